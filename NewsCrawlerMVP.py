@@ -21,6 +21,8 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
 
+from hu_normalizer import is_hu_index, match_query, register as register_hu_norm
+
 # ===========================
 # --- Alap domain objektumok
 # ===========================
@@ -194,6 +196,7 @@ class Repository:
     def __init__(self, db_path: str = "news.sqlite") -> None:
         self.db_path = db_path
         self.conn = sqlite3.connect(self.db_path)
+        register_hu_norm(self.conn)   # az items_fts triggerei hu_norm()-ot hívnak
         self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS items(
@@ -249,7 +252,10 @@ class Repository:
                 "FROM items i JOIN items_fts ON items_fts.rowid = i.rowid\n"
                 "WHERE items_fts MATCH ? ORDER BY " + ("rank" if order=="bm25" else "i.ts DESC") + " LIMIT ?"
             )
-            rows = self.conn.execute(sql, [query, limit]).fetchall()
+            match = match_query(query) if is_hu_index(self.conn) else query
+            if match is None:
+                return []   # nincs kereshető szó (pl. csak kizárás: "NOT kormány")
+            rows = self.conn.execute(sql, [match, limit]).fetchall()
         except sqlite3.OperationalError:
             rows = self.conn.execute(
                 "SELECT title, link, label, label_score, datetime(ts,'unixepoch') as date, NULL as rank, cluster_id, substr(content,1,400) as snippet\n"
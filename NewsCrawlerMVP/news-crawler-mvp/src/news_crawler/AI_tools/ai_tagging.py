@@ -297,25 +297,21 @@ def update_article_tags_in_db(repo: Repository,
                               article_id: str,
                               tagging: TaggingResult) -> None:
     """
-    Egyetlen cikk tags + matched_tags mezőinek frissítése az articles táblában.
+    Egyetlen cikk tags + matched_tags mezőinek frissítése az articles táblában,
+    és ugyanabban a tranzakcióban a normalizált entities / topics kapcsolótáblák
+    feltöltése (ezeken megy a search_by_meta entitás/topic szűrése).
 
     - tags: egyszerű string-lista JSON-ben (topicok + entitások + kulcsszavak)
     - matched_tags: strukturált JSON (entities + topics + keywords külön)
     """
-    tags_json = tagging.to_json_tags()
-    matched_json = tagging.to_json_matched_tags()
-
-    conn = repo.conn
-    cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE articles
-        SET tags = ?, matched_tags = ?, updated_at = strftime('%s','now')
-        WHERE id = ?
-        """,
-        (tags_json, matched_json, article_id),
+    repo.set_article_tags(
+        article_id,
+        tags_json=tagging.to_json_tags(),
+        matched_tags_json=tagging.to_json_matched_tags(),
+        entities=[(e.text, e.type, e.salience) for e in tagging.entities],
+        topics=tagging.topics,
+        keywords=tagging.keywords,
     )
-    conn.commit()
 
 
 def tag_article_and_update(repo: Repository,
@@ -356,10 +352,11 @@ def bulk_tag_missing_articles(repo: Repository,
     cur = conn.cursor()
 
     sql = [
-        "SELECT a.*",
+        "SELECT a.*, body_text(b.content, b.content_z, b.dict_id) AS content",
         "FROM articles a",
         "JOIN sources s ON s.id = a.source_id",
-        "WHERE a.content IS NOT NULL AND a.content <> ''",
+        "JOIN article_bodies b ON b.article_id = a.id",
+        "WHERE a.has_content = 1",
         "AND (a.tags IS NULL OR a.tags = '')",
     ]
     params: List[Any] = []
@@ -109,63 +109,95 @@ class NarrativeDetector:
         Betölti azokat a cikkeket, amelyeknél:
           - van content
           - van matched_tags (NER + topic + keyword struktúra)
+
+        Az entitásokat / topicokat / kulcsszavakat a normalizált
+        kapcsolótáblákból olvassa (nincs soronkénti json.loads).
         """
         cur = self.repo.conn.cursor()
 
-        sql = [
-            "SELECT a.id, a.url, a.title, a.content, a.published_date,",
-            "       a.matched_tags",
-            "FROM articles a",
-            "JOIN sources s ON s.id = a.source_id",
-            "WHERE a.content IS NOT NULL AND a.content <> ''",
-            "  AND a.matched_tags IS NOT NULL AND a.matched_tags <> ''",
+        where = [
+            "a.has_content = 1",
+            "a.matched_tags IS NOT NULL AND a.matched_tags <> ''",
         ]
-
         params: List[object] = []
 
         if domain:
-            sql.append("  AND s.domain = ?")
+            where.append("s.domain = ?")
             params.append(domain)
 
         if date_from:
-            sql.append("  AND a.published_date >= ?")
+            where.append("a.published_date >= ?")
             params.append(date_from)
 
         if date_to:
-            sql.append("  AND a.published_date <= ?")
+            where.append("a.published_date <= ?")
             params.append(date_to)
 
-        sql.append("ORDER BY a.published_date ASC, a.id ASC")
-
+        sql = [
+            "SELECT a.id, a.url, a.title, a.published_date",
+            "FROM articles a",
+            "JOIN sources s ON s.id = a.source_id",
+            "WHERE " + " AND ".join(where),
+            "ORDER BY a.published_date ASC, a.id ASC",
+        ]
+        article_params = list(params)
         if limit is not None:
             sql.append("LIMIT ?")
-            params.append(limit)
+            article_params.append(limit)
 
-        rows = cur.execute(" ".join(sql), params).fetchall()
+        rows = cur.execute(" ".join(sql), article_params).fetchall()
 
         articles: List[NarrativeArticle] = []
+        by_id: Dict[str, NarrativeArticle] = {}
         for row in rows:
-            mt_raw = row["matched_tags"]
-            try:
-                mt = json.loads(mt_raw) if mt_raw else {}
-            except Exception:
-                mt = {}
-
-            entities = [e.get("text", "") for e in mt.get("entities", []) if e.get("text")]
-            topics = mt.get("topics", []) or []
-            keywords = mt.get("keywords", []) or []
-
-            articles.append(
-                NarrativeArticle(
-                    id=row["id"],
-                    url=row["url"],
-                    title=row["title"] or "",
-                    date=row["published_date"] or "",
-                    entities=entities,
-                    topics=topics,
-                    keywords=keywords,
-                )
+            art = NarrativeArticle(
+                id=row["id"],
+                url=row["url"],
+                title=row["title"] or "",
+                date=row["published_date"] or "",
+                entities=[],
+                topics=[],
+                keywords=[],
             )
+            articles.append(art)
+            by_id[art.id] = art
+
+        if not articles:
+            return articles
+
+        # ugyanaz a szűrés, a kapcsolótáblákon át (egy-egy lekérdezés az egész ablakra)
+        base = " ".join([
+            "FROM articles a",
+            "JOIN sources s ON s.id = a.source_id",
+            "{join}",
+            "WHERE " + " AND ".join(where),
+        ])
+
+        ent_sql = (
+            "SELECT ae.article_id, e.name "
+            + base.format(join="JOIN article_entities ae ON ae.article_id = a.id "
+                               "JOIN entities e ON e.id = ae.entity_id")
+            + " ORDER BY ae.article_id, ae.salience DESC"
+        )
+        for r in cur.execute(ent_sql, params):
+            art = by_id.get(r["article_id"])
+            if art is not None:
+                art.entities.append(r["name"])
+
+        topic_sql = (
+            "SELECT at.article_id, t.name, t.kind "
+            + base.format(join="JOIN article_topics at ON at.article_id = a.id "
+                               "JOIN topics t ON t.id = at.topic_id")
+            + " ORDER BY at.article_id, t.kind, at.pos"   # a tagger sorrendje, mint a JSON-ben
+        )
+        for r in cur.execute(topic_sql, params):
+            art = by_id.get(r["article_id"])
+            if art is None:
+                continue
+            if r["kind"] == "keyword":
+                art.keywords.append(r["name"])
+            else:
+                art.topics.append(r["name"])
 
         return articles
 
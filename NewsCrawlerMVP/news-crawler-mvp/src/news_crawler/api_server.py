@@ -1,5 +1,8 @@
-from typing import List, Optional
+from contextlib import contextmanager, nullcontext
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
 import os
+import sqlite3
 from pathlib import Path
 from urllib.parse import urlparse  # +++
 
@@ -8,6 +11,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel          # ⬅️ EZ HIÁNYZOTT
 from .core import NewsCrawlerMVP  # NewsCrawler + Repo + Fetcher + SearchEngine
+from .federated import FederatedSearch
+from .filters import Filters
+from .percolator import StandingQuery
+from .query_budget import QueryBudget, QueryBudgetExceeded
+from .query_cache import QueryCache
+from .repository import Repository, merge_stats
+from .search import SearchEngine
+from .suggest import SuggestIndex, merge_suggestions
+from .vector_index import DEFAULT_MODEL, QueryEncoder, VectorIndex
 
 
 # ---- Alap DB + domain→DB mapping ----
@@ -23,6 +35,54 @@ DOMAIN_DB_MAP = {
     "hvg.hu": Path(os.environ.get("HVG_DB_PATH", "hvg_30d.sqlite")).resolve(),
 }
 
+# Federált (domain nélküli) keresés: shardonkénti timeout másodpercben
+FEDERATED_TIMEOUT = float(os.environ.get("FEDERATED_TIMEOUT", "5"))
+
+# Keresési eredmény cache (minden DB-re közös; 0 MB = kikapcsolva).
+# Az írási generáció miatt ingest után sem ad elavult találatot.
+QUERY_CACHE_MB = int(os.environ.get("QUERY_CACHE_MB", "64"))
+QUERY_CACHE_TTL = float(os.environ.get("QUERY_CACHE_TTL", "300"))
+query_cache: Optional[QueryCache] = (
+    QueryCache(max_bytes=QUERY_CACHE_MB << 20, ttl=QUERY_CACHE_TTL) if QUERY_CACHE_MB > 0 else None
+)
+
+# Lekérdezési időkeret végpontonként (ms, 0 = nincs keret): a kereten túlfutó SQLite
+# lekérdezést a progress handler megszakítja, a válasz részleges (truncated=True),
+# így egy rossz lekérdezés nem foglalja a kapcsolatot mindenki elől.
+# SLOW_QUERY_MS fölött a lekérdezés SQL-je + EXPLAIN QUERY PLAN-je a naplóba kerül.
+SEARCH_BUDGET_MS = float(os.environ.get("SEARCH_BUDGET_MS", "2000"))
+STATS_BUDGET_MS = float(os.environ.get("STATS_BUDGET_MS", "5000"))
+HITS_BUDGET_MS = float(os.environ.get("HITS_BUDGET_MS", "1000"))
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "500"))
+query_budget = QueryBudget(slow_ms=SLOW_QUERY_MS)
+
+
+def budget_seconds(ms: float) -> Optional[float]:
+    return ms / 1000 if ms > 0 else None
+
+
+@contextmanager
+def endpoint_budget(repo: Repository, ms: float, label: str) -> Iterator[None]:
+    """
+    Részeredményt nem adó végpontok (stats, hits) kerete: a kereten túlfutó
+    vagy a foglalt kapcsolat miatt el sem induló lekérdezés HTTP 503.
+    """
+    try:
+        with repo.time_budget(budget_seconds(ms), label=label) as budget:
+            try:
+                yield
+            except sqlite3.OperationalError:
+                if budget is None or not budget.aborted:
+                    raise
+                raise HTTPException(status_code=503, detail=f"{label}: túllépte a {ms:g} ms-os időkeretet")
+    except QueryBudgetExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# Hibrid (BM25 + vektor) keresés: a query embedding modellje (az article_embeddings-ével egyezzen)
+HYBRID_MODEL = os.environ.get("HYBRID_MODEL", DEFAULT_MODEL)
+HYBRID_CANDIDATES = int(os.environ.get("HYBRID_CANDIDATES", "100"))
+
 print(f"[TISZA] Default DB (fallback): {DB_PATH_ABS}")
 for dom, p in DOMAIN_DB_MAP.items():
     print(f"[TISZA] Domain DB mapping: {dom} -> {p}")
@@ -53,9 +113,77 @@ def get_crawler_for_domain(domain: Optional[str]) -> NewsCrawlerMVP:
     if key not in crawler_cache:
         print(f"[TISZA] Creating NewsCrawlerMVP for DB: {db_path} (domain={dom or 'DEFAULT'})")
         crawler_cache[key] = NewsCrawlerMVP(db_path=str(db_path))
+        crawler_cache[key].repo.cache = query_cache
+        crawler_cache[key].repo.budget = query_budget
     return crawler_cache[key]
 
 
+vector_cache: dict[str, VectorIndex] = {}
+hybrid_cache: dict[str, SearchEngine] = {}
+query_encoder: Optional[QueryEncoder] = None
+
+
+def get_hybrid_engine(domain: Optional[str]) -> SearchEngine:
+    """
+    SearchEngine vektoros indexszel a domain DB-jéhez (domain nélkül a default DB).
+    Az index (és a SearchEngine a query-encode szálkészletével) DB-nként egyszer
+    jön létre, utána magától frissül; az encoder (és a query-embedding cache) közös.
+    """
+    global query_encoder
+    crawler = get_crawler_for_domain(domain)
+    key = str(crawler.repo.db_path)
+    if key not in vector_cache:
+        vector_cache[key] = VectorIndex(crawler.repo, model=HYBRID_MODEL)
+    if query_encoder is None:
+        query_encoder = QueryEncoder(HYBRID_MODEL)
+    if key not in hybrid_cache:
+        hybrid_cache[key] = SearchEngine(crawler.repo, vectors=vector_cache[key], encoder=query_encoder)
+    return hybrid_cache[key]
+
+
+suggest_cache: dict[str, SuggestIndex] = {}
+
+
+def get_suggest_index(domain: Optional[str]) -> SuggestIndex:
+    """Autocomplete index a domain DB-jéhez; DB-nként egyszer épül, utána inkrementálisan frissül."""
+    crawler = get_crawler_for_domain(domain)
+    key = str(crawler.repo.db_path)
+    if key not in suggest_cache:
+        suggest_cache[key] = SuggestIndex(crawler.repo)
+    return suggest_cache[key]
+
+
+federated_cache: dict[tuple, FederatedSearch] = {}
+
+
+def get_federated_search() -> FederatedSearch:
+    """
+    Federált kereső az összes domain-DB + a default DB felett.
+    Csak a létező fájlok lesznek shardok (üres DB-t nem hozunk létre);
+    ha közben új DB fájl jelenik meg, új példány készül.
+    """
+    shards: dict[str, Path] = {}
+    for dom, p in DOMAIN_DB_MAP.items():
+        if p.exists():
+            shards[dom] = p
+    if DB_PATH_ABS.exists() and DB_PATH_ABS not in shards.values():
+        shards["default"] = DB_PATH_ABS
+    key = tuple(sorted((name, str(p)) for name, p in shards.items()))
+    if key not in federated_cache:
+        for old in federated_cache.values():
+            old.close()
+        federated_cache.clear()
+        print(f"[TISZA] Federated search shards: {', '.join(shards) or '-'}")
+        # a shardok a keresés keretén belül maradnak (a shard-lekérdezések keretezettek)
+        timeout = min(FEDERATED_TIMEOUT, SEARCH_BUDGET_MS / 1000) if SEARCH_BUDGET_MS > 0 else FEDERATED_TIMEOUT
+        federated_cache[key] = FederatedSearch(
+            {name: get_crawler_for_domain(name if name != "default" else None).repo
+             for name in shards},
+            timeout=timeout,
+        )
+    return federated_cache[key]
+
+
 # -------------------------------------------------
 # FastAPI app config
 # -------------------------------------------------
@@ -89,6 +217,67 @@ class SearchResult(BaseModel):
     snippet: str
 
 
+class FacetValue(BaseModel):
+    value: Optional[str] = None         # None = nincs érték (pl. címkézetlen / dátum nélküli)
+    count: int
+
+
+class SearchPage(BaseModel):
+    items: List[SearchResult]
+    next_cursor: Optional[str] = None   # None = nincs több oldal
+    partial: bool = False               # federált keresésnél: valamelyik shard kimaradt (timeout/hiba)
+    truncated: bool = False             # az időkeret lejárt: csak az addig kész találatok (lásd next_cursor)
+    facets: Optional[Dict[str, List[FacetValue]]] = None   # ?facets=domain,label,month
+
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str                           # entity | topic | keyword | section | title
+    count: int                          # ennyi cikkben fordul elő
+    last: Optional[str] = None          # legutóbbi előfordulás napja
+
+
+class StandingQueryIn(BaseModel):
+    name: str
+    any: List[str] = []                 # legalább egy szerepeljen (vagy egy regex illeszkedjen)
+    all: List[str] = []                 # mind szerepeljen
+    none: List[str] = []                # egyik se szerepeljen
+    regex: List[str] = []
+    domains: List[str] = []             # üres = minden forrás
+
+
+class StandingQueryOut(StandingQueryIn):
+    id: int
+    active: bool = True
+
+
+class QueryHit(BaseModel):
+    hit_id: int
+    query: str
+    matched: List[str] = []
+    title: str
+    url: str
+    date: Optional[str] = None
+    domain: Optional[str] = None
+
+
+class HitsPage(BaseModel):
+    items: List[QueryHit]
+    next_cursor: str                    # a következő pollozás cursor-a (nincs új találat: ugyanaz)
+    has_more: bool = False
+
+
+class StatsRow(BaseModel):
+    domain: Optional[str] = None
+    day: Optional[str] = None       # group_by=day
+    month: Optional[str] = None     # group_by=month
+    n_articles: int
+    n_with_content: int
+    n_tagged: int
+    n_labeled: int
+    labels: Dict[str, int] = {}
+
+
 class ArticleResponse(BaseModel):
     title: str
     url: str
@@ -105,10 +294,22 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/api/metrics")
+async def metrics() -> dict:
+    """
+    Query cache találati arány / méret (hits, misses, stale, evictions, bytes),
+    lekérdezési időkeret: lefutott / megszakított / foglalt / lassú lekérdezések.
+    """
+    return {
+        "query_cache": query_cache.stats() if query_cache is not None else None,
+        "query_budget": query_budget.stats(),
+    }
+
+
 # -------------------------------------------------
 # 1) Keresés CSAK az adatbázisban
 # -------------------------------------------------
-@app.get("/api/search", response_model=List[SearchResult])
+@app.get("/api/search", response_model=SearchPage)
 async def search_db(
     domain: Optional[str] = None,
     date_from: Optional[str] = None,
@@ -116,32 +317,99 @@ async def search_db(
     q: Optional[str] = None,
     topic: Optional[str] = None,       # ÚJ
     keyword: Optional[str] = None,     # ÚJ
-    limit: int = Query(1000, ge=1),
-) -> List[SearchResult]:
-    crawler = get_crawler_for_domain(domain)
+    label: Optional[str] = None,       # pl. "ellenzéki" – SQL-ben szűrve, a limit előtt
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,      # előző oldal next_cursor-a (keyset lapozás)
+    mode: str = Query("meta", description="meta | hybrid (BM25 + vektor, RRF; q és domain kötelező)"),
+    facets: Optional[str] = Query(None, description="pl. domain,label,month (cluster, section is)"),
+    facet_limit: int = Query(10, ge=1, le=100),
+) -> SearchPage:
     # ha fordítva vannak, cseréljük fel
     if date_from and date_to and date_from > date_to:
         date_from, date_to = date_to, date_from
 
-    # a domain alapján kiválasztjuk a megfelelő DB-t
-    crawler = get_crawler_for_domain(domain)
+    facet_names = [f.strip() for f in facets.split(",") if f.strip()] if facets else None
 
-    rows = crawler.repo.search_by_meta(
-        domain=domain,
-        date_from=date_from,
-        date_to=date_to,
-        q=q,
-        topic=topic,        # ezt majd hozzáadod a repo metódushoz
-        keyword=keyword,    # ezt is
-        limit=limit,
-    )
+    if mode == "hybrid":
+        return hybrid_search(domain, date_from, date_to, q, label, limit, facet_names, facet_limit)
+    if mode != "meta":
+        raise HTTPException(status_code=400, detail=f"Ismeretlen mode: {mode!r} (meta | hybrid)")
+
+    # domain nélkül: minden domain-DB párhuzamosan (federált), különben a domain saját DB-je
+    searcher = get_federated_search() if not normalize_domain(domain) else get_crawler_for_domain(domain).repo
 
+    # a FederatedSearch shardonként maga keretez (timeout = a keresés kerete)
+    budget = (
+        searcher.time_budget(budget_seconds(SEARCH_BUDGET_MS), label="search")
+        if isinstance(searcher, Repository)
+        else nullcontext()
+    )
+    try:
+        with budget:
+            page = searcher.search_by_meta_page(
+                domain=domain,
+                date_from=date_from,
+                date_to=date_to,
+                q=q,
+                topic=topic,
+                keyword=keyword,
+                where=Filters.by_label([label]) if label else None,
+                limit=limit,
+                cursor=cursor,
+                facets=facet_names,
+                facet_limit=facet_limit,
+            )
+    except QueryBudgetExceeded as e:
+        # a kapcsolatot a keretnél tovább foglalja egy másik lekérdezés: üres, csonka oldal
+        print(f"[TISZA] /api/search {e}")
+        page = {"items": [], "next_cursor": cursor, "partial": True, "truncated": True}
+    except ValueError as e:
+        # hibás / lejárt cursor, ismeretlen facet
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = page["items"]
     print(
         f"[TISZA] /api/search domain={domain!r} "
-        f"from={date_from!r} to={date_to!r} q={q!r} "
-        f"limit={limit} -> {len(rows)} rows"
+        f"from={date_from!r} to={date_to!r} q={q!r} label={label!r} "
+        f"limit={limit} cursor={'yes' if cursor else 'no'} -> {len(rows)} rows"
+    )
+    if page.get("shards"):
+        print("[TISZA]   shards: " + ", ".join(
+            f"{name}={st['status']}({st['rows']}, {st['seconds']}s)" for name, st in page["shards"].items()
+        ))
+
+    return SearchPage(
+        items=to_results(rows),
+        next_cursor=page["next_cursor"],
+        partial=page.get("partial", False),
+        truncated=page.get("truncated", False),
+        facets=to_facets(page.get("facets")),
     )
 
+
+@app.get("/api/suggest", response_model=List[Suggestion])
+async def suggest(
+    q: str = Query(..., description="A keresőmező eddig begépelt része, pl. 'Tisza P'"),
+    domain: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    kinds: Optional[str] = Query(None, description="pl. entity,topic (keyword, section, title is)"),
+) -> List[Suggestion]:
+    kind_list = [k.strip() for k in kinds.split(",") if k.strip()] if kinds else None
+    if normalize_domain(domain):
+        rows = get_suggest_index(domain).suggest(q, limit=limit, kinds=kind_list)
+    else:
+        # domain nélkül: minden shard javaslatai összefésülve
+        rows = merge_suggestions(
+            (
+                get_suggest_index(name if name != "default" else None).suggest(q, limit=limit, kinds=kind_list)
+                for name in get_federated_search().shards
+            ),
+            limit,
+        )
+    return [Suggestion(text=r["text"], kind=r["kind"], count=r["count"], last=r["last"]) for r in rows]
+
+
+def to_results(rows: List[Dict]) -> List[SearchResult]:
     results: List[SearchResult] = []
     for r in rows:
         results.append(
@@ -159,6 +427,126 @@ async def search_db(
     return results
 
 
+def to_facets(facets: Optional[Dict[str, List[Dict]]]) -> Optional[Dict[str, List[FacetValue]]]:
+    if facets is None:
+        return None
+    # a klaszter-id szám, a válaszban minden facet-érték string
+    return {
+        name: [FacetValue(value=None if v["value"] is None else str(v["value"]), count=v["count"]) for v in values]
+        for name, values in facets.items()
+    }
+
+
+def hybrid_search(
+    domain: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    q: Optional[str],
+    label: Optional[str],
+    limit: int,
+    facet_names: Optional[List[str]] = None,
+    facet_limit: int = 10,
+) -> SearchPage:
+    """
+    mode=hybrid: BM25 + dense vektor, RRF fúzió (SearchEngine.hybrid_search).
+    A szűrők (domain, dátum, label) mindkét ágon a fúzió előtt érvényesülnek.
+    Egy oldal van (a fúziós pontszám nem lapozási kulcs), next_cursor mindig None.
+    Csak egy domain DB-jén fut (a vektoros index DB-nként külön van, federált
+    változata nincs): domain nélkül 400, nem csendben a default DB.
+    A facetek a szöveges (FTS) találati halmazra vonatkoznak, ugyanazokkal a szűrőkkel.
+    A BM25 ág és a facetek a keresés időkeretén belül futnak (SEARCH_BUDGET_MS).
+    """
+    if not q or not q.strip():
+        raise HTTPException(status_code=400, detail="mode=hybrid esetén a q paraméter kötelező")
+    dom = normalize_domain(domain)
+    if not dom:
+        raise HTTPException(
+            status_code=400,
+            detail="mode=hybrid esetén a domain paraméter kötelező (domain nélkül: mode=meta, federált)",
+        )
+
+    parts = [Filters.by_domain([dom])]
+    try:
+        if date_from or date_to:
+            # date_to napja még beleszámít (mint a meta keresésnél)
+            end_excl = date.fromisoformat(date_to[:10]) + timedelta(days=1) if date_to else None
+            parts.append(Filters.by_date_range(date_from, end_excl))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Hibás dátum: {e}")
+    if label:
+        parts.append(Filters.by_label([label]))
+
+    where = Filters.compose(*parts) if parts else None
+    budget, truncated = None, False
+    try:
+        engine = get_hybrid_engine(dom)
+        with engine.repo.time_budget(budget_seconds(SEARCH_BUDGET_MS), label="search:hybrid") as budget:
+            rows = engine.hybrid_search(
+                q,
+                limit=limit,
+                where=where,
+                candidates=max(HYBRID_CANDIDATES, limit),
+            )
+            facets = engine.repo.facets(facet_names, top_n=facet_limit, q=q, where=where) if facet_names else None
+        truncated = bool(budget and budget.truncated)
+    except QueryBudgetExceeded as e:
+        print(f"[TISZA] /api/search mode=hybrid {e}")
+        rows, facets, truncated = [], None, True
+    except sqlite3.OperationalError:
+        # a vektoros ág / sorbetöltés SQL-je nem ad részeredményt: üres, csonka válasz
+        if not (budget and budget.aborted):
+            raise
+        rows, facets, truncated = [], None, True
+    except RuntimeError as e:
+        # numpy / sentence-transformers hiányzik
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    print(
+        f"[TISZA] /api/search mode=hybrid domain={domain!r} "
+        f"from={date_from!r} to={date_to!r} q={q!r} label={label!r} limit={limit} -> {len(rows)} rows"
+    )
+    return SearchPage(items=to_results(rows), next_cursor=None, truncated=truncated, facets=to_facets(facets))
+
+
+# -------------------------------------------------
+# 1b) Statisztika (daily_stats rollup, O(napok))
+# -------------------------------------------------
+@app.get("/api/stats", response_model=List[StatsRow])
+async def stats(
+    domain: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    group_by: str = Query("day", description="day | month | domain | total"),
+) -> List[StatsRow]:
+    """
+    Cikkszámok napra / hónapra / domainre bontva (összes, body-val, címkézett,
+    label szerint). Domain nélkül az összes domain-DB összegzése; ugyanaz a
+    cikk több DB-ben is szerepelhet, ilyenkor mindegyikben beleszámít.
+    """
+    if date_from and date_to and date_from > date_to:
+        date_from, date_to = date_to, date_from
+
+    def shard_stats(repo: Repository, dom: Optional[str]) -> List[dict]:
+        # a keret DB-nként (shardonként) érvényes
+        with endpoint_budget(repo, STATS_BUDGET_MS, "stats"):
+            return repo.stats(dom, date_from, date_to, group_by=group_by)
+
+    dom = normalize_domain(domain)
+    try:
+        if dom:
+            rows = shard_stats(get_crawler_for_domain(dom).repo, dom)
+        else:
+            fed = get_federated_search()
+            rows = merge_stats(shard_stats(repo, None) for repo in fed.shards.values())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    print(f"[TISZA] /api/stats domain={dom!r} from={date_from!r} to={date_to!r} group_by={group_by} -> {len(rows)} rows")
+    return [StatsRow(**r) for r in rows]
+
+
 # -------------------------------------------------
 # 2) Dinamikus crawling + scrapelés domain + intervallum alapján
 # -------------------------------------------------
@@ -250,6 +638,74 @@ async def crawl_range(
     return results
 
 
+# -------------------------------------------------
+# 3) Állandó lekérdezések (percolator): találatok ingestkor, cursor-ral olvasva
+# -------------------------------------------------
+def to_query_out(q: StandingQuery) -> StandingQueryOut:
+    return StandingQueryOut(id=q.id, active=q.active, name=q.name, **q.spec())
+
+
+@app.get("/api/queries", response_model=List[StandingQueryOut])
+async def list_queries(domain: Optional[str] = None) -> List[StandingQueryOut]:
+    return [to_query_out(q) for q in get_crawler_for_domain(domain).percolator.queries()]
+
+
+@app.post("/api/queries", response_model=StandingQueryOut)
+async def register_query(
+    body: StandingQueryIn,
+    domain: Optional[str] = None,
+    backfill: bool = Query(False, description="A már tárolt cikkekre is lefut"),
+) -> StandingQueryOut:
+    """Felvétel / felülírás név alapján, a domain DB-jébe (domain nélkül a default DB)."""
+    perc = get_crawler_for_domain(domain).percolator
+    query = StandingQuery(**body.dict())
+    try:
+        perc.register(query, backfill=backfill)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    print(f"[TISZA] /api/queries: {query.name!r} (id={query.id}) domain={domain!r} backfill={backfill}")
+    return to_query_out(query)
+
+
+@app.delete("/api/queries/{name}")
+async def delete_query(name: str, domain: Optional[str] = None) -> dict:
+    if not get_crawler_for_domain(domain).percolator.remove(name):
+        raise HTTPException(status_code=404, detail=f"Nincs ilyen lekérdezés: {name!r}")
+    return {"deleted": name}
+
+
+@app.get("/api/hits", response_model=HitsPage)
+async def query_hits(
+    domain: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Az előző válasz next_cursor-a (üres = az elejéről)"),
+    query: Optional[str] = Query(None, description="Lekérdezés-nevek vesszővel (üres = mind)"),
+    limit: int = Query(100, ge=1, le=1000),
+) -> HitsPage:
+    names = [n.strip() for n in query.split(",") if n.strip()] if query else None
+    crawler = get_crawler_for_domain(domain)
+    try:
+        with endpoint_budget(crawler.repo, HITS_BUDGET_MS, "hits"):
+            page = crawler.percolator.hits_since(cursor, queries=names, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return HitsPage(
+        items=[
+            QueryHit(
+                hit_id=h["hit_id"],
+                query=h["query"],
+                matched=h["matched"],
+                title=h["title"] or "",
+                url=h["link"] or "",
+                date=h["date"],
+                domain=h["domain"],
+            )
+            for h in page["items"]
+        ],
+        next_cursor=page["next_cursor"],
+        has_more=page["has_more"],
+    )
+
+
 # -------------------------------------------------
 # Egy konkrét cikk lekérése (cache-eléssel)
 # -------------------------------------------------
@@ -458,7 +914,9 @@ INDEX_HTML = """
       <h2>Keresés</h2>
       <div class="search-row">
         <input id="q" type="text" placeholder="Opcionális kulcsszó (pl. 'Orbán Viktor')" 
+               list="qSuggest" autocomplete="off" oninput="scheduleSuggest()"
                onkeydown="if(event.key==='Enter'){doDbSearch();}" />
+        <datalist id="qSuggest"></datalist>
         <select id="domain">
           <option value="">Minden forrás</option>
           <option value="telex.hu">Telex</option>
@@ -490,21 +948,66 @@ INDEX_HTML = """
   </main>
 
   <script>
-    function renderResults(data) {
+    // Lapozási állapot a DB-kereséshez (keyset cursor)
+    let searchParams = null;
+    let nextCursor = null;
+    let loadingPage = false;
+    let shownCount = 0;
+
+    // Typeahead: /api/suggest, rövid debounce-szal, a legutóbbi kérés nyer
+    let suggestTimer = null;
+    let suggestSeq = 0;
+
+    function scheduleSuggest() {
+      clearTimeout(suggestTimer);
+      suggestTimer = setTimeout(loadSuggestions, 120);
+    }
+
+    async function loadSuggestions() {
+      const q = document.getElementById('q').value.trim();
+      const listEl = document.getElementById('qSuggest');
+      if (q.length < 2) {
+        listEl.innerHTML = '';
+        return;
+      }
+      const seq = ++suggestSeq;
+      const params = new URLSearchParams({ q: q, limit: '8' });
+      const domain = document.getElementById('domain').value;
+      if (domain) params.append('domain', domain);
+      try {
+        const resp = await fetch('/api/suggest?' + params.toString());
+        if (!resp.ok || seq !== suggestSeq) return;
+        const items = await resp.json();
+        listEl.innerHTML = '';
+        items.forEach(item => {
+          const opt = document.createElement('option');
+          opt.value = item.text;
+          opt.label = item.kind + ' · ' + item.count + ' cikk';
+          listEl.appendChild(opt);
+        });
+      } catch (err) {
+        // a javaslat nem kritikus: hiba esetén csendben kimarad
+      }
+    }
+
+    function renderResults(data, append = false) {
       const resultsEl = document.getElementById('results');
       const articleEl = document.getElementById('article');
       const infoEl = document.getElementById('resultsInfo');
-      if (!data.length) {
+      if (!append && !data.length) {
         resultsEl.innerHTML = '<p class="small">Nincs találat.</p>';
         articleEl.innerHTML = '';
         return;
       }
 
-      if (infoEl) infoEl.textContent = 'Találatok: ' + data.length + ' db';
-
-      articleEl.innerHTML = '<p class="small">Válassz egy cikket a találatok közül.</p>';
+      if (!append) {
+        shownCount = 0;
+        articleEl.innerHTML = '<p class="small">Válassz egy cikket a találatok közül.</p>';
+        resultsEl.innerHTML = '';
+      }
+      shownCount += data.length;
+      if (infoEl) infoEl.textContent = 'Találatok: ' + shownCount + ' db' + (nextCursor ? '+' : '');
 
-      resultsEl.innerHTML = '';
       data.forEach((item, idx) => {
         const div = document.createElement('div');
         div.className = 'result-item';
@@ -530,6 +1033,38 @@ INDEX_HTML = """
       });
     }
 
+    async function loadNextPage() {
+      if (!searchParams || !nextCursor || loadingPage) return;
+      loadingPage = true;
+      const params = new URLSearchParams(searchParams);
+      params.append('cursor', nextCursor);
+      try {
+        const resp = await fetch('/api/search?' + params.toString());
+        if (!resp.ok) {
+          nextCursor = null;
+          return;
+        }
+        const page = await resp.json();
+        nextCursor = page.next_cursor;
+        renderResults(page.items, true);
+      } catch (err) {
+        console.error(err);
+        nextCursor = null;
+      } finally {
+        loadingPage = false;
+      }
+    }
+
+    // Görgetéskor, a lista alja előtt töltjük a következő oldalt
+    document.addEventListener('DOMContentLoaded', () => {
+      const resultsEl = document.getElementById('results');
+      resultsEl.addEventListener('scroll', () => {
+        if (resultsEl.scrollTop + resultsEl.clientHeight >= resultsEl.scrollHeight - 200) {
+          loadNextPage();
+        }
+      });
+    });
+
     async function doDbSearch() {
       const q = document.getElementById('q').value.trim();
       const domain = document.getElementById('domain').value.trim();
@@ -546,7 +1081,7 @@ INDEX_HTML = """
       articleEl.innerHTML = '<p class="small">Várakozás a DB-keresés eredményére…</p>';
 
       const params = new URLSearchParams();
-      params.append('limit', '1000');
+      params.append('limit', '50');
       if (q) params.append('q', q);
       if (domain) params.append('domain', domain);
       if (dateFrom) params.append('date_from', dateFrom);
@@ -564,9 +1099,15 @@ INDEX_HTML = """
           articleEl.innerHTML = '';
           return;
         }
-        const data = await resp.json();
-        console.log("API /api/search (db) response:", data);
-        renderResults(data);
+        const page = await resp.json();
+        console.log("API /api/search (db) response:", page);
+        searchParams = params;
+        nextCursor = page.next_cursor;
+        renderResults(page.items);
+        // ha az első oldal nem tölti ki a panelt, nincs mit görgetni → töltsünk tovább
+        while (nextCursor && resultsEl.scrollHeight <= resultsEl.clientHeight) {
+          await loadNextPage();
+        }
       } catch (err) {
         console.error(err);
         resultsEl.innerHTML = '<p class="small">Váratlan hiba a DB-keresés során.</p>';
@@ -584,6 +1125,8 @@ INDEX_HTML = """
       const infoEl = document.getElementById('resultsInfo');
       resultsEl.innerHTML = '';
       if (infoEl) infoEl.textContent = '';
+      searchParams = null;   // a crawl_range válasza nem lapozható
+      nextCursor = null;
       articleEl.innerHTML = '<p class="small">Intervallum lekérdezése és archívum letöltése…</p>';
 
       const params = new URLSearchParams();
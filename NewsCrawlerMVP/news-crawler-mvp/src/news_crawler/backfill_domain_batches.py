@@ -8,11 +8,15 @@ Fő elvek:
 - Minden batch:
   1) crawl (meta) -> master DB
   2) content backfill -> master DB (get_or_fetch_article)
-  3) az adott 30 nap összes cikkének kimásolása külön batch-DB-be (almappába)
+  3) az adott 30 nap összes cikkének kimásolása külön batch-DB-be (almappába),
+     ATTACH + INSERT ... SELECT, egy tranzakcióban
   4) részletes JSON riport mentése
-- WAL + integrity_check minden batch végén
+- WAL + lépcsőzetes ellenőrzés: minden batch után olcsó quick_check a
+  batch-DB-n + az ablak sorszám/checksum egyeztetése master és batch között;
+  teljes integrity_check a masteren csak ütemezve (--full-check-every) és a végén
 - Resume: ha a batch riportja megvan és success=true, skip
-- Opcionális master DB backup batchenként
+- Opcionális master DB backup batchenként: online (backup API / VACUUM INTO),
+  háttérszálon, rotációval, quick_check-kel – a crawl közben fut tovább
 
 Példák:
 
@@ -26,10 +30,12 @@ python -m news_crawler.backfill_domain_batches \
     --outdir backfills/index.hu \
     -v
 
-# HVG, 10 év, integritás-ellenőrzés + backup minden batch előtt
+# HVG, 10 év, első betöltés bulk módban, backup minden batch előtt,
+# teljes master integrity_check minden 12. batch után
 python -m news_crawler.backfill_domain_batches \
-    --domain hvg.hu --years 10 \
-    --backup-master --backup-prefix backups/hvg_master_
+    --domain hvg.hu --years 10 --bulk-load \
+    --backup-master --backup-prefix backups/hvg_master_ \
+    --full-check-every 12
 """
 
 from __future__ import annotations
@@ -37,7 +43,6 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import shutil
 import signal
 import sys
 from dataclasses import dataclass
@@ -48,12 +53,14 @@ from typing import Optional, List, Dict, Any
 # pakettszerű import + fallback (mint a meglévő scriptekben)
 try:
     from .core import NewsCrawlerMVP
+    from .backup import OnlineBackup
 except Exception:
     here = Path(__file__).resolve()
     src_root = here.parents[1]
     if str(src_root) not in sys.path:
         sys.path.insert(0, str(src_root))
     from news_crawler.core import NewsCrawlerMVP  # type: ignore
+    from news_crawler.backup import OnlineBackup  # type: ignore
 
 import sqlite3
 
@@ -74,27 +81,42 @@ def set_safe_sqlite_pragmas(conn: sqlite3.Connection) -> None:
         pass
 
 
-def integrity_ok(db_path: Path) -> bool:
+def sqlite_check(db_path: Path, pragma: str = "quick_check") -> bool:
+    """PRAGMA quick_check / integrity_check egy DB fájlon -> True, ha 'ok'."""
     try:
         conn = sqlite3.connect(str(db_path))
-        ok = conn.execute("PRAGMA integrity_check;").fetchone()
+        ok = conn.execute(f"PRAGMA {pragma};").fetchone()
         conn.close()
         return bool(ok and ok[0] == "ok")
     except Exception:
         return False
 
 
-def backup_file(src: Path, prefix: Optional[str] = None) -> Optional[Path]:
-    if not src.exists():
-        return None
-    ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    if prefix:
-        dst = Path(f"{prefix}{ts}.sqlite")
-    else:
-        dst = src.with_suffix(f".{ts}.bak.sqlite")
-    ensure_dirs(dst)
-    shutil.copy2(src, dst)
-    return dst
+def verify_window(
+    master: NewsCrawlerMVP,
+    batch: NewsCrawlerMVP,
+    batch_db: Path,
+    domain: str,
+    df: str,
+    dt: str,
+) -> Dict[str, Any]:
+    """
+    Batch-méretű ellenőrzés (nem a teljes master DB-vel arányos):
+      - quick_check a batch-DB-n,
+      - az ablak sorszáma + checksumja a masterben és a batch-ben egyezik-e.
+    """
+    t0 = datetime.utcnow()
+    m_count, m_sum = master.repo.window_checksum(domain, df, dt)
+    b_count, b_sum = batch.repo.window_checksum(domain, df, dt)
+    return {
+        "batch_quick_check": sqlite_check(batch_db, "quick_check"),
+        "master_rows": m_count,
+        "batch_rows": b_count,
+        "master_checksum": m_sum,
+        "batch_checksum": b_sum,
+        "reconciled": m_count == b_count and m_sum == b_sum,
+        "seconds": (datetime.utcnow() - t0).total_seconds(),
+    }
 
 
 def daterange_batches(start: date, end: date, step_days: int = 30) -> List[tuple[date, date]]:
@@ -125,8 +147,10 @@ class BatchStats:
     copied_to_batch: int = 0
     total_in_master_after: int = 0
     total_in_batch: int = 0
-    integrity_master_ok: Optional[bool] = None
-    integrity_batch_ok: Optional[bool] = None
+    integrity_master_ok: Optional[bool] = None   # teljes integrity_check (csak ütemezett batcheknél)
+    integrity_batch_ok: Optional[bool] = None    # quick_check a batch-DB-n
+    verification: Optional[Dict[str, Any]] = None
+    backup: Optional[Dict[str, Any]] = None   # legutóbb befejezett master backup
     success: bool = False
 
     def to_dict(self) -> Dict[str, Any]:
@@ -147,6 +171,8 @@ class BatchStats:
             "total_in_batch": self.total_in_batch,
             "integrity_master_ok": self.integrity_master_ok,
             "integrity_batch_ok": self.integrity_batch_ok,
+            "verification": self.verification,
+            "backup": self.backup,
             "success": self.success,
         }
 
@@ -190,7 +216,7 @@ def fill_content(app: NewsCrawlerMVP, domain: str, df: str, dt: str, limit: Opti
         "FROM articles a",
         "JOIN sources s ON s.id = a.source_id",
         "WHERE s.domain = ?",
-        "AND (a.content IS NULL OR a.content = '')",
+        "AND a.has_content = 0",
         "AND a.published_date >= ?",
         "AND a.published_date < ?",
         "ORDER BY a.published_date ASC",
@@ -216,40 +242,26 @@ def fill_content(app: NewsCrawlerMVP, domain: str, df: str, dt: str, limit: Opti
     return ok, errs
 
 
-def copy_window_to_batch(master: NewsCrawlerMVP, batch: NewsCrawlerMVP, domain: str, df: str, dt: str) -> int:
+def copy_window_to_batch(master: NewsCrawlerMVP, batch_db: Path, domain: str, df: str, dt: str, snapshot: bool = False) -> int:
     """
-    Az adott (domain, [df, dt)) ablak összes cikkét (title+content) bemásolja a batch-DB-be.
-    Repository.upsert()-tel teszünk át minden sort.  :contentReference[oaicite:4]{index=4}
+    Az adott (domain, [df, dt)) ablak összes cikkét bemásolja a batch-DB-be,
+    minden oszloppal (body, címkék, entitások is).
+    Repository.copy_window_to(): ATTACH + egyetlen INSERT ... SELECT tranzakció,
+    a source_id domain alapján újraképezve. snapshot=True: VACUUM INTO-val
+    mindig friss, tömör batch fájl.
     """
-    mcur = master.repo.conn.cursor()
-    rows = mcur.execute(
-        """
-        SELECT a.*
-        FROM articles a
-        JOIN sources s ON s.id = a.source_id
-        WHERE s.domain = ?
-          AND a.published_date >= ?
-          AND a.published_date < ?
-        ORDER BY a.published_date ASC
-        """,
-        (domain, df, dt),
-    ).fetchall()
-
-    # Row -> Article dataclass -> upsert (Repository kezeli a source_id mappinget is).  :contentReference[oaicite:5]{index=5}
-    count = 0
-    for row in rows:
-        art = master.repo.row_to_article(row)  # title, url, content, published, label...  :contentReference[oaicite:6]{index=6}
-        batch.repo.upsert(art)                 # stabil id + domain feloldás  :contentReference[oaicite:7]{index=7}
-        count += 1
-    return count
+    return master.repo.copy_window_to(
+        str(batch_db), domain=domain, date_from=df, date_to=dt, snapshot=snapshot
+    )
 
 
 def count_domain_total(conn: sqlite3.Connection, domain: str) -> int:
+    # a daily_stats rollupból: O(napok), nem COUNT(*) a teljes articles-ön
     cur = conn.cursor()
     row = cur.execute(
         """
-        SELECT COUNT(*) FROM articles a
-        JOIN sources s ON s.id = a.source_id
+        SELECT COALESCE(SUM(d.n_articles), 0) FROM daily_stats d
+        JOIN sources s ON s.id = d.source_id
         WHERE s.domain = ?
         """,
         (domain,),
@@ -268,8 +280,19 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--outdir", default=None, help="Batch DB-k és riportok gyökérmappája. Alap: backfills/<domain>/")
     p.add_argument("--resume", action="store_true", help="Már sikeres riporttal rendelkező batcheket kihagy.")
     p.add_argument("--force", action="store_true", help="A riport meglététől függetlenül újrafuttatja a batch-et.")
-    p.add_argument("--backup-master", action="store_true", help="Minden batch előtt backupot készít a master DB-ről.")
+    p.add_argument("--backup-master", action="store_true",
+                   help="Minden batch előtt online backupot indít a master DB-ről (háttérszálon, a crawl nem áll meg).")
     p.add_argument("--backup-prefix", default=None, help="Backup fájl prefix (pl. backups/telex_master_).")
+    p.add_argument("--backup-keep", type=int, default=5, help="Megtartott backupok száma (rotáció, alap: 5).")
+    p.add_argument("--backup-method", choices=["backup", "vacuum"], default="backup",
+                   help="backup: SQLite backup API lépésenként; vacuum: VACUUM INTO (tömör másolat).")
+    p.add_argument("--batch-snapshot", action="store_true",
+                   help="A batch DB minden futáskor újra készül VACUUM INTO-val (tömör, -wal nélküli fájl).")
+    p.add_argument("--bulk-load", action="store_true",
+                   help="Bulk load mód a masteren: másodlagos indexek + FTS triggerek felfüggesztve, "
+                        "a végén egy index/FTS rebuild + ANALYZE (első, nagy betöltéshez).")
+    p.add_argument("--full-check-every", type=int, default=0,
+                   help="Teljes master integrity_check minden N. batch után (0 = csak a futás végén).")
     p.add_argument("--max-articles", type=int, default=None, help="Content backfill max cikk/batch (debug).")
     p.add_argument("-v", "--verbose", action="store_true", help="Részletes log.")
     return p.parse_args()
@@ -303,106 +326,179 @@ def main() -> None:
     master_app = NewsCrawlerMVP(db_path=str(master_db))
     set_safe_sqlite_pragmas(master_app.repo.conn)
 
+    # Online backup szolgáltatás (a master saját olvasó kapcsolatán)
+    backup = None
+    if args.backup_master:
+        backup = OnlineBackup(
+            str(master_db),
+            prefix=args.backup_prefix,
+            keep=args.backup_keep,
+            method=args.backup_method,
+        )
+
     # Batch intervallumok felosztása
     windows = daterange_batches(start, end, step_days=args.batch_days)
 
-    for (df_d, dt_d) in windows:
-        if stop_flag["stop"]:
-            break
-
-        df = df_d.isoformat()
-        dt = dt_d.isoformat()
-        tag = f"{df}_to_{dt}"
-        batch_db = batches_dir / f"{domain}_{tag}.sqlite"
-        report_path = reports_dir / f"{domain}_{tag}.json"
+    batches_run = 0
+    last_full_check: Optional[bool] = None
 
-        # Resume/force logika
-        if report_path.exists() and not args.force:
+    # --bulk-load: indexek + FTS triggerek nélkül (az ablak-index marad: copy / verify ablakonként olvas);
+    # különben csak az FTS automerge szünetel a backfill idejére, a végén egy optimize
+    if args.bulk_load:
+        load_ctx = master_app.repo.bulk_load(keep_indexes=["idx_articles_source_published_id"])
+    else:
+        load_ctx = master_app.repo.fts_deferred_merge()
+
+    with load_ctx:
+        for (df_d, dt_d) in windows:
+            if stop_flag["stop"]:
+                break
+
+            df = df_d.isoformat()
+            dt = dt_d.isoformat()
+            tag = f"{df}_to_{dt}"
+            batch_db = batches_dir / f"{domain}_{tag}.sqlite"
+            report_path = reports_dir / f"{domain}_{tag}.json"
+
+            # Resume/force logika
+            if report_path.exists() and not args.force:
+                try:
+                    prev = json.loads(report_path.read_text(encoding="utf-8"))
+                    if args.resume and prev.get("success"):
+                        print(f"[SKIP] {tag} – már sikeres batch (resume).")
+                        continue
+                except Exception:
+                    pass
+
+            print(f"\n[RUN] Batch {tag}")
+
+            if backup is not None:
+                prev_backup = backup.last_result
+                if prev_backup is not None and not prev_backup.ok:
+                    print(f"[WARN] Előző master backup hibás: {prev_backup.error}")
+                if backup.start():
+                    print("[BACKUP] Master online backup elindítva (háttérszál).")
+                elif args.verbose:
+                    print("[BACKUP] Az előző backup még fut – most kimarad.")
+
+            stats = BatchStats(
+                domain=domain,
+                df=df,
+                dt=dt,
+                master_db=str(master_db),
+                batch_db=str(batch_db),
+                started_at=datetime.utcnow().isoformat()+"Z",
+                content_errors=[],
+            )
+            t0 = datetime.utcnow()
+
+            # 1) Crawl (meta) -> master
+            try:
+                ins = crawl_meta(master_app, domain, df, dt, args.verbose)  # :contentReference[oaicite:8]{index=8}
+                stats.crawl_upserts = int(ins)
+                if args.verbose:
+                    print(f"[BATCH] crawl meta upserts ~{ins}")
+            except Exception as e:
+                print(f"[ERROR] crawl_meta: {e}")
+                # továbbmegyünk: hátha van már adat a DB-ben
+
+            # 2) Content backfill -> master
             try:
-                prev = json.loads(report_path.read_text(encoding="utf-8"))
-                if args.resume and prev.get("success"):
-                    print(f"[SKIP] {tag} – már sikeres batch (resume).")
-                    continue
+                ok, errs = fill_content(master_app, domain, df, dt, args.max_articles, args.verbose)  # :contentReference[oaicite:9]{index=9}
+                stats.content_success = ok
+                stats.content_errors = errs
+                print(f"[BATCH] content backfill: ok={ok} errs={len(errs)}")
+            except Exception as e:
+                print(f"[ERROR] fill_content: {e}")
+
+            # 3) Batch DB: bemásoljuk az ablak összes cikkét (bulk, ATTACH-csel)
+            try:
+                copied = copy_window_to_batch(master_app, batch_db, domain, df, dt, snapshot=args.batch_snapshot)
+                stats.copied_to_batch = copied
+                if args.verbose:
+                    print(f"[BATCH] {copied} cikk átmásolva -> {batch_db.name}")
+            except Exception as e:
+                print(f"[ERROR] copy_window_to_batch: {e}")
+            batch_app = NewsCrawlerMVP(db_path=str(batch_db))
+            set_safe_sqlite_pragmas(batch_app.repo.conn)
+
+            # Lépcsőzetes ellenőrzés: batch quick_check + ablak-egyeztetés minden batch után,
+            # teljes master integrity_check csak minden N. batch után (és a futás végén)
+            try:
+                stats.verification = verify_window(master_app, batch_app, batch_db, domain, df, dt)
+            except Exception as e:
+                print(f"[ERROR] verify_window: {e}")
+                stats.verification = {"error": str(e), "reconciled": False, "batch_quick_check": False}
+            stats.integrity_batch_ok = stats.verification["batch_quick_check"]
+            if not stats.verification["reconciled"]:
+                print("[WARN] Az ablak sorszáma/checksumja eltér a master és a batch DB között.")
+
+            batches_run += 1
+            if args.full_check_every and batches_run % args.full_check_every == 0:
+                stats.integrity_master_ok = sqlite_check(master_db, "integrity_check")
+                stats.verification["tier"] = "full"
+                last_full_check = stats.integrity_master_ok
+                if not stats.integrity_master_ok:
+                    print("[WARN] Master DB integrity_check != ok – érdemes azonnal megvizsgálni.")
+                    # Nem állunk meg automatikusan: a riport jelzi a problémát.
+            else:
+                stats.verification["tier"] = "quick"
+
+            # 4) Összegző számok
+            stats.total_in_master_after = count_domain_total(master_app.repo.conn, domain)
+            stats.total_in_batch = count_domain_total(batch_app.repo.conn, domain)
+
+            # lezárás
+            t1 = datetime.utcnow()
+            stats.finished_at = t1.isoformat()+"Z"
+            stats.seconds = (t1 - t0).total_seconds()
+            stats.success = bool(
+                stats.integrity_batch_ok
+                and stats.verification.get("reconciled")
+                and stats.integrity_master_ok is not False
+            )
+            if backup is not None and backup.last_result is not None:
+                stats.backup = backup.last_result.to_dict()
+
+            # 5) Riport mentése
+            ensure_dirs(report_path)
+            report_path.write_text(json.dumps(stats.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"[REPORT] {report_path}  success={stats.success}")
+
+            # Takarítás
+            try:
+                batch_app.repo.close()
             except Exception:
                 pass
 
-        print(f"\n[RUN] Batch {tag}")
-
-        if args.backup_master and master_db.exists():
-            b = backup_file(master_db, prefix=args.backup_prefix)
-            if b:
-                print(f"[BACKUP] Master backup: {b}")
-
-        stats = BatchStats(
-            domain=domain,
-            df=df,
-            dt=dt,
-            master_db=str(master_db),
-            batch_db=str(batch_db),
-            started_at=datetime.utcnow().isoformat()+"Z",
-            content_errors=[],
+    # Záró teljes integritás-ellenőrzés a masteren (ha volt futott batch)
+    if batches_run:
+        final_ok = sqlite_check(master_db, "integrity_check")
+        final_report = reports_dir / f"{domain}_final_integrity.json"
+        final_report.write_text(
+            json.dumps(
+                {
+                    "domain": domain,
+                    "master_db": str(master_db),
+                    "checked_at": datetime.utcnow().isoformat() + "Z",
+                    "batches_run": batches_run,
+                    "integrity_check_ok": final_ok,
+                    "last_scheduled_check_ok": last_full_check,
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
         )
-        t0 = datetime.utcnow()
-
-        # 1) Crawl (meta) -> master
-        try:
-            ins = crawl_meta(master_app, domain, df, dt, args.verbose)  # :contentReference[oaicite:8]{index=8}
-            stats.crawl_upserts = int(ins)
-            if args.verbose:
-                print(f"[BATCH] crawl meta upserts ~{ins}")
-        except Exception as e:
-            print(f"[ERROR] crawl_meta: {e}")
-            # továbbmegyünk: hátha van már adat a DB-ben
-
-        # 2) Content backfill -> master
-        try:
-            ok, errs = fill_content(master_app, domain, df, dt, args.max_articles, args.verbose)  # :contentReference[oaicite:9]{index=9}
-            stats.content_success = ok
-            stats.content_errors = errs
-            print(f"[BATCH] content backfill: ok={ok} errs={len(errs)}")
-        except Exception as e:
-            print(f"[ERROR] fill_content: {e}")
-
-        # Integritás-ellenőrzés a masteren
-        stats.integrity_master_ok = integrity_ok(master_db)
-        if not stats.integrity_master_ok:
-            print("[WARN] Master DB integrity_check != ok – érdemes azonnal megvizsgálni.")
-            # Nem állunk meg automatikusan: a riport jelzi a problémát.
-
-        # 3) Batch DB: bemásoljuk az ablak összes cikkét
-        batch_app = NewsCrawlerMVP(db_path=str(batch_db))
-        set_safe_sqlite_pragmas(batch_app.repo.conn)
-        try:
-            copied = copy_window_to_batch(master_app, batch_app, domain, df, dt)  # :contentReference[oaicite:10]{index=10}
-            stats.copied_to_batch = copied
-        except Exception as e:
-            print(f"[ERROR] copy_window_to_batch: {e}")
-
-        # Integritás-ellenőrzés a batchen
-        stats.integrity_batch_ok = integrity_ok(batch_db)
-
-        # 4) Összegző számok
-        stats.total_in_master_after = count_domain_total(master_app.repo.conn, domain)
-        stats.total_in_batch = count_domain_total(batch_app.repo.conn, domain)
-
-        # lezárás
-        t1 = datetime.utcnow()
-        stats.finished_at = t1.isoformat()+"Z"
-        stats.seconds = (t1 - t0).total_seconds()
-        stats.success = bool(stats.integrity_master_ok and stats.integrity_batch_ok)
-
-        # 5) Riport mentése
-        ensure_dirs(report_path)
-        report_path.write_text(json.dumps(stats.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
-        print(f"[REPORT] {report_path}  success={stats.success}")
-
-        # Takarítás
-        try:
-            batch_app.repo.close()
-        except Exception:
-            pass
-
-    # Master zárása
+        print(f"[CHECK] Master integrity_check a futás végén: {'ok' if final_ok else 'HIBA'} -> {final_report}")
+
+    # Futó backup megvárása, master zárása
+    if backup is not None:
+        res = backup.wait()
+        backup.close()
+        if res is not None:
+            state = "kihagyva (változatlan)" if res.skipped else ("ok" if res.ok else f"HIBA: {res.error}")
+            print(f"[BACKUP] Utolsó master backup: {res.path} – {state}")
     try:
         master_app.repo.close()
     except Exception:
@@ -193,7 +193,7 @@ def content_backfill_phase(app: NewsCrawlerMVP, args: argparse.Namespace) -> int
         "SELECT a.url, a.published_date, s.domain",
         "FROM articles a",
         "JOIN sources s ON s.id = a.source_id",
-        "WHERE (a.content IS NULL OR a.content = '')",
+        "WHERE a.has_content = 0",
     ]
     params = []
 
@@ -276,11 +276,13 @@ def main() -> None:
 
     app = NewsCrawlerMVP(db_path=args.db)
 
-    # 1) Cikk URL-ek (meta) backfill
-    crawl_inserted = crawl_phase(app, args)
+    # FTS merge-ek elhalasztása a backfill végére (egy optimize a végén)
+    with app.repo.fts_deferred_merge():
+        # 1) Cikk URL-ek (meta) backfill
+        crawl_inserted = crawl_phase(app, args)
 
-    # 2) Cikk-tartalom backfill
-    content_filled = content_backfill_phase(app, args)
+        # 2) Cikk-tartalom backfill
+        content_filled = content_backfill_phase(app, args)
 
     print(
         f"[BACKFILL] Összegzés: meta upsert ~{crawl_inserted} rekord, "
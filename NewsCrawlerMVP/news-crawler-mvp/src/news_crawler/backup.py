@@ -0,0 +1,215 @@
+# news_crawler/backup.py
+"""
+Online (nem blokkoló) SQLite backup élő, írás alatt álló DB-ről.
+
+- method='backup': sqlite3.Connection.backup (backup API), lépésenként
+  `pages_per_step` lappal, lépések között `step_sleep` szünettel;
+- method='vacuum': VACUUM INTO (tömör másolat, szabad lapok nélkül).
+
+Mindkettő egyetlen olvasási tranzakcióból dolgozik, így WAL módban
+konzisztens pillanatképet ad, és közben az írók (crawl) zavartalanul
+haladnak. A mentés először `.partial` fájlba készül, quick_check után
+kerül a végleges nevére; a régieket rotáljuk (`keep` darab marad).
+
+Minden mentés teljes másolat (nem inkrementális). skip_unchanged=True:
+ha a DB a legutóbbi sikeres mentés óta nem változott (ugyanezen a
+kapcsolaton mért PRAGMA data_version ugyanaz), a mentés kimarad – így a
+gyakori ütemezés tétlen DB-n nem gyárt egyforma fájlokat.
+
+    backup = OnlineBackup("telex.hu_master.sqlite", prefix="backups/telex_master_")
+    backup.start()          # háttérszálon fut
+    ...
+    result = backup.wait()
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class BackupResult:
+    path: Optional[str]
+    method: str
+    started_at: str
+    seconds: float = 0.0
+    pages: int = 0
+    skipped: bool = False          # nem változott a DB az előző mentés óta
+    quick_check_ok: Optional[bool] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.skipped or bool(self.quick_check_ok)
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["ok"] = self.ok
+        return d
+
+
+class OnlineBackup:
+    """Egy forrás DB periodikus, háttérszálas mentése rotációval."""
+
+    def __init__(
+        self,
+        db_path: str,
+        *,
+        prefix: Optional[str] = None,
+        keep: int = 5,
+        method: str = "backup",
+        pages_per_step: int = 1024,
+        step_sleep: float = 0.005,
+        skip_unchanged: bool = True,
+    ) -> None:
+        if method not in ("backup", "vacuum"):
+            raise ValueError(f"Ismeretlen backup method: {method!r} (backup | vacuum)")
+        self.db_path = Path(db_path).resolve()
+        self.prefix = prefix
+        self.keep = keep
+        self.method = method
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.skip_unchanged = skip_unchanged
+
+        # saját kapcsolat: a data_version csak ugyanazon a kapcsolaton összevethető
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_version: Optional[int] = None
+        self.last_result: Optional[BackupResult] = None
+
+    # ------------------------------------------------------------------
+    # Fájlnevek / rotáció
+    # ------------------------------------------------------------------
+    def _target_path(self) -> Path:
+        # mikroszekundum is: egy másodpercen belüli két mentés se írja felül egymást
+        ts = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+        if self.prefix:
+            return Path(f"{self.prefix}{ts}.sqlite")
+        return self.db_path.with_suffix(f".{ts}.bak.sqlite")
+
+    def _existing_backups(self) -> List[Path]:
+        if self.prefix:
+            pattern = Path(self.prefix)
+            folder, glob = pattern.parent, f"{pattern.name}*.sqlite"
+        else:
+            folder, glob = self.db_path.parent, f"{self.db_path.stem}.*.bak.sqlite"
+        # az időbélyeg a névben van -> név szerinti rendezés = időrend
+        return sorted(p for p in folder.glob(glob) if p.is_file())
+
+    def _rotate(self) -> None:
+        if self.keep <= 0:
+            return
+        for old in self._existing_backups()[:-self.keep]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Mentés
+    # ------------------------------------------------------------------
+    def _copy(self, partial: Path) -> int:
+        """Pillanatkép a partial fájlba egyetlen olvasási tranzakcióból. Visszaad: lapok száma."""
+        conn = self._conn
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        if self.method == "vacuum":
+            conn.execute("VACUUM INTO ?", (str(partial),))
+            return pages
+
+        def _throttle(_status: int, _remaining: int, _total: int) -> None:
+            # a szünet alatt az olvasási snapshot nyitva marad, az írók WAL-ba dolgoznak
+            if self.step_sleep:
+                time.sleep(self.step_sleep)
+
+        dst = sqlite3.connect(str(partial))
+        try:
+            conn.execute("BEGIN")
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()  # snapshot rögzítése
+            conn.backup(dst, pages=self.pages_per_step, progress=_throttle)
+        finally:
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+            dst.close()
+        return pages
+
+    def run(self) -> BackupResult:
+        """Egy mentés szinkron futtatása (a háttérszál is ezt hívja)."""
+        with self._lock:
+            t0 = time.time()
+            result = BackupResult(
+                path=None,
+                method=self.method,
+                started_at=datetime.utcnow().isoformat() + "Z",
+            )
+            try:
+                version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if self.skip_unchanged and version == self._last_version:
+                    result.skipped = True
+                    result.path = self.last_result.path if self.last_result else None
+                    return self._finish(result, t0)
+
+                target = self._target_path()
+                target.parent.mkdir(parents=True, exist_ok=True)
+                partial = target.with_name(target.name + ".partial")
+                if partial.exists():
+                    partial.unlink()
+
+                result.pages = self._copy(partial)
+
+                check = sqlite3.connect(str(partial))
+                try:
+                    row = check.execute("PRAGMA quick_check").fetchone()
+                finally:
+                    check.close()
+                result.quick_check_ok = bool(row and row[0] == "ok")
+                if not result.quick_check_ok:
+                    partial.unlink()
+                    result.error = f"quick_check: {row[0] if row else '?'}"
+                    return self._finish(result, t0)
+
+                os.replace(partial, target)
+                result.path = str(target)
+                self._last_version = version
+                self._rotate()
+            except Exception as e:
+                result.error = str(e)
+            return self._finish(result, t0)
+
+    def _finish(self, result: BackupResult, t0: float) -> BackupResult:
+        result.seconds = round(time.time() - t0, 3)
+        self.last_result = result
+        return result
+
+    # ------------------------------------------------------------------
+    # Háttérszál
+    # ------------------------------------------------------------------
+    def start(self) -> bool:
+        """
+        Mentés indítása háttérszálon. Ha az előző még fut, nem indul új
+        (False), a crawl ilyenkor sem vár.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._thread = threading.Thread(target=self.run, name="online-backup", daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[BackupResult]:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.last_result
+
+    def close(self) -> None:
+        self.wait()
+        try:
+            self._conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,171 @@
+# news_crawler/body_codec.py
+"""
+Cikk-body tömörítés domainenként tanított zstd szótárral.
+
+- A szótárak a body_dicts táblában vannak, kulcs a zstd dict_id
+  (ez kerül az article_bodies.dict_id oszlopba, soronként).
+- Egy domainhez mindig a legutóbb tanított szótár az aktív; a régebbi
+  szótárral tömörített sorok továbbra is olvashatók.
+- A `body_text(content, content_z, dict_id)` SQL függvény adja vissza a
+  tömörítetlen szöveget (FTS view, triggerek, LIKE fallback). Az items view
+  és az FTS triggerek is ezt hívják, ezért minden Repository nélküli
+  sqlite3 kapcsolatnak, ami ezeket olvassa / az articles-t vagy
+  article_bodies-t írja, register(conn)-t kell hívnia (a sqlite3 CLI-ből
+  a táblák közvetlenül olvashatók: articles, article_bodies.content).
+
+A zstandard csomag opcionális (pip install zstandard): nélküle minden body
+sima szövegként íródik, tömörített sor olvasásakor viszont hibát dobunk.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# zstandard opcionális; ha nincs, nem tömörítünk
+try:
+    import zstandard as zstd  # type: ignore  # pip install zstandard
+except Exception:
+    zstd = None  # type: ignore
+
+DEFAULT_DICT_SIZE = 112_640   # ~110 KB, a zstd CLI alapértéke
+DEFAULT_LEVEL = 9
+MIN_COMPRESS_LEN = 256        # ennél rövidebb szöveget nem éri meg tömöríteni
+
+
+class BodyCodec:
+    """
+    Body <-> (content, content_z, dict_id) kódolás egy Repository kapcsolatához.
+
+    A zstd (de)kompresszor objektumok nem szálbiztosak, ezért szálanként
+    cache-eljük őket (a Repository FastAPI alatt több szálból is fut).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, level: int = DEFAULT_LEVEL) -> None:
+        self.conn = conn
+        self.level = level
+        self._dicts: Dict[int, "zstd.ZstdCompressionDict"] = {}
+        self._domain_dict: Dict[str, Optional[int]] = {}
+        self._local = threading.local()
+
+    @property
+    def available(self) -> bool:
+        return zstd is not None
+
+    def register(self) -> None:
+        """body_text() SQL függvény regisztrálása a kapcsolaton."""
+        self.conn.create_function("body_text", 3, self.decode, deterministic=True)
+
+    # ------------------------------------------------------------------
+    # Szótárak
+    # ------------------------------------------------------------------
+    def _dict(self, dict_id: int) -> "zstd.ZstdCompressionDict":
+        d = self._dicts.get(dict_id)
+        if d is None:
+            row = self.conn.execute(
+                "SELECT dict FROM body_dicts WHERE dict_id = ?", (dict_id,)
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"Ismeretlen zstd szótár: dict_id={dict_id}")
+            d = zstd.ZstdCompressionDict(row[0])
+            self._dicts[dict_id] = d
+        return d
+
+    def active_dict_id(self, domain: Optional[str]) -> Optional[int]:
+        """A domain legutóbb tanított szótárának id-ja (None, ha nincs)."""
+        if not domain:
+            return None
+        if domain not in self._domain_dict:
+            row = self.conn.execute(
+                "SELECT dict_id FROM body_dicts WHERE domain = ? "
+                "ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                (domain,),
+            ).fetchone()
+            self._domain_dict[domain] = int(row[0]) if row else None
+        return self._domain_dict[domain]
+
+    def train(
+        self,
+        domain: str,
+        samples: Iterable[str],
+        *,
+        dict_size: int = DEFAULT_DICT_SIZE,
+    ) -> int:
+        """
+        Új szótár tanítása a domain mintáiból és mentése a body_dicts-be
+        (commit a hívónál). Visszaad: az új dict_id.
+        """
+        if zstd is None:
+            raise RuntimeError("A szótár tanításához telepítsd a zstandard csomagot (pip install zstandard).")
+        data = [s.encode("utf-8") for s in samples if s]
+        if not data:
+            raise ValueError(f"Nincs tanító minta a(z) {domain} domainhez.")
+        trained = zstd.train_dictionary(dict_size, data, level=self.level)
+        dict_id = trained.dict_id()
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO body_dicts (dict_id, domain, dict, sample_count, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (dict_id, domain, trained.as_bytes(), len(data), int(time.time())),
+        )
+        self._dicts[dict_id] = trained
+        self._domain_dict[domain] = dict_id
+        return dict_id
+
+    # ------------------------------------------------------------------
+    # Kódolás / dekódolás
+    # ------------------------------------------------------------------
+    def _compressor(self, dict_id: int) -> "zstd.ZstdCompressor":
+        cache = self._local.__dict__.setdefault("cctx", {})
+        cctx = cache.get(dict_id)
+        if cctx is None:
+            cctx = zstd.ZstdCompressor(level=self.level, dict_data=self._dict(dict_id))
+            cache[dict_id] = cctx
+        return cctx
+
+    def _decompressor(self, dict_id: Optional[int]) -> "zstd.ZstdDecompressor":
+        cache = self._local.__dict__.setdefault("dctx", {})
+        dctx = cache.get(dict_id)
+        if dctx is None:
+            if dict_id is None:
+                dctx = zstd.ZstdDecompressor()
+            else:
+                dctx = zstd.ZstdDecompressor(dict_data=self._dict(dict_id))
+            cache[dict_id] = dctx
+        return dctx
+
+    def encode(
+        self, text: str, domain: Optional[str], *, compress: bool = True
+    ) -> Tuple[Optional[str], Optional[bytes], Optional[int]]:
+        """
+        Szöveg -> (content, content_z, dict_id).
+
+        Csak akkor tömörít, ha van zstandard, a domainhez van tanított szótár
+        és a szöveg elég hosszú; különben sima szöveg marad.
+        """
+        if not compress or zstd is None or len(text) < MIN_COMPRESS_LEN:
+            return text, None, None
+        dict_id = self.active_dict_id(domain)
+        if dict_id is None:
+            return text, None, None
+        blob = self._compressor(dict_id).compress(text.encode("utf-8"))
+        return None, blob, dict_id
+
+    def decode(
+        self, content: Optional[str], content_z: Optional[bytes], dict_id: Optional[int]
+    ) -> Optional[str]:
+        """(content, content_z, dict_id) -> szöveg. Ez a body_text() SQL függvény is."""
+        if content is not None or content_z is None:
+            return content
+        if zstd is None:
+            raise RuntimeError("Tömörített body olvasásához telepítsd a zstandard csomagot (pip install zstandard).")
+        return self._decompressor(dict_id).decompress(content_z).decode("utf-8")
+
+
+def register(conn: sqlite3.Connection) -> BodyCodec:
+    """body_text() egy nyers sqlite3 kapcsolaton (Repository nélkül). Visszaad: a codec."""
+    codec = BodyCodec(conn)
+    codec.register()
+    return codec
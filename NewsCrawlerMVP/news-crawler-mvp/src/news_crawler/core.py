@@ -2,6 +2,7 @@ from .adapters.factories import make_telex_adapter, make_index_adapter, make_444
 from .repository import Repository
 from .search import SearchEngine
 from .pipeline import Pipeline
+from .percolator import Percolator
 from .embedder import EmbedderClassifier
 from .fetcher import Fetcher
 from typing import Optional, List, Dict, Any
@@ -9,6 +10,8 @@ from typing import Optional, List, Dict, Any
 class NewsCrawlerMVP:
     def __init__(self, db_path: str = "news.sqlite") -> None:
         self.repo = Repository(db_path)
+        # állandó lekérdezések: a Pipeline upsert-jei ezen futnak át (repo.percolator)
+        self.percolator = Percolator(self.repo)
         self.fetcher = Fetcher()
         self.adapters = [
             make_telex_adapter(self.fetcher),
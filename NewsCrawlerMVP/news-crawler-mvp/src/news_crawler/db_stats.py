@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cikkstatisztika a daily_stats rollupból (+ a rollupok újraépítése).
+
+Használat (példák):
+
+  # havi bontás a telex master DB-ben
+  python -m news_crawler.db_stats --db telex.hu_master.sqlite --group-by month
+
+  # 2024 első negyedéve, naponként, csak index.hu
+  python -m news_crawler.db_stats --db news.sqlite --domain index.hu \
+      --from 2024-01-01 --to 2024-03-31
+
+  # rollupok teljes újraszámolása (pl. kézi DB-javítás után)
+  python -m news_crawler.db_stats --db news.sqlite --rebuild
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.repository import Repository  # type: ignore
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Cikkszámok napi / havi / domain bontásban (daily_stats).")
+    p.add_argument("--db", required=True, help="SQLite adatbázis fájl.")
+    p.add_argument("--domain", default=None, help="Opcionális domain szűrő (pl. telex.hu).")
+    p.add_argument("--from", dest="date_from", default=None, help="Kezdő nap (YYYY-MM-DD).")
+    p.add_argument("--to", dest="date_to", default=None, help="Utolsó nap (YYYY-MM-DD).")
+    p.add_argument(
+        "--group-by",
+        choices=list(Repository.STATS_GROUPS),
+        default="day",
+        help="Bontás (alap: day).",
+    )
+    p.add_argument("--rebuild", action="store_true", help="A rollup táblák újraszámolása az articles-ből.")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not Path(args.db).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.db}")
+
+    repo = Repository(args.db)
+    try:
+        if args.rebuild:
+            t0 = time.time()
+            n = repo.rebuild_stats()
+            print(f"[STATS] Rollup újraépítve: {n} napi sor ({time.time() - t0:.1f} s)")
+
+        rows = repo.stats(args.domain, args.date_from, args.date_to, group_by=args.group_by)
+        if not rows:
+            print("(Nincs adat.)")
+        for r in rows:
+            key = " ".join(str(r.get(k) or "----") for k in ("domain", "day", "month") if k in r)
+            labels = ", ".join(f"{lab}={n}" for lab, n in sorted(r["labels"].items()))
+            print(
+                f"{key or 'összesen'}: {r['n_articles']} cikk, {r['n_with_content']} body-val, "
+                f"{r['n_tagged']} címkézett, {r['n_labeled']} label-lel"
+                + (f" ({labels})" if labels else "")
+            )
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
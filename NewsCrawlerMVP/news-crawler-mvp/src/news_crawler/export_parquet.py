@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Oszlopos (Parquet / Arrow) export: cikkek + címkék + embeddingek.
+
+A sorok rowid-keyset szerint, chunkonként jönnek az SQLite-ból, minden chunk
+egy Arrow RecordBatch lesz, amit a pyarrow.dataset domain / hónap szerint
+particionált Parquet fájlokba ír (hive stílus: domain=telex.hu/month=2024-05/).
+A memóriában egyszerre csak egy chunk van.
+
+  - a HTML-tisztítás vektorizált (pyarrow.compute regex a teljes oszlopon),
+  - az embedding fixed_size_list<float32, dim> oszlop (nincs JSON/CSV kerülő),
+  - entitások / topicok / kulcsszavak list<string> oszlopok.
+
+Olvasás (memory-mappel, csak a kellő oszlopok / partíciók):
+
+    import pyarrow.dataset as ds
+    d = ds.dataset("export/parquet", format="parquet", partitioning="hive")
+    t = d.to_table(columns=["title", "embedding"], filter=ds.field("domain") == "telex.hu")
+
+Használat (példák):
+
+  python -m news_crawler.export_parquet --db news.sqlite --out export/parquet
+  python -m news_crawler.export_parquet --db telex.hu_master.sqlite --out export/telex \
+      --from 2023-01-01 --no-content
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as pds
+except Exception:  # opcionális függőség: pip install pyarrow
+    pa = None
+    pc = None
+    pds = None
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.repository import Repository  # type: ignore
+
+
+DEFAULT_CHUNK_SIZE = 5000
+UNDATED_MONTH = "undated"
+_SEP = "\x1f"   # group_concat elválasztó a list<string> oszlopokhoz
+
+# leggyakoribb HTML entitások; a többi ritka, maradhat
+_ENTITIES = (
+    ("&nbsp;", " "), ("&#160;", " "), ("&quot;", '"'), ("&#39;", "'"),
+    ("&apos;", "'"), ("&lt;", "<"), ("&gt;", ">"), ("&amp;", "&"),
+)
+
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("A Parquet exporthoz pyarrow kell: pip install pyarrow")
+
+
+# ----------------------------------------------------------------------
+# Oszlop-transzformációk (vektorizált)
+# ----------------------------------------------------------------------
+def clean_html_array(arr: "pa.Array") -> "pa.Array":
+    """HTML tagek, entitások és whitespace normalizálása a teljes oszlopon."""
+    arr = pc.replace_substring_regex(arr, pattern=r"<[^>]+>", replacement=" ")
+    for entity, repl in _ENTITIES:
+        arr = pc.replace_substring(arr, pattern=entity, replacement=repl)
+    arr = pc.replace_substring_regex(arr, pattern=r"\s+", replacement=" ")
+    return pc.utf8_trim_whitespace(arr)
+
+
+def _split_list(arr: "pa.Array") -> "pa.Array":
+    # group_concat eredmény -> list<string>; NULL (nincs címke) -> üres lista
+    return pc.fill_null(pc.split_pattern(arr, pattern=_SEP), pa.scalar([], pa.list_(pa.string())))
+
+
+def embedding_array(blobs: List[Optional[bytes]], dims: List[Optional[int]], dim: int) -> "pa.Array":
+    """
+    float32 BLOB-ok -> fixed_size_list<float32, dim>; az eltérő méretű vagy
+    hiányzó embedding NULL (helyén nullák a values pufferben).
+    """
+    valid = [b is not None and d == dim and len(b) == 4 * dim for b, d in zip(blobs, dims)]
+    zero = bytes(4 * dim)
+    buf = pa.py_buffer(b"".join(b if ok else zero for b, ok in zip(blobs, valid)))
+    values = pa.Array.from_buffers(pa.float32(), len(blobs) * dim, [None, buf])
+    mask = None if all(valid) else pa.array([not ok for ok in valid], pa.bool_())
+    return pa.FixedSizeListArray.from_arrays(values, dim, mask=mask)
+
+
+# ----------------------------------------------------------------------
+# Streamelés
+# ----------------------------------------------------------------------
+def _schema(with_content: bool, dim: Optional[int]) -> "pa.Schema":
+    fields = [
+        ("id", pa.string()),
+        ("domain", pa.string()),
+        ("month", pa.string()),
+        ("published_date", pa.string()),
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("section", pa.string()),
+        ("label", pa.string()),
+        ("label_score", pa.float64()),
+        ("cluster_id", pa.int64()),
+        ("matched_tags", pa.string()),
+        ("entities", pa.list_(pa.string())),
+        ("topics", pa.list_(pa.string())),
+        ("keywords", pa.list_(pa.string())),
+    ]
+    if with_content:
+        fields.append(("content", pa.string()))
+    if dim:
+        fields.append(("embedding", pa.list_(pa.float32(), dim)))
+    return pa.schema(fields)
+
+
+def embedding_dim(repo: Repository) -> Optional[int]:
+    """A leggyakoribb embedding-dimenzió (None, ha nincs embedding)."""
+    row = repo.conn.execute(
+        "SELECT dim FROM article_embeddings GROUP BY dim ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()
+    return int(row["dim"]) if row else None
+
+
+def iter_record_batches(
+    repo: Repository,
+    *,
+    domain: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    with_content: bool = True,
+    dim: Optional[int] = None,
+    strip_html: bool = True,
+    progress: Optional[ProgressFn] = None,
+) -> Iterator["pa.RecordBatch"]:
+    """
+    Cikkek chunkonként, Arrow RecordBatch-ként (rowid-keyset, nincs fetchall
+    a teljes eredményre). dim=None: nincs embedding oszlop.
+    """
+    _require_pyarrow()
+    schema = _schema(with_content, dim)
+
+    where, params = ["a.rowid > ?"], []
+    if domain:
+        where.append("s.domain = ?")
+        params.append(domain.lower())
+    if date_from:
+        where.append("a.published_date >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("a.published_date <= ?")
+        params.append(date_to)
+
+    tag_sub = (
+        "(SELECT group_concat(t.name, char(31)) FROM article_topics x JOIN topics t ON t.id = x.topic_id "
+        "WHERE x.article_id = a.id AND t.kind = '{kind}')"
+    )
+    sql = f"""
+        SELECT a.rowid AS _rowid, a.id, s.domain,
+               COALESCE(substr(a.published_date, 1, 7), '{UNDATED_MONTH}') AS month,
+               a.published_date, a.url, a.title, a.section,
+               a.label, a.label_score, a.cluster_id, a.matched_tags,
+               (SELECT group_concat(e.name, char(31)) FROM article_entities x JOIN entities e ON e.id = x.entity_id
+                 WHERE x.article_id = a.id) AS entities,
+               {tag_sub.format(kind="topic")} AS topics,
+               {tag_sub.format(kind="keyword")} AS keywords
+               {", body_text(b.content, b.content_z, b.dict_id) AS content" if with_content else ""}
+               {", emb.vec AS emb_vec, emb.dim AS emb_dim" if dim else ""}
+        FROM articles a
+        JOIN sources s ON s.id = a.source_id
+        {"LEFT JOIN article_bodies b ON b.article_id = a.id" if with_content else ""}
+        {"LEFT JOIN article_embeddings emb ON emb.article_id = a.id" if dim else ""}
+        WHERE {" AND ".join(where)}
+        ORDER BY a.rowid
+        LIMIT ?
+    """
+
+    last_rowid, total, t0 = 0, 0, time.time()
+    while True:
+        rows = repo.conn.execute(sql, [last_rowid, *params, chunk_size]).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1]["_rowid"]
+
+        cols: Dict[str, Any] = {}
+        for name in (
+            "id", "domain", "month", "published_date", "url", "title", "section",
+            "label", "label_score", "cluster_id", "matched_tags",
+        ):
+            cols[name] = pa.array([r[name] for r in rows], schema.field(name).type)
+        for name in ("entities", "topics", "keywords"):
+            raw = pa.array([r[name] for r in rows], pa.string())
+            cols[name] = _split_list(raw)
+        if with_content:
+            content = pa.array([r["content"] for r in rows], pa.string())
+            cols["content"] = clean_html_array(content) if strip_html else content
+        if dim:
+            cols["embedding"] = embedding_array(
+                [r["emb_vec"] for r in rows], [r["emb_dim"] for r in rows], dim
+            )
+
+        total += len(rows)
+        if progress:
+            progress({"rows": total, "rows_per_sec": total / max(time.time() - t0, 1e-6)})
+        yield pa.RecordBatch.from_arrays([cols[f.name] for f in schema], schema=schema)
+
+
+def export_parquet(
+    repo: Repository,
+    out_dir: str,
+    *,
+    with_embeddings: bool = True,
+    compression: str = "zstd",
+    **kwargs: Any,
+) -> int:
+    """
+    Particionált Parquet dataset írása out_dir alá (domain=/month=).
+    A meglévő, azonos partíciók felülíródnak. Visszatérés: kiírt sorok.
+    """
+    _require_pyarrow()
+    dim = embedding_dim(repo) if with_embeddings else None
+    schema = _schema(kwargs.get("with_content", True), dim)
+    written = 0
+
+    def counted() -> Iterator["pa.RecordBatch"]:
+        nonlocal written
+        for batch in iter_record_batches(repo, dim=dim, **kwargs):
+            written += batch.num_rows
+            yield batch
+
+    pds.write_dataset(
+        counted(),
+        out_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=pds.partitioning(
+            pa.schema([("domain", pa.string()), ("month", pa.string())]), flavor="hive"
+        ),
+        existing_data_behavior="delete_matching",
+        file_options=pds.ParquetFileFormat().make_write_options(compression=compression),
+        max_rows_per_group=64 * 1024,
+    )
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Cikkek / címkék / embeddingek Parquet exportja (domain/hónap partíciók).")
+    p.add_argument("--db", required=True, help="SQLite adatbázis fájl.")
+    p.add_argument("--out", required=True, help="Cél könyvtár (Parquet dataset).")
+    p.add_argument("--domain", default=None, help="Csak ez a domain.")
+    p.add_argument("--from", dest="date_from", default=None, help="Kezdő nap (YYYY-MM-DD).")
+    p.add_argument("--to", dest="date_to", default=None, help="Utolsó nap (YYYY-MM-DD).")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Sor / RecordBatch (alap: 5000).")
+    p.add_argument("--no-content", action="store_true", help="A teljes szöveg kihagyása.")
+    p.add_argument("--no-embeddings", action="store_true", help="Az embedding oszlop kihagyása.")
+    p.add_argument("--keep-html", action="store_true", help="A body HTML-tisztításának kihagyása.")
+    p.add_argument("--compression", default="zstd", help="Parquet tömörítés (zstd / snappy / none).")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not Path(args.db).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.db}")
+    if pa is None:
+        sys.exit("❌ A Parquet exporthoz telepítsd: pip install pyarrow")
+
+    def report(info: Dict[str, Any]) -> None:
+        print(f"[PARQUET] {info['rows']} sor ({info['rows_per_sec']:.0f} sor/s)")
+
+    repo = Repository(args.db, read_only=True)
+    try:
+        t0 = time.time()
+        n = export_parquet(
+            repo,
+            args.out,
+            with_embeddings=not args.no_embeddings,
+            compression=args.compression,
+            domain=args.domain,
+            date_from=args.date_from,
+            date_to=args.date_to,
+            chunk_size=args.chunk_size,
+            with_content=not args.no_content,
+            strip_html=not args.keep_html,
+            progress=report,
+        )
+        print(f"✅ Parquet export kész: {args.out}  ({n} sor, {time.time() - t0:.1f} s)")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
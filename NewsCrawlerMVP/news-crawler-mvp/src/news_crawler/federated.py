@@ -0,0 +1,303 @@
+# news_crawler/federated.py
+"""
+Federált keresés több (domainenkénti) SQLite adatbázison.
+
+A search_by_meta minden shardon párhuzamosan fut egy szálkészletben, a
+shardonként már rendezett találatokat k-utas heap merge fésüli össze:
+
+  - order='date': (published_date DESC, id DESC), NULL dátum a végén –
+    ugyanaz a kulcs, mint a keyset cursoré, így ugyanaz a cursor minden
+    shardra továbbadható (az id URL-hash, shardok között is egyedi);
+  - order='bm25': rank szerint növekvő (shardonkénti bm25, közelítő); ha
+    nincs rank (nincs q / nem FTS-es q), a shardok is dátum szerint adják,
+    így a dátum-kulcs fésül (mint a Repository.search_by_meta).
+
+A limit lefelé is megy (minden shard legfeljebb limit+1 sort ad). Minden
+shard-lekérdezés Repository.time_budget() alatt fut a közös határidőig: a
+keretet túllépő shard az addig kész sorait adja ('truncated'), a mégis
+beragadót a timeout után conn.interrupt() állítja le ('timeout'); ilyenkor
+a válasz részleges (partial=True), a shard állapota a "shards" mezőben látszik.
+
+    fed = FederatedSearch({"telex.hu": telex_repo, "index.hu": index_repo})
+    page = fed.search_by_meta_page(q="Tisza", limit=50)
+    page["items"], page["next_cursor"], page["shards"]
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .query_budget import QueryBudgetExceeded
+from .repository import Repository, encode_cursor
+
+DEFAULT_TIMEOUT = 5.0   # mp / shard
+
+
+def _date_key(row: Dict[str, Any]) -> Tuple[bool, str, str]:
+    # (published_date DESC, id DESC), a NULL dátum a legkisebb -> a lista végére kerül
+    pd = row.get("published_date")
+    return (pd is not None, pd or "", row.get("id") or "")
+
+
+def _rank_key(row: Dict[str, Any]) -> float:
+    rank = row.get("rank")
+    return rank if rank is not None else float("inf")
+
+
+class FederatedSearch:
+    """
+    Párhuzamos fan-out keresés shardok (név -> Repository) felett.
+
+    Egy shardon egyszerre csak egy lekérdezés fut (shardonkénti lock): ha az
+    előző, megszakított lekérdezés még nem engedte el a kapcsolatot, a shard
+    'busy' állapottal kimarad.
+    """
+
+    def __init__(
+        self,
+        shards: Mapping[str, Repository],
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.shards: Dict[str, Repository] = dict(shards)
+        self.timeout = timeout
+        self._locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in self.shards}
+        # shard -> melyik _fan_out hívás (token) fogja éppen a lockját; csak azt szabad interrupt-olni
+        self._holders: Dict[str, object] = {}
+        self._holders_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or max(1, len(self.shards)),
+            thread_name_prefix="fed-search",
+        )
+
+    def add_shard(self, name: str, repo: Repository) -> None:
+        self.shards[name] = repo
+        self._locks.setdefault(name, threading.Lock())
+
+    def remove_shard(self, name: str) -> None:
+        self.shards.pop(name, None)
+        self._locks.pop(name, None)
+
+    # ------------------------------------------------------------------
+    # Shard lekérdezés
+    # ------------------------------------------------------------------
+    def _query_shard(
+        self,
+        name: str,
+        deadline: float,
+        filters: Dict[str, Any],
+        method: str = "search_by_meta",
+        token: Optional[object] = None,
+    ) -> Tuple[Any, float, bool]:
+        lock = self._locks[name]
+        # a lockra legfeljebb a maradék keret felét várjuk: a 'busy' így még a
+        # _fan_out wait()-je előtt eldől (nem versenyez a 'timeout'-tal)
+        if not lock.acquire(timeout=max(0.0, deadline - time.monotonic()) / 2):
+            raise TimeoutError("busy")
+        with self._holders_lock:
+            self._holders[name] = token
+        t0 = time.monotonic()
+        try:
+            repo = self.shards[name]
+            # a keret a közös határidőig tart: a progress handler előbb szakít, mint a timeout
+            remaining = max(0.001, deadline - time.monotonic())
+            with repo.time_budget(remaining, label=f"{method}:{name}") as budget:
+                result = getattr(repo, method)(**filters)
+            return result, time.monotonic() - t0, bool(budget and budget.truncated)
+        finally:
+            with self._holders_lock:
+                self._holders.pop(name, None)
+            lock.release()
+
+    def _fan_out(
+        self, filters: Dict[str, Any], names: List[str], method: str = "search_by_meta"
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        deadline = time.monotonic() + self.timeout
+        token = object()
+        futures = {
+            self._pool.submit(self._query_shard, name, deadline, filters, method, token): name
+            for name in names
+        }
+        done, pending = wait(futures, timeout=self.timeout)
+
+        results: Dict[str, Any] = {}
+        status: Dict[str, Dict[str, Any]] = {}
+        for fut in pending:
+            name = futures[fut]
+            # a futó SQLite lekérdezés megszakítása (sqlite3.OperationalError: interrupted) –
+            # csak ha ez a hívás fogja a shard lockját, különben más lekérdezését állítanánk le
+            with self._holders_lock:
+                if token is not None and self._holders.get(name) is token:
+                    try:
+                        self.shards[name].conn.interrupt()
+                    except Exception:
+                        pass
+            fut.cancel()
+            status[name] = {"status": "timeout", "rows": 0, "seconds": self.timeout}
+        for fut in done:
+            name = futures[fut]
+            try:
+                rows, seconds, truncated = fut.result()
+            except (TimeoutError, QueryBudgetExceeded):
+                # a shard kapcsolatát másik (pl. API) lekérdezés foglalja
+                status[name] = {"status": "busy", "rows": 0, "seconds": self.timeout}
+                continue
+            except ValueError:
+                raise   # hibás cursor / paraméter: a hívó kezeli (HTTP 400)
+            except Exception as e:
+                status[name] = {"status": "error", "rows": 0, "seconds": 0.0, "error": str(e)}
+                continue
+            status[name] = {
+                "status": "truncated" if truncated else "ok",
+                "rows": len(rows),
+                "seconds": round(seconds, 3),
+            }
+            results[name] = rows
+        # shard-sorrendben, hogy a log / válasz stabil legyen
+        return (
+            {name: results[name] for name in names if name in results},
+            {name: status[name] for name in names if name in status},
+        )
+
+    # ------------------------------------------------------------------
+    # Összefésülés
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _merge(shard_rows: List[List[Dict[str, Any]]], order: str) -> Iterator[Dict[str, Any]]:
+        ranked = any(row.get("rank") is not None for rows in shard_rows for row in rows)
+        if order == "bm25" and ranked:
+            merged = heapq.merge(*shard_rows, key=_rank_key)
+        else:
+            merged = heapq.merge(*shard_rows, key=_date_key, reverse=True)
+        seen = set()
+        for row in merged:
+            # ugyanaz a cikk több DB-ben is lehet (pl. news.sqlite + domain DB)
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            yield row
+
+    @staticmethod
+    def _merge_facets(
+        shard_facets: List[Dict[str, List[Dict[str, Any]]]], top_n: Optional[int]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        totals: Dict[str, Dict[Any, int]] = {}
+        for facets in shard_facets:
+            for name, values in facets.items():
+                acc = totals.setdefault(name, {})
+                for v in values:
+                    acc[v["value"]] = acc.get(v["value"], 0) + v["count"]
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for name, acc in totals.items():
+            ranked = sorted(acc.items(), key=lambda kv: (-kv[1], kv[0] is None, str(kv[0])))
+            out[name] = [{"value": v, "count": n} for v, n in (ranked[:top_n] if top_n is not None else ranked)]
+        return out
+
+    def _facet_fan_out(
+        self, names: Iterable[str], top_n: Optional[int], filters: Dict[str, Any], shards: List[str]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+        # shardonként az összes érték kell (top_n=None), különben az összeg torzulna;
+        # ugyanaz a cikk több DB-ben is lehet, ezt a számok nem szűrik ki
+        names = tuple(names)
+        filters = {k: v for k, v in filters.items() if k != "order"}
+        results, status = self._fan_out(dict(filters, names=names, top_n=None), shards, "facets")
+        merged = self._merge_facets(list(results.values()), top_n)
+        return {name: merged.get(name, []) for name in names}, status
+
+    def facets(
+        self,
+        names: Iterable[str],
+        *,
+        top_n: Optional[int] = Repository.DEFAULT_FACET_LIMIT,
+        only: Optional[Iterable[str]] = None,
+        **filters: Any,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Repository.facets megfelelője: a shardok facet-számainak összege."""
+        shards = list(self.shards) if only is None else [n for n in only if n in self.shards]
+        return self._facet_fan_out(names, top_n, filters, shards)[0]
+
+    # a Repository-val azonos interfész, hogy a hívó (api_server) ne kelljen különbséget tegyen
+    def search_by_meta(self, *, limit: int = 200, **filters: Any) -> List[Dict[str, Any]]:
+        """search_by_meta megfelelője az összes shardon (csak a sorok)."""
+        return self.search_by_meta_page(limit=limit, **filters)["items"]
+
+    def search_by_meta_page(
+        self,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        only: Optional[Iterable[str]] = None,
+        facets: Optional[Iterable[str]] = None,
+        facet_limit: Optional[int] = Repository.DEFAULT_FACET_LIMIT,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """
+        Egy oldal a federált találatokból.
+
+        only: csak ezek a shardok (pl. a dátum-szűrőre illeszkedő partíciók).
+        Visszatérés: {"items", "next_cursor", "partial", "truncated", "shards"} –
+        a cursor ugyanaz a formátum, mint a Repository.search_by_meta_page-é;
+        ha egy shard kimaradt (timeout / busy / hiba), next_cursor None, mert a
+        folytatás végleg átugraná a shard sorait;
+        truncated: legalább egy shard a keret miatt csak részeredményt adott –
+        az oldal a csonka shardok legkisebb utolsó kulcsánál véget ér, és onnan
+        folytatható (mint a Repository csonka oldala);
+        facets megadásával "facets" is (a shardok összegzett facet-számai).
+        """
+        order = filters.get("order", "date")
+        names = list(self.shards) if only is None else [n for n in only if n in self.shards]
+        shard_filters = dict(filters, limit=limit + 1, cursor=cursor)
+        shard_rows, status = self._fan_out(shard_filters, names)
+
+        # kimaradt shard (timeout / busy / hiba) sorai a cursor után elvesznének -> nincs cursor
+        skipped = any(s["status"] in ("timeout", "busy", "error") for s in status.values())
+        # keret miatt csonka shard: a fésült lista csak az utolsó sora kulcsáig teljes
+        bound = None
+        if order != "bm25":
+            for name, st in status.items():
+                if st["status"] != "truncated":
+                    continue
+                if not shard_rows[name]:
+                    skipped = True   # egy sort sem adott: mint a timeout
+                    continue
+                key = _date_key(shard_rows[name][-1])
+                bound = key if bound is None else min(bound, key)
+
+        rows: List[Dict[str, Any]] = []
+        more = bound is not None
+        for row in self._merge(list(shard_rows.values()), order):
+            if bound is not None and _date_key(row) < bound:
+                break
+            rows.append(row)
+            if len(rows) > limit:
+                break
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            more = True
+        if more and rows and order != "bm25" and not skipped:
+            last = rows[-1]
+            next_cursor = encode_cursor(last["published_date"], last["id"])
+
+        page = {
+            "items": rows,
+            "next_cursor": next_cursor,
+            "partial": any(s["status"] != "ok" for s in status.values()),
+            "truncated": any(s["status"] == "truncated" for s in status.values()),
+            "shards": status,
+        }
+        if facets:
+            page["facets"], facet_status = self._facet_fan_out(facets, facet_limit, filters, names)
+            page["partial"] = page["partial"] or any(s["status"] != "ok" for s in facet_status.values())
+            page["truncated"] = page["truncated"] or any(
+                s["status"] == "truncated" for s in facet_status.values()
+            )
+        return page
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
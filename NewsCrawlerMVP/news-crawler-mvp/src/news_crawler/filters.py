@@ -1,8 +1,9 @@
 # news_crawler/filters.py
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Callable, Mapping, Sequence, Iterable
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time as dt_time
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Iterable, Tuple, Union
 from urllib.parse import urlparse
 from dataclasses import dataclass
 
@@ -10,67 +11,202 @@ from .models import Article  # see note below; if Article lives elsewhere, adjus
 
 Predicate = Callable[[Article], bool]
 
+
+# ----------------------------------------------------------------------
+# Összerakható szűrők: ugyanaz az objektum memóriában (Pipeline.collect
+# predicate-ként, Article-re) és SQL WHERE fragmensként (Repository
+# search / search_by_meta, "a" = articles, "s" = sources alias) is működik.
+# Frozen dataclass-ok, így hashelhetők (query cache kulcs).
+# ----------------------------------------------------------------------
+def _sql_date(d: Union[datetime, date, str]) -> str:
+    """datetime/date -> a published_date-tel összevethető ISO string."""
+    if isinstance(d, str):
+        return d
+    if isinstance(d, datetime):
+        if d.time() == dt_time(0) and d.tzinfo is None:
+            return d.date().isoformat()   # 'YYYY-MM-DD' (a tárolt dátumok többsége ilyen)
+        return d.isoformat()
+    return d.isoformat()
+
+
+def _as_datetime(d: Union[datetime, date, str, None]) -> Optional[datetime]:
+    if d is None or isinstance(d, datetime):
+        return d
+    if isinstance(d, date):
+        return datetime(d.year, d.month, d.day)
+    return datetime.fromisoformat(d)
+
+
+def url_section(url: Optional[str]) -> str:
+    """
+    Az URL első path-szegmense kisbetűvel ('' ha nincs / nem parse-olható).
+    pl. https://telex.hu/belfold/2025/...  -> "belfold"
+
+    A Repository url_section() SQL függvényként is regisztrálja, így az
+    UrlSectionFilter memóriában és SQL-ben ugyanazt a szabályt alkalmazza.
+    """
+    try:
+        path = urlparse(url or "").path.strip("/")
+    except Exception:
+        return ""
+    return path.split("/")[0].lower() if path else ""
+
+
+class Filter(ABC):
+    """Alaposztály: __call__(Article) -> bool és to_sql() -> (fragmens, paraméterek)."""
+
+    @abstractmethod
+    def __call__(self, a: Article) -> bool:
+        ...
+
+    @abstractmethod
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        ...
+
+    def __and__(self, other: "Filter") -> "AllOf":
+        return AllOf(tuple(_flatten(self)) + tuple(_flatten(other)))
+
+
+def _flatten(f: Filter) -> Iterable[Filter]:
+    return f.parts if isinstance(f, AllOf) else (f,)
+
+
+def _placeholders(n: int) -> str:
+    return ", ".join("?" * n)
+
+
+@dataclass(frozen=True)
+class DomainFilter(Filter):
+    domains: Tuple[str, ...]
+
+    def __call__(self, a: Article) -> bool:
+        return (a.source or "").lower() in self.domains
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        # idx_articles_source_published_id: a source_id IN (...) range scan-t ad
+        return f"s.domain IN ({_placeholders(len(self.domains))})", list(self.domains)
+
+
+@dataclass(frozen=True)
+class DateRangeFilter(Filter):
+    start: Optional[datetime] = None
+    end_excl: Optional[datetime] = None
+
+    def __call__(self, a: Article) -> bool:
+        dt = a.published_dt() if callable(getattr(a, "published_dt", None)) else None
+        if dt is None:
+            return False   # <<-- ne engedjük át a dátum nélkülieket
+        if self.start and dt < self.start: return False
+        if self.end_excl and dt >= self.end_excl: return False
+        return True
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        # NULL published_date: az összehasonlítás NULL -> kiesik, mint memóriában
+        conds, params = ["a.published_date IS NOT NULL"], []
+        if self.start:
+            conds.append("a.published_date >= ?")
+            params.append(_sql_date(self.start))
+        if self.end_excl:
+            conds.append("a.published_date < ?")
+            params.append(_sql_date(self.end_excl))
+        return " AND ".join(conds), params
+
+
+@dataclass(frozen=True)
+class LabelFilter(Filter):
+    labels: Tuple[str, ...]
+
+    def __call__(self, a: Article) -> bool:
+        return getattr(a, "label", None) in self.labels
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        # idx_articles_label_published_id
+        return f"a.label IN ({_placeholders(len(self.labels))})", list(self.labels)
+
+
+@dataclass(frozen=True)
+class UrlSectionFilter(Filter):
+    """
+    Csak azokat az Article-öket engedi át, ahol az URL első path-szegmense
+    benne van az adott domainhez tartozó allowlistben.
+
+    pl. https://telex.hu/belfold/2025/...  -> "belfold"
+    """
+    sections: Tuple[Tuple[str, Tuple[str, ...]], ...]   # ((domain, (rovat, ...)), ...)
+
+    def __call__(self, a: Article) -> bool:
+        allowed = dict(self.sections).get((a.source or "").lower())
+        if not allowed:
+            # ha nincs konfigurálva, nem szűrünk
+            return True
+        first = url_section(a.link)
+        return not first or first in allowed
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        if not self.sections:
+            return "1", []
+        domains = [d for d, _ in self.sections]
+        alts = [f"s.domain NOT IN ({_placeholders(len(domains))})", "url_section(a.url) = ''"]
+        params: List[Any] = list(domains)
+        for dom, secs in self.sections:
+            alts.append(f"(s.domain = ? AND url_section(a.url) IN ({_placeholders(len(secs))}))")
+            params.append(dom)
+            params.extend(secs)
+        return "(" + " OR ".join(alts) + ")", params
+
+
+@dataclass(frozen=True)
+class AllOf(Filter):
+    parts: Tuple[Filter, ...] = ()
+
+    def __call__(self, a: Article) -> bool:
+        return all(p(a) for p in self.parts)
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        if not self.parts:
+            return "1", []
+        frags, params = [], []
+        for p in self.parts:
+            frag, frag_params = p.to_sql()
+            frags.append(f"({frag})")
+            params.extend(frag_params)
+        return " AND ".join(frags), params
+
+
 class Filters:
     @staticmethod
-    def by_domain(allowed: Sequence[str]) -> Predicate:
-        s = {d.lower() for d in allowed}
-        return lambda a: (a.source or "").lower() in s
+    def by_domain(allowed: Sequence[str]) -> DomainFilter:
+        return DomainFilter(tuple(sorted({d.lower() for d in allowed})))
 
     @staticmethod
     # filters.py
-    def by_date_range(start, end_excl):
-        def _pred(a):
-            dt = a.published_dt() if callable(getattr(a, "published_dt", None)) else None
-            if dt is None:
-                return False   # <<-- változtatás: ne engedjük át a dátum nélkülieket
-            if start and dt < start: return False
-            if end_excl and dt >= end_excl: return False
-            return True
-        return _pred
-
+    def by_date_range(start, end_excl) -> DateRangeFilter:
+        return DateRangeFilter(_as_datetime(start), _as_datetime(end_excl))
 
     @staticmethod
-    def by_label(labels: Sequence[str]) -> Predicate:
-        s = set(labels)
-        return lambda a: (getattr(a, "label", None) in s)
+    def by_label(labels: Sequence[str]) -> LabelFilter:
+        return LabelFilter(tuple(sorted(set(labels))))
 
     @staticmethod
     def compose(*preds: Predicate) -> Predicate:
+        # csak Filter-ekből SQL-re fordítható AllOf lesz; tetszőleges callable-lel sima predicate
+        if all(isinstance(p, Filter) for p in preds):
+            return AllOf(tuple(f for p in preds for f in _flatten(p)))
         return lambda a: all(p(a) for p in preds)
 
     @staticmethod
-    def by_url_section(allowed_by_domain: Mapping[str, Sequence[str]]) -> Predicate:
+    def by_url_section(allowed_by_domain: Mapping[str, Sequence[str]]) -> UrlSectionFilter:
         """
         Csak azokat az Article-öket engedi át, ahol az URL első path-szegmense
-        benne van az adott domainhez tartozó allowlistben.
-
-        pl. https://telex.hu/belfold/2025/...  -> "belfold"
+        benne van az adott domainhez tartozó allowlistben (lásd UrlSectionFilter).
         """
-        mapping = {
-            d.lower(): {s.lower() for s in secs}
+        return UrlSectionFilter(tuple(sorted(
+            (d.lower(), tuple(sorted({s.lower() for s in secs})))
             for d, secs in allowed_by_domain.items()
-        }
-
-        def _pred(a: Article) -> bool:
-            dom = (a.source or "").lower()
-            allowed = mapping.get(dom)
-            if not allowed:
-                # ha nincs konfigurálva, nem szűrünk
-                return True
-
-            try:
-                path = urlparse(a.link).path.strip("/")
-            except Exception:
-                return True
-
-            if not path:
-                return True
+            if secs
+        )))
 
-            first = path.split("/")[0].lower()
-            return first in allowed
 
-        return _pred
-    
 POLITICAL_SECTIONS = {
     "telex.hu": [
         "belfold", "kulfold", "gazdasag",
@@ -0,0 +1,150 @@
+# news_crawler/fts.py
+"""
+FTS5 segédek: a felhasználói keresőkifejezésből biztonságos MATCH query-t
+építünk, hogy az idézőjelek, kötőjelek, csillagok stb. ne okozzanak
+szintaxishibát (és ne kelljen LIKE-ra visszaesni).
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25 súlyok az article_fts oszlopsorrendjében: title, content, summary, tags, url
+BM25_WEIGHTS = (10.0, 1.0, 2.0, 4.0, 2.0)
+
+
+def fold_diacritics(text: str) -> str:
+    """Ékezetek leszedése + lower (pl. 'Magyar Péter' -> 'magyar peter')."""
+    norm = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in norm if not unicodedata.combining(c)).lower()
+
+
+def tokenize_query(q: str) -> List[str]:
+    """Szavakra bontás ugyanazzal a logikával, mint a unicode61 tokenizer."""
+    return _TOKEN_RE.findall(q or "")
+
+
+def build_match_query(q: str, *, prefix_last: bool = True) -> Optional[str]:
+    """
+    Szabad szöveg -> FTS5 MATCH kifejezés.
+
+    - minden token idézőjelbe kerül (implicit AND a tokenek között),
+    - az utolsó token prefixként megy ("Orb" -> "Orb"*), amit a
+      prefix index szolgál ki,
+    - ha nincs értelmes token, None (a hívó dönt a fallbackről).
+    """
+    tokens = tokenize_query(q)
+    if not tokens:
+        return None
+    parts = ['"%s"' % t.replace('"', '""') for t in tokens]
+    if prefix_last:
+        parts[-1] += "*"
+    return " ".join(parts)
+
+
+def bm25_expr(table: str = "article_fts") -> str:
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    return f"bm25({table}, {weights})"
+
+
+# ---------------------------------------------------------------------------
+# Query planner: szavas FTS vs. trigram (substring / URL-slug) index
+# ---------------------------------------------------------------------------
+
+_SLUG_CHARS = set("-/._")
+_SLUG_SEP_RE = re.compile(r"[-/_]+")
+_PHRASE_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)   # mint a unicode61: az '_' is elválasztó
+TRIGRAM_MIN_LEN = 3  # a trigram index 3 karakter alatti mintát nem tud kiszolgálni
+SLUG_MIN_SEGMENTS = 3  # 'magyar-peter-tisza' slug, az 'Orbán-kormány' még sima szó
+
+
+@dataclass
+class TextQueryPlan:
+    """
+    Melyik index szolgálja ki a szabad szöveges `q`-t.
+
+      mode = 'fts'     -> article_fts MATCH (bm25), természetes nyelvű kifejezés
+      mode = 'trigram' -> article_trgm LIKE '%...%' (slug / URL-töredék / részszó),
+                          phrase esetén UNION az article_fts kifejezés-találataival
+      mode = 'like'    -> nincs használható index, régi LIKE scan
+    """
+    mode: str
+    match: Optional[str] = None        # FTS MATCH kifejezés ('fts' módban)
+    phrase: Optional[str] = None       # FTS MATCH kifejezés a body-hoz ('trigram' módban)
+    url_pattern: Optional[str] = None  # ékezet nélküli LIKE minta az url oszlopra
+    title_pattern: Optional[str] = None  # eredeti LIKE minta a title oszlopra
+
+
+def looks_like_slug(q: str) -> bool:
+    """'magyar-peter', 'T/1234', 'orban_viktor' -> True; 'Magyar Péter' -> False."""
+    q = (q or "").strip()
+    return bool(q) and not any(c.isspace() for c in q) and any(c in _SLUG_CHARS for c in q)
+
+
+def looks_like_url(q: str) -> bool:
+    """
+    Valódi URL / slug: séma ('https://'), vezető '/', 'www.', vagy szóköz nélkül
+    legalább SLUG_MIN_SEGMENTS kötőjeles/perjeles szegmens ('magyar-peter-tisza').
+    'Orbán-kormány', 'Fidesz-KDNP', 'T/1234' -> False (ezek a body-ban is lehetnek).
+    """
+    q = (q or "").strip()
+    if not looks_like_slug(q):
+        return False
+    if "://" in q or q.startswith(("/", "www.")):
+        return True
+    return len([seg for seg in _SLUG_SEP_RE.split(q) if seg]) >= SLUG_MIN_SEGMENTS
+
+
+def build_phrase_query(q: str) -> Optional[str]:
+    """'Orbán-kormány' -> '"Orbán kormány"' (a tokenek szomszédos kifejezésként)."""
+    tokens = _PHRASE_TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    return '"%s"' % " ".join(t.replace('"', '""') for t in tokens)
+
+
+def plan_text_query(q: str, *, has_fts: bool = True, has_trigram: bool = True) -> TextQueryPlan:
+    """
+    Döntés a két index között:
+
+      1) slug-szerű bemenet (nincs szóköz, van benne - / . _) -> trigram,
+         mert a szavas tokenizer szétszedné és elveszne a szomszédság; a
+         trigram index csak url + title, ezért ha nem valódi URL / slug
+         (looks_like_url), a tokenek FTS kifejezés-találatai is (body);
+      2) egyébként, ha van értelmes token -> szavas FTS (a url is indexelve
+         van benne, így a slug szavai is találnak);
+      3) ha csak rövid/írásjeles töredék marad, de legalább 3 karakter -> trigram;
+      4) különben LIKE fallback.
+    """
+    q = (q or "").strip()
+    folded = fold_diacritics(q)
+
+    if has_trigram and looks_like_slug(q) and len(folded) >= TRIGRAM_MIN_LEN:
+        return TextQueryPlan(
+            mode="trigram",
+            phrase=build_phrase_query(q) if has_fts and not looks_like_url(q) else None,
+            url_pattern=f"%{folded}%",
+            title_pattern=f"%{q}%",
+        )
+
+    match = build_match_query(q) if has_fts else None
+    if match is not None:
+        return TextQueryPlan(mode="fts", match=match)
+
+    if has_trigram and len(q) >= TRIGRAM_MIN_LEN:
+        return TextQueryPlan(
+            mode="trigram",
+            url_pattern=f"%{folded}%",
+            title_pattern=f"%{q}%",
+        )
+
+    return TextQueryPlan(mode="like")
+
+
+def normalize_tag(name: str) -> str:
+    """Címke/entitás kulcs: ékezet nélkül, kisbetűvel, egy szóközzel ('Orbán  Viktor' -> 'orban viktor')."""
+    return " ".join(fold_diacritics(name).split())
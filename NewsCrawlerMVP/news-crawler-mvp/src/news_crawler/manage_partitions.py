@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Időpartíciók karbantartása (lásd partitioned.PartitionedRepository).
+
+Használat (példák):
+
+  # meglévő telex master DB szétosztása havi partíciókba
+  python -m news_crawler.manage_partitions --root partitions/telex import --from telex.hu_master.sqlite
+
+  # partíciók listája (állapot, sorok, méret)
+  python -m news_crawler.manage_partitions --root partitions/telex list
+
+  # minden hónap lezárása az aktuális előtt (tömörítés + VACUUM + read-only)
+  python -m news_crawler.manage_partitions --root partitions/telex close
+
+  # 2023 előtti lezárt partíciók áthelyezése olcsóbb tárolóra
+  python -m news_crawler.manage_partitions --root partitions/telex relocate --before 2023-01-01 --dest /mnt/cold/telex
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .partitioned import PartitionedRepository
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.partitioned import PartitionedRepository  # type: ignore
+    from news_crawler.repository import Repository  # type: ignore
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Havi/éves cikk-partíciók karbantartása.")
+    p.add_argument("--root", required=True, help="A partíciók könyvtára (catalog.sqlite + partíció fájlok).")
+    p.add_argument(
+        "--granularity",
+        choices=["month", "year"],
+        default="month",
+        help="Partíció méret (alap: month). Meglévő katalógusnál egyeznie kell.",
+    )
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="Partíciók listája.")
+
+    imp = sub.add_parser("import", help="Monolitikus DB cikkeinek szétosztása a partíciókba.")
+    imp.add_argument("--from", dest="source", required=True, help="Forrás SQLite DB (pl. master).")
+    imp.add_argument("--domain", action="append", default=None, help="Csak ez a domain (többször is megadható).")
+
+    close = sub.add_parser("close", help="Régi partíciók lezárása.")
+    close.add_argument(
+        "--before",
+        default=None,
+        help="Ez előtt véget érő partíciók ('YYYY-MM-DD'); alap: az aktuális hónap első napja.",
+    )
+    close.add_argument("--no-compress", action="store_true", help="zstd újratömörítés kihagyása.")
+
+    reopen = sub.add_parser("reopen", help="Lezárt partíció újranyitása írásra.")
+    reopen.add_argument("key", help="Partíció kulcs, pl. 2024-05.")
+
+    reloc = sub.add_parser("relocate", help="Lezárt partíciók áthelyezése másik könyvtárba.")
+    reloc.add_argument("--dest", required=True, help="Cél könyvtár (pl. olcsóbb tároló).")
+    reloc.add_argument("--before", required=True, help="Ez előtt véget érő partíciók ('YYYY-MM-DD').")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    prepo = PartitionedRepository(args.root, granularity=args.granularity)
+    try:
+        if args.cmd == "list":
+            for row in prepo.partitions():
+                size = f"{row['bytes'] // 1024} KB" if row["bytes"] else "-"
+                print(
+                    f"{row['key']:<8} {row['state']:<6} rows={row['rows'] if row['rows'] is not None else '-':<7} "
+                    f"{size:<10} {row['path']}"
+                )
+
+        elif args.cmd == "import":
+            if not Path(args.source).exists():
+                sys.exit(f"❌ Nincs ilyen adatbázis: {args.source}")
+            source = Repository(args.source)
+            try:
+                counts = prepo.import_from(source, domains=args.domain)
+            finally:
+                source.close()
+            for key, n in counts.items():
+                print(f"[PART] {key}: {n} cikk")
+            print(f"[PART] Import kész: {sum(counts.values())} cikk, {len(counts)} partíció.")
+
+        elif args.cmd == "close":
+            cutoff = args.before or date.today().replace(day=1).isoformat()
+            keys = prepo.close_before(cutoff, compress=not args.no_compress)
+            print(f"[PART] {len(keys)} partíció lezárva ({cutoff} előtt).")
+
+        elif args.cmd == "reopen":
+            prepo.reopen_partition(args.key)
+            print(f"[PART] {args.key}: újranyitva.")
+
+        elif args.cmd == "relocate":
+            for row in prepo.partitions(date_to=args.before):
+                if row["state"] != "closed" or row["date_to"] > args.before:
+                    continue
+                dest = prepo.relocate_partition(row["key"], args.dest)
+                print(f"[PART] {row['key']} -> {dest}")
+    finally:
+        prepo.close()
+
+
+if __name__ == "__main__":
+    main()
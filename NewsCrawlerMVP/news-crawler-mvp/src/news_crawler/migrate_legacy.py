@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Régi (flat) `items` táblák átköltöztetése a normalizált sémába.
+
+A régi scriptek (rss_filter, backfill_sitemap, embed_classify_summarize,
+migrate_db) egyetlen `items` táblába írtak; ez a migrátor soronként
+streameli át őket:
+
+  - items(id, title, link, published, source, content, matched_tags, ts)
+      -> articles + article_bodies (Repository.upsert)
+  - label, label_score, cluster_id      -> articles
+  - emb (float32 BLOB)                  -> article_embeddings
+  - cluster_summary                     -> clusters (klaszterenként egyszer)
+  - views / comments / likes / popularity_score / last_popcheck_ts
+                                        -> article_popularity
+
+Deduplikáció kanonikus URL alapján (https, kisbetűs host, utm_* és fragment
+nélkül, záró '/' nélkül): az új cikk id = sha256(kanonikus URL), így a
+duplikátumok ugyanarra a sorra futnak rá (a meglévő nem-NULL mezők maradnak).
+
+A forrás rowid-keyset szerint, chunk_size soronként egy tranzakcióban
+megy át; a checkpoint (utolsó rowid + számlálók) ugyanabban a tranzakcióban
+a repo_meta táblába kerül, így megszakítás után a futás onnan folytatódik.
+
+Használat (példák):
+
+  python -m news_crawler.migrate_legacy --source old_news.sqlite --db news.sqlite
+  python -m news_crawler.migrate_legacy --source old_news.sqlite --db news.sqlite --bulk --chunk-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .models import Article
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.models import Article  # type: ignore
+    from news_crawler.repository import Repository  # type: ignore
+
+
+DEFAULT_CHUNK_SIZE = 1000
+META_PREFIX = "legacy_migration:"
+
+# a régi items tábla oszlopai, amiket ismerünk (a hiányzókat NULL-nak vesszük)
+LEGACY_COLUMNS = (
+    "id", "title", "link", "published", "source", "content", "matched_tags", "ts",
+    "label", "label_score", "emb", "cluster_id", "cluster_summary",
+    "views", "comments", "likes", "popularity_score", "last_popcheck_ts",
+)
+
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+# ----------------------------------------------------------------------
+# Normalizálás
+# ----------------------------------------------------------------------
+def canonicalize_url(u: str) -> str:
+    """https, kisbetűs host, záró '/' és fragment nélkül, utm_* paraméterek nélkül."""
+    try:
+        pr = urlparse(u.strip())
+        path = pr.path or "/"
+        if path != "/" and path.endswith("/"):
+            path = path.rstrip("/")
+        query = urlencode(
+            [(k, v) for k, v in parse_qsl(pr.query, keep_blank_values=True) if not k.lower().startswith("utm_")]
+        )
+        return urlunparse(pr._replace(scheme="https", netloc=pr.netloc.lower(), path=path, query=query, fragment=""))
+    except Exception:
+        return u
+
+
+def normalize_date(s: Optional[str]) -> Optional[str]:
+    """ISO vagy RFC 822 (RSS pubDate) dátum -> 'YYYY-MM-DD'; felismerhetetlen -> None."""
+    if not s:
+        return None
+    s = str(s).strip()
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00")).date().isoformat()
+    except Exception:
+        pass
+    try:
+        return parsedate_to_datetime(s).date().isoformat()
+    except Exception:
+        pass
+    try:
+        return datetime.strptime(s[:10], "%Y-%m-%d").date().isoformat()
+    except Exception:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Migráció
+# ----------------------------------------------------------------------
+def _legacy_columns(src: sqlite3.Connection) -> Dict[str, str]:
+    row = src.execute("SELECT type FROM sqlite_master WHERE name = 'items'").fetchone()
+    if row is None:
+        raise ValueError("A forrás DB-ben nincs 'items' tábla.")
+    if row[0] != "table":
+        # az új sémában az items csak kompatibilitási VIEW – abból nincs mit migrálni
+        raise ValueError("A forrás 'items' objektuma nem tábla (már normalizált DB?).")
+    cols = {r[1] for r in src.execute("PRAGMA table_info(items)")}
+    # ismert oszlop -> SELECT kifejezés (hiányzó oszlop: NULL)
+    return {c: (c if c in cols else "NULL") for c in LEGACY_COLUMNS}
+
+
+def _row_to_article(row: sqlite3.Row) -> Optional[Article]:
+    link = (row["link"] or "").strip()
+    if not link:
+        return None
+    url = canonicalize_url(link)
+    raw_tags = row["matched_tags"]
+    return Article(
+        id=hashlib.sha256(url.encode("utf-8")).hexdigest(),
+        title=(row["title"] or "").strip(),
+        link=url,
+        published=normalize_date(row["published"]),
+        source=(row["source"] or urlparse(url).netloc).lower(),
+        content=row["content"] or None,   # a régi táblákban az üres string = "nincs body"
+        matched_tags=[raw_tags] if raw_tags else [],
+        ts=int(row["ts"]) if row["ts"] is not None else None,
+        label=row["label"],
+        label_score=row["label_score"],
+        cluster_id=row["cluster_id"],
+    )
+
+
+def migrate_items(
+    source_path: str,
+    repo: Repository,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressFn] = None,
+) -> Dict[str, Any]:
+    """
+    A source_path DB `items` táblájának átvitele a repo-ba.
+
+    Újrafuttatható: a checkpoint a repo_meta-ban van (kulcs: forrás abszolút
+    útvonala), a már átvitt rowid-okat nem olvassa újra. A forrás lehet
+    ugyanaz a fájl is, mint a repo (helyben migrálás).
+
+    Visszatérés: a számlálók (seen / inserted / merged / skipped / last_rowid).
+    """
+    meta_key = META_PREFIX + str(Path(source_path).resolve())
+    state = json.loads(repo._meta_get(meta_key) or "{}")
+    for k in ("last_rowid", "seen", "inserted", "merged", "skipped"):
+        state.setdefault(k, 0)
+
+    src = sqlite3.connect(f"file:{Path(source_path).resolve()}?mode=ro", uri=True)
+    src.row_factory = sqlite3.Row
+    try:
+        exprs = _legacy_columns(src)
+        select = ", ".join(f"{expr} AS {name}" for name, expr in exprs.items())
+        max_rowid = src.execute("SELECT COALESCE(MAX(rowid), 0) FROM items").fetchone()[0]
+        t0 = time.time()
+        done_at_start = state["seen"]
+
+        while True:
+            # a chunkot teljesen beolvassuk, mielőtt írunk: így nincs nyitott olvasás
+            # a forráson commit közben (helyben migrálásnál ez rollback journalban is kell)
+            rows = src.execute(
+                f"SELECT rowid AS _rowid, {select} FROM items WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (state["last_rowid"], chunk_size),
+            ).fetchall()
+            if not rows:
+                break
+
+            cur = repo.conn.cursor()
+            try:
+                for row in rows:
+                    state["seen"] += 1
+                    art = _row_to_article(row)
+                    if art is None:
+                        state["skipped"] += 1
+                        continue
+                    exists = cur.execute("SELECT 1 FROM articles WHERE id = ?", (art.id,)).fetchone()
+                    repo.upsert(art, commit=False)
+                    state["merged" if exists else "inserted"] += 1
+
+                    if row["emb"]:
+                        repo.set_embedding(art.id, bytes(row["emb"]), model="legacy", commit=False)
+                    if row["cluster_id"] is not None and row["cluster_summary"]:
+                        repo.set_cluster_summary(int(row["cluster_id"]), row["cluster_summary"], commit=False)
+                    pop = {k: row[k] for k in ("views", "comments", "likes", "popularity_score", "last_popcheck_ts")}
+                    if any(v is not None for v in pop.values()):
+                        repo.set_popularity(art.id, commit=False, **pop)
+
+                state["last_rowid"] = rows[-1]["_rowid"]
+                repo._meta_set(meta_key, json.dumps(state), commit=False)
+                repo.conn.commit()
+            except Exception:
+                repo.conn.rollback()
+                raise
+
+            elapsed = max(time.time() - t0, 1e-6)
+            info = dict(
+                state,
+                max_rowid=max_rowid,
+                rows_per_sec=(state["seen"] - done_at_start) / elapsed,
+            )
+            if progress:
+                progress(info)
+    finally:
+        src.close()
+    return state
+
+
+def _print_progress(info: Dict[str, Any]) -> None:
+    pct = 100.0 * info["last_rowid"] / info["max_rowid"] if info["max_rowid"] else 100.0
+    print(
+        f"[MIGRATE] rowid {info['last_rowid']}/{info['max_rowid']} ({pct:.1f}%) "
+        f"új={info['inserted']} összevont={info['merged']} kihagyott={info['skipped']} "
+        f"{info['rows_per_sec']:.0f} sor/s"
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Régi items tábla migrálása a normalizált sémába.")
+    p.add_argument("--source", required=True, help="A régi SQLite DB (items táblával).")
+    p.add_argument("--db", required=True, help="Cél DB (lehet ugyanaz a fájl is).")
+    p.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Sor / tranzakció (alap: 1000).")
+    p.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Repository.bulk_load(): indexek/FTS triggerek nélkül tölt, a végén újraépít.",
+    )
+    p.add_argument("-v", "--verbose", action="store_true", help="Haladás kiírása chunkonként.")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not Path(args.source).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.source}")
+
+    repo = Repository(args.db)
+    try:
+        t0 = time.time()
+        with repo.bulk_load() if args.bulk else nullcontext():
+            try:
+                state = migrate_items(
+                    args.source,
+                    repo,
+                    chunk_size=args.chunk_size,
+                    progress=_print_progress if args.verbose else None,
+                )
+            except ValueError as e:
+                sys.exit(f"❌ {e}")
+        print(
+            f"[MIGRATE] Kész: {state['seen']} sor, {state['inserted']} új, {state['merged']} összevont, "
+            f"{state['skipped']} kihagyott ({time.time() - t0:.1f} s)"
+        )
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,450 @@
+# news_crawler/partitioned.py
+"""
+Időben particionált cikktárolás: havi (vagy éves) SQLite partíciók + katalógus.
+
+    root/
+      catalog.sqlite          -- partitions: kulcs, fájl, dátumhatárok, állapot
+      2024-01.sqlite          -- teljes Repository séma, csak az adott hónap cikkei
+      2024-02.sqlite
+      undated.sqlite          -- published_date nélküli cikkek
+
+- Írás: az upsert a published_date alapján a megfelelő partícióba megy.
+- Olvasás: csak a date_from/date_to-val átfedő partíciók nyílnak meg
+  (partition pruning). Sima dátum szerinti listázásnál a partíciókat
+  a legfrissebbtől sorban olvassuk és megállunk, ha megvan a limit;
+  szöveg/tag szűrőnél (ismeretlen találati arány) FederatedSearch-csel
+  párhuzamosan fut a lekérdezés a kiválasztott partíciókon.
+- Lezárás (close_partition): zstd tömörítés domainenként, FTS optimize,
+  VACUUM, journal_mode=DELETE és írásvédett fájl; utána read-only
+  kapcsolattal nyílik. A lezárt partíció áttehető olcsóbb tárolóra
+  (relocate_partition), a katalógus követi az új útvonalat.
+
+    prepo = PartitionedRepository("partitions/telex")
+    prepo.upsert_many(articles)
+    prepo.search_by_meta_page(date_from="2024-05-01", q="Tisza", limit=50)
+    prepo.close_before("2024-06-01")
+"""
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .federated import DEFAULT_TIMEOUT, FederatedSearch
+from .models import Article
+from .repository import Repository, decode_cursor, encode_cursor, merge_stats
+
+UNDATED = "undated"
+GRANULARITIES = {"month": 7, "year": 4}   # kulcs = a published_date ennyi karakteres prefixe
+_DATE_RE = re.compile(r"^\d{4}-\d{2}")
+
+
+def partition_key(published: Optional[str], granularity: str = "month") -> str:
+    """'2024-05-17' -> '2024-05' (month) / '2024' (year); dátum nélkül: 'undated'."""
+    if not published or not _DATE_RE.match(published):
+        return UNDATED
+    return published[: GRANULARITIES[granularity]]
+
+
+def partition_bounds(key: str, granularity: str = "month") -> Tuple[Optional[str], Optional[str]]:
+    """A partíció [date_from, date_to) határai 'YYYY-MM-DD' formában (undated: None, None)."""
+    if key == UNDATED:
+        return None, None
+    if granularity == "year":
+        year = int(key)
+        return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    year, month = int(key[:4]), int(key[5:7])
+    nxt = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{nxt[0]:04d}-{nxt[1]:02d}-01"
+
+
+class PartitionedRepository:
+    """
+    Repository-szerű felület időpartíciók felett (upsert / search_by_meta(_page)).
+
+    A partíciók Repository példányai cache-ben vannak; a lezártak read-only
+    kapcsolattal nyílnak.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        *,
+        granularity: str = "month",
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: int = 8,
+    ) -> None:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Ismeretlen granularity: {granularity!r} (month | year)")
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.catalog = sqlite3.connect(str(self.root / "catalog.sqlite"), check_same_thread=False)
+        self.catalog.row_factory = sqlite3.Row
+        self.catalog.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS catalog_meta (
+                key   TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS partitions (
+                key         TEXT PRIMARY KEY,       -- '2024-05' / '2024' / 'undated'
+                path        TEXT NOT NULL,
+                date_from   TEXT,                   -- [date_from, date_to), undated: NULL
+                date_to     TEXT,
+                state       TEXT NOT NULL DEFAULT 'open',   -- open | closed
+                rows        INTEGER,
+                bytes       INTEGER,
+                created_at  INTEGER NOT NULL,
+                closed_at   INTEGER
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_partitions_bounds
+                ON partitions (date_from, date_to);
+            """
+        )
+        row = self.catalog.execute(
+            "SELECT value FROM catalog_meta WHERE key = 'granularity'"
+        ).fetchone()
+        if row is None:
+            self.catalog.execute(
+                "INSERT INTO catalog_meta (key, value) VALUES ('granularity', ?)", (granularity,)
+            )
+            self.catalog.commit()
+        elif row["value"] != granularity:
+            raise ValueError(
+                f"A katalógus {row['value']!r} granularitással készült, nem {granularity!r}-vel."
+            )
+        self.granularity = granularity
+
+        self._repos: Dict[str, Repository] = {}
+        self._lock = threading.RLock()
+        self.federated = FederatedSearch({}, timeout=timeout, max_workers=max_workers)
+
+    # ------------------------------------------------------------------
+    # Katalógus / partíciók megnyitása
+    # ------------------------------------------------------------------
+    def _row(self, key: str) -> Optional[sqlite3.Row]:
+        return self.catalog.execute("SELECT * FROM partitions WHERE key = ?", (key,)).fetchone()
+
+    def _ensure_partition(self, key: str) -> sqlite3.Row:
+        row = self._row(key)
+        if row is None:
+            date_from, date_to = partition_bounds(key, self.granularity)
+            self.catalog.execute(
+                """
+                INSERT INTO partitions (key, path, date_from, date_to, state, created_at)
+                VALUES (?, ?, ?, ?, 'open', ?)
+                """,
+                (key, str(self.root / f"{key}.sqlite"), date_from, date_to, int(time.time())),
+            )
+            self.catalog.commit()
+            row = self._row(key)
+        return row
+
+    def _drop_cached(self, key: str) -> None:
+        repo = self._repos.pop(key, None)
+        self.federated.remove_shard(key)
+        if repo is not None:
+            repo.close()
+
+    def repo(self, key: str) -> Repository:
+        """A partíció Repository-ja (cache-elt; lezárt partíció read-only)."""
+        with self._lock:
+            repo = self._repos.get(key)
+            if repo is None:
+                row = self._row(key)
+                if row is None:
+                    raise KeyError(f"Nincs ilyen partíció: {key}")
+                repo = Repository(row["path"], read_only=row["state"] == "closed")
+                if repo.read_only and not repo.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='daily_stats'"
+                ).fetchone():
+                    # korábbi sémával lezárt partíció: egyszeri séma-frissítés írható módban
+                    repo.close()
+                    self._upgrade_closed(row["path"])
+                    repo = Repository(row["path"], read_only=True)
+                self._repos[key] = repo
+                self.federated.add_shard(key, repo)
+            return repo
+
+    @staticmethod
+    def _upgrade_closed(path: str) -> None:
+        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+        try:
+            Repository(path).close()
+        finally:
+            os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    def _writable(self, key: str) -> Repository:
+        with self._lock:
+            row = self._ensure_partition(key)
+            if row["state"] == "closed":
+                # késve érkező cikk egy lezárt hónapba: visszanyitjuk (a következő close újra tömörít)
+                print(f"[PART] {key}: lezárt partícióba írás -> újranyitás")
+                self.reopen_partition(key)
+            return self.repo(key)
+
+    def partitions(
+        self, date_from: Optional[str] = None, date_to: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        """
+        A [date_from, date_to] intervallummal átfedő partíciók, legfrissebb elöl;
+        az undated partíció csak dátumszűrő nélkül jön (a végén).
+        """
+        where, params = ["date_from IS NOT NULL"], []
+        if date_to:
+            where.append("date_from <= ?")
+            params.append(date_to)
+        if date_from:
+            where.append("date_to > ?")
+            params.append(date_from)
+        rows = self.catalog.execute(
+            f"SELECT * FROM partitions WHERE {' AND '.join(where)} ORDER BY date_from DESC",
+            params,
+        ).fetchall()
+        if not date_from and not date_to:
+            undated = self._row(UNDATED)
+            if undated is not None:
+                rows.append(undated)
+        return rows
+
+    # ------------------------------------------------------------------
+    # Írás
+    # ------------------------------------------------------------------
+    def upsert(self, art: Article) -> None:
+        key = partition_key(art.published, self.granularity)
+        self._writable(key).upsert(art)
+        if key != UNDATED:
+            # ha korábban dátum nélkül jött, ne maradjon két példány
+            undated = self._row(UNDATED)
+            if undated is not None and undated["state"] == "open":
+                repo = self.repo(UNDATED)
+                cur = repo.conn.execute("DELETE FROM articles WHERE id = ?", (art.id,))
+                if cur.rowcount:
+                    repo.conn.commit()
+
+    def upsert_many(self, articles: Iterable[Article]) -> int:
+        count = 0
+        for art in articles:
+            self.upsert(art)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # Olvasás (partition pruning)
+    # ------------------------------------------------------------------
+    def search_by_meta(self, *, limit: int = 200, **filters: Any) -> List[Dict[str, Any]]:
+        return self.search_by_meta_page(limit=limit, **filters)["items"]
+
+    def search_by_meta_page(
+        self, *, limit: int = 50, cursor: Optional[str] = None, **filters: Any
+    ) -> Dict[str, Any]:
+        """
+        Repository.search_by_meta_page megfelelője; a cursor formátuma azonos.
+        Visszatérés: {"items", "next_cursor", "partial", "truncated", "shards"}.
+        """
+        facets = filters.pop("facets", None)
+        facet_limit = filters.pop("facet_limit", Repository.DEFAULT_FACET_LIMIT)
+        keys = [p["key"] for p in self.partitions(filters.get("date_from"), filters.get("date_to"))]
+        order = filters.get("order", "date")
+        selective = any(filters.get(f) for f in ("q", "topic", "entity", "keyword"))
+
+        if order == "bm25" or selective or facets:
+            # facetekhez úgyis minden illeszkedő partíciót végig kell nézni
+            for key in keys:
+                self.repo(key)   # megnyitás + shardként regisztrálás
+            return self.federated.search_by_meta_page(
+                limit=limit, cursor=cursor, only=keys, facets=facets, facet_limit=facet_limit, **filters
+            )
+
+        # dátum szerinti listázás: a partíciók diszjunktak és dátum szerint rendezettek,
+        # így sorban olvasva a sorrend globálisan is helyes -> korai megállás
+        if cursor:
+            last_date, _ = decode_cursor(cursor)
+            if last_date is None:
+                keys = [k for k in keys if k == UNDATED]
+            else:
+                keys = [k for k in keys if k == UNDATED or partition_bounds(k, self.granularity)[0] <= last_date]
+
+        rows: List[Dict[str, Any]] = []
+        status: Dict[str, Dict[str, Any]] = {}
+        for key in keys:
+            t0 = time.monotonic()
+            part = self.repo(key).search_by_meta(limit=limit + 1 - len(rows), cursor=cursor, **filters)
+            status[key] = {"status": "ok", "rows": len(part), "seconds": round(time.monotonic() - t0, 3)}
+            rows.extend(part)
+            if len(rows) > limit:
+                break
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["published_date"], last["id"])
+        return {"items": rows, "next_cursor": next_cursor, "partial": False, "truncated": False, "shards": status}
+
+    def stats(
+        self,
+        domain: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        *,
+        group_by: str = "day",
+    ) -> List[Dict[str, Any]]:
+        """Repository.stats az átfedő partíciókon, összegezve."""
+        return merge_stats(
+            self.repo(p["key"]).stats(domain, date_from, date_to, group_by=group_by)
+            for p in self.partitions(date_from, date_to)
+        )
+
+    # ------------------------------------------------------------------
+    # Életciklus: lezárás / újranyitás / áthelyezés
+    # ------------------------------------------------------------------
+    def close_partition(self, key: str, *, compress: bool = True, sample_size: int = 2000) -> Dict[str, Any]:
+        """
+        Partíció lezárása: domainenkénti zstd szótár + újratömörítés (ha van
+        zstandard), journal_mode=DELETE, VACUUM, FTS rebuild + optimize,
+        írásvédett fájl.
+        """
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                raise KeyError(f"Nincs ilyen partíció: {key}")
+            if row["state"] == "closed":
+                return dict(row)
+            repo = self.repo(key)
+            before = os.path.getsize(row["path"])
+
+            if compress and repo.codec.available:
+                domains = [
+                    r["domain"]
+                    for r in repo.conn.execute(
+                        "SELECT DISTINCT s.domain FROM sources s JOIN articles a ON a.source_id = s.id"
+                    )
+                ]
+                for domain in domains:
+                    try:
+                        repo.train_body_dict(domain, sample_size=sample_size)
+                    except Exception as e:
+                        # nincs / túl kevés body ebben a partícióban ennél a domainnél
+                        print(f"[PART] {key}: {domain} szótár tanítás kihagyva -> {e}")
+                        continue
+                    repo.recompress_bodies(domain)
+
+            repo.conn.execute("PRAGMA journal_mode = DELETE")
+            repo.conn.execute("VACUUM")
+            # az articles-nek nincs INTEGER PRIMARY KEY-e: a VACUUM átszámozhatja a rowid-kat,
+            # amikre az FTS (content_rowid) mutat -> újraépítés, majd egyetlen b-fába fésülés
+            repo.fts_rebuild()
+            repo.fts_optimize()
+            n = repo.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            self._drop_cached(key)
+
+            path = row["path"]
+            os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            after = os.path.getsize(path)
+            self.catalog.execute(
+                "UPDATE partitions SET state = 'closed', rows = ?, bytes = ?, closed_at = ? WHERE key = ?",
+                (n, after, int(time.time()), key),
+            )
+            self.catalog.commit()
+            print(f"[PART] {key}: lezárva, {n} cikk, {before // 1024} KB -> {after // 1024} KB")
+            return dict(self._row(key))
+
+    def close_before(self, cutoff: str, **kwargs: Any) -> List[str]:
+        """Minden nyitott partíció lezárása, ami teljesen cutoff ('YYYY-MM-DD') előtt véget ér."""
+        keys = [
+            r["key"]
+            for r in self.catalog.execute(
+                "SELECT key FROM partitions WHERE state = 'open' AND date_to <= ? ORDER BY date_from",
+                (cutoff,),
+            )
+        ]
+        for key in keys:
+            self.close_partition(key, **kwargs)
+        return keys
+
+    def reopen_partition(self, key: str) -> None:
+        with self._lock:
+            row = self._row(key)
+            if row is None or row["state"] != "closed":
+                return
+            self._drop_cached(key)
+            os.chmod(row["path"], stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+            self.catalog.execute(
+                "UPDATE partitions SET state = 'open', closed_at = NULL WHERE key = ?", (key,)
+            )
+            self.catalog.commit()
+
+    def relocate_partition(self, key: str, dest_dir: str) -> str:
+        """Lezárt partíció áthelyezése (pl. olcsóbb tárolóra); a katalógus az új útvonalat kapja."""
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                raise KeyError(f"Nincs ilyen partíció: {key}")
+            if row["state"] != "closed":
+                raise ValueError(f"Csak lezárt partíció helyezhető át: {key}")
+            self._drop_cached(key)
+            dest = Path(dest_dir).resolve() / Path(row["path"]).name
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(row["path"], str(dest))
+            self.catalog.execute("UPDATE partitions SET path = ? WHERE key = ?", (str(dest), key))
+            self.catalog.commit()
+            return str(dest)
+
+    # ------------------------------------------------------------------
+    # Import monolitikus DB-ből
+    # ------------------------------------------------------------------
+    def import_from(self, source: Repository, *, domains: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Egy meglévő (master) DB cikkeinek szétosztása a partíciókba,
+        domainenként és partíciónként Repository.copy_window_to-val (ATTACH bulk).
+        A dátum nélküli cikkek az upsert útvonalon mennek az undated partícióba.
+        """
+        if domains is None:
+            domains = [r["domain"] for r in source.conn.execute("SELECT domain FROM sources")]
+        counts: Dict[str, int] = {}
+        keys = sorted(
+            {
+                partition_key(r[0], self.granularity)
+                for r in source.conn.execute(
+                    "SELECT DISTINCT substr(published_date, 1, 10) FROM articles "
+                    "WHERE published_date IS NOT NULL"
+                )
+            }
+            - {UNDATED}
+        )
+        for key in keys:
+            date_from, date_to = partition_bounds(key, self.granularity)
+            with self._lock:
+                self._writable(key)
+                self._drop_cached(key)   # az ATTACH-es másolás alatt ne legyen nyitva
+                path = self._row(key)["path"]
+                n = 0
+                for domain in domains:
+                    n += source.copy_window_to(path, domain=domain, date_from=date_from, date_to=date_to)
+            counts[key] = n
+
+        undated = 0
+        for row in source.conn.execute("SELECT url FROM articles WHERE published_date IS NULL").fetchall():
+            src_row = source.get_article_row_by_url(row["url"])
+            if src_row is not None:
+                self.upsert(source.row_to_article(src_row))
+                undated += 1
+        if undated:
+            counts[UNDATED] = undated
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            for key in list(self._repos):
+                self._drop_cached(key)
+            self.federated.close()
+            self.catalog.close()
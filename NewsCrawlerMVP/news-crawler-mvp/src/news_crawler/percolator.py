@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Állandó (standing) lekérdezések: a figyelt kifejezéseket nem az elemzők
+pollozzák /api/search-csel, hanem minden új / frissített cikk az ingest
+során (Repository.upsert -> Percolator.percolate) egyszer fut át az összes
+regisztrált lekérdezésen; a találatok a query_hits táblába kerülnek.
+
+Egy lekérdezés (a config.yaml szerkezetét követi):
+
+    any     -> legalább egy kifejezés szerepeljen (vagy egy regex illeszkedjen)
+    all     -> mind szerepeljen
+    none    -> egyik se szerepeljen
+    regex   -> reguláris kifejezések (kis/nagybetű-függetlenül)
+    domains -> csak ezekről a forrásokról (üres = mind)
+
+A kifejezések ugyanúgy illeszkednek, mint az rss_filter.py-ben: kisbetűs
+részszöveg-egyezés a cím + szöveg felett ("Orbán Viktort" is "Orbán Viktor").
+Az összes lekérdezés összes kifejezése egyetlen automatává fordul
+(pyahocorasick, ha telepítve van; különben egy trie-ből épített regex),
+így egy cikk egyszer olvasódik végig, a lekérdezések számától függetlenül.
+
+    perc = Percolator(repo)                # repo.percolator = perc: upsert-kor fut
+    perc.register(StandingQuery("Magyar Péter", any=["Magyar Péter"]))
+    perc.hits_since(cursor)                # {"items": [...], "next_cursor": "..."}
+
+CLI:
+
+  python -m news_crawler.percolator --db news.sqlite --from-config ../../config.yaml --backfill
+  python -m news_crawler.percolator --db news.sqlite --add "T/ javaslatok" --regex "\\bT/\\d{3,6}\\b"
+  python -m news_crawler.percolator --db news.sqlite --hits --since 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+
+try:
+    import ahocorasick  # pip install pyahocorasick
+except Exception:
+    ahocorasick = None
+
+try:
+    import yaml  # pip install pyyaml
+except Exception:
+    yaml = None
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .models import Article
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.models import Article  # type: ignore
+    from news_crawler.repository import Repository  # type: ignore
+
+
+DEFAULT_HITS_LIMIT = 100
+GEN_KEY = "standing_queries_gen"   # repo_meta: regisztráláskor nő -> a többi folyamat újratölt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS standing_queries (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    name        TEXT NOT NULL UNIQUE,
+    spec        TEXT NOT NULL,              -- JSON: any / all / none / regex / domains
+    active      INTEGER NOT NULL DEFAULT 1,
+    created_at  INTEGER NOT NULL,
+    updated_at  INTEGER NOT NULL
+);
+
+-- az id a cursor: monoton nő, "az utolsó látott óta" = id > cursor
+CREATE TABLE IF NOT EXISTS query_hits (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    query_id    INTEGER NOT NULL,
+    article_id  TEXT NOT NULL,
+    matched     TEXT,                       -- JSON: az illeszkedő kifejezések / regexek
+    created_at  INTEGER NOT NULL,
+    UNIQUE (query_id, article_id),
+    FOREIGN KEY (query_id) REFERENCES standing_queries(id) ON DELETE CASCADE,
+    FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_hits_query ON query_hits (query_id, id);
+"""
+
+
+def norm_term(text: Optional[str]) -> str:
+    """Kisbetű, szóközök összevonva (ékezet marad, mint az rss_filter.py-ben)."""
+    return " ".join((text or "").lower().split())
+
+
+@dataclass
+class StandingQuery:
+    name: str
+    any: List[str] = field(default_factory=list)
+    all: List[str] = field(default_factory=list)
+    none: List[str] = field(default_factory=list)
+    regex: List[str] = field(default_factory=list)
+    domains: List[str] = field(default_factory=list)
+    id: Optional[int] = None
+    active: bool = True
+
+    def spec(self) -> Dict[str, List[str]]:
+        return {"any": self.any, "all": self.all, "none": self.none, "regex": self.regex, "domains": self.domains}
+
+
+# ----------------------------------------------------------------------
+# Kifejezés-automata
+# ----------------------------------------------------------------------
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Trie -> regex; az opcionális folytatás mohó, így egy pozícióról a leghosszabb kifejezés illeszkedik."""
+    alts = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+class TermMatcher:
+    """Sok kifejezés egyszerre, egy menetben: find(szöveg) -> a benne előforduló kifejezések halmaza."""
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms = sorted({t for t in terms if t})
+        self._automaton = None
+        self._regex = None
+        if not self.terms:
+            return
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for t in self.terms:
+                self._automaton.add_word(t, t)
+            self._automaton.make_automaton()
+            return
+        trie: Dict[str, Any] = {}
+        for t in self.terms:
+            node = trie
+            for ch in t:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        # lookahead: minden pozícióról a leghosszabb kifejezés; az ugyanott kezdődő
+        # rövidebbek (és a benne lévők) a contained táblából jönnek
+        self._regex = re.compile("(?=(" + _trie_pattern(trie) + "))")
+        self._contained = {t: {u for u in self.terms if u in t} for t in self.terms}
+
+    def find(self, text: str) -> Set[str]:
+        if not self.terms or not text:
+            return set()
+        if self._automaton is not None:
+            return {t for _, t in self._automaton.iter(text)}
+        found: Set[str] = set()
+        for m in self._regex.finditer(text):
+            hit = m.group(1)
+            if hit not in found:
+                found |= self._contained[hit]
+        return found
+
+
+class _Compiled:
+    """Az aktív lekérdezések egyben: közös automata + egyedi regexek."""
+
+    def __init__(self, queries: Sequence[StandingQuery]) -> None:
+        self.queries = [q for q in queries if q.active]
+        self.terms = TermMatcher(norm_term(t) for q in self.queries for t in q.any + q.all + q.none)
+        self.regexes = {p: re.compile(p, re.I) for q in self.queries for p in q.regex}
+        # lekérdezésenként előre normalizált halmazok
+        self.sets = [
+            (
+                q,
+                {norm_term(t) for t in q.any},
+                {norm_term(t) for t in q.all},
+                {norm_term(t) for t in q.none},
+                {d.lower() for d in q.domains},
+            )
+            for q in self.queries
+        ]
+
+    def match(self, text: str, domain: Optional[str]) -> List[Tuple[StandingQuery, List[str]]]:
+        if not self.queries:
+            return []
+        found = self.terms.find(norm_term(text))
+        regex_hits = {p for p, rx in self.regexes.items() if rx.search(text)}
+        out = []
+        for q, any_t, all_t, none_t, domains in self.sets:
+            if domains and (domain or "") not in domains:
+                continue
+            if not all_t <= found or none_t & found:
+                continue
+            matched = sorted(any_t & found) + [f"re:{p}" for p in q.regex if p in regex_hits]
+            if (any_t or q.regex) and not matched:
+                continue
+            out.append((q, sorted(all_t) + matched))
+        return out
+
+
+# ----------------------------------------------------------------------
+# Percolator
+# ----------------------------------------------------------------------
+class Percolator:
+    """
+    Egy Repository állandó lekérdezései. A repo.percolator-ként beállítva az
+    upsert() minden cikkre meghívja a percolate()-et (ugyanabban a tranzakcióban).
+    """
+
+    def __init__(self, repo: Repository, *, attach: bool = True) -> None:
+        self.repo = repo
+        self._lock = threading.Lock()
+        self._gen: Optional[str] = None
+        self._loaded = False
+        self._compiled = _Compiled([])
+        self.repo.conn.executescript(SCHEMA)
+        self.repo.conn.commit()
+        self._reload()
+        if attach:
+            self.repo.percolator = self
+
+    # ------------------------------------------------------------------
+    # Lekérdezések kezelése
+    # ------------------------------------------------------------------
+    def queries(self, *, include_inactive: bool = False) -> List[StandingQuery]:
+        rows = self.repo.conn.execute(
+            "SELECT id, name, spec, active FROM standing_queries"
+            + ("" if include_inactive else " WHERE active = 1")
+            + " ORDER BY id"
+        ).fetchall()
+        out = []
+        for r in rows:
+            spec = json.loads(r["spec"])
+            out.append(StandingQuery(
+                name=r["name"], id=r["id"], active=bool(r["active"]),
+                **{k: list(spec.get(k) or []) for k in ("any", "all", "none", "regex", "domains")},
+            ))
+        return out
+
+    def _reload(self) -> None:
+        gen = self.repo._meta_get(GEN_KEY)
+        with self._lock:
+            if self._loaded and gen == self._gen:
+                return
+            self._compiled = _Compiled(self.queries())
+            self._gen = gen
+            self._loaded = True
+
+    def _bump(self) -> None:
+        self.repo.conn.execute(
+            "INSERT INTO repo_meta (key, value) VALUES (?, '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (GEN_KEY,),
+        )
+
+    def register(self, query: StandingQuery, *, backfill: bool = False) -> int:
+        """
+        Lekérdezés felvétele / felülírása név alapján. backfill=True: a már
+        tárolt cikkekre is lefut. Hibás regex -> ValueError. Visszaad: id.
+        """
+        if not query.name or not (query.any or query.all or query.regex):
+            raise ValueError("A lekérdezéshez név és legalább egy any / all / regex kell")
+        for p in query.regex:
+            try:
+                re.compile(p)
+            except re.error as e:
+                raise ValueError(f"Hibás regex: {p!r} ({e})") from None
+        now = int(time.time())
+        self.repo.conn.execute(
+            """
+            INSERT INTO standing_queries (name, spec, active, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                spec = excluded.spec, active = excluded.active, updated_at = excluded.updated_at
+            """,
+            (query.name, json.dumps(query.spec(), ensure_ascii=False), int(query.active), now, now),
+        )
+        self._bump()
+        self.repo.conn.commit()
+        query.id = self.repo.conn.execute(
+            "SELECT id FROM standing_queries WHERE name = ?", (query.name,)
+        ).fetchone()["id"]
+        self._reload()
+        if backfill:
+            self.backfill([query.id])
+        return query.id
+
+    def remove(self, name: str) -> bool:
+        """Lekérdezés és találatainak törlése."""
+        cur = self.repo.conn.execute("SELECT id FROM standing_queries WHERE name = ?", (name,))
+        row = cur.fetchone()
+        if row is None:
+            return False
+        self.repo.conn.execute("DELETE FROM query_hits WHERE query_id = ?", (row["id"],))
+        self.repo.conn.execute("DELETE FROM standing_queries WHERE id = ?", (row["id"],))
+        self._bump()
+        self.repo.conn.commit()
+        self._reload()
+        return True
+
+    def register_config(self, path: str, *, backfill: bool = False) -> List[int]:
+        """
+        config.yaml -> lekérdezések: include.any minden eleme és regex.any minden
+        mintája külön lekérdezés (a neve maga a kifejezés), az exclude.any
+        kizárásként mindegyikre vonatkozik.
+        """
+        if yaml is None:
+            raise RuntimeError("A config.yaml olvasásához telepítsd: pip install pyyaml")
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+        exclude = list((cfg.get("exclude") or {}).get("any") or [])
+        domains = list(cfg.get("domain_allowlist") or [])
+        ids = []
+        for term in (cfg.get("include") or {}).get("any") or []:
+            ids.append(self.register(StandingQuery(name=term, any=[term], none=exclude, domains=domains)))
+        for pat in (cfg.get("regex") or {}).get("any") or []:
+            ids.append(self.register(StandingQuery(name=f"re:{pat}", regex=[pat], none=exclude, domains=domains)))
+        if backfill and ids:
+            self.backfill(ids)
+        return ids
+
+    # ------------------------------------------------------------------
+    # Kiértékelés
+    # ------------------------------------------------------------------
+    def percolate(self, art: Article, *, domain: Optional[str] = None, commit: bool = True) -> List[int]:
+        """Egy cikk kiértékelése az összes aktív lekérdezésen; az új találatok a query_hits-be. Visszaad: query id-k."""
+        self._reload()
+        domain = (domain or art.source or urlparse(art.link).netloc).lower()
+        text = f"{art.title or ''}\n{art.content or ''}"
+        hits = self._compiled.match(text, domain)
+        if hits:
+            self._write_hits(art.id, hits)
+            if commit:
+                self.repo.conn.commit()
+        return [q.id for q, _ in hits]
+
+    def _write_hits(self, article_id: str, hits: List[Tuple[StandingQuery, List[str]]]) -> None:
+        now = int(time.time())
+        self.repo.conn.executemany(
+            "INSERT INTO query_hits (query_id, article_id, matched, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(query_id, article_id) DO NOTHING",
+            [(q.id, article_id, json.dumps(m, ensure_ascii=False), now) for q, m in hits],
+        )
+
+    def backfill(self, query_ids: Optional[Sequence[int]] = None, *, batch_size: int = 500) -> int:
+        """A már tárolt cikkek kiértékelése (csak a megadott lekérdezésekre). Visszaad: új találatok."""
+        self._reload()
+        queries = [q for q in self._compiled.queries if query_ids is None or q.id in set(query_ids)]
+        compiled = _Compiled(queries)
+        before = self.repo.conn.execute("SELECT COUNT(*) FROM query_hits").fetchone()[0]
+        cur = self.repo.conn.execute(
+            "SELECT a.id, a.title, s.domain, body_text(b.content, b.content_z, b.dict_id) AS body "
+            "FROM articles a JOIN sources s ON s.id = a.source_id "
+            "LEFT JOIN article_bodies b ON b.article_id = a.id"
+        )
+        pending: List[Tuple[str, List[Tuple[StandingQuery, List[str]]]]] = []
+        scanned = 0
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            scanned += len(rows)
+            for r in rows:
+                hits = compiled.match(f"{r['title'] or ''}\n{r['body'] or ''}", r["domain"])
+                if hits:
+                    pending.append((r["id"], hits))
+        # a SELECT cursor lezárása után írunk (ugyanazon a kapcsolaton)
+        for article_id, hits in pending:
+            self._write_hits(article_id, hits)
+        self.repo.conn.commit()
+        added = self.repo.conn.execute("SELECT COUNT(*) FROM query_hits").fetchone()[0] - before
+        print(f"[PERC] Backfill: {scanned} cikk, {len(queries)} lekérdezés -> {added} új találat")
+        return added
+
+    # ------------------------------------------------------------------
+    # Találatok olvasása
+    # ------------------------------------------------------------------
+    def hits_since(
+        self,
+        cursor: Optional[str] = None,
+        *,
+        queries: Optional[Sequence[str]] = None,
+        limit: int = DEFAULT_HITS_LIMIT,
+    ) -> Dict[str, Any]:
+        """
+        A cursor utáni találatok (legrégebbi elöl). next_cursor-ral folytatható;
+        ha nincs új találat, a next_cursor a kapott cursor (a kliens azzal pollozhat tovább).
+        Hibás cursor -> ValueError.
+        """
+        try:
+            after = int(cursor) if cursor else 0
+        except ValueError:
+            raise ValueError(f"Érvénytelen cursor: {cursor!r}") from None
+        where, params = ["h.id > ?"], [after]
+        if queries:
+            where.append(f"q.name IN ({', '.join('?' * len(queries))})")
+            params.extend(queries)
+        rows = self.repo.conn.execute(
+            f"""
+            SELECT h.id AS hit_id, q.name AS query, h.matched, h.created_at,
+                   a.id AS article_id, a.title, a.url, a.published_date, s.domain
+            FROM query_hits h
+            JOIN standing_queries q ON q.id = h.query_id
+            JOIN articles a ON a.id = h.article_id
+            JOIN sources s ON s.id = a.source_id
+            WHERE {' AND '.join(where)}
+            ORDER BY h.id
+            LIMIT ?
+            """,
+            params + [limit + 1],
+        ).fetchall()
+        items = [
+            {
+                "hit_id": r["hit_id"],
+                "query": r["query"],
+                "matched": json.loads(r["matched"] or "[]"),
+                "created_at": r["created_at"],
+                "article_id": r["article_id"],
+                "title": r["title"],
+                "link": r["url"],
+                "date": r["published_date"],
+                "domain": r["domain"],
+            }
+            for r in rows[:limit]
+        ]
+        return {
+            "items": items,
+            "next_cursor": str(items[-1]["hit_id"]) if items else str(after),
+            "has_more": len(rows) > limit,
+        }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Állandó lekérdezések (percolator) kezelése.")
+    p.add_argument("--db", required=True, help="SQLite adatbázis fájl.")
+    p.add_argument("--from-config", help="config.yaml: include.any / regex.any -> lekérdezések.")
+    p.add_argument("--add", metavar="NAME", help="Új / módosított lekérdezés neve.")
+    p.add_argument("--any", nargs="*", default=[], help="Legalább egy szerepeljen.")
+    p.add_argument("--all", nargs="*", default=[], help="Mind szerepeljen.")
+    p.add_argument("--none", nargs="*", default=[], help="Egyik se szerepeljen.")
+    p.add_argument("--regex", nargs="*", default=[], help="Reguláris kifejezések.")
+    p.add_argument("--domains", nargs="*", default=[], help="Csak ezek a források.")
+    p.add_argument("--remove", metavar="NAME", help="Lekérdezés törlése.")
+    p.add_argument("--backfill", action="store_true", help="A tárolt cikkekre is lefut.")
+    p.add_argument("--list", action="store_true", help="Lekérdezések listája.")
+    p.add_argument("--hits", action="store_true", help="Találatok a --since cursor után.")
+    p.add_argument("--since", default=None, help="Cursor (hit id).")
+    p.add_argument("--limit", type=int, default=DEFAULT_HITS_LIMIT)
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not Path(args.db).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.db}")
+    repo = Repository(args.db)
+    try:
+        perc = Percolator(repo)
+        if args.from_config:
+            ids = perc.register_config(args.from_config, backfill=args.backfill)
+            print(f"[PERC] {len(ids)} lekérdezés a {args.from_config} alapján")
+        if args.add:
+            q = StandingQuery(name=args.add, any=args.any, all=args.all, none=args.none,
+                              regex=args.regex, domains=args.domains)
+            print(f"[PERC] {args.add!r} -> id={perc.register(q, backfill=args.backfill)}")
+        if args.remove:
+            print(f"[PERC] {args.remove!r} törölve" if perc.remove(args.remove) else f"⚠️ Nincs ilyen: {args.remove!r}")
+        if args.list:
+            for q in perc.queries():
+                print(f"{q.id:4d}  {q.name}  {json.dumps(q.spec(), ensure_ascii=False)}")
+        if args.hits:
+            page = perc.hits_since(args.since, limit=args.limit)
+            for h in page["items"]:
+                print(f"#{h['hit_id']} [{h['date'] or '—'}] {h['query']}: {h['title']}\n    🔗 {h['link']}")
+            print(f"[PERC] next_cursor={page['next_cursor']}{' (van még)' if page['has_more'] else ''}")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
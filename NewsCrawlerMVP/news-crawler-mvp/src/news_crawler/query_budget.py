@@ -0,0 +1,117 @@
+# news_crawler/query_budget.py
+"""
+Lekérdezési időkeret (time budget) a megosztott SQLite kapcsolatokhoz.
+
+Egy széles keresés (pl. egybetűs q a LIKE ágon) minden cikk body-ját
+végigolvashatja, és közben másodpercekig foglalja a kapcsolatot. A
+Repository.time_budget() alatt futó lekérdezéseket egy progress handler
+(conn.set_progress_handler, N VM-utasításonként) a keret lejártakor
+megszakítja; a keresők ilyenkor az addig kész sorokat adják vissza
+(dátum szerinti sorrendnél ez helyes prefix, a cursor folytatható),
+a BudgetState.truncated jelzi, hogy az eredmény csonka.
+
+A QueryBudget a közös számlálókat (/api/metrics) és a lassú lekérdezések
+naplóját adja: a slow_ms fölötti (vagy megszakított) lekérdezések SQL-je
+és EXPLAIN QUERY PLAN-je kiíródik.
+
+    budget = QueryBudget(slow_ms=500)
+    repo.budget = budget            # több Repository is osztozhat rajta
+    with repo.time_budget(2.0, label="search") as b:
+        page = repo.search_by_meta_page(q="a")
+    b.truncated, budget.stats()
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+
+PROGRESS_STEPS = 1000          # ennyi VM-utasításonként nézi az órát a handler
+DEFAULT_SLOW_MS = 500.0
+MAX_EXPLAINED = 3              # lekérdezésenként legfeljebb ennyi SQL kerül a naplóba
+_SQL_PREVIEW = 400
+
+
+class QueryBudgetExceeded(sqlite3.OperationalError):
+    """A kapcsolatot a keretnél tovább foglalta egy másik lekérdezés (el sem indult)."""
+
+
+class BudgetState:
+    """Egy time_budget() blokk állapota (a Repository tölti, a hívó olvassa)."""
+
+    def __init__(self, label: str, seconds: float) -> None:
+        self.label = label
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+        self.thread = threading.get_ident()
+        self.aborted = False       # a progress handler megszakított legalább egy lekérdezést
+        self.truncated = False     # a visszaadott eredmény emiatt csonka
+        self.statements: List[str] = []
+
+    def check(self) -> int:
+        """Progress handler: nem 0 -> az SQLite megszakítja az utasítást ('interrupted')."""
+        # a kapcsolat közös: más szál (pl. ingest) utasítását nem szakítjuk meg
+        if threading.get_ident() != self.thread:
+            return 0
+        if time.monotonic() > self.deadline:
+            self.aborted = True
+            return 1
+        return 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+class QueryBudget:
+    """Szálbiztos számlálók + lassú lekérdezés napló (EXPLAIN QUERY PLAN-nel)."""
+
+    def __init__(self, *, slow_ms: float = DEFAULT_SLOW_MS, explain: bool = True) -> None:
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._counters = {"queries": 0, "aborted": 0, "busy": 0, "slow": 0}
+        self._by_label: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, label: str, *names: str) -> None:
+        with self._lock:
+            per = self._by_label.setdefault(label, {"queries": 0, "aborted": 0, "busy": 0, "slow": 0})
+            for name in names:
+                self._counters[name] += 1
+                per[name] += 1
+
+    def record_busy(self, label: str) -> None:
+        self._bump(label, "queries", "busy")
+
+    def record(self, conn: sqlite3.Connection, state: BudgetState) -> None:
+        """Egy time_budget() blokk vége: számlálók + napló (a kapcsolat még a hívóé)."""
+        ms = state.elapsed() * 1000
+        slow = ms >= self.slow_ms
+        names = ["queries"] + (["aborted"] if state.aborted else []) + (["slow"] if slow else [])
+        self._bump(state.label, *names)
+        if not (slow or state.aborted):
+            return
+        what = f"megszakítva a {state.seconds * 1000:.0f} ms-os keretnél" if state.aborted else "lassú"
+        print(f"[BUDGET] {state.label}: {ms:.0f} ms ({what})")
+        if not self.explain:
+            return
+        for sql in list(dict.fromkeys(state.statements))[:MAX_EXPLAINED]:
+            head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+            if head not in ("SELECT", "WITH", "CREATE"):
+                continue
+            preview = " ".join(sql.split())
+            print(f"[BUDGET]   SQL: {preview[:_SQL_PREVIEW]}{'…' if len(preview) > _SQL_PREVIEW else ''}")
+            try:
+                for row in conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall():
+                    print(f"[BUDGET]     {row[-1]}")
+            except sqlite3.Error as e:
+                print(f"[BUDGET]     (EXPLAIN hiba: {e})")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._counters,
+                slow_ms=self.slow_ms,
+                by_label={k: dict(v) for k, v in self._by_label.items()},
+            )
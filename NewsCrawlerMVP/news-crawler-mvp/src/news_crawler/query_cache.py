@@ -0,0 +1,122 @@
+# news_crawler/query_cache.py
+"""
+Lekérdezés-eredmény cache (Repository.search / search_by_meta).
+
+LRU, bájt-korláttal és TTL-lel. A frissességet nem a TTL, hanem a DB írási
+generációja garantálja: az articles triggerei minden írásnál növelik a
+repo_meta 'write_gen' értékét (más folyamat írására is), a cache bejegyzés
+csak akkor érvényes, ha ugyanazon a generáción készült. A TTL csak a
+ritkán kért bejegyzések memóriában tartását korlátozza.
+
+    cache = QueryCache(max_bytes=64 << 20, ttl=300)
+    repo.cache = cache          # több Repository is osztozhat rajta
+    cache.stats()               # {"hits", "misses", "stale", "expired", ...}
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 64 << 20   # 64 MB
+DEFAULT_TTL = 300.0            # mp
+
+_ROW_OVERHEAD = 64             # dict + kulcsok becsült fix költsége / mező
+
+
+def estimate_size(rows: List[Dict[str, Any]]) -> int:
+    """Durva bájtbecslés egy találati listára (a sys.getsizeof rekurzív bejárása drága)."""
+    size = 64
+    for row in rows:
+        size += 232   # üres dict + hash tábla
+        for v in row.values():
+            size += _ROW_OVERHEAD + (len(v) if isinstance(v, (str, bytes)) else 8)
+    return size
+
+
+def normalize_params(**params: Any) -> Tuple[Tuple[str, Any], ...]:
+    """
+    Rendezett, hashelhető kulcs a lekérdezés paramétereiből. A None és az
+    üres string kimarad (a keresők mindkettőt "nincs szűrő"-nek veszik); a
+    többi érték változatlan, mert pl. a LIKE ág a szóközökre is érzékeny.
+    """
+    return tuple((k, params[k]) for k in sorted(params) if params[k] is not None and params[k] != "")
+
+
+class QueryCache:
+    """Szálbiztos LRU cache (kulcs -> (generáció, lejárat, méret, eredmény))."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[int, float, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0, "too_large": 0}
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, gen: int) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            entry_gen, expires, _, rows = entry
+            if entry_gen != gen:
+                self._counters["stale"] += 1
+                self._counters["misses"] += 1
+                self._drop(key)
+                return None
+            if expires < time.monotonic():
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            self._counters["hits"] += 1
+        # sekély másolat: a hívó nyugodtan módosíthatja a dict-eket
+        return [dict(r) for r in rows]
+
+    def put(self, key: Hashable, gen: int, rows: List[Dict[str, Any]]) -> None:
+        size = estimate_size(rows)
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            if size > self.max_bytes // 4:
+                # egy óriás eredmény ne söpörje ki az egész cache-t
+                self._counters["too_large"] += 1
+                return
+            self._data[key] = (gen, time.monotonic() + self.ttl, size, [dict(r) for r in rows])
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._data:
+                self._drop(next(iter(self._data)))
+                self._counters["evictions"] += 1
+
+    def get_or_compute(
+        self, key: Hashable, gen: int, compute: Callable[[], List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        rows = self.get(key, gen)
+        if rows is None:
+            rows = compute()
+            self.put(key, gen, rows)
+        return rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return dict(
+                self._counters,
+                entries=len(self._data),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                hit_ratio=round(self._counters["hits"] / lookups, 4) if lookups else None,
+            )
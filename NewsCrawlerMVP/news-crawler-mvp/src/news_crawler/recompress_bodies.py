@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline body-tömörítés: domainenkénti zstd szótár tanítása + a meglévő
+article_bodies sorok újratömörítése (vagy visszaállítása sima szövegre).
+
+Használat (példák):
+
+  # telex master DB: szótár tanítás 2000 mintából + minden body újratömörítése
+  python -m news_crawler.recompress_bodies \
+      --db telex.hu_master.sqlite \
+      --domain telex.hu \
+      --train \
+      --vacuum
+
+  # minden domain a DB-ben, a már meglévő (legutóbbi) szótárral
+  python -m news_crawler.recompress_bodies --db news.sqlite
+
+  # vissza sima szövegre (pl. zstandard eltávolítása előtt)
+  python -m news_crawler.recompress_bodies --db news.sqlite --plain
+
+Kell hozzá: pip install zstandard
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .repository import Repository
+    from .body_codec import DEFAULT_DICT_SIZE, zstd
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.repository import Repository  # type: ignore
+    from news_crawler.body_codec import DEFAULT_DICT_SIZE, zstd  # type: ignore
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(
+        description="Article body-k zstd tömörítése domainenként tanított szótárral."
+    )
+    p.add_argument("--db", required=True, help="SQLite adatbázis fájl.")
+    p.add_argument(
+        "--domain",
+        action="append",
+        default=None,
+        help="Domain (többször is megadható). Ha nincs megadva: minden domain a DB-ben.",
+    )
+    p.add_argument(
+        "--train",
+        action="store_true",
+        help="Új szótár tanítása a domain mintáiból az újratömörítés előtt.",
+    )
+    p.add_argument("--sample-size", type=int, default=2000, help="Tanító minták száma (alap: 2000).")
+    p.add_argument(
+        "--dict-size",
+        type=int,
+        default=DEFAULT_DICT_SIZE,
+        help=f"Szótár mérete bájtban (alap: {DEFAULT_DICT_SIZE}).",
+    )
+    p.add_argument(
+        "--plain",
+        action="store_true",
+        help="Tömörítés helyett minden body visszaírása sima szövegre.",
+    )
+    p.add_argument("--batch-size", type=int, default=500, help="Sorok tranzakciónként (alap: 500).")
+    p.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="A végén VACUUM (+ FTS rebuild, mert a rowid-k változhatnak), hogy a fájl ténylegesen kisebb legyen.",
+    )
+    p.add_argument("--verbose", "-v", action="store_true", help="Részletes log.")
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    if zstd is None and not args.plain:
+        sys.exit("❌ A tömörítéshez telepítsd a zstandard csomagot: pip install zstandard")
+    if not Path(args.db).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.db}")
+
+    repo = Repository(args.db)
+    domains = args.domain or [
+        r["domain"] for r in repo.conn.execute("SELECT domain FROM sources ORDER BY domain")
+    ]
+
+    for domain in domains:
+        t0 = time.time()
+        if args.train and not args.plain:
+            try:
+                dict_id = repo.train_body_dict(
+                    domain, sample_size=args.sample_size, dict_size=args.dict_size
+                )
+            except Exception as e:
+                # pl. túl kevés minta a tanításhoz
+                print(f"[ZSTD] {domain}: szótár tanítás sikertelen -> {e}")
+                continue
+            print(f"[ZSTD] {domain}: új szótár dict_id={dict_id}")
+        elif not args.plain and repo.codec.active_dict_id(domain) is None:
+            print(f"[ZSTD] {domain}: nincs tanított szótár (használd a --train kapcsolót), kihagyva.")
+            continue
+
+        def _progress(seen: int, rewritten: int) -> None:
+            if args.verbose:
+                print(f"[ZSTD] {domain}: {seen} átnézve, {rewritten} átírva")
+
+        seen, rewritten = repo.recompress_bodies(
+            domain,
+            compress=not args.plain,
+            batch_size=args.batch_size,
+            on_progress=_progress,
+        )
+        print(
+            f"[ZSTD] {domain}: kész, {seen} body átnézve, {rewritten} átírva "
+            f"({time.time() - t0:.1f} s)"
+        )
+
+    if args.vacuum:
+        print("[ZSTD] VACUUM + FTS rebuild…")
+        repo.conn.execute("VACUUM")
+        repo.fts_rebuild()
+
+    repo.close()
+
+
+if __name__ == "__main__":
+    main()
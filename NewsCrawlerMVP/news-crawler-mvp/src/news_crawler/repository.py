@@ -1,14 +1,74 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import hashlib
+import json
+import os
 import sqlite3
+import threading
 import time
-from typing import Iterable, List, Dict, Any, Optional
+import uuid
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
-import unicodedata  # a file tetején már legyen importálva 
 from .models import Article
+from .body_codec import BodyCodec, DEFAULT_DICT_SIZE
+from .fts import build_match_query, bm25_expr, fold_diacritics, normalize_tag, plan_text_query
 from .article_reader import read_article
 from .fetcher import Fetcher
+from .filters import Filter, url_section
+from .query_budget import PROGRESS_STEPS, BudgetState, QueryBudget, QueryBudgetExceeded
+from .query_cache import QueryCache, normalize_params
+
+
+# ---------------------------------------------------------------------------
+# Keyset lapozás: opaque cursor = base64url(JSON [published_date, id])
+# ---------------------------------------------------------------------------
+
+def encode_cursor(published_date: Optional[str], article_id: str) -> str:
+    raw = json.dumps([published_date, article_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], Optional[str]]:
+    """Cursor -> (published_date, id). Hibás cursor esetén ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Érvénytelen cursor: {cursor!r}") from e
+    if not (isinstance(value, list) and len(value) == 2):
+        raise ValueError(f"Érvénytelen cursor: {cursor!r}")
+    pub, art_id = value
+    if pub is not None and not isinstance(pub, str):
+        raise ValueError(f"Érvénytelen cursor: {cursor!r}")
+    if not isinstance(art_id, str):
+        raise ValueError(f"Érvénytelen cursor: {cursor!r}")
+    return pub, art_id
+
+
+def merge_stats(results: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Több DB (shard / partíció) Repository.stats() eredményének összegzése
+    ugyanazon kulcsok (domain / day / month) szerint.
+    """
+    merged: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    for rows in results:
+        for row in rows:
+            key = tuple(row.get(k) for k in ("domain", "day", "month"))
+            item = merged.get(key)
+            if item is None:
+                merged[key] = dict(row, labels=dict(row["labels"]))
+                continue
+            for col in ("n_articles", "n_with_content", "n_tagged", "n_labeled"):
+                item[col] += row[col]
+            for label, n in row["labels"].items():
+                item["labels"][label] = item["labels"].get(label, 0) + n
+    return [
+        merged[k]
+        for k in sorted(merged, key=lambda k: tuple("" if v is None else v for v in k))
+    ]
 
 
 class Repository:
@@ -18,20 +78,82 @@ class Repository:
     Uses the normalized schema:
 
       - sources  (domain-level metadata)
-      - articles (all articles, any domain)
+      - articles (all articles, any domain; "hot" metadata + snippet only)
+      - article_bodies (full article text, "cold", loaded lazily;
+        optionally zstd-compressed with a per-domain dictionary from body_dicts)
       - article_fts (FTS5 full-text index, if available)
+      - article_trgm (FTS5 trigram index over url + title, substring / slug search)
 
     On first use it will create / migrate the DB in-place.
+
+    read_only=True: the file is opened with mode=ro (e.g. a closed, already
+    migrated partition); no schema setup runs and every write fails.
+
+    cache: optional QueryCache for search / search_by_meta results, keyed on
+    the normalized parameters and invalidated by the DB write generation.
+
+    budget: optional QueryBudget (shared counters + slow-query log) for the
+    time_budget() blocks; truncated results are never cached.
+
+    percolator: optional percolator.Percolator; upsert() runs every stored
+    article through its standing queries in the same transaction.
     """
 
-    def __init__(self, db_path: str = "news.sqlite") -> None:
+    def __init__(
+        self,
+        db_path: str = "news.sqlite",
+        *,
+        read_only: bool = False,
+        cache: Optional[QueryCache] = None,
+        budget: Optional[QueryBudget] = None,
+    ) -> None:
         self.db_path = db_path
+        self.read_only = read_only
+        self.cache = cache
+        self.budget = budget
+        # time_budget(): egyszerre egy keretes lekérdezés a kapcsolaton (a handler kapcsolatonkénti)
+        self._query_lock = threading.RLock()
+        self._budget_state: Optional[BudgetState] = None
+        self.percolator = None   # percolator.Percolator(repo) állítja be
+        # QueryCache kulcs: fájl DB-nél az útvonal (több Repository ugyanarra a fájlra osztozhat),
+        # ":memory:" / "" (ideiglenes) DB-nél példányonként egyedi, különben összeütköznének
+        if self.db_path in (":memory:", ""):
+            self._cache_ns = f"{self.db_path or 'temp'}:{uuid.uuid4().hex}"
+        else:
+            self._cache_ns = os.path.abspath(self.db_path)
         # FONTOS: check_same_thread=False, hogy FastAPI alatt több szálról is használható legyen
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if read_only:
+            uri = "file:" + os.path.abspath(self.db_path) + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         # Ensure foreign keys
         self.conn.execute("PRAGMA foreign_keys = ON;")
-        self._init_schema()
+        # body_text() SQL függvény: a triggerek / FTS view a tömörítetlen szöveget látják
+        self.codec = BodyCodec(self.conn)
+        self.codec.register()
+        # url_section(): a filters.UrlSectionFilter SQL oldala (ugyanaz a Python szabály)
+        self.conn.create_function("url_section", 1, url_section, deterministic=True)
+        if read_only:
+            self._detect_features()
+        else:
+            self._init_schema()
+            if self._meta_get("bulk_load") is not None:
+                # egy korábbi bulk load nem ért a végére (pl. kill): az indexek / FTS pótlása
+                print(f"[BULK] Félbeszakadt bulk load a(z) {self.db_path} DB-n -> befejezés")
+                self.finish_bulk_load()
+
+    def _detect_features(self) -> None:
+        """has_fts / has_trigram a meglévő sémából (read-only mód, nincs _init_schema)."""
+        names = {
+            r["name"]
+            for r in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE name IN ('article_fts', 'article_trgm')"
+            )
+        }
+        self.has_fts = "article_fts" in names
+        self.has_trigram = "article_trgm" in names
 
     # ------------------------------------------------------------------
     # Schema setup
@@ -58,7 +180,9 @@ class Repository:
                 source_id       INTEGER NOT NULL,
                 url             TEXT NOT NULL UNIQUE,
                 title           TEXT,
-                content         TEXT,
+                snippet         TEXT,
+                content_len     INTEGER NOT NULL DEFAULT 0,
+                has_content     INTEGER NOT NULL DEFAULT 0,
                 summary         TEXT,
                 published_date  TEXT,
                 path_year       INTEGER,
@@ -76,62 +200,39 @@ class Repository:
                 FOREIGN KEY (source_id) REFERENCES sources(id)
             );
 
-            CREATE INDEX IF NOT EXISTS idx_articles_source_published
-                ON articles (source_id, published_date DESC);
-
-            CREATE INDEX IF NOT EXISTS idx_articles_published
-                ON articles (published_date DESC);
+            -- régi indexnevek (a keyset lapozás óta (published_date, id) a kulcs)
+            DROP INDEX IF EXISTS idx_articles_source_published;
+            DROP INDEX IF EXISTS idx_articles_published;
 
-            CREATE INDEX IF NOT EXISTS idx_articles_cluster
-                ON articles (cluster_id);
+            -- kulcs-érték állapot (pl. félbeszakadt bulk load jelzője)
+            CREATE TABLE IF NOT EXISTS repo_meta (
+                key     TEXT PRIMARY KEY,
+                value   TEXT
+            );
             """
         )
 
+        # 1b) Teljes szöveg külön táblában (hot/cold split)
+        self._init_bodies(cur)
+
+        # 1c) Másodlagos indexek az articles-ön (bulk load alatt eldobhatók)
+        self._ensure_article_indexes(cur)
+
         # 2) FTS index (ha van FTS5)
-        '''try:
-            cur.executescript(
-                """
-                CREATE VIRTUAL TABLE IF NOT EXISTS article_fts
-                USING fts5(
-                    title,
-                    content,
-                    summary,
-                    tags,
-                    url,
-                    content='articles',
-                    content_rowid='rowid'
-                );
+        self._init_fts(cur)
 
-                CREATE TRIGGER IF NOT EXISTS article_ai
-                AFTER INSERT ON articles
-                BEGIN
-                    INSERT INTO article_fts(rowid, title, content, summary, tags, url)
-                    VALUES (new.rowid, new.title, new.content, new.summary, new.tags, new.url);
-                END;
+        # 2b) Normalizált entitás / topic / kulcsszó táblák
+        self._init_tag_tables(cur)
 
-                CREATE TRIGGER IF NOT EXISTS article_au
-                AFTER UPDATE ON articles
-                BEGIN
-                    UPDATE article_fts
-                    SET title   = new.title,
-                        content = new.content,
-                        summary = new.summary,
-                        tags    = new.tags,
-                        url     = new.url
-                    WHERE rowid = new.rowid;
-                END;
+        # 2c) Napi / klaszter statisztika (triggerekkel karbantartott rollup)
+        self._init_stats(cur)
+
+        # 2d) Embedding / klaszter-összefoglaló / népszerűség (a régi items oszlopai)
+        self._init_enrichment_tables(cur)
+
+        # 2e) Írási generáció (a query cache érvénytelenítéséhez)
+        self._init_write_gen(cur)
 
-                CREATE TRIGGER IF NOT EXISTS article_ad
-                AFTER DELETE ON articles
-                BEGIN
-                    DELETE FROM article_fts WHERE rowid = old.rowid;
-                END;
-                """
-            )
-        except sqlite3.OperationalError:
-            # Nincs FTS5 → search() LIKE-ra fog visszaesni
-            pass
-        '''
         # 3) Alapértelmezett források (idempotens)
         self._ensure_default_sources(cur)
 
@@ -149,248 +250,1742 @@ class Repository:
                     a.url            AS link,
                     a.published_date AS published,
                     s.domain         AS source,
-                    a.content        AS content,
+                    body_text(b.content, b.content_z, b.dict_id) AS content,
                     a.matched_tags   AS matched_tags,
                     a.updated_at     AS ts,
                     a.label          AS label,
                     a.label_score    AS label_score,
                     a.cluster_id     AS cluster_id
                 FROM articles a
-                JOIN sources s ON s.id = a.source_id;
+                JOIN sources s ON s.id = a.source_id
+                LEFT JOIN article_bodies b ON b.article_id = a.id;
                 """
             )
 
         self.conn.commit()
 
-    def _ensure_default_sources(self, cur: sqlite3.Cursor) -> None:
-        now = int(time.time())
-        defaults = [
-            ("telex.hu", "Telex", "https://telex.hu", "Europe/Budapest"),
-            ("index.hu", "Index", "https://index.hu", "Europe/Budapest"),
-            ("444.hu", "444", "https://444.hu", "Europe/Budapest"),
-            ("hvg.hu", "HVG", "https://hvg.hu", "Europe/Budapest"),
-        ]
-        for domain, name, base_url, tz in defaults:
-            cur.execute(
-                """
-                INSERT OR IGNORE INTO sources (domain, name, base_url, timezone, is_active, created_at, updated_at)
-                VALUES (?, ?, ?, ?, 1, ?, ?)
-                """,
-                (domain, name, base_url, tz, now, now),
-            )
+    SNIPPET_LEN = 400
 
-    # ------------------------------------------------------------------
-    # Helpers
-    # ------------------------------------------------------------------
-    def _get_or_create_source_id(self, domain: str) -> int:
-        """Return the sources.id for a domain, creating it if needed."""
-        domain = (domain or "").lower()
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT id FROM sources WHERE domain = ?",
-            (domain,),
-        ).fetchone()
-        if row:
-            return int(row["id"])
-        now = int(time.time())
-        cur.execute(
-            """
-            INSERT INTO sources (domain, name, base_url, timezone, is_active, created_at, updated_at)
-            VALUES (?, ?, NULL, NULL, 1, ?, ?)
-            """,
-            (domain, domain, now, now),
-        )
-        self.conn.commit()
-        return int(cur.lastrowid)
+    # az articles nem-unique indexei; bulk_load() alatt eldobhatók, a végén újraépülnek
+    _ARTICLE_INDEXES = {
+        # keyset lapozás: (published_date, id) a rendezési kulcs, az id a tie-breaker
+        "idx_articles_source_published_id": "articles (source_id, published_date DESC, id DESC)",
+        "idx_articles_published_id": "articles (published_date DESC, id DESC)",
+        "idx_articles_cluster": "articles (cluster_id)",
+        # label szűrés (SearchEngine / LabelFilter) dátum szerinti listázással
+        "idx_articles_label_published_id": "articles (label, published_date DESC, id DESC)",
+        # fill_content / tagging: "van-e már szöveg" index-ből, body olvasás nélkül
+        "idx_articles_source_has_content": "articles (source_id, has_content, published_date)",
+    }
 
-    def get_article_row_by_url(self, url: str) -> Optional[sqlite3.Row]:
-        """Nyers DB-sor visszaadása URL alapján (ha létezik)."""
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT * FROM articles WHERE url = ?",
-            (url,),
-        ).fetchone()
-        return row
+    # FTS / trigram triggerek: bulk_load() alatt nincsenek, a végén egy 'rebuild' pótolja őket
+    _FTS_TRIGGERS = (
+        "article_fts_ai",
+        "article_fts_au",
+        "article_fts_bd",
+        "article_body_fts_ai",
+        "article_body_fts_au",
+        "article_body_fts_ad",
+        "article_trgm_ai",
+        "article_trgm_au",
+        "article_trgm_ad",
+    )
 
-    def row_to_article(self, row: sqlite3.Row) -> Article:
-        """sqlite3.Row -> Article dataclass."""
-        tags_raw = row["matched_tags"] or ""
-        matched_tags = [t for t in tags_raw.split(",") if t]
+    def _ensure_article_indexes(self, cur: sqlite3.Cursor) -> None:
+        for name, target in self._ARTICLE_INDEXES.items():
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
 
-        return Article(
-            id=row["id"],
-            title=row["title"] or "",
-            link=row["url"],
-            published=row["published_date"],
-            source=urlparse(row["url"]).netloc if row["url"] else None,
-            content=row["content"],
-            matched_tags=matched_tags,
-            ts=row["updated_at"],
-            label=row["label"],
-            label_score=row["label_score"],
-            cluster_id=row["cluster_id"],
-        )
+    # a body-t olvasó triggerek / view-k; ha a definíciójuk nem a body_text()-en
+    # megy (régebbi DB), eldobjuk és újra létrejönnek
+    _BODY_DEPENDENTS = (
+        ("trigger", "article_bodies_meta_ai"),
+        ("trigger", "article_bodies_meta_au"),
+        ("trigger", "article_fts_ai"),
+        ("trigger", "article_fts_au"),
+        ("trigger", "article_fts_bd"),
+        ("trigger", "article_body_fts_ai"),
+        ("trigger", "article_body_fts_au"),
+        ("trigger", "article_body_fts_ad"),
+        ("view", "article_fts_src"),
+        ("view", "items"),
+    )
 
-    def update_article_content_by_url(
-        self,
-        url: str,
-        title: Optional[str],
-        content: Optional[str],
-    ) -> None:
-        """Title/content frissítése URL alapján."""
-        now = int(time.time())
-        self.conn.execute(
-            """
-            UPDATE articles
-            SET title   = COALESCE(?, title),
-                content = COALESCE(?, content),
-                updated_at = ?
-            WHERE url = ?
-            """,
-            (title, content, now, url),
-        )
-        self.conn.commit()
+    _BODIES_DDL = """
+        CREATE TABLE IF NOT EXISTS {name} (
+            article_id  TEXT PRIMARY KEY,
+            content     TEXT,               -- sima szöveg (ha nincs tömörítve)
+            content_z   BLOB,               -- zstd frame (ha tömörítve)
+            dict_id     INTEGER,            -- body_dicts.dict_id (NULL = szótár nélkül)
+            FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE
+        );
+    """
 
-    def get_or_fetch_article(self, url: str, fetcher: Optional[Fetcher] = None) -> Article:
+    def _init_bodies(self, cur: sqlite3.Cursor) -> None:
         """
-        Magas szintű API: URL -> Article.
+        Hot/cold split: a teljes cikkszöveg az article_bodies táblában van,
+        az articles sorában csak a snippet / content_len / has_content marad.
+        Így a listázó és számláló lekérdezések nem húzzák be a több KB-os
+        body-kat tartalmazó lapokat.
 
-        - Ha az URL már szerepel az adatbázisban ÉS van content,
-          akkor csak visszaadjuk az Article-t.
-        - Ha nincs, akkor read_article()-lel letöltjük/parszoljuk,
-          elmentjük, és úgy adjuk vissza.
+        A body lehet zstd-vel tömörítve (content_z + dict_id, lásd body_codec);
+        a triggerek és az FTS a body_text() függvényen át a szöveget látják.
+
+        A hot oszlopokat az article_bodies triggerei tartják karban.
+        Régi DB-n (articles.content oszloppal) egyszeri migráció fut.
         """
-        row = self.get_article_row_by_url(url)
-        if row is not None and row["content"]:
-            return self.row_to_article(row)
+        cols = {r["name"] for r in cur.execute("PRAGMA table_info(articles)")}
+        for name, ddl in (
+            ("snippet", "TEXT"),
+            ("content_len", "INTEGER NOT NULL DEFAULT 0"),
+            ("has_content", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            if name not in cols:
+                cur.execute(f"ALTER TABLE articles ADD COLUMN {name} {ddl}")
 
-        # Nincs (hasznos) content -> le kell húzni
-        article_fetcher = fetcher or Fetcher()
-        title, body = read_article(url, fetcher=article_fetcher)
+        for kind, name in self._BODY_DEPENDENTS:
+            row = cur.execute(
+                "SELECT sql FROM sqlite_master WHERE type = ? AND name = ?", (kind, name)
+            ).fetchone()
+            if row and "body_text" not in (row["sql"] or ""):
+                cur.execute(f"DROP {kind.upper()} {name}")
 
-        # Ha teljesen új az URL
-        if row is None:
-            stable_id = hashlib.sha256(url.encode("utf-8")).hexdigest()
-            now = int(time.time())
-            art = Article(
-                id=stable_id,
-                title=title or "",
-                link=url,
-                published=None,
-                source=urlparse(url).netloc,
-                content=body or "",
-                matched_tags=[],
-                ts=now,
-                label=None,
-                label_score=None,
-                cluster_id=None,
+        body_cols = {r["name"] for r in cur.execute("PRAGMA table_info(article_bodies)")}
+        if body_cols and "content_z" not in body_cols:
+            # content NOT NULL volt és nincs tömörített oszlop -> tábla újraépítése
+            cur.executescript(
+                self._BODIES_DDL.format(name="article_bodies_new")
+                + """
+                INSERT INTO article_bodies_new (article_id, content)
+                SELECT article_id, content FROM article_bodies;
+                DROP TABLE article_bodies;
+                ALTER TABLE article_bodies_new RENAME TO article_bodies;
+                """
             )
-            self.upsert(art)
-            return art
 
-        # Ha volt sor, de content nélkül -> frissítés
-        self.update_article_content_by_url(url, title, body)
-        updated = self.get_article_row_by_url(url)
-        assert updated is not None
-        return self.row_to_article(updated)
+        n = self.SNIPPET_LEN
+        text = "body_text(new.content, new.content_z, new.dict_id)"
+        cur.executescript(
+            self._BODIES_DDL.format(name="article_bodies")
+            + f"""
+            CREATE TABLE IF NOT EXISTS body_dicts (
+                dict_id      INTEGER PRIMARY KEY,   -- a zstd szótár saját id-ja
+                domain       TEXT NOT NULL,
+                dict         BLOB NOT NULL,
+                sample_count INTEGER,
+                created_at   INTEGER NOT NULL
+            );
 
-    # ------------------------------------------------------------------
-    # Write API
-    # ------------------------------------------------------------------
-    def upsert(self, art: Article) -> None:
-        """
-        Insert or update a single Article into the normalized schema.
-        Keeps the SHA-256 based Article.id stable across runs.
-        """
-        cur = self.conn.cursor()
-        # Domain meghatározása: adapterek beállítják a .source-ot, de azért fallback is van.
-        domain = (art.source or urlparse(art.link).netloc).lower()
-        source_id = self._get_or_create_source_id(domain)
-        now = int(time.time())
-        published_date = art.published or None
-        matched_tags = ",".join(art.matched_tags) if art.matched_tags else None
+            CREATE INDEX IF NOT EXISTS idx_body_dicts_domain
+                ON body_dicts (domain, created_at DESC);
 
-        cur.execute(
+            CREATE TRIGGER IF NOT EXISTS article_bodies_meta_ai
+            AFTER INSERT ON article_bodies
+            BEGIN
+                UPDATE articles
+                SET snippet     = substr({text}, 1, {n}),
+                    content_len = length({text}),
+                    has_content = new.content_z IS NOT NULL OR length(new.content) > 0
+                WHERE id = new.article_id;
+            END;
+
+            -- újratömörítés (ugyanaz a szöveg) nem írja az articles sort
+            CREATE TRIGGER IF NOT EXISTS article_bodies_meta_au
+            AFTER UPDATE OF content, content_z, dict_id ON article_bodies
+            WHEN body_text(old.content, old.content_z, old.dict_id) IS NOT {text}
+            BEGIN
+                UPDATE articles
+                SET snippet     = substr({text}, 1, {n}),
+                    content_len = length({text}),
+                    has_content = new.content_z IS NOT NULL OR length(new.content) > 0
+                WHERE id = new.article_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS article_bodies_meta_ad
+            AFTER DELETE ON article_bodies
+            BEGIN
+                UPDATE articles
+                SET snippet = NULL, content_len = 0, has_content = 0
+                WHERE id = old.article_id;
+            END;
             """
-            INSERT INTO articles (
-                id, source_id, url,
-                title, content, summary,
-                published_date,
-                path_year, path_month, path_day,
-                section, tags, matched_tags,
-                author,
-                label, label_score, cluster_id,
-                created_at, updated_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, NULL, NULL, NULL, ?, NULL, ?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                title          = COALESCE(excluded.title, articles.title),
-                content        = COALESCE(excluded.content, articles.content),
-                summary        = COALESCE(excluded.summary, articles.summary),
-                published_date = COALESCE(excluded.published_date, articles.published_date),
-                matched_tags   = COALESCE(excluded.matched_tags, articles.matched_tags),
-                label          = COALESCE(excluded.label, articles.label),
-                label_score    = COALESCE(excluded.label_score, articles.label_score),
-                cluster_id     = COALESCE(excluded.cluster_id, articles.cluster_id),
-                updated_at     = excluded.updated_at
-            """,
-            (
-                art.id,
-                source_id,
-                art.link,
-                art.title,
-                art.content,
-                None,  # summary – majd az embedder/összefoglaló pipeline tölti ki
-                published_date,
-                matched_tags,
-                art.label,
-                art.label_score,
-                art.cluster_id,
-                now if art.ts is None else art.ts,
-                now,
-            ),
         )
-        self.conn.commit()
 
-    def upsert_many(self, articles: Iterable[Article]) -> int:
-        """Batch upsert – returns number of processed records."""
-        count = 0
-        for art in articles:
-            self.upsert(art)
-            count += 1
-        return count
+        if "content" in cols:
+            self._migrate_inline_content(cur)
 
-    # ------------------------------------------------------------------
-    # Read / search API
-    # ------------------------------------------------------------------
-    def search(self, query: str, *, limit: int = 200, order: str = "bm25") -> List[Dict[str, Any]]:
+    def _migrate_inline_content(self, cur: sqlite3.Cursor) -> None:
+        """articles.content -> article_bodies, majd az oszlop eldobása."""
+        # a régi FTS triggerek az articles.content-re hivatkoznak, DROP COLUMN előtt mennek;
+        # az article_fts-t az _init_fts az article_fts_src view-ra építi újra
+        cur.executescript(
+            """
+            DROP TRIGGER IF EXISTS article_ai;
+            DROP TRIGGER IF EXISTS article_au;
+            DROP TRIGGER IF EXISTS article_ad;
+            """
+        )
+
+        moved = cur.execute(
+            """
+            INSERT OR IGNORE INTO article_bodies (article_id, content)
+            SELECT id, content FROM articles
+            WHERE content IS NOT NULL AND content <> ''
+            """
+        ).rowcount
+        try:
+            cur.execute("ALTER TABLE articles DROP COLUMN content")
+        except sqlite3.OperationalError:
+            # SQLite < 3.35: nincs DROP COLUMN -> legalább a helyet szabadítsuk fel
+            cur.execute("UPDATE articles SET content = NULL WHERE content IS NOT NULL")
+        self.conn.commit()
+        if moved:
+            print(f"[TISZA] articles.content -> article_bodies migráció: {moved} cikk")
+
+    def _init_fts(self, cur: sqlite3.Cursor) -> None:
         """
-        Full-text search over articles. Tries FTS5 first, falls back to
-        a simple LIKE search if FTS is unavailable.
+        External-content FTS5 index az article_fts_src view-ra
+        (articles hot oszlopai + article_bodies.content).
 
-        Returns a list of dicts with keys:
-          - title, link, label, label_score, date, rank, cluster_id, snippet
+        - unicode61 + remove_diacritics 2: 'Orbán' és 'orban' ugyanaz a term,
+        - prefix='2 3': a rövid prefix-keresések ("Orb"*) indexből mennek,
+        - a triggerek inkrementálisan tartják karban (delete + insert, ahogy
+          az external-content tábláknál kell).
+
+        Ha nincs FTS5 a SQLite buildben, has_fts=False és a keresés LIKE-ra esik vissza.
         """
-        cur = self.conn.cursor()
-        rows: List[sqlite3.Row]
+        self.has_fts = False
+        self.has_trigram = False
+        existing = cur.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='article_fts'"
+        ).fetchone()
+        if existing and "article_fts_src" not in (existing["sql"] or ""):
+            # régi séma (tokenizer nélkül / közvetlenül az articles.content-en) -> eldobjuk, alább újraépül
+            cur.executescript(
+                """
+                DROP TRIGGER IF EXISTS article_ai;
+                DROP TRIGGER IF EXISTS article_au;
+                DROP TRIGGER IF EXISTS article_ad;
+                DROP TABLE IF EXISTS article_fts;
+                """
+            )
+            existing = None
 
-        # Próbáljuk FTS-sel
+        body = "(SELECT body_text(content, content_z, dict_id) FROM article_bodies WHERE article_id = {}.id)"
+        old_text = "body_text(old.content, old.content_z, old.dict_id)"
+        new_text = "body_text(new.content, new.content_z, new.dict_id)"
         try:
-            sql = (
-                "SELECT a.title, a.url AS link, a.label, a.label_score, "
-                "COALESCE(a.published_date, datetime(a.created_at, 'unixepoch')) AS date, "
-                "bm25(article_fts) AS rank, "
-                "a.cluster_id, "
-                "substr(a.content, 1, 400) AS snippet "
-                "FROM articles a "
-                "JOIN article_fts ON article_fts.rowid = a.rowid "
-                "WHERE article_fts MATCH ? "
-                "ORDER BY "
-                + ("rank" if order == 'bm25' else "a.created_at DESC")
+            cur.executescript(
+                f"""
+                -- external content: articles hot oszlopai + article_bodies.content
+                CREATE VIEW IF NOT EXISTS article_fts_src AS
+                SELECT a.rowid AS rowid, a.title,
+                       body_text(b.content, b.content_z, b.dict_id) AS content,
+                       a.summary, a.tags, a.url
+                FROM articles a
+                LEFT JOIN article_bodies b ON b.article_id = a.id;
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS article_fts
+                USING fts5(
+                    title,
+                    content,
+                    summary,
+                    tags,
+                    url,
+                    content='article_fts_src',
+                    content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS article_fts_ai
+                AFTER INSERT ON articles
+                BEGIN
+                    INSERT INTO article_fts(rowid, title, content, summary, tags, url)
+                    VALUES (new.rowid, new.title, {body.format("new")}, new.summary, new.tags, new.url);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS article_fts_au
+                AFTER UPDATE OF title, summary, tags, url ON articles
+                BEGIN
+                    INSERT INTO article_fts(article_fts, rowid, title, content, summary, tags, url)
+                    VALUES ('delete', old.rowid, old.title, {body.format("old")}, old.summary, old.tags, old.url);
+                    INSERT INTO article_fts(rowid, title, content, summary, tags, url)
+                    VALUES (new.rowid, new.title, {body.format("new")}, new.summary, new.tags, new.url);
+                END;
+
+                -- BEFORE: a body-t a cascade még nem törölte
+                CREATE TRIGGER IF NOT EXISTS article_fts_bd
+                BEFORE DELETE ON articles
+                BEGIN
+                    INSERT INTO article_fts(article_fts, rowid, title, content, summary, tags, url)
+                    VALUES ('delete', old.rowid, old.title, {body.format("old")}, old.summary, old.tags, old.url);
+                END;
+
+                -- body változás: a cikk FTS sora újra (ha a cikk már nem létezik, no-op)
+                CREATE TRIGGER IF NOT EXISTS article_body_fts_ai
+                AFTER INSERT ON article_bodies
+                BEGIN
+                    INSERT INTO article_fts(article_fts, rowid, title, content, summary, tags, url)
+                    SELECT 'delete', a.rowid, a.title, NULL, a.summary, a.tags, a.url
+                    FROM articles a WHERE a.id = new.article_id;
+                    INSERT INTO article_fts(rowid, title, content, summary, tags, url)
+                    SELECT a.rowid, a.title, {new_text}, a.summary, a.tags, a.url
+                    FROM articles a WHERE a.id = new.article_id;
+                END;
+
+                -- csak valódi szövegváltozásnál (újratömörítésnél nincs FTS churn)
+                CREATE TRIGGER IF NOT EXISTS article_body_fts_au
+                AFTER UPDATE OF content, content_z, dict_id ON article_bodies
+                WHEN {old_text} IS NOT {new_text}
+                BEGIN
+                    INSERT INTO article_fts(article_fts, rowid, title, content, summary, tags, url)
+                    SELECT 'delete', a.rowid, a.title, {old_text}, a.summary, a.tags, a.url
+                    FROM articles a WHERE a.id = old.article_id;
+                    INSERT INTO article_fts(rowid, title, content, summary, tags, url)
+                    SELECT a.rowid, a.title, {new_text}, a.summary, a.tags, a.url
+                    FROM articles a WHERE a.id = new.article_id;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS article_body_fts_ad
+                AFTER DELETE ON article_bodies
+                BEGIN
+                    INSERT INTO article_fts(article_fts, rowid, title, content, summary, tags, url)
+                    SELECT 'delete', a.rowid, a.title, {old_text}, a.summary, a.tags, a.url
+                    FROM articles a WHERE a.id = old.article_id;
+                    INSERT INTO article_fts(rowid, title, content, summary, tags, url)
+                    SELECT a.rowid, a.title, NULL, a.summary, a.tags, a.url
+                    FROM articles a WHERE a.id = old.article_id;
+                END;
+                """
+            )
+        except sqlite3.OperationalError:
+            # Nincs FTS5 → search() LIKE-ra fog visszaesni
+            return
+
+        self.has_fts = True
+        if not existing:
+            # friss index egy már feltöltött DB-n: egyszeri teljes build
+            has_rows = cur.execute("SELECT 1 FROM articles LIMIT 1").fetchone()
+            if has_rows:
+                cur.execute("INSERT INTO article_fts(article_fts) VALUES ('rebuild')")
+
+        self._init_trigram(cur)
+
+    def _init_trigram(self, cur: sqlite3.Cursor) -> None:
+        """
+        Trigram FTS5 index az url + title oszlopokra: tetszőleges részszó- és
+        slug-keresés ('magyar-peter', '/belfold/2024/') LIKE '%...%' mintával,
+        index-ből kiszolgálva. A trigram tokenizer SQLite >= 3.34 kell.
+        """
+        self.has_trigram = False
+        existing = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='article_trgm'"
+        ).fetchone()
+        try:
+            cur.executescript(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS article_trgm
+                USING fts5(
+                    url,
+                    title,
+                    content='articles',
+                    content_rowid='rowid',
+                    tokenize='trigram'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS article_trgm_ai
+                AFTER INSERT ON articles
+                BEGIN
+                    INSERT INTO article_trgm(rowid, url, title)
+                    VALUES (new.rowid, new.url, new.title);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS article_trgm_au
+                AFTER UPDATE OF url, title ON articles
+                BEGIN
+                    INSERT INTO article_trgm(article_trgm, rowid, url, title)
+                    VALUES ('delete', old.rowid, old.url, old.title);
+                    INSERT INTO article_trgm(rowid, url, title)
+                    VALUES (new.rowid, new.url, new.title);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS article_trgm_ad
+                AFTER DELETE ON articles
+                BEGIN
+                    INSERT INTO article_trgm(article_trgm, rowid, url, title)
+                    VALUES ('delete', old.rowid, old.url, old.title);
+                END;
+                """
+            )
+        except sqlite3.OperationalError:
+            # régi SQLite, nincs trigram tokenizer -> a planner nem választja
+            return
+
+        self.has_trigram = True
+        if not existing:
+            has_rows = cur.execute("SELECT 1 FROM articles LIMIT 1").fetchone()
+            if has_rows:
+                cur.execute("INSERT INTO article_trgm(article_trgm) VALUES ('rebuild')")
+
+    def _init_tag_tables(self, cur: sqlite3.Cursor) -> None:
+        """
+        Normalizált címke-táblák a matched_tags JSON mellé:
+
+          - entities / article_entities  (NER entitások, típus + salience cikkenként)
+          - topics / article_topics      (kind = 'topic' vagy 'keyword')
+
+        A kapcsolótáblákban a published_date denormalizálva van, így az
+        (entity_id, published_date) index egy entitás+időablak szűrést
+        index range scan-nel szolgál ki. Az article_topics.pos a tagger
+        sorrendje (a matched_tags JSON-beli sorrend; kindenként 0-tól).
+        """
+        existing = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='article_entities'"
+        ).fetchone()
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entities (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                name        TEXT NOT NULL,
+                norm        TEXT NOT NULL UNIQUE,
+                created_at  INTEGER NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS article_entities (
+                article_id      TEXT NOT NULL,
+                entity_id       INTEGER NOT NULL,
+                type            TEXT,
+                salience        REAL,
+                published_date  TEXT,
+                PRIMARY KEY (article_id, entity_id),
+                FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE,
+                FOREIGN KEY (entity_id) REFERENCES entities(id)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_article_entities_entity_published
+                ON article_entities (entity_id, published_date DESC, article_id);
+
+            CREATE TABLE IF NOT EXISTS topics (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                name        TEXT NOT NULL,
+                norm        TEXT NOT NULL,
+                kind        TEXT NOT NULL DEFAULT 'topic',
+                created_at  INTEGER NOT NULL,
+                UNIQUE (kind, norm)
+            );
+
+            CREATE TABLE IF NOT EXISTS article_topics (
+                article_id      TEXT NOT NULL,
+                topic_id        INTEGER NOT NULL,
+                published_date  TEXT,
+                pos             INTEGER,
+                PRIMARY KEY (article_id, topic_id),
+                FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE,
+                FOREIGN KEY (topic_id) REFERENCES topics(id)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_article_topics_topic_published
+                ON article_topics (topic_id, published_date DESC, article_id);
+
+            CREATE INDEX IF NOT EXISTS idx_topics_norm
+                ON topics (norm);
+
+            -- a denormalizált published_date kövesse a cikket
+            CREATE TRIGGER IF NOT EXISTS article_tags_pubdate_au
+            AFTER UPDATE OF published_date ON articles
+            BEGIN
+                UPDATE article_entities SET published_date = new.published_date WHERE article_id = new.id;
+                UPDATE article_topics   SET published_date = new.published_date WHERE article_id = new.id;
+            END;
+            """
+        )
+        if not existing:
+            # régebben címkézett DB: a matched_tags JSON-ből egyszer feltöltjük
+            self._backfill_tag_tables(cur)
+        elif "pos" not in {r["name"] for r in cur.execute("PRAGMA table_info(article_topics)")}:
+            # pos előtti DB: a tagger sorrendje a matched_tags JSON-ből áll vissza
+            cur.execute("ALTER TABLE article_topics ADD COLUMN pos INTEGER")
+            self._backfill_tag_tables(cur)
+
+    # napi statisztika: a published_date napja ('' = dátum nélkül), címkézett = van tags
+    _STATS_DAY = "COALESCE(substr({r}.published_date, 1, 10), '')"
+    _STATS_TAGGED = "({r}.tags IS NOT NULL AND {r}.tags <> '')"
+
+    @classmethod
+    def _stats_delta_sql(cls, r: str, sign: int) -> str:
+        """Trigger-törzs: a(z) r ('new' / 'old') sor hozzáadása (+1) vagy levonása (-1) a rollupokból."""
+        day = cls._STATS_DAY.format(r=r)
+        tagged = cls._STATS_TAGGED.format(r=r)
+        sql = f"""
+            INSERT INTO daily_stats (source_id, day, n_articles, n_with_content, n_tagged, n_labeled)
+            VALUES ({r}.source_id, {day}, {sign}, {sign} * {r}.has_content, {sign} * {tagged},
+                    {sign} * ({r}.label IS NOT NULL))
+            ON CONFLICT(source_id, day) DO UPDATE SET
+                n_articles     = n_articles     + excluded.n_articles,
+                n_with_content = n_with_content + excluded.n_with_content,
+                n_tagged       = n_tagged       + excluded.n_tagged,
+                n_labeled      = n_labeled      + excluded.n_labeled;
+
+            INSERT INTO daily_label_stats (source_id, day, label, n)
+            SELECT {r}.source_id, {day}, {r}.label, {sign} WHERE {r}.label IS NOT NULL
+            ON CONFLICT(source_id, day, label) DO UPDATE SET n = n + excluded.n;
+
+            INSERT INTO cluster_stats (cluster_id, n_articles, last_day)
+            SELECT {r}.cluster_id, {sign}, NULLIF({day}, '') WHERE {r}.cluster_id IS NOT NULL
+            ON CONFLICT(cluster_id) DO UPDATE SET
+                n_articles = n_articles + excluded.n_articles,
+                last_day   = CASE WHEN excluded.n_articles > 0
+                                  THEN NULLIF(MAX(COALESCE(last_day, ''), COALESCE(excluded.last_day, '')), '')
+                                  ELSE last_day END;
+        """
+        if sign < 0:
+            # kiürült sorok törlése + a klaszter legutóbbi napjának újraszámolása, ha épp azt vettük el
+            sql += f"""
+            DELETE FROM daily_stats
+             WHERE source_id = {r}.source_id AND day = {day} AND n_articles <= 0;
+            DELETE FROM daily_label_stats
+             WHERE source_id = {r}.source_id AND day = {day} AND label = {r}.label AND n <= 0;
+            DELETE FROM cluster_stats WHERE cluster_id = {r}.cluster_id AND n_articles <= 0;
+            UPDATE cluster_stats
+               SET last_day = (SELECT MAX(substr(published_date, 1, 10)) FROM articles
+                               WHERE cluster_id = {r}.cluster_id)
+             WHERE cluster_id = {r}.cluster_id AND last_day IS NOT NULL AND last_day = {day};
+            """
+        return sql
+
+    def _init_stats(self, cur: sqlite3.Cursor) -> None:
+        """
+        Inkrementálisan karbantartott rollupok (dashboard / riport lekérdezések
+        O(napok) költséggel, COUNT(*) + GROUP BY az articles-ön helyett):
+
+          - daily_stats       (source_id, day): cikkek, body-val, címkézett, label-lel
+          - daily_label_stats (source_id, day, label): cikkek label szerint
+          - cluster_stats     (cluster_id): cikkszám + legutóbbi nap
+
+        Az articles triggerei tartják naprakészen; teljes újraszámolás:
+        rebuild_stats() (pl. bulk betöltés vagy kézi javítás után).
+        """
+        existing = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='daily_stats'"
+        ).fetchone()
+        changed = (
+            "old.source_id IS NOT new.source_id OR old.published_date IS NOT new.published_date "
+            "OR old.has_content IS NOT new.has_content OR old.tags IS NOT new.tags "
+            "OR old.label IS NOT new.label OR old.cluster_id IS NOT new.cluster_id"
+        )
+        cur.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                source_id       INTEGER NOT NULL,
+                day             TEXT NOT NULL,          -- 'YYYY-MM-DD', '' = dátum nélkül
+                n_articles      INTEGER NOT NULL DEFAULT 0,
+                n_with_content  INTEGER NOT NULL DEFAULT 0,
+                n_tagged        INTEGER NOT NULL DEFAULT 0,
+                n_labeled       INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (source_id, day)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_daily_stats_day
+                ON daily_stats (day);
+
+            CREATE TABLE IF NOT EXISTS daily_label_stats (
+                source_id   INTEGER NOT NULL,
+                day         TEXT NOT NULL,
+                label       TEXT NOT NULL,
+                n           INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (source_id, day, label)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS cluster_stats (
+                cluster_id  INTEGER PRIMARY KEY,
+                n_articles  INTEGER NOT NULL DEFAULT 0,
+                last_day    TEXT
+            );
+
+            CREATE TRIGGER IF NOT EXISTS article_stats_ai
+            AFTER INSERT ON articles
+            BEGIN
+                {self._stats_delta_sql("new", 1)}
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS article_stats_ad
+            AFTER DELETE ON articles
+            BEGIN
+                {self._stats_delta_sql("old", -1)}
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS article_stats_au
+            AFTER UPDATE OF source_id, published_date, has_content, tags, label, cluster_id ON articles
+            WHEN {changed}
+            BEGIN
+                {self._stats_delta_sql("old", -1)}
+                {self._stats_delta_sql("new", 1)}
+            END;
+            """
+        )
+        if not existing:
+            # meglévő DB: egyszeri feltöltés az articles-ből
+            self.rebuild_stats(commit=False)
+
+    def _init_enrichment_tables(self, cur: sqlite3.Cursor) -> None:
+        """
+        A régi items tábla "extra" oszlopainak normalizált helye:
+
+          - article_embeddings  (emb BLOB, float32 vektor cikkenként)
+          - clusters            (cluster_summary klaszterenként, nem soronként)
+          - article_popularity  (views / comments / likes / popularity_score)
+        """
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS article_embeddings (
+                article_id  TEXT PRIMARY KEY,
+                model       TEXT,
+                dim         INTEGER NOT NULL,
+                vec         BLOB NOT NULL,              -- float32, little-endian
+                updated_at  INTEGER NOT NULL,
+                FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE
+            );
+
+            CREATE TABLE IF NOT EXISTS clusters (
+                cluster_id  INTEGER PRIMARY KEY,
+                summary     TEXT,
+                updated_at  INTEGER NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS article_popularity (
+                article_id        TEXT PRIMARY KEY,
+                views             INTEGER,
+                comments          INTEGER,
+                likes             INTEGER,
+                popularity_score  REAL,
+                last_popcheck_ts  INTEGER,
+                FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE
+            );
+            """
+        )
+
+    def _init_write_gen(self, cur: sqlite3.Cursor) -> None:
+        """
+        repo_meta 'write_gen': minden articles írás (a body / címke változás is
+        az articles sort frissíti a triggereken át) növeli. Trigger, így más
+        folyamat (pl. backfill) írása is látszik; a QueryCache ezzel ellenőrzi,
+        hogy egy eltárolt eredmény még ugyanarra az adatállapotra vonatkozik-e.
+
+        repo_meta 'delete_gen': csak a törlések számlálója (külön trigger, így a
+        régi DB-kben is létrejön). Az inkrementális indexek (SuggestIndex) ebből
+        látják, hogy egy cikk hozzájárulását le kellene vonni – a sorszámból
+        nem, mert egy törlés + egy beszúrás kiadja egymást.
+        """
+        bump = "UPDATE repo_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = '{}';"
+        cur.execute("INSERT OR IGNORE INTO repo_meta (key, value) VALUES ('write_gen', '0')")
+        cur.execute("INSERT OR IGNORE INTO repo_meta (key, value) VALUES ('delete_gen', '0')")
+        for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+            cur.execute(
+                f"CREATE TRIGGER IF NOT EXISTS article_gen_{suffix} AFTER {event} ON articles "
+                f"BEGIN {bump.format('write_gen')} END"
+            )
+        cur.execute(
+            "CREATE TRIGGER IF NOT EXISTS article_delete_gen AFTER DELETE ON articles "
+            f"BEGIN {bump.format('delete_gen')} END"
+        )
+
+    def write_generation(self) -> int:
+        """Az aktuális írási generáció (0, ha a DB-ben nincs ilyen számláló)."""
+        try:
+            value = self._meta_get("write_gen")
+        except sqlite3.OperationalError:
+            return 0   # régi, read-only megnyitott DB repo_meta nélkül
+        return int(value) if value is not None else 0
+
+    def delete_generation(self) -> int:
+        """A törölt cikkek számlálója (0, ha a DB-ben nincs ilyen számláló)."""
+        try:
+            value = self._meta_get("delete_gen")
+        except sqlite3.OperationalError:
+            return 0
+        return int(value) if value is not None else 0
+
+    def _cached(self, kind: str, params: Dict[str, Any], compute) -> List[Dict[str, Any]]:
+        if self.cache is None:
+            return compute()
+        key = (self._cache_ns, kind, normalize_params(**params))
+        gen = self.write_generation()
+        rows = self.cache.get(key, gen)
+        if rows is None:
+            rows = compute()
+            # időkeret miatt csonka eredmény nem kerülhet a cache-be
+            if not self.truncated:
+                self.cache.put(key, gen, rows)
+        return rows
+
+    # ------------------------------------------------------------------
+    # Lekérdezési időkeret (query_budget.py)
+    # ------------------------------------------------------------------
+    @contextmanager
+    def time_budget(self, seconds: Optional[float], *, label: str = "query") -> Iterator[Optional[BudgetState]]:
+        """
+        A blokkban futó lekérdezések legfeljebb `seconds` másodpercig futnak: a
+        progress handler utána megszakítja őket, a keresők (search, search_by_meta,
+        facets) az addig kész sorokkal térnek vissza, a state.truncated = True.
+
+        A blokk a kapcsolat zárját tartja; ha egy másik keretes lekérdezés a
+        kereten túl foglalja, QueryBudgetExceeded (a blokk el sem indul).
+        Egymásba ágyazva a külső keret érvényes; seconds=None: nincs keret.
+        """
+        if self._budget_state is not None and self._budget_state.thread == threading.get_ident():
+            yield self._budget_state
+            return
+        if not seconds:
+            yield None
+            return
+        if not self._query_lock.acquire(timeout=seconds):
+            if self.budget is not None:
+                self.budget.record_busy(label)
+            raise QueryBudgetExceeded(f"{label}: a kapcsolat {seconds:g} mp után is foglalt")
+        state = BudgetState(label, seconds)
+        self._budget_state = state
+        try:
+            self.conn.set_progress_handler(state.check, PROGRESS_STEPS)
+            if self.budget is not None and self.budget.explain:
+                self.conn.set_trace_callback(state.statements.append)
+            yield state
+        finally:
+            self.conn.set_progress_handler(None, PROGRESS_STEPS)
+            self.conn.set_trace_callback(None)
+            self._budget_state = None
+            try:
+                if self.budget is not None:
+                    self.budget.record(self.conn, state)
+            finally:
+                self._query_lock.release()
+
+    @property
+    def truncated(self) -> bool:
+        """Az aktuális (ebben a szálban futó) time_budget() eredménye csonka-e."""
+        state = self._budget_state
+        return state is not None and state.thread == threading.get_ident() and state.truncated
+
+    def _fetch_all(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        """
+        execute + fetchall; ha közben lejár a time_budget(), az addig kész sorok
+        (dátum szerinti, index-sorrendű lekérdezésnél ez a teljes eredmény prefixe).
+        """
+        rows: List[sqlite3.Row] = []
+        try:
+            cur = self.conn.execute(sql, list(params))
+            while True:
+                chunk = cur.fetchmany(256)
+                if not chunk:
+                    return rows
+                rows.extend(chunk)
+        except sqlite3.OperationalError:
+            state = self._budget_state
+            if state is None or not state.aborted or state.thread != threading.get_ident():
+                raise   # nem a keret szakította meg (pl. federált timeout: conn.interrupt())
+            state.truncated = True
+            return rows
+
+    def rebuild_stats(self, *, commit: bool = True) -> int:
+        """A rollup táblák teljes újraszámolása az articles-ből. Visszaad: napi sorok száma."""
+        day = self._STATS_DAY.format(r="a")
+        tagged = self._STATS_TAGGED.format(r="a")
+        cur = self.conn.cursor()
+        cur.execute("DELETE FROM daily_stats")
+        cur.execute("DELETE FROM daily_label_stats")
+        cur.execute("DELETE FROM cluster_stats")
+        cur.execute(
+            f"""
+            INSERT INTO daily_stats (source_id, day, n_articles, n_with_content, n_tagged, n_labeled)
+            SELECT a.source_id, {day}, COUNT(*), SUM(a.has_content), SUM({tagged}), SUM(a.label IS NOT NULL)
+            FROM articles a
+            GROUP BY 1, 2
+            """
+        )
+        n = cur.rowcount
+        cur.execute(
+            f"""
+            INSERT INTO daily_label_stats (source_id, day, label, n)
+            SELECT a.source_id, {day}, a.label, COUNT(*)
+            FROM articles a
+            WHERE a.label IS NOT NULL
+            GROUP BY 1, 2, 3
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO cluster_stats (cluster_id, n_articles, last_day)
+            SELECT a.cluster_id, COUNT(*), MAX(substr(a.published_date, 1, 10))
+            FROM articles a
+            WHERE a.cluster_id IS NOT NULL
+            GROUP BY 1
+            """
+        )
+        if commit:
+            self.conn.commit()
+        return n
+
+    def _backfill_tag_tables(self, cur: sqlite3.Cursor) -> int:
+        rows = cur.execute(
+            "SELECT id, published_date, matched_tags FROM articles "
+            "WHERE matched_tags LIKE '{%'"
+        ).fetchall()
+        n = 0
+        for row in rows:
+            try:
+                mt = json.loads(row["matched_tags"])
+            except Exception:
+                continue
+            entities = [
+                (e.get("text"), e.get("type"), e.get("salience"))
+                for e in mt.get("entities", []) or []
+                if isinstance(e, dict) and e.get("text")
+            ]
+            self._write_tag_links(
+                cur,
+                row["id"],
+                row["published_date"],
+                entities,
+                mt.get("topics", []) or [],
+                mt.get("keywords", []) or [],
+            )
+            n += 1
+        return n
+
+    def _ensure_default_sources(self, cur: sqlite3.Cursor) -> None:
+        now = int(time.time())
+        defaults = [
+            ("telex.hu", "Telex", "https://telex.hu", "Europe/Budapest"),
+            ("index.hu", "Index", "https://index.hu", "Europe/Budapest"),
+            ("444.hu", "444", "https://444.hu", "Europe/Budapest"),
+            ("hvg.hu", "HVG", "https://hvg.hu", "Europe/Budapest"),
+        ]
+        for domain, name, base_url, tz in defaults:
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO sources (domain, name, base_url, timezone, is_active, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?)
+                """,
+                (domain, name, base_url, tz, now, now),
+            )
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _get_or_create_source_id(self, domain: str) -> int:
+        """Return the sources.id for a domain, creating it if needed."""
+        domain = (domain or "").lower()
+        cur = self.conn.cursor()
+        row = cur.execute(
+            "SELECT id FROM sources WHERE domain = ?",
+            (domain,),
+        ).fetchone()
+        if row:
+            return int(row["id"])
+        now = int(time.time())
+        cur.execute(
+            """
+            INSERT INTO sources (domain, name, base_url, timezone, is_active, created_at, updated_at)
+            VALUES (?, ?, NULL, NULL, 1, ?, ?)
+            """,
+            (domain, domain, now, now),
+        )
+        self.conn.commit()
+        return int(cur.lastrowid)
+
+    def get_article_row_by_url(self, url: str) -> Optional[sqlite3.Row]:
+        """Nyers DB-sor visszaadása URL alapján (ha létezik)."""
+        cur = self.conn.cursor()
+        row = cur.execute(
+            "SELECT * FROM articles WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return row
+
+    def get_article_body(self, article_id: str) -> Optional[str]:
+        """Teljes cikkszöveg az article_bodies táblából (None, ha nincs)."""
+        row = self.conn.execute(
+            "SELECT content, content_z, dict_id FROM article_bodies WHERE article_id = ?",
+            (article_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return self.codec.decode(row["content"], row["content_z"], row["dict_id"])
+
+    def _write_body(
+        self, cur: sqlite3.Cursor, article_id: str, content: str, domain: Optional[str] = None
+    ) -> None:
+        """
+        Body írása (commit nélkül). Üres szöveg -> a body törlődik.
+        Ha a domainhez van tanított zstd szótár, tömörítve tároljuk.
+        """
+        if content:
+            text, blob, dict_id = self.codec.encode(content, domain)
+            # azonos szövegnél nincs UPDATE -> nincs fölösleges FTS churn
+            cur.execute(
+                """
+                INSERT INTO article_bodies (article_id, content, content_z, dict_id)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(article_id) DO UPDATE SET
+                    content   = excluded.content,
+                    content_z = excluded.content_z,
+                    dict_id   = excluded.dict_id
+                WHERE body_text(article_bodies.content, article_bodies.content_z, article_bodies.dict_id) IS NOT ?
+                """,
+                (article_id, text, blob, dict_id, content),
+            )
+        else:
+            cur.execute("DELETE FROM article_bodies WHERE article_id = ?", (article_id,))
+
+    def row_to_article(self, row: sqlite3.Row, *, load_content: bool = True) -> Article:
+        """
+        sqlite3.Row -> Article dataclass.
+
+        A body lazy: ha a sor nem hozza magával a `content` oszlopot (pl. nincs
+        JOIN az article_bodies-ra), akkor csak load_content=True és
+        has_content=1 esetén olvassuk be, külön PK lookup-pal.
+        """
+        tags_raw = row["matched_tags"] or ""
+        matched_tags = [t for t in tags_raw.split(",") if t]
+
+        keys = row.keys()
+        content = row["content"] if "content" in keys else None
+        if content is None and load_content and ("has_content" not in keys or row["has_content"]):
+            content = self.get_article_body(row["id"])
+
+        return Article(
+            id=row["id"],
+            title=row["title"] or "",
+            link=row["url"],
+            published=row["published_date"],
+            source=urlparse(row["url"]).netloc if row["url"] else None,
+            content=content,
+            matched_tags=matched_tags,
+            ts=row["updated_at"],
+            label=row["label"],
+            label_score=row["label_score"],
+            cluster_id=row["cluster_id"],
+        )
+
+    def _entity_id(self, cur: sqlite3.Cursor, name: str) -> int:
+        norm = normalize_tag(name)
+        cur.execute(
+            "INSERT OR IGNORE INTO entities (name, norm, created_at) VALUES (?, ?, ?)",
+            (name.strip(), norm, int(time.time())),
+        )
+        row = cur.execute("SELECT id FROM entities WHERE norm = ?", (norm,)).fetchone()
+        return int(row["id"])
+
+    def _topic_id(self, cur: sqlite3.Cursor, name: str, kind: str) -> int:
+        norm = normalize_tag(name)
+        cur.execute(
+            "INSERT OR IGNORE INTO topics (name, norm, kind, created_at) VALUES (?, ?, ?, ?)",
+            (name.strip(), norm, kind, int(time.time())),
+        )
+        row = cur.execute(
+            "SELECT id FROM topics WHERE kind = ? AND norm = ?", (kind, norm)
+        ).fetchone()
+        return int(row["id"])
+
+    def _write_tag_links(
+        self,
+        cur: sqlite3.Cursor,
+        article_id: str,
+        published_date: Optional[str],
+        entities: Iterable[Tuple[str, Optional[str], Optional[float]]],
+        topics: Iterable[str],
+        keywords: Iterable[str],
+    ) -> None:
+        """Egy cikk kapcsolósorainak cseréje (commit nélkül, a hívó tranzakciójában)."""
+        cur.execute("DELETE FROM article_entities WHERE article_id = ?", (article_id,))
+        cur.execute("DELETE FROM article_topics WHERE article_id = ?", (article_id,))
+
+        for text, etype, salience in entities:
+            if not text or not normalize_tag(text):
+                continue
+            entity_id = self._entity_id(cur, text)
+            # ugyanaz az entitás többször is előfordulhat -> a legnagyobb salience marad
+            cur.execute(
+                """
+                INSERT INTO article_entities (article_id, entity_id, type, salience, published_date)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(article_id, entity_id) DO UPDATE SET
+                    salience = MAX(COALESCE(article_entities.salience, 0), COALESCE(excluded.salience, 0))
+                """,
+                (article_id, entity_id, etype, salience, published_date),
+            )
+
+        for kind, names in (("topic", topics), ("keyword", keywords)):
+            for pos, name in enumerate(names):
+                if not name or not normalize_tag(name):
+                    continue
+                topic_id = self._topic_id(cur, name, kind)
+                cur.execute(
+                    "INSERT OR IGNORE INTO article_topics (article_id, topic_id, published_date, pos) "
+                    "VALUES (?, ?, ?, ?)",
+                    (article_id, topic_id, published_date, pos),
+                )
+
+    def set_article_tags(
+        self,
+        article_id: str,
+        *,
+        tags_json: Optional[str],
+        matched_tags_json: Optional[str],
+        entities: Iterable[Tuple[str, Optional[str], Optional[float]]] = (),
+        topics: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+    ) -> None:
+        """
+        AI tagging eredményének mentése egyetlen tranzakcióban:
+        articles.tags / matched_tags + a normalizált entitás/topic kapcsolótáblák.
+        """
+        cur = self.conn.cursor()
+        try:
+            cur.execute(
+                """
+                UPDATE articles
+                SET tags = ?, matched_tags = ?, updated_at = strftime('%s','now')
+                WHERE id = ?
+                """,
+                (tags_json, matched_tags_json, article_id),
+            )
+            row = cur.execute(
+                "SELECT published_date FROM articles WHERE id = ?", (article_id,)
+            ).fetchone()
+            if row is not None:
+                self._write_tag_links(
+                    cur, article_id, row["published_date"], entities, topics, keywords
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def rebuild_tag_index(self) -> int:
+        """Kapcsolótáblák teljes újraépítése a matched_tags JSON-ből. Visszaad: feldolgozott cikkek."""
+        cur = self.conn.cursor()
+        try:
+            cur.execute("DELETE FROM article_entities")
+            cur.execute("DELETE FROM article_topics")
+            n = self._backfill_tag_tables(cur)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return n
+
+    def update_article_content_by_url(
+        self,
+        url: str,
+        title: Optional[str],
+        content: Optional[str],
+    ) -> None:
+        """Title/content frissítése URL alapján (content=None -> a body marad)."""
+        now = int(time.time())
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            UPDATE articles
+            SET title   = COALESCE(?, title),
+                updated_at = ?
+            WHERE url = ?
+            """,
+            (title, now, url),
+        )
+        row = cur.execute(
+            "SELECT a.id, s.domain FROM articles a JOIN sources s ON s.id = a.source_id "
+            "WHERE a.url = ?",
+            (url,),
+        ).fetchone()
+        if row is not None:
+            if content is not None:
+                self._write_body(cur, row["id"], content, row["domain"])
+            # állandó lekérdezések az új címre / body-ra is (mint upsert-nél, egy commitban)
+            if self.percolator is not None and (title is not None or content is not None):
+                updated = self.get_article_row_by_url(url)
+                self.percolator.percolate(
+                    self.row_to_article(updated, load_content=True), domain=row["domain"], commit=False
+                )
+        self.conn.commit()
+
+    def get_or_fetch_article(self, url: str, fetcher: Optional[Fetcher] = None) -> Article:
+        """
+        Magas szintű API: URL -> Article.
+
+        - Ha az URL már szerepel az adatbázisban ÉS van content (has_content),
+          akkor csak visszaadjuk az Article-t (a body egy PK lookup).
+        - Ha nincs, akkor read_article()-lel letöltjük/parszoljuk,
+          elmentjük, és úgy adjuk vissza.
+        """
+        row = self.get_article_row_by_url(url)
+        if row is not None and row["has_content"]:
+            return self.row_to_article(row)
+
+        # Nincs (hasznos) content -> le kell húzni
+        article_fetcher = fetcher or Fetcher()
+        title, body = read_article(url, fetcher=article_fetcher)
+
+        # Ha teljesen új az URL
+        if row is None:
+            stable_id = hashlib.sha256(url.encode("utf-8")).hexdigest()
+            now = int(time.time())
+            art = Article(
+                id=stable_id,
+                title=title or "",
+                link=url,
+                published=None,
+                source=urlparse(url).netloc,
+                content=body or "",
+                matched_tags=[],
+                ts=now,
+                label=None,
+                label_score=None,
+                cluster_id=None,
+            )
+            self.upsert(art)
+            return art
+
+        # Ha volt sor, de content nélkül -> frissítés
+        self.update_article_content_by_url(url, title, body)
+        updated = self.get_article_row_by_url(url)
+        assert updated is not None
+        return self.row_to_article(updated)
+
+    # ------------------------------------------------------------------
+    # Write API
+    # ------------------------------------------------------------------
+    def upsert(self, art: Article, *, commit: bool = True) -> None:
+        """
+        Insert or update a single Article into the normalized schema.
+        Keeps the SHA-256 based Article.id stable across runs.
+        commit=False: the caller batches several writes into one transaction.
+        """
+        cur = self.conn.cursor()
+        # Domain meghatározása: adapterek beállítják a .source-ot, de azért fallback is van.
+        domain = (art.source or urlparse(art.link).netloc).lower()
+        source_id = self._get_or_create_source_id(domain)
+        now = int(time.time())
+        published_date = art.published or None
+        matched_tags = ",".join(art.matched_tags) if art.matched_tags else None
+
+        cur.execute(
+            """
+            INSERT INTO articles (
+                id, source_id, url,
+                title, summary,
+                published_date,
+                path_year, path_month, path_day,
+                section, tags, matched_tags,
+                author,
+                label, label_score, cluster_id,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, NULL, NULL, NULL, ?, NULL, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                title          = COALESCE(excluded.title, articles.title),
+                summary        = COALESCE(excluded.summary, articles.summary),
+                published_date = COALESCE(excluded.published_date, articles.published_date),
+                matched_tags   = COALESCE(excluded.matched_tags, articles.matched_tags),
+                label          = COALESCE(excluded.label, articles.label),
+                label_score    = COALESCE(excluded.label_score, articles.label_score),
+                cluster_id     = COALESCE(excluded.cluster_id, articles.cluster_id),
+                updated_at     = excluded.updated_at
+            """,
+            (
+                art.id,
+                source_id,
+                art.link,
+                art.title,
+                None,  # summary – majd az embedder/összefoglaló pipeline tölti ki
+                published_date,
+                matched_tags,
+                art.label,
+                art.label_score,
+                art.cluster_id,
+                now if art.ts is None else art.ts,
+                now,
+            ),
+        )
+        # content=None -> a meglévő body marad (ugyanaz, mint a régi COALESCE)
+        if art.content is not None:
+            self._write_body(cur, art.id, art.content, domain)
+        # állandó lekérdezések: a találat a cikkel együtt commitolódik
+        if self.percolator is not None:
+            self.percolator.percolate(art, domain=domain, commit=False)
+        if commit:
+            self.conn.commit()
+
+    def set_embedding(
+        self,
+        article_id: str,
+        vec: bytes,
+        *,
+        model: Optional[str] = None,
+        dim: Optional[int] = None,
+        commit: bool = True,
+    ) -> None:
+        """float32 embedding (nyers bájtok) mentése egy cikkhez."""
+        self.conn.execute(
+            """
+            INSERT INTO article_embeddings (article_id, model, dim, vec, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(article_id) DO UPDATE SET
+                model = excluded.model, dim = excluded.dim,
+                vec = excluded.vec, updated_at = excluded.updated_at
+            """,
+            (article_id, model, dim if dim is not None else len(vec) // 4, vec, int(time.time())),
+        )
+        if commit:
+            self.conn.commit()
+
+    def get_embedding(self, article_id: str) -> Optional[bytes]:
+        row = self.conn.execute(
+            "SELECT vec FROM article_embeddings WHERE article_id = ?", (article_id,)
+        ).fetchone()
+        return row["vec"] if row else None
+
+    def set_cluster_summary(self, cluster_id: int, summary: str, *, commit: bool = True) -> None:
+        self.conn.execute(
+            """
+            INSERT INTO clusters (cluster_id, summary, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(cluster_id) DO UPDATE SET summary = excluded.summary, updated_at = excluded.updated_at
+            """,
+            (cluster_id, summary, int(time.time())),
+        )
+        if commit:
+            self.conn.commit()
+
+    def set_popularity(
+        self,
+        article_id: str,
+        *,
+        views: Optional[int] = None,
+        comments: Optional[int] = None,
+        likes: Optional[int] = None,
+        popularity_score: Optional[float] = None,
+        last_popcheck_ts: Optional[int] = None,
+        commit: bool = True,
+    ) -> None:
+        """Népszerűségi mutatók; a None mezők a meglévő értéket hagyják."""
+        self.conn.execute(
+            """
+            INSERT INTO article_popularity
+                (article_id, views, comments, likes, popularity_score, last_popcheck_ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(article_id) DO UPDATE SET
+                views            = COALESCE(excluded.views, views),
+                comments         = COALESCE(excluded.comments, comments),
+                likes            = COALESCE(excluded.likes, likes),
+                popularity_score = COALESCE(excluded.popularity_score, popularity_score),
+                last_popcheck_ts = COALESCE(excluded.last_popcheck_ts, last_popcheck_ts)
+            """,
+            (article_id, views, comments, likes, popularity_score, last_popcheck_ts),
+        )
+        if commit:
+            self.conn.commit()
+
+    def upsert_many(self, articles: Iterable[Article]) -> int:
+        """Batch upsert – returns number of processed records."""
+        count = 0
+        for art in articles:
+            self.upsert(art)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # FTS karbantartás
+    # ------------------------------------------------------------------
+    def _fts_tables(self) -> List[str]:
+        tables = []
+        if self.has_fts:
+            tables.append("article_fts")
+        if self.has_trigram:
+            tables.append("article_trgm")
+        return tables
+
+    def fts_rebuild(self) -> None:
+        """Teljes FTS újraépítés az articles táblából (pl. VACUUM után, mert az rowid-k változhatnak)."""
+        for table in self._fts_tables():
+            self.conn.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        self.conn.commit()
+
+    def fts_optimize(self) -> None:
+        """Az FTS szegmensek összefésülése egyetlen b-fába (gyorsabb MATCH, kisebb index)."""
+        for table in self._fts_tables():
+            self.conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Bulk load (indexek + FTS triggerek nélkül)
+    # ------------------------------------------------------------------
+    def _meta_get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM repo_meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _meta_set(self, key: str, value: Optional[str], *, commit: bool = True) -> None:
+        if value is None:
+            self.conn.execute("DELETE FROM repo_meta WHERE key = ?", (key,))
+        else:
+            self.conn.execute(
+                "INSERT INTO repo_meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+        if commit:
+            self.conn.commit()
+
+    @contextmanager
+    def bulk_load(self, *, keep_indexes: Iterable[str] = (), cache_mb: int = 256) -> Iterator[None]:
+        """
+        Nagy betöltésekhez (több éves backfill): a blokk idejére eldobja az
+        articles nem-unique indexeit (kivéve keep_indexes) és az FTS/trigram
+        triggereket, synchronous=OFF + nagy cache; a végén újraépíti az
+        indexeket, egy FTS 'rebuild' + 'optimize', majd ANALYZE.
+
+        A daily_stats triggerek maradnak (olcsók, és a backfill riportok
+        közben is ezekből számolnak).
+
+        Megszakítás-biztos: a repo_meta 'bulk_load' jelzője a DROP előtt
+        íródik; ha a folyamat a blokk vége előtt meghal, a következő
+        Repository() megnyitás befejezi (finish_bulk_load).
+
+            with app.repo.bulk_load(keep_indexes=["idx_articles_source_published_id"]):
+                ... crawl / upsert ...
+        """
+        if self.read_only:
+            raise RuntimeError("bulk_load read-only Repository-n nem használható.")
+        if getattr(self, "_bulk_active", False):
+            yield   # egymásba ágyazott hívás: a külső blokk végzi a lezárást
+            return
+
+        keep = set(keep_indexes)
+        indexes = [name for name in self._ARTICLE_INDEXES if name not in keep]
+        self._meta_set(
+            "bulk_load",
+            json.dumps({"started_at": int(time.time()), "indexes": indexes, "triggers": list(self._FTS_TRIGGERS)}),
+        )
+        for name in indexes:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name in self._FTS_TRIGGERS:
+            self.conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        self.conn.commit()
+
+        saved = {
+            pragma: self.conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in ("synchronous", "cache_size", "temp_store")
+        }
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute(f"PRAGMA cache_size = {-int(cache_mb) * 1024}")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        print(f"[BULK] Bulk load indul: {len(indexes)} index + {len(self._FTS_TRIGGERS)} FTS trigger felfüggesztve")
+
+        self._bulk_active = True
+        try:
+            yield
+        finally:
+            self._bulk_active = False
+            self.conn.commit()
+            for pragma, value in saved.items():
+                self.conn.execute(f"PRAGMA {pragma} = {int(value)}")
+            self.finish_bulk_load()
+
+    def finish_bulk_load(self) -> bool:
+        """
+        Bulk load lezárása: indexek + FTS triggerek vissza, FTS rebuild +
+        optimize, ANALYZE, jelző törlése. Idempotens; False, ha nem volt mit lezárni.
+        """
+        if self._meta_get("bulk_load") is None:
+            return False
+        t0 = time.time()
+        cur = self.conn.cursor()
+        self._ensure_article_indexes(cur)
+        self._init_fts(cur)   # a triggerek IF NOT EXISTS-szel újra létrejönnek
+        self.conn.commit()
+        self.fts_rebuild()
+        self.fts_optimize()
+        self.conn.execute("ANALYZE")
+        self._meta_set("bulk_load", None)
+        print(f"[BULK] Indexek + FTS újraépítve, ANALYZE kész ({time.time() - t0:.1f} s)")
+        return True
+
+    @contextmanager
+    def fts_deferred_merge(self) -> Iterator[None]:
+        """
+        Backfillek idejére kikapcsolja az FTS automerge-et: az inkrementális
+        insertek csak új szegmenseket írnak, a drága összefésülés a végén,
+        egyetlen 'optimize' lépésben történik.
+
+            with app.repo.fts_deferred_merge():
+                ... crawl / content backfill ...
+        """
+        tables = self._fts_tables()
+        if not tables:
+            yield
+            return
+        for table in tables:
+            self.conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('automerge', 0)")
+        self.conn.commit()
+        try:
+            yield
+        finally:
+            for table in tables:
+                self.conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('automerge', 4)")
+            self.conn.commit()
+            self.fts_optimize()
+
+    # ------------------------------------------------------------------
+    # Bulk másolás másik DB-be (ATTACH + INSERT ... SELECT)
+    # ------------------------------------------------------------------
+    def _common_columns(self, table: str, schema: str = "dst") -> List[str]:
+        """A main és az attach-elt séma közös oszlopai (a sorrend DB-nként eltérhet)."""
+        src = [r["name"] for r in self.conn.execute(f"PRAGMA main.table_info({table})")]
+        dst = {r["name"] for r in self.conn.execute(f"PRAGMA {schema}.table_info({table})")}
+        return [c for c in src if c in dst]
+
+    def _copy_window_attached(self, domain: str, date_from: str, date_to: str) -> int:
+        """
+        A [date_from, date_to) ablak cikkei a main DB-ből a `dst` sémába,
+        minden oszloppal: articles, article_bodies (+ a hozzájuk tartozó
+        zstd szótárak), entitás/topic kapcsolatok. A source_id és az
+        entitás/topic id-k domain / norm alapján újra vannak képezve.
+        Egyetlen tranzakcióban fut; visszaad: másolt cikkek száma.
+        """
+        cur = self.conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            cur.execute("DROP TABLE IF EXISTS temp.copy_window")
+            cur.execute(
+                """
+                CREATE TEMP TABLE copy_window AS
+                SELECT a.id AS article_id
+                FROM main.articles a
+                JOIN main.sources s ON s.id = a.source_id
+                WHERE s.domain = ?
+                  AND a.published_date >= ?
+                  AND a.published_date < ?
+                """,
+                (domain, date_from, date_to),
+            )
+
+            # sources: domain alapján, a cél DB saját id-jával
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO dst.sources
+                    (domain, name, base_url, timezone, is_active, created_at, updated_at)
+                SELECT domain, name, base_url, timezone, is_active, created_at, updated_at
+                FROM main.sources WHERE domain = ?
+                """,
+                (domain,),
+            )
+
+            # articles: minden közös oszlop, source_id a cél DB-ben feloldva
+            cols = self._common_columns("articles")
+            select_cols = ", ".join("ds.id" if c == "source_id" else f"a.{c}" for c in cols)
+            updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c != "id")
+            n = cur.execute(
+                f"""
+                INSERT INTO dst.articles ({", ".join(cols)})
+                SELECT {select_cols}
+                FROM main.articles a
+                JOIN main.sources s ON s.id = a.source_id
+                JOIN dst.sources ds ON ds.domain = s.domain
+                WHERE a.id IN (SELECT article_id FROM temp.copy_window)
+                ON CONFLICT(id) DO UPDATE SET {updates}
+                """
+            ).rowcount
+
+            # body-k tömörítve maradnak -> a szótáraik is kellenek
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO dst.body_dicts
+                SELECT * FROM main.body_dicts
+                WHERE dict_id IN (
+                    SELECT DISTINCT b.dict_id FROM main.article_bodies b
+                    WHERE b.article_id IN (SELECT article_id FROM temp.copy_window)
+                      AND b.dict_id IS NOT NULL
+                )
+                """
+            )
+            cur.execute(
+                """
+                INSERT INTO dst.article_bodies (article_id, content, content_z, dict_id)
+                SELECT b.article_id, b.content, b.content_z, b.dict_id
+                FROM main.article_bodies b
+                WHERE b.article_id IN (SELECT article_id FROM temp.copy_window)
+                ON CONFLICT(article_id) DO UPDATE SET
+                    content   = excluded.content,
+                    content_z = excluded.content_z,
+                    dict_id   = excluded.dict_id
+                """
+            )
+
+            # entitás / topic kapcsolatok: id-k a cél DB-ben norm alapján
+            cur.execute(
+                "DELETE FROM dst.article_entities WHERE article_id IN (SELECT article_id FROM temp.copy_window)"
+            )
+            cur.execute(
+                "DELETE FROM dst.article_topics WHERE article_id IN (SELECT article_id FROM temp.copy_window)"
+            )
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO dst.entities (name, norm, created_at)
+                SELECT e.name, e.norm, e.created_at
+                FROM main.entities e
+                WHERE e.id IN (
+                    SELECT entity_id FROM main.article_entities
+                    WHERE article_id IN (SELECT article_id FROM temp.copy_window)
+                )
+                """
+            )
+            cur.execute(
+                """
+                INSERT INTO dst.article_entities (article_id, entity_id, type, salience, published_date)
+                SELECT ae.article_id, de.id, ae.type, ae.salience, ae.published_date
+                FROM main.article_entities ae
+                JOIN main.entities e ON e.id = ae.entity_id
+                JOIN dst.entities de ON de.norm = e.norm
+                WHERE ae.article_id IN (SELECT article_id FROM temp.copy_window)
+                """
+            )
+            cur.execute(
+                """
+                INSERT OR IGNORE INTO dst.topics (name, norm, kind, created_at)
+                SELECT t.name, t.norm, t.kind, t.created_at
+                FROM main.topics t
+                WHERE t.id IN (
+                    SELECT topic_id FROM main.article_topics
+                    WHERE article_id IN (SELECT article_id FROM temp.copy_window)
+                )
+                """
+            )
+            cur.execute(
+                """
+                INSERT INTO dst.article_topics (article_id, topic_id, published_date, pos)
+                SELECT at.article_id, dt.id, at.published_date, at.pos
+                FROM main.article_topics at
+                JOIN main.topics t ON t.id = at.topic_id
+                JOIN dst.topics dt ON dt.kind = t.kind AND dt.norm = t.norm
+                WHERE at.article_id IN (SELECT article_id FROM temp.copy_window)
+                """
+            )
+            cur.execute("DROP TABLE temp.copy_window")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return n
+
+    def copy_window_to(
+        self,
+        target_path: str,
+        *,
+        domain: str,
+        date_from: str,
+        date_to: str,
+        snapshot: bool = False,
+    ) -> int:
+        """
+        Egy domain [date_from, date_to) ablakának bulk másolása egy másik
+        (batch) DB-be: ATTACH + INSERT ... SELECT, egy tranzakcióban.
+
+        snapshot=True: a cél fájl minden futáskor újra készül egy ideiglenes
+        DB-ből `VACUUM INTO`-val (tömör, szabad lapok és -wal nélkül), és csak
+        kész állapotban kerül a helyére. Ilyenkor a célt más ne tartsa nyitva.
+
+        Visszaad: a másolt cikkek száma.
+        """
+        target = os.path.abspath(target_path)
+        work = f"{target}.tmp" if snapshot else target
+        if snapshot:
+            for path in (work, f"{work}-wal", f"{work}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        # a cél séma (táblák, triggerek, indexek) a saját Repository-jával jön létre
+        Repository(work).close()
+
+        self.conn.commit()  # ATTACH nem mehet nyitott tranzakcióban
+        self.conn.execute("ATTACH DATABASE ? AS dst", (work,))
+        try:
+            n = self._copy_window_attached(domain, date_from, date_to)
+            if snapshot:
+                partial = f"{target}.partial"
+                if os.path.exists(partial):
+                    os.remove(partial)
+                self.conn.execute("VACUUM dst INTO ?", (partial,))
+        finally:
+            self.conn.execute("DETACH DATABASE dst")
+
+        if snapshot:
+            for path in (f"{target}-wal", f"{target}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+            os.replace(partial, target)
+            os.remove(work)
+            # VACUUM után a rowid-k változhatnak -> az FTS indexet újraépítjük (mint close_partition)
+            snap = Repository(target)
+            try:
+                snap.fts_rebuild()
+                snap.fts_optimize()
+            finally:
+                snap.close()
+        return n
+
+    def window_checksum(self, domain: str, date_from: str, date_to: str) -> Tuple[int, str]:
+        """
+        Egy domain [date_from, date_to) ablakának sorszáma + sha256 ujjlenyomata
+        (id, url, title, dátum, content_len, címke, cluster, updated_at).
+        Master és batch DB összevetésére: csak az ablak sorait olvassa (index range).
+        """
+        rows = self.conn.execute(
+            """
+            SELECT a.id, a.url, a.title, a.published_date, a.content_len,
+                   a.label, a.cluster_id, a.updated_at
+            FROM articles a
+            JOIN sources s ON s.id = a.source_id
+            WHERE s.domain = ?
+              AND a.published_date >= ?
+              AND a.published_date < ?
+            ORDER BY a.id
+            """,
+            (domain, date_from, date_to),
+        )
+        h = hashlib.sha256()
+        n = 0
+        for row in rows:
+            h.update(json.dumps(list(row), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            h.update(b"\n")
+            n += 1
+        return n, h.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Body tömörítés (zstd szótár domainenként)
+    # ------------------------------------------------------------------
+    def train_body_dict(
+        self,
+        domain: str,
+        *,
+        sample_size: int = 2000,
+        dict_size: int = DEFAULT_DICT_SIZE,
+    ) -> int:
+        """
+        Új zstd szótár tanítása a domain véletlen body-mintájából.
+        Ettől kezdve a domain új/módosított body-jai ezzel tömörülnek.
+        Visszaad: az új dict_id.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT body_text(b.content, b.content_z, b.dict_id) AS content
+            FROM article_bodies b
+            JOIN articles a ON a.id = b.article_id
+            JOIN sources s ON s.id = a.source_id
+            WHERE s.domain = ?
+            ORDER BY random()
+            LIMIT ?
+            """,
+            (domain, sample_size),
+        ).fetchall()
+        dict_id = self.codec.train(domain, (r["content"] for r in rows), dict_size=dict_size)
+        self.conn.commit()
+        return dict_id
+
+    def recompress_bodies(
+        self,
+        domain: str,
+        *,
+        compress: bool = True,
+        batch_size: int = 500,
+        on_progress=None,
+    ) -> Tuple[int, int]:
+        """
+        A domain összes body-jának átírása az aktív szótárral
+        (compress=False: vissza sima szövegre). A szöveg nem változik, így
+        az FTS index és a hot oszlopok érintetlenek maradnak.
+
+        Visszaad: (átnézett, átírt) body-k száma.
+        """
+        cur = self.conn.cursor()
+        seen = rewritten = 0
+        last_id = ""
+        while True:
+            rows = cur.execute(
+                """
+                SELECT b.article_id, b.content, b.content_z, b.dict_id
+                FROM article_bodies b
+                JOIN articles a ON a.id = b.article_id
+                JOIN sources s ON s.id = a.source_id
+                WHERE s.domain = ? AND b.article_id > ?
+                ORDER BY b.article_id
+                LIMIT ?
+                """,
+                (domain, last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                text = self.codec.decode(row["content"], row["content_z"], row["dict_id"])
+                new_text, blob, dict_id = self.codec.encode(text or "", domain, compress=compress)
+                if (new_text is None) == (row["content"] is None) and dict_id == row["dict_id"]:
+                    continue  # már a cél formátumban van
+                cur.execute(
+                    "UPDATE article_bodies SET content = ?, content_z = ?, dict_id = ? "
+                    "WHERE article_id = ?",
+                    (new_text, blob, dict_id, row["article_id"]),
+                )
+                rewritten += 1
+            seen += len(rows)
+            last_id = rows[-1]["article_id"]
+            self.conn.commit()
+            if on_progress is not None:
+                on_progress(seen, rewritten)
+        return seen, rewritten
+
+    # ------------------------------------------------------------------
+    # Read / search API
+    # ------------------------------------------------------------------
+    def search(
+        self, query: str, *, limit: int = 200, order: str = "bm25", where: Optional[Filter] = None
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over articles (see _search); served from self.cache if set."""
+        return self._cached(
+            "search",
+            dict(query=query, limit=limit, order=order, where=where),
+            lambda: self._search(query, limit=limit, order=order, where=where),
+        )
+
+    def _search(
+        self, query: str, *, limit: int = 200, order: str = "bm25", where: Optional[Filter] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over articles. Tries FTS5 first, falls back to
+        a simple LIKE search if FTS is unavailable.
+
+        where: filters.Filter, SQL-be fordítva (a limit a szűrt halmazra vonatkozik).
+
+        Returns a list of dicts with keys:
+          - title, link, label, label_score, date, rank, cluster_id, snippet
+        """
+        rows: List[sqlite3.Row]
+        extra_sql, extra_params = where.to_sql() if where is not None else ("1", [])
+
+        match = build_match_query(query) if self.has_fts else None
+        if match is not None:
+            sql = (
+                "SELECT a.title, a.url AS link, a.label, a.label_score, "
+                "COALESCE(a.published_date, datetime(a.created_at, 'unixepoch')) AS date, "
+                f"{bm25_expr()} AS rank, "
+                "a.cluster_id, "
+                "COALESCE(a.snippet, '') AS snippet "
+                "FROM article_fts "
+                "JOIN articles a ON a.rowid = article_fts.rowid "
+                "JOIN sources s ON s.id = a.source_id "
+                f"WHERE article_fts MATCH ? AND ({extra_sql}) "
+                "ORDER BY "
+                + ("rank" if order == 'bm25' else "a.created_at DESC")
                 + " LIMIT ?"
             )
-            rows = cur.execute(sql, (query, limit)).fetchall()
-        except sqlite3.OperationalError:
+            rows = self._fetch_all(sql, (match, *extra_params, limit))
+        else:
             # Nincs FTS → LIKE fallback
             like = f"%{query}%"
             sql = (
@@ -398,13 +1993,16 @@ class Repository:
                 "COALESCE(a.published_date, datetime(a.created_at, 'unixepoch')) AS date, "
                 "NULL AS rank, "
                 "a.cluster_id, "
-                "substr(a.content, 1, 400) AS snippet "
+                "COALESCE(a.snippet, '') AS snippet "
                 "FROM articles a "
-                "WHERE a.title LIKE ? OR a.content LIKE ? "
+                "JOIN sources s ON s.id = a.source_id "
+                "WHERE (a.title LIKE ? "
+                "OR a.id IN (SELECT article_id FROM article_bodies WHERE body_text(content, content_z, dict_id) LIKE ?)) "
+                f"AND ({extra_sql}) "
                 "ORDER BY a.created_at DESC "
                 "LIMIT ?"
             )
-            rows = cur.execute(sql, (like, like, limit)).fetchall()
+            rows = self._fetch_all(sql, (like, like, *extra_params, limit))
 
         cols = ["title", "link", "label", "label_score", "date", "rank", "cluster_id", "snippet"]
         result: List[Dict[str, Any]] = []
@@ -412,6 +2010,26 @@ class Repository:
             result.append({c: row[c] for c in cols})
         return result
     
+    @staticmethod
+    def _tag_filter_sql(
+        link_table: str,
+        key_col: str,
+        key_subquery: str,
+        norm: str,
+        date_from: Optional[str],
+        date_to: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        """`a.id IN (...)` fragmens egy kapcsolótáblára, a dátumablakot is lenyomva az indexbe."""
+        sql = f"a.id IN (SELECT article_id FROM {link_table} WHERE {key_col} IN ({key_subquery})"
+        params: List[Any] = [norm]
+        if date_from:
+            sql += " AND published_date >= ?"
+            params.append(date_from)
+        if date_to:
+            sql += " AND published_date <= ?"
+            params.append(date_to)
+        return sql + ")", params
+
     def search_by_meta(
         self,
         *,
@@ -419,32 +2037,74 @@ class Repository:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         q: Optional[str] = None,
-        topic: Optional[str] = None,  
-        entity: Optional[str] = None,     # ÚJ
-        keyword: Optional[str] = None,    # ÚJ
+        topic: Optional[str] = None,
+        entity: Optional[str] = None,
+        keyword: Optional[str] = None,
         limit: int = 200,
-    ):
-        """
-        Egyszerű meta-alapú keresés:
+        order: str = "date",
+        cursor: Optional[str] = None,
+        where: Optional[Filter] = None,
+    ) -> List[Dict[str, Any]]:
+        """search_by_meta (lásd _search_by_meta); a self.cache-ből, ha be van állítva."""
+        params = dict(
+            domain=domain, date_from=date_from, date_to=date_to, q=q, topic=topic,
+            entity=entity, keyword=keyword, limit=limit, order=order, cursor=cursor, where=where,
+        )
+        return self._cached("search_by_meta", params, lambda: self._search_by_meta(**params))
 
-          - opcionális domain (sources.domain)
-          - opcionális dátum intervallum (articles.published_date, 'YYYY-MM-DD')
-          - opcionális kulcsszó: title/content LIKE
+    def _meta_query(
+        self,
+        *,
+        domain: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        q: Optional[str] = None,
+        topic: Optional[str] = None,
+        entity: Optional[str] = None,
+        keyword: Optional[str] = None,
+        where: Optional[Filter] = None,
+    ) -> Tuple[str, List[str], List[Any], Optional[str]]:
         """
-        cur = self.conn.cursor()
+        A search_by_meta szűrőinek FROM + WHERE része (a találatokhoz és a facetekhez
+        közös). Visszatérés: (from_sql, feltételek, paraméterek, FTS MATCH vagy None).
+        """
+        plan = plan_text_query(q, has_fts=self.has_fts, has_trigram=self.has_trigram) if q else None
+        match = plan.match if plan is not None else None
 
-        sql = (
-            "SELECT a.title, a.url AS link, "
-            "COALESCE(a.published_date, datetime(a.created_at, 'unixepoch')) AS date, "
-            "a.label, a.label_score, a.cluster_id, "
-            "substr(a.content, 1, 400) AS snippet "
-            "FROM articles a "
-            "JOIN sources s ON s.id = a.source_id "
-        )
+        if match is not None:
+            # az FTS találati halmaz hajtja a lekérdezést, nem az articles full scan
+            from_sql = (
+                "FROM article_fts "
+                "JOIN articles a ON a.rowid = article_fts.rowid "
+                "JOIN sources s ON s.id = a.source_id "
+            )
+        else:
+            from_sql = (
+                "FROM articles a "
+                "JOIN sources s ON s.id = a.source_id "
+            )
 
-        where = []
+        extra_filter, where = where, []
         params: List[Any] = []
 
+        if match is not None:
+            where.append("article_fts MATCH ?")
+            params.append(match)
+        elif plan is not None and plan.mode == "trigram":
+            # slug / részszó: a trigram index adja a rowid-halmazt, nincs full scan;
+            # nem URL-szerű bemenetnél ('Orbán-kormány') a body-t az FTS kifejezés fedi
+            where.append(
+                "a.rowid IN ("
+                "SELECT rowid FROM article_trgm WHERE url LIKE ? "
+                "UNION "
+                "SELECT rowid FROM article_trgm WHERE title LIKE ?"
+                + (" UNION SELECT rowid FROM article_fts WHERE article_fts MATCH ?" if plan.phrase else "")
+                + ")"
+            )
+            params.extend([plan.url_pattern, plan.title_pattern])
+            if plan.phrase:
+                params.append(plan.phrase)
+
         if domain:
             where.append("s.domain = ?")
             params.append(domain)
@@ -457,65 +2117,391 @@ class Repository:
             where.append("a.published_date <= ?")
             params.append(date_to)
 
+        # Entitás / topic / kulcsszó: a normalizált kapcsolótáblákon át,
+        # (id, published_date) index range scan-nel, JSON LIKE helyett.
         if topic:
-            where.append("a.tags LIKE ?")
-            params.append(f"%{topic}%")
+            frag, frag_params = self._tag_filter_sql(
+                "article_topics", "topic_id",
+                "SELECT id FROM topics WHERE kind = 'topic' AND norm = ?",
+                normalize_tag(topic), date_from, date_to,
+            )
+            where.append(frag)
+            params.extend(frag_params)
         if entity:
-            # JSON-ben így szerepel: "text": "Orbán Viktor"
-            where.append("a.matched_tags LIKE ?")
-            params.append(f'%\"text\": \"{entity}\"%')
+            frag, frag_params = self._tag_filter_sql(
+                "article_entities", "entity_id",
+                "SELECT id FROM entities WHERE norm = ?",
+                normalize_tag(entity), date_from, date_to,
+            )
+            where.append(frag)
+            params.extend(frag_params)
 
         if keyword:
-            where.append("a.tags LIKE ?")
-            params.append(f"%{keyword}%")
+            # kulcsszó bármilyen topic-típusra illeszkedhet (topic vagy keyword)
+            frag, frag_params = self._tag_filter_sql(
+                "article_topics", "topic_id",
+                "SELECT id FROM topics WHERE norm = ?",
+                normalize_tag(keyword), date_from, date_to,
+            )
+            where.append(frag)
+            params.extend(frag_params)
 
-        import unicodedata  # a file tetején már legyen importálva
+        if extra_filter is not None:
+            frag, frag_params = extra_filter.to_sql()
+            where.append(f"({frag})")
+            params.extend(frag_params)
 
-        if q:
-            # 1) Eredeti keresőkifejezés (title/content-hez jó lehet)
+        if plan is not None and plan.mode == "like":
+            # Nincs használható index (nincs FTS5 / túl rövid töredék) → régi LIKE keresés
             like_raw = f"%{q}%"
 
-            # 2) Ékezetek leszedése + lower → jobban hasonlít a slugokra
-            q_norm = unicodedata.normalize("NFKD", q)
-            q_ascii = "".join(c for c in q_norm if not unicodedata.combining(c))
-            q_ascii = q_ascii.lower()
+            # Ékezetek leszedése + lower → jobban hasonlít a slugokra
+            q_ascii = fold_diacritics(q)
 
-            # 3) Tipikus slug: szavak kötőjellel
+            # Tipikus slug: szavak kötőjellel
             slug_like = "%" + "-".join(q_ascii.split()) + "%"
 
             where.append(
                 "("
                 "a.title   LIKE ? OR "
-                "a.content LIKE ? OR "
+                "a.id IN (SELECT article_id FROM article_bodies WHERE body_text(content, content_z, dict_id) LIKE ?) OR "
                 "LOWER(a.url) LIKE ? OR "
                 "LOWER(a.url) LIKE ?"
                 ")"
             )
             params.extend([like_raw, like_raw, f"%{q_ascii}%", slug_like])
 
+        return from_sql, where, params, match
+
+    def _search_by_meta(
+        self,
+        *,
+        domain: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        q: Optional[str] = None,
+        topic: Optional[str] = None,  
+        entity: Optional[str] = None,     # ÚJ
+        keyword: Optional[str] = None,    # ÚJ
+        limit: int = 200,
+        order: str = "date",
+        cursor: Optional[str] = None,
+        where: Optional[Filter] = None,
+    ):
+        """
+        Egyszerű meta-alapú keresés:
+
+          - opcionális domain (sources.domain)
+          - opcionális dátum intervallum (articles.published_date, 'YYYY-MM-DD')
+          - opcionális kulcsszó: a planner (fts.plan_text_query) dönt:
+              szavas kifejezés -> FTS5 MATCH (bm25 rank-kel),
+              slug / URL-töredék -> trigram index (ha nem valódi URL, + a body
+              FTS kifejezés-találatai, pl. 'Orbán-kormány'), egyébként LIKE
+          - order: 'date' (alap, legfrissebb elöl) vagy 'bm25' (relevancia)
+          - cursor: az előző oldal next_cursor-a (lásd search_by_meta_page);
+            keyset lapozás (published_date DESC, id DESC) szerint, OFFSET nélkül
+          - where: további filters.Filter (label, rovat, több domain ...),
+            SQL-be fordítva, a limit előtt
+        """
+        if cursor is not None and order == "bm25":
+            raise ValueError("A cursor-os lapozás csak order='date' mellett támogatott.")
+        keyset = decode_cursor(cursor) if cursor else None
+
+        from_sql, where, params, match = self._meta_query(
+            domain=domain, date_from=date_from, date_to=date_to, q=q,
+            topic=topic, entity=entity, keyword=keyword, where=where,
+        )
+        rank_sql = f"{bm25_expr()} AS rank" if match is not None else "NULL AS rank"
+
+        sql = (
+            "SELECT a.id, a.published_date, a.title, a.url AS link, "
+            "COALESCE(a.published_date, datetime(a.created_at, 'unixepoch')) AS date, "
+            "a.label, a.label_score, a.cluster_id, "
+            "COALESCE(a.snippet, '') AS snippet, "
+            f"{rank_sql} "
+            + from_sql
+        )
+
+        def _run(keyset_sql: Optional[str], keyset_params: List[Any], n: int) -> List[sqlite3.Row]:
+            conds = where + ([keyset_sql] if keyset_sql else [])
+            q_sql = sql
+            if conds:
+                q_sql += " WHERE " + " AND ".join(conds)
+            if order == "bm25" and match is not None:
+                q_sql += " ORDER BY rank LIMIT ?"
+            else:
+                # (published_date DESC, id DESC) index sorrendje; NULL dátum a végén
+                q_sql += " ORDER BY a.published_date DESC, a.id DESC LIMIT ?"
+            return self._fetch_all(q_sql, params + keyset_params + [n])
+
+        if keyset is None:
+            rows = _run(None, [], limit)
+        else:
+            last_date, last_id = keyset
+            if last_date is not None:
+                # row-value összehasonlítás -> index seek a cursor pozíciójára
+                rows = _run("(a.published_date, a.id) < (?, ?)", [last_date, last_id], limit)
+                if len(rows) < limit:
+                    # a NULL dátumú cikkek a lista végén jönnek, a row-value feltétel kizárja őket
+                    rows += _run("a.published_date IS NULL", [], limit - len(rows))
+            else:
+                rows = _run("a.published_date IS NULL AND a.id < ?", [last_id], limit)
+
+        return [self._meta_row(row) for row in rows]
+
+    @staticmethod
+    def _meta_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "published_date": row["published_date"],
+            "title": row["title"] or "",
+            "link": row["link"] or "",
+            "date": row["date"],
+            "label": row["label"],
+            "label_score": row["label_score"],
+            "cluster_id": row["cluster_id"],
+            "snippet": row["snippet"] or "",
+            "rank": row["rank"],
+        }
+
+    def rows_by_ids(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """search_by_meta formátumú sorok id alapján (pl. a vektoros találatokhoz); id -> sor."""
+        ids = list(dict.fromkeys(ids))
+        out: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(ids), 500):   # SQLite paraméterlimit alatt
+            chunk = ids[i:i + 500]
+            rows = self.conn.execute(
+                "SELECT a.id, a.published_date, a.title, a.url AS link, "
+                "COALESCE(a.published_date, datetime(a.created_at, 'unixepoch')) AS date, "
+                "a.label, a.label_score, a.cluster_id, COALESCE(a.snippet, '') AS snippet, NULL AS rank "
+                f"FROM articles a WHERE a.id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            out.update((row["id"], self._meta_row(row)) for row in rows)
+        return out
+
+    # ------------------------------------------------------------------
+    # Facetek (találatszám domain / label / klaszter / hónap szerint)
+    # ------------------------------------------------------------------
+    FACETS = {
+        "domain": "s.domain",
+        "label": "a.label",
+        "cluster": "a.cluster_id",
+        "month": "substr(a.published_date, 1, 7)",
+        "section": "url_section(a.url)",
+    }
+    DEFAULT_FACET_LIMIT = 10
+
+    def facets(
+        self,
+        names: Iterable[str],
+        *,
+        top_n: Optional[int] = DEFAULT_FACET_LIMIT,
+        domain: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        q: Optional[str] = None,
+        topic: Optional[str] = None,
+        entity: Optional[str] = None,
+        keyword: Optional[str] = None,
+        where: Optional[Filter] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Facet-számok a search_by_meta teljes találati halmazára (lapozástól függetlenül):
+        {"label": [{"value": "ellenzéki", "count": 812}, ...], ...}, facetenként
+        legfeljebb top_n érték (None = mind), darabszám szerint csökkenőben.
+
+        A találati halmaz (FTS találatok vagy index range) egyszer értékelődik ki,
+        a facetek egy temp táblán számolódnak, nem facetenként újra az egész
+        keresés. A self.cache-ben a találatokkal együtt cache-elődik (ugyanaz az
+        írási generáció).
+        """
+        names = tuple(dict.fromkeys(names))
+        unknown = [n for n in names if n not in self.FACETS]
+        if unknown:
+            raise ValueError(f"Ismeretlen facet: {', '.join(unknown)} ({', '.join(self.FACETS)})")
+        if not names:
+            return {}
+        filters = dict(
+            domain=domain, date_from=date_from, date_to=date_to, q=q,
+            topic=topic, entity=entity, keyword=keyword, where=where,
+        )
+        rows = self._cached(
+            "facets", dict(filters, facets=names, top_n=top_n),
+            lambda: self._facet_rows(names, top_n, filters),
+        )
+        out: Dict[str, List[Dict[str, Any]]] = {name: [] for name in names}
+        for row in rows:
+            out[row["facet"]].append({"value": row["value"], "count": row["count"]})
+        return out
+
+    def _facet_rows(
+        self, names: Tuple[str, ...], top_n: Optional[int], filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        # egy menet a találati halmazon: a szűrők (FTS / LIKE / tag join) egyszer
+        # futnak, a kért facet-oszlopok temp táblába kerülnek; facetenként utána
+        # már csak egy GROUP BY ezen a kis táblán (C-ben, top_n a LIMIT-ben)
+        from_sql, where, params, _ = self._meta_query(**filters)
+        cols = ", ".join(f"{self.FACETS[n]} AS f{i}" for i, n in enumerate(names))
+        sql = f"SELECT {cols} " + from_sql
         if where:
             sql += " WHERE " + " AND ".join(where)
 
-        sql += " ORDER BY a.published_date DESC, a.created_at DESC LIMIT ?"
-        params.append(limit)
+        out: List[Dict[str, Any]] = []
+        self.conn.execute("DROP TABLE IF EXISTS temp._facet_src")
+        try:
+            try:
+                self.conn.execute("CREATE TEMP TABLE _facet_src AS " + sql, params)
+            except sqlite3.OperationalError:
+                if self._budget_state is None or not self._budget_state.aborted:
+                    raise
+                # lejárt az időkeret: nincs (részleges) találati halmaz -> üres facetek
+                self._budget_state.truncated = True
+                return out
+            for i, name in enumerate(names):
+                # darabszám szerint csökkenő, egyezésnél érték szerint (NULL a végén) -> stabil
+                rows = self._fetch_all(
+                    f"SELECT f{i} AS value, COUNT(*) AS n FROM temp._facet_src GROUP BY f{i} "
+                    f"ORDER BY n DESC, value IS NULL, CAST(value AS TEXT)"
+                    + (" LIMIT ?" if top_n is not None else ""),
+                    [top_n] if top_n is not None else [],
+                )
+                out.extend({"facet": name, "value": r["value"], "count": r["n"]} for r in rows)
+        finally:
+            self.conn.execute("DROP TABLE IF EXISTS temp._facet_src")
+        return out
+
+    def search_by_meta_page(
+        self,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        facets: Optional[Iterable[str]] = None,
+        facet_limit: Optional[int] = DEFAULT_FACET_LIMIT,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """
+        Egy oldal a search_by_meta találataiból + a következő oldal cursor-a.
 
-        rows = cur.execute(sql, params).fetchall()
+        Visszatérés: {"items": [...], "next_cursor": str | None}
+        (next_cursor None, ha nincs több találat; order='bm25' esetén
+        csak az első oldal van, mert a rank nem stabil lapozási kulcs).
+        facets megadásával "facets" is (lásd facets(); a teljes találati halmazra).
+        """
+        rows = self.search_by_meta(limit=limit + 1, cursor=cursor, **filters)
+        truncated = self.truncated
+        next_cursor = None
+        if len(rows) > limit or (truncated and rows):
+            # csonka (időkeret) oldal: a dátum szerinti prefix után a cursor-ral folytatható
+            rows = rows[:limit]
+            if filters.get("order", "date") != "bm25":
+                last = rows[-1]
+                next_cursor = encode_cursor(last["published_date"], last["id"])
+        page: Dict[str, Any] = {"items": rows, "next_cursor": next_cursor}
+        if facets:
+            facet_filters = {k: v for k, v in filters.items() if k != "order"}
+            page["facets"] = self.facets(facets, top_n=facet_limit, **facet_filters)
+        if self.truncated:
+            page["truncated"] = True
+        return page
 
-        result: List[Dict[str, Any]] = []
-        for row in rows:
-            result.append(
-                {
-                    "title": row["title"] or "",
-                    "link": row["link"] or "",
-                    "date": row["date"],
-                    "label": row["label"],
-                    "label_score": row["label_score"],
-                    "cluster_id": row["cluster_id"],
-                    "snippet": row["snippet"] or "",
-                    "rank": None,  # itt nincs bm25
-                }
+    # ------------------------------------------------------------------
+    # Statisztika (daily_stats rollupokból, O(napok))
+    # ------------------------------------------------------------------
+    STATS_GROUPS = ("day", "month", "domain", "total")
+
+    def stats(
+        self,
+        domain: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        *,
+        group_by: str = "day",
+    ) -> List[Dict[str, Any]]:
+        """
+        Cikkszámok a daily_stats / daily_label_stats rollupokból.
+
+        group_by: 'day' (domain + nap), 'month' (domain + hónap),
+        'domain' vagy 'total'. Dátumszűrőnél a dátum nélküli cikkek
+        kimaradnak (ahogy a search_by_meta-ban is). Sorok:
+        {"domain", "day"/"month", "n_articles", "n_with_content",
+         "n_tagged", "n_labeled", "labels": {label: n}}
+        """
+        if group_by not in self.STATS_GROUPS:
+            raise ValueError(f"Ismeretlen group_by: {group_by!r} ({', '.join(self.STATS_GROUPS)})")
+        keys: List[Tuple[str, str]] = []
+        if group_by != "total":
+            keys.append(("s.domain", "domain"))
+        if group_by == "day":
+            keys.append(("d.day", "day"))
+        elif group_by == "month":
+            keys.append(("substr(d.day, 1, 7)", "month"))
+
+        where, params = [], []
+        if domain:
+            where.append("s.domain = ?")
+            params.append(domain)
+        if date_from or date_to:
+            where.append("d.day <> ''")
+        if date_from:
+            where.append("d.day >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("d.day <= ?")
+            params.append(date_to)
+        where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+        select_keys = "".join(f"{expr} AS {alias}, " for expr, alias in keys)
+        group_sql = (" GROUP BY " + ", ".join(alias for _, alias in keys)) if keys else ""
+        order_sql = (" ORDER BY " + ", ".join(alias for _, alias in keys)) if keys else ""
+        aliases = [alias for _, alias in keys]
+
+        result: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for row in self.conn.execute(
+            f"""
+            SELECT {select_keys}
+                   SUM(d.n_articles) AS n_articles, SUM(d.n_with_content) AS n_with_content,
+                   SUM(d.n_tagged) AS n_tagged, SUM(d.n_labeled) AS n_labeled
+            FROM daily_stats d
+            JOIN sources s ON s.id = d.source_id
+            {where_sql}{group_sql}{order_sql}
+            """,
+            params,
+        ):
+            if row["n_articles"] is None:
+                continue   # 'total' üres DB-n
+            key = tuple(row[a] for a in aliases)
+            item = {a: (row[a] or None) for a in aliases}
+            item.update(
+                n_articles=row["n_articles"],
+                n_with_content=row["n_with_content"],
+                n_tagged=row["n_tagged"],
+                n_labeled=row["n_labeled"],
+                labels={},
             )
-        return result
+            result[key] = item
+
+        for row in self.conn.execute(
+            f"""
+            SELECT {select_keys} d.label AS label, SUM(d.n) AS n
+            FROM daily_label_stats d
+            JOIN sources s ON s.id = d.source_id
+            {where_sql} GROUP BY {", ".join(aliases + ["label"])}
+            """,
+            params,
+        ):
+            item = result.get(tuple(row[a] for a in aliases))
+            if item is not None:
+                item["labels"][row["label"]] = row["n"]
+        return list(result.values())
+
+    def cluster_stats(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Klaszterenkénti cikkszám + legutóbbi nap (cluster_stats rollup), cluster_id szerint."""
+        sql = "SELECT cluster_id, n_articles, last_day FROM cluster_stats ORDER BY cluster_id"
+        params: List[Any] = []
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(r) for r in self.conn.execute(sql, params)]
 
     def close(self) -> None:
         try:
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
+from .filters import Filter, Filters
 from .repository import Repository
 from .adapters.regex_archive_adapter import SourceAdapter
 from .adapters.factories import make_telex_adapter, make_index_adapter, make_444_adapter, make_hvg_adapter
@@ -10,10 +13,33 @@ from .adapters.factories import make_telex_adapter, make_index_adapter, make_444
 class SearchEngine:
     """
     Vékony wrapper a Repository.search() fölött, opcionális label-szűréssel.
+    A szűrők SQL-be mennek (a limit a szűrt halmazra vonatkozik), nem utólag Pythonban.
+
+    vectors + encoder (vector_index.VectorIndex / QueryEncoder) megadásával
+    hybrid_search() is elérhető: BM25 + dense vektor, Reciprocal Rank Fusion.
     """
 
-    def __init__(self, repo: Repository) -> None:
+    def __init__(self, repo: Repository, *, vectors: Any = None, encoder: Any = None) -> None:
         self.repo = repo
+        self.vectors = vectors
+        self.encoder = encoder
+        # a lekérdezés-embedding párhuzamosan fut a BM25 ággal (a modell GIL-t enged);
+        # a szálkészlet lusta (csak hybrid_search indítja), close() állítja le
+        self._encode_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _encoder_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._encode_pool is None:
+                self._encode_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="query-encode")
+            return self._encode_pool
+
+    def close(self) -> None:
+        """A query-encode szálkészlet leállítása (a repo-t nem zárja, az a hívóé)."""
+        with self._pool_lock:
+            if self._encode_pool is not None:
+                self._encode_pool.shutdown(wait=False, cancel_futures=True)
+                self._encode_pool = None
 
     def search(
         self,
@@ -22,11 +48,83 @@ class SearchEngine:
         label: Optional[str] = None,
         limit: int = 200,
         order: str = "bm25",
+        where: Optional[Filter] = None,
     ) -> List[Dict[str, Any]]:
-        rows = self.repo.search(text, limit=limit, order=order)
+        parts = [where] if where is not None else []
         if label is not None:
-            rows = [r for r in rows if r.get("label") == label]
-        return rows
+            parts.append(Filters.by_label([label]))
+        return self.repo.search(text, limit=limit, order=order, where=Filters.compose(*parts) if parts else None)
+
+    def facets(
+        self,
+        text: Optional[str],
+        names: Sequence[str] = ("domain", "label", "month"),
+        *,
+        label: Optional[str] = None,
+        top_n: Optional[int] = 10,
+        where: Optional[Filter] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Facet-számok (Repository.facets) ugyanarra a találati halmazra, mint a search()."""
+        parts = [where] if where is not None else []
+        if label is not None:
+            parts.append(Filters.by_label([label]))
+        return self.repo.facets(names, top_n=top_n, q=text, where=Filters.compose(*parts) if parts else None)
+
+    def hybrid_search(
+        self,
+        text: str,
+        *,
+        limit: int = 50,
+        where: Optional[Filter] = None,
+        candidates: int = 100,
+        rrf_k: int = 60,
+    ) -> List[Dict[str, Any]]:
+        """
+        Hibrid keresés: FTS5 bm25 top-`candidates` + vektoros top-`candidates`,
+        Reciprocal Rank Fusion-nel összefésülve (score = sum 1 / (rrf_k + helyezés)).
+
+        A szűrő (where) mindkét ágon a fúzió ELŐTT érvényesül: a bm25 ágon SQL-ben,
+        a vektoros ágon a megengedett cikkhalmazra korlátozott kereséssel.
+        Sorok: a search_by_meta formátuma, rank = -rrf_score (kisebb = jobb,
+        mint a bm25-nél), plusz "bm25_rank" / "vector_rank" (1-től, vagy None).
+        """
+        if self.vectors is None or self.encoder is None:
+            raise RuntimeError("hybrid_search: nincs vektoros index / encoder beállítva")
+
+        # a query embedding háttérszálon, közben a fő szálon a bm25 ág;
+        # a sqlite kapcsolatot csak ez a szál használja
+        qvec_future = self._encoder_pool().submit(self.encoder.encode, text)
+        self.vectors.refresh()
+        lexical = self.repo.search_by_meta(q=text, order="bm25", where=where, limit=candidates)
+        allowed = self.vectors.allowed_positions(where)
+        dense = self.vectors.search(qvec_future.result(), k=candidates, allowed=allowed)
+
+        scores: Dict[str, float] = {}
+        bm25_rank: Dict[str, int] = {}
+        vector_rank: Dict[str, int] = {}
+        for i, row in enumerate(lexical, start=1):
+            bm25_rank[row["id"]] = i
+            scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (rrf_k + i)
+        for i, (aid, _) in enumerate(dense, start=1):
+            vector_rank[aid] = i
+            scores[aid] = scores.get(aid, 0.0) + 1.0 / (rrf_k + i)
+
+        top = sorted(scores, key=lambda aid: (-scores[aid], aid))[:limit]
+        rows = {row["id"]: row for row in lexical}
+        rows.update(self.repo.rows_by_ids(aid for aid in top if aid not in rows))
+
+        out: List[Dict[str, Any]] = []
+        for aid in top:
+            row = rows.get(aid)
+            if row is None:   # embedding van, cikk már nincs
+                continue
+            out.append(dict(
+                row,
+                rank=-scores[aid],
+                bm25_rank=bm25_rank.get(aid),
+                vector_rank=vector_rank.get(aid),
+            ))
+        return out
 
 
 def initialize_components(db_path: str = "news.sqlite") -> Tuple[Repository, List[SourceAdapter], SearchEngine]:
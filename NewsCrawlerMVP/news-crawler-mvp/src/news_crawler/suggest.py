@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Typeahead (autocomplete) index a keresőmezőhöz.
+
+Jelöltek (mind normalize_tag-gel normalizálva: kisbetű, ékezet nélkül):
+
+  - entitások és topicok / kulcsszavak (entities / topics + kapcsolótáblák,
+    vagyis a matched_tags normalizált alakja),
+  - rovatnevek (url_section: 'belfold', 'gazdasag', ...),
+  - gyakori cím n-gramok (1-2 szó, legalább min_df cikkben, az utolsó
+    title_days nap címeiből).
+
+A kulcsok egy rendezett listában vannak ("orban viktor" mellett a szó-kezdetek
+is: "viktor"), a prefixre illeszkedő tartomány bisecttel jön, a top-N pedig
+előre kiszámolt pontszám szerint: log(1 + cikkszám) * recency-felezés * típus-súly.
+
+Frissítés inkrementális: ha a DB írási generációja nőtt, csak az updated_at
+vízjel óta módosult cikkek (új cikk, újracímkézés) számolódnak újra. Napváltáskor
+csak a pontszámok frissülnek (recency); ha cikk törlődött, teljes újraépítés.
+
+    idx = SuggestIndex(repo)
+    idx.suggest("tisza p")   # [{"text": "Tisza Párt", "kind": "entity", "count": 412, ...}, ...]
+
+CLI (méréshez):
+
+  python -m news_crawler.suggest --db news.sqlite --q "orb" --q "tisza p"
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import math
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .fts import normalize_tag, tokenize_query
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.fts import normalize_tag, tokenize_query  # type: ignore
+    from news_crawler.repository import Repository  # type: ignore
+
+
+MIN_PREFIX = 2              # ennél rövidebb bemenetre nincs javaslat
+DEFAULT_LIMIT = 10
+TITLE_DAYS = 365            # cím n-gramok csak ennyi napra visszamenőleg
+TITLE_MIN_DF = 3            # cím n-gram legalább ennyi cikkben
+HALF_LIFE_DAYS = 30.0       # recency: ennyi nap alatt feleződik a súly
+INNER_WORD_WEIGHT = 0.6     # "viktor" -> "Orbán Viktor": szó közbeni illeszkedés gyengébb
+_CHUNK = 500
+
+# típus-súlyok: a címkék (entitás / topic) megbízhatóbbak a cím n-gramoknál
+KIND_WEIGHT = {
+    "entity": 1.5,
+    "topic": 1.2,
+    "section": 1.0,
+    "keyword": 1.0,
+    "title": 0.8,
+}
+
+# cím n-gram nem kezdődhet / végződhet ezekkel (normalizált alak)
+STOPWORDS = frozenset("""
+    a az egy es is nem hogy meg mar de ha mint mert vagy van volt lesz lett
+    ez azt ezt itt ott igy ugy most csak sem se mi mit ki kit aki ami amely
+    el fel le be ra at ossze vissza ujra
+    the of and to in on for
+""".split())
+
+# (kind, norm) -> bejegyzés indexe; bejegyzés: [kind, norm, display, df, last_date, score]
+_KIND, _NORM, _DISPLAY, _DF, _LAST, _SCORE = range(6)
+
+
+# NFKD + regex: a címenkénti fold_diacritics karakter-generátoránál jóval gyorsabb
+_COMBINING_RE = re.compile("[\u0300-\u036f]+")
+
+
+def _title_ngrams(title: Optional[str]) -> Dict[str, str]:
+    """Cím -> {normalizált 1-2 gram: eredeti alak}; stopword a szélén és szám kimarad."""
+    words = tokenize_query(title or "")
+    folded = tokenize_query(_COMBINING_RE.sub("", unicodedata.normalize("NFKD", " ".join(words).lower())))
+    if len(folded) != len(words):
+        words = folded   # egzotikus írásjel: az írásmód is a normalizált alak
+    out: Dict[str, str] = {}
+    for i, f in enumerate(folded):
+        if len(f) >= 4 and f not in STOPWORDS and not f.isdigit():
+            out.setdefault(f, words[i])
+        if i + 1 < len(folded):
+            g = folded[i + 1]
+            if f in STOPWORDS or g in STOPWORDS or len(f) < 2 or len(g) < 2 or (f.isdigit() and g.isdigit()):
+                continue
+            out.setdefault(f"{f} {g}", f"{words[i]} {words[i + 1]}")
+    return out
+
+
+def _variants(norm: str) -> List[Tuple[str, int]]:
+    """A kulcs és szó-kezdetei: 'orban viktor' -> [('orban viktor', 0), ('viktor', 1)]."""
+    words = norm.split()
+    return [(" ".join(words[i:]), i) for i in range(len(words))]
+
+
+class SuggestIndex:
+    """
+    Egy Repository memóriabeli prefix-indexe. A suggest() magától frissít
+    (legfeljebb refresh_interval másodpercenként nézi meg a write generációt).
+    """
+
+    def __init__(
+        self,
+        repo: Repository,
+        *,
+        title_days: int = TITLE_DAYS,
+        title_min_df: int = TITLE_MIN_DF,
+        half_life_days: float = HALF_LIFE_DAYS,
+        refresh_interval: float = 5.0,
+    ) -> None:
+        self.repo = repo
+        self.title_days = title_days
+        self.title_min_df = title_min_df
+        self.half_life_days = half_life_days
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._reset()
+        self.refresh(force=True)
+
+    def _reset(self) -> None:
+        self._entries: List[list] = []
+        self._ids: Dict[Tuple[str, str], int] = {}
+        # rendezett (variáns, bejegyzés, szó-pozíció); cseréje atomikus (olvasók a régit látják)
+        self._keys: List[Tuple[str, int, int]] = []
+        self._indexed: Set[int] = set()
+        # cikk -> címke-bejegyzései (újracímkézéskor ezeket vonjuk le)
+        self._article_tags: Dict[str, array] = {}
+        self._seen: Set[str] = set()          # cím / rovat már beszámítva
+        self._title_df: Dict[str, int] = {}   # minden cím n-gram cikkszáma (a ritkáké is)
+        self._watermark = 0                   # max(updated_at) a feldolgozottak közül
+        self._gen: Optional[int] = None
+        self._day: Optional[date] = None
+        self._delete_gen: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._indexed)
+
+    # ------------------------------------------------------------------
+    # Frissítés
+    # ------------------------------------------------------------------
+    def refresh(self, *, force: bool = False) -> bool:
+        """Inkrementális frissítés, ha a DB változott. True, ha volt mit feldolgozni."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            gen = self.repo.write_generation()
+            today = date.today()
+            if not force and gen == self._gen and today == self._day:
+                return False
+            t0 = time.perf_counter()
+            delete_gen = self.repo.delete_generation()
+            # törölt cikk hozzájárulását nem tudjuk levonni -> teljes újraépítés
+            full = force or delete_gen != self._delete_gen
+            if full:
+                self._reset()
+                self._day = today
+            elif today != self._day:
+                # napváltás: csak a recency változott, minden pontszám újraszámolva
+                self._day = today
+                self._rescore(range(len(self._entries)))
+            changed = self._apply_changes(full=full)
+            self._gen = gen
+            self._delete_gen = delete_gen
+            if full:
+                print(f"[SUGGEST] {self.repo.db_path}: {len(self._indexed)} javaslat "
+                      f"({changed} cikk, {(time.perf_counter() - t0) * 1000:.0f} ms)")
+        return True
+
+    def _apply_changes(self, *, full: bool) -> int:
+        conn = self.repo.conn
+        # régebbi elöl: a dict.update-ek után a legfrissebb írásmód / nap marad meg
+        rows = conn.execute(
+            "SELECT id, title, url_section(url) AS section, published_date, updated_at "
+            "FROM articles WHERE updated_at >= ? ORDER BY published_date",
+            (self._watermark,),
+        ).fetchall()
+        if not rows:
+            return 0
+
+        cutoff = date.fromordinal(self._day.toordinal() - self.title_days).isoformat()
+        sections: Counter = Counter()
+        section_day: Dict[str, str] = {}
+        grams_df: Counter = Counter()
+        grams_display: Dict[str, str] = {}
+        grams_day: Dict[str, str] = {}
+        for r in rows:
+            if r["id"] in self._seen:
+                continue   # cím és url nem változik: elég egyszer beszámítani
+            self._seen.add(r["id"])
+            day = (r["published_date"] or "")[:10]
+            if r["section"]:
+                sections[r["section"]] += 1
+                section_day[r["section"]] = day
+            if r["title"] and day >= cutoff:
+                grams = _title_ngrams(r["title"])
+                grams_df.update(grams.keys())
+                grams_display.update(grams)
+                grams_day.update(dict.fromkeys(grams, day))
+
+        touched: Set[int] = {
+            self._add("section", sec, sec, section_day[sec], count=n) for sec, n in sections.items()
+        }
+        # ritka n-gram csak számlálóban él; bejegyzés akkor lesz, ha eléri a min_df-et
+        if self._title_df:
+            for norm, n in grams_df.items():
+                grams_df[norm] = self._title_df[norm] = self._title_df.get(norm, 0) + n
+        else:
+            self._title_df = grams_df
+        for norm, total in grams_df.items():
+            if total >= self.title_min_df:
+                eid = self._ids.get(("title", norm))
+                n = total if eid is None else total - self._entries[eid][_DF]
+                touched.add(self._add("title", norm, grams_display[norm], grams_day[norm], count=n))
+
+        # címkék: a cikk régi hozzájárulása le, az aktuális fel
+        pub_by_id = {r["id"]: (r["published_date"] or "")[:10] for r in rows}
+        links: Dict[str, List[Tuple[str, str, str]]] = {aid: [] for aid in pub_by_id}
+        for row in self._tag_links(None if full else list(pub_by_id)):
+            if row[0] in links:
+                links[row[0]].append((row[1], row[2], row[3]))
+
+        for aid, tags in links.items():
+            old = self._article_tags.pop(aid, None)
+            if old is not None:
+                for eid in old:
+                    self._entries[eid][_DF] -= 1
+                    touched.add(eid)
+            if tags:
+                new = array("i", (self._add(kind, norm, name, pub_by_id[aid]) for kind, norm, name in tags))
+                touched.update(new)
+                self._article_tags[aid] = new
+
+        self._rescore(touched)
+        self._watermark = max(self._watermark, max(r["updated_at"] for r in rows))
+        return len(rows)
+
+    def _tag_links(self, ids: Optional[List[str]]) -> Iterable[Tuple[str, str, str, str]]:
+        """(article_id, kind, norm, name) a megadott cikkekre (None = mindre, egy lekérdezéssel)."""
+        sql = """
+            SELECT ae.article_id, 'entity' AS kind, e.norm, e.name
+            FROM article_entities ae JOIN entities e ON e.id = ae.entity_id {w1}
+            UNION ALL
+            SELECT at.article_id, t.kind, t.norm, t.name
+            FROM article_topics at JOIN topics t ON t.id = at.topic_id {w2}
+        """
+        if ids is None:
+            yield from self.repo.conn.execute(sql.format(w1="", w2=""))
+            return
+        for i in range(0, len(ids), _CHUNK):
+            chunk = ids[i:i + _CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            yield from self.repo.conn.execute(
+                sql.format(w1=f"WHERE ae.article_id IN ({marks})", w2=f"WHERE at.article_id IN ({marks})"),
+                chunk + chunk,
+            )
+
+    def _add(self, kind: str, norm: str, display: str, day: str, count: int = 1) -> int:
+        key = (kind, norm)
+        eid = self._ids.get(key)
+        if eid is None:
+            eid = len(self._entries)
+            self._ids[key] = eid
+            self._entries.append([kind, norm, display, 0, None, 0.0])
+        e = self._entries[eid]
+        e[_DF] += count
+        if day and (e[_LAST] is None or day >= e[_LAST]):
+            e[_LAST] = day
+            e[_DISPLAY] = display   # a legfrissebb írásmód látszik
+        return eid
+
+    def _score(self, e: list) -> float:
+        min_df = self.title_min_df if e[_KIND] == "title" else 1
+        if e[_DF] < min_df:
+            return 0.0
+        try:
+            age = self._day.toordinal() - date.fromisoformat(e[_LAST]).toordinal()
+        except (TypeError, ValueError):
+            age = 4 * self.half_life_days   # dátum nélküli: régi
+        recency = 0.5 ** (max(age, 0) / self.half_life_days)
+        return KIND_WEIGHT.get(e[_KIND], 1.0) * math.log1p(e[_DF]) * recency
+
+    def _rescore(self, touched: Iterable[int]) -> None:
+        new_keys: List[Tuple[str, int, int]] = []
+        for eid in touched:
+            e = self._entries[eid]
+            e[_SCORE] = self._score(e)
+            if e[_SCORE] > 0 and eid not in self._indexed:
+                self._indexed.add(eid)
+                new_keys.extend((v, eid, pos) for v, pos in _variants(e[_NORM]))
+        if new_keys:
+            # majdnem rendezett lista: a timsort ezt lineárisan összefésüli
+            self._keys = sorted(self._keys + new_keys)
+
+    # ------------------------------------------------------------------
+    # Lekérdezés
+    # ------------------------------------------------------------------
+    def suggest(
+        self,
+        prefix: str,
+        *,
+        limit: int = DEFAULT_LIMIT,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top-limit javaslat a prefixre; normalizált alakonként csak a legjobb típus marad."""
+        self.refresh()
+        p = normalize_tag(prefix)
+        if len(p) < MIN_PREFIX:
+            return []
+        keys, entries = self._keys, self._entries
+        lo = bisect_left(keys, (p,))
+        hi = bisect_left(keys, (p + "\uffff",), lo)
+        allowed = set(kinds) if kinds else None
+
+        def weight(i: int) -> float:
+            _, eid, pos = keys[i]
+            e = entries[eid]
+            if allowed is not None and e[_KIND] not in allowed:
+                return 0.0
+            return e[_SCORE] * (1.0 if pos == 0 else INNER_WORD_WEIGHT)
+
+        out: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        # egy bejegyzés több variánssal / típussal is illeszkedhet: ráhagyással kérünk
+        for i in heapq.nlargest(limit * 3, range(lo, hi), key=weight):
+            w = weight(i)
+            e = entries[keys[i][1]]
+            if w <= 0 or e[_NORM] in seen:
+                continue
+            seen.add(e[_NORM])
+            out.append({
+                "text": e[_DISPLAY],
+                "norm": e[_NORM],
+                "kind": e[_KIND],
+                "count": e[_DF],
+                "last": e[_LAST],
+                "score": round(w, 4),
+            })
+            if len(out) >= limit:
+                break
+        return out
+
+
+def merge_suggestions(results: Iterable[List[Dict[str, Any]]], limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """Több DB (shard) javaslatainak összefésülése: normalizált alakonként pontszám / darabszám összeadva."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for rows in results:
+        for r in rows:
+            m = merged.get(r["norm"])
+            if m is None:
+                merged[r["norm"]] = dict(r)
+                continue
+            m["count"] += r["count"]
+            m["score"] = round(m["score"] + r["score"], 4)
+            if (r["last"] or "") > (m["last"] or ""):
+                m["last"], m["text"], m["kind"] = r["last"], r["text"], r["kind"]
+    return sorted(merged.values(), key=lambda r: -r["score"])[:limit]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Autocomplete index építése és próbája.")
+    p.add_argument("--db", required=True, help="SQLite adatbázis fájl.")
+    p.add_argument("--q", action="append", default=[], help="Próba prefix (többször is megadható).")
+    p.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not Path(args.db).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.db}")
+    repo = Repository(args.db)
+    try:
+        idx = SuggestIndex(repo)
+        for q in args.q:
+            t0 = time.perf_counter()
+            rows = idx.suggest(q, limit=args.limit)
+            print(f"[SUGGEST] {q!r}: {len(rows)} javaslat ({(time.perf_counter() - t0) * 1000:.2f} ms)")
+            for r in rows:
+                print(f"    {r['text']}  ({r['kind']}, {r['count']} cikk, {r['last'] or '—'})")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Dense-vektoros index az article_embeddings tábla felett (hibrid kereséshez).
+
+  - a vektorok normalizált float32 mátrixba töltődnek (koszinusz = skalárszorzat),
+  - faiss telepítve: HNSW (ANN) index; különben pontos numpy keresés,
+  - szűrő (filters.Filter) esetén a megengedett cikkek SQL-ből (indexszel) jönnek;
+    kis halmazon pontos keresés csak azokon, nagyon túlmintavételezett ANN + szűrés,
+  - a lekérdezés embeddingje LRU cache-ben marad (QueryEncoder).
+
+Az index magától frissül, ha az article_embeddings változott (legfeljebb
+refresh_interval másodpercenként ellenőrzi).
+
+Hiányzó embeddingek számolása (ugyanaz a modell, mint embed_classify_summarize.py):
+
+  python -m news_crawler.vector_index --db news.sqlite --embed-missing
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # opcionális: pip install numpy
+    np = None
+
+try:
+    import faiss  # pip install faiss-cpu
+except Exception:
+    faiss = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except Exception:
+    SentenceTransformer = None
+
+# --- Import: csomagként vagy fallback-kel, ugyanaz a minta mint scrape_archive.py-ben ---
+try:
+    from .filters import Filter
+    from .repository import Repository
+except Exception:
+    here = Path(__file__).resolve()
+    src_root = here.parents[1]  # .../src
+    if str(src_root) not in sys.path:
+        sys.path.insert(0, str(src_root))
+    from news_crawler.filters import Filter  # type: ignore
+    from news_crawler.repository import Repository  # type: ignore
+
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+HNSW_M = 32
+HNSW_EF_SEARCH = 128
+EXACT_BELOW = 50_000        # ennyi megengedett cikk alatt szűrt pontos keresés
+OVERSAMPLE = 8              # szűrt ANN: k * OVERSAMPLE jelöltből szűrünk
+
+
+def _normalize(m: "np.ndarray") -> "np.ndarray":
+    return m / (np.linalg.norm(m, axis=-1, keepdims=True) + 1e-12)
+
+
+class QueryEncoder:
+    """Szöveg -> normalizált float32 vektor, LRU cache-sel (a modell lustán töltődik)."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, *, cache_size: int = 1024) -> None:
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self._model = None
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            if SentenceTransformer is None:
+                raise RuntimeError("A vektoros kereséshez telepítsd: pip install sentence-transformers")
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode_many(self, texts: Sequence[str], batch_size: int = 32) -> "np.ndarray":
+        vecs = self._load().encode(list(texts), convert_to_numpy=True, batch_size=batch_size, show_progress_bar=False)
+        return _normalize(np.asarray(vecs, dtype=np.float32))
+
+    def encode(self, text: str) -> "np.ndarray":
+        key = " ".join(text.split()).lower()
+        with self._lock:
+            vec = self._cache.get(key)
+            if vec is not None:
+                self._cache.move_to_end(key)
+                return vec
+        vec = self.encode_many([key])[0]
+        with self._lock:
+            self._cache[key] = vec
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return vec
+
+
+class VectorIndex:
+    """
+    Egy Repository article_embeddings táblájának memóriabeli indexe.
+
+        vi = VectorIndex(repo, model=DEFAULT_MODEL)
+        allowed = vi.allowed_positions(Filters.by_label(["ellenzéki"]))   # None = nincs szűrő
+        vi.search(encoder.encode("Magyar Péter pártja"), k=50, allowed=allowed)
+    """
+
+    def __init__(
+        self,
+        repo: Repository,
+        *,
+        model: Optional[str] = None,
+        use_faiss: bool = True,
+        refresh_interval: float = 30.0,
+    ) -> None:
+        if np is None:
+            raise RuntimeError("A vektoros indexhez telepítsd: pip install numpy")
+        self.repo = repo
+        self.model = model
+        self.use_faiss = use_faiss and faiss is not None
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._checked_at = 0.0
+        # pillanatkép: (ids, id -> pozíció, mátrix, faiss index | None); csere atomikus
+        self._snap: Tuple[List[str], Dict[str, int], "np.ndarray", Any] = ([], {}, np.zeros((0, 0), np.float32), None)
+        self.refresh(force=True)
+
+    # ------------------------------------------------------------------
+    # Betöltés / frissítés
+    # ------------------------------------------------------------------
+    def _model_sql(self) -> Tuple[str, List[Any]]:
+        return ("WHERE model = ?", [self.model]) if self.model else ("", [])
+
+    def _current_signature(self) -> Tuple[Any, ...]:
+        cond, params = self._model_sql()
+        row = self.repo.conn.execute(
+            f"SELECT COUNT(*), MAX(updated_at) FROM article_embeddings {cond}", params
+        ).fetchone()
+        return tuple(row)
+
+    def refresh(self, *, force: bool = False) -> bool:
+        """Újraépítés, ha az article_embeddings megváltozott. True, ha újraépült."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            sig = self._current_signature()
+            if not force and sig == self._signature:
+                return False
+            self._snap = self._build()
+            self._signature = sig
+        return True
+
+    def _build(self):
+        cond, params = self._model_sql()
+        dim_row = self.repo.conn.execute(
+            f"SELECT dim FROM article_embeddings {cond} GROUP BY dim ORDER BY COUNT(*) DESC LIMIT 1", params
+        ).fetchone()
+        if dim_row is None:
+            return [], {}, np.zeros((0, 0), np.float32), None
+        dim = int(dim_row["dim"])
+
+        ids: List[str] = []
+        blobs: List[bytes] = []
+        cur = self.repo.conn.execute(
+            f"SELECT article_id, vec FROM article_embeddings {cond + (' AND' if cond else 'WHERE')} dim = ?",
+            params + [dim],
+        )
+        while True:
+            chunk = cur.fetchmany(5000)
+            if not chunk:
+                break
+            for row in chunk:
+                if len(row["vec"]) == 4 * dim:
+                    ids.append(row["article_id"])
+                    blobs.append(row["vec"])
+        matrix = _normalize(np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(ids), dim))
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+        index = None
+        if self.use_faiss and len(ids):
+            index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            index.add(matrix)
+        print(f"[VEC] {self.repo.db_path}: {len(ids)} vektor (dim={dim}, {'HNSW' if index is not None else 'numpy'})")
+        return ids, {aid: i for i, aid in enumerate(ids)}, matrix, index
+
+    def __len__(self) -> int:
+        return len(self._snap[0])
+
+    # ------------------------------------------------------------------
+    # Keresés
+    # ------------------------------------------------------------------
+    def allowed_positions(self, where: Optional[Filter]) -> Optional["np.ndarray"]:
+        """A szűrőre illeszkedő cikkek pozíciói (None = nincs szűrő). SQL, a szűrő indexeivel."""
+        if where is None:
+            return None
+        pos = self._snap[1]
+        frag, params = where.to_sql()
+        rows = self.repo.conn.execute(
+            f"SELECT a.id FROM articles a JOIN sources s ON s.id = a.source_id WHERE {frag}", params
+        ).fetchall()
+        return np.fromiter((pos[r["id"]] for r in rows if r["id"] in pos), dtype=np.int64)
+
+    def search(
+        self,
+        qvec: "np.ndarray",
+        *,
+        k: int = 100,
+        allowed: Optional["np.ndarray"] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top-k (article_id, koszinusz) a qvec-hez; allowed: csak ezek a pozíciók."""
+        ids, _, matrix, index = self._snap
+        if not ids or (allowed is not None and len(allowed) == 0):
+            return []
+        q = _normalize(np.asarray(qvec, dtype=np.float32).reshape(1, -1))
+
+        if allowed is not None and (index is None or len(allowed) <= EXACT_BELOW):
+            # szelektív szűrő: pontos skalárszorzat csak a megengedett sorokon
+            scores = matrix[allowed] @ q[0]
+            top = np.argsort(-scores)[:k]
+            return [(ids[int(allowed[i])], float(scores[i])) for i in top]
+
+        if index is None:
+            scores = matrix @ q[0]
+            top = np.argpartition(-scores, min(k, len(ids) - 1))[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(ids[int(i)], float(scores[i])) for i in top]
+
+        want = k if allowed is None else min(len(ids), k * OVERSAMPLE)
+        scores, idx = index.search(q, want)
+        ok = None if allowed is None else set(allowed.tolist())
+        out = [
+            (ids[int(i)], float(s))
+            for s, i in zip(scores[0], idx[0])
+            if i >= 0 and (ok is None or int(i) in ok)
+        ]
+        return out[:k]
+
+
+# ----------------------------------------------------------------------
+# Hiányzó embeddingek számolása
+# ----------------------------------------------------------------------
+def embed_missing(repo: Repository, encoder: QueryEncoder, *, batch_size: int = 64, limit: Optional[int] = None) -> int:
+    """Embedding a még vektor nélküli cikkekhez (cím + body eleje), mint embed_classify_summarize.py."""
+    sql = (
+        "SELECT a.id, a.title, body_text(b.content, b.content_z, b.dict_id) AS body "
+        "FROM articles a LEFT JOIN article_bodies b ON b.article_id = a.id "
+        "WHERE NOT EXISTS (SELECT 1 FROM article_embeddings e WHERE e.article_id = a.id AND e.model = ?) "
+        "ORDER BY a.published_date DESC"
+        + (f" LIMIT {int(limit)}" if limit else "")
+    )
+    rows = repo.conn.execute(sql, (encoder.model_name,)).fetchall()
+    done = 0
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        texts = [f"{r['title'] or ''}. {(r['body'] or '')[:2000]}" for r in chunk]
+        vecs = encoder.encode_many(texts, batch_size=batch_size)
+        for r, v in zip(chunk, vecs):
+            repo.set_embedding(r["id"], v.astype(np.float32).tobytes(), model=encoder.model_name, commit=False)
+        repo.conn.commit()
+        done += len(chunk)
+        print(f"[VEC] {done}/{len(rows)} embedding kész")
+    return done
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Cikk-embeddingek számolása a hibrid kereséshez.")
+    p.add_argument("--db", required=True, help="SQLite adatbázis fájl.")
+    p.add_argument("--model", default=DEFAULT_MODEL, help="sentence-transformers modell.")
+    p.add_argument("--embed-missing", action="store_true", help="A hiányzó embeddingek kiszámolása.")
+    p.add_argument("--limit", type=int, default=None, help="Legfeljebb ennyi cikk (a legfrissebbek).")
+    p.add_argument("--batch-size", type=int, default=64)
+    return p.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not Path(args.db).exists():
+        sys.exit(f"❌ Nincs ilyen adatbázis: {args.db}")
+    repo = Repository(args.db)
+    try:
+        if args.embed_missing:
+            n = embed_missing(repo, QueryEncoder(args.model), batch_size=args.batch_size, limit=args.limit)
+            print(f"[VEC] {n} új embedding.")
+        vi = VectorIndex(repo, model=args.model)
+        print(f"[VEC] Index: {len(vi)} vektor.")
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    main()
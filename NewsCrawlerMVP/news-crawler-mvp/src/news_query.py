@@ -6,6 +6,7 @@ Egyszerű DB query util:
 
 - Kiírja, hány cikk van az adatbázisban összesen.
 - Kiírja, domainenként hány cikk van.
+  (Ha van daily_stats rollup a DB-ben, abból számol – O(napok) –, különben COUNT(*)-tal.)
 - Opcionálisan listázza az összes (vagy limitált számú) cikket: dátum, domain, cím, URL.
 
 Használat példák:
@@ -21,6 +22,13 @@ import argparse
 import sqlite3
 from pathlib import Path
 
+
+def has_table(cur: sqlite3.Cursor, name: str) -> bool:
+    return cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone() is not None
+
+
 def main() -> None:
     p = argparse.ArgumentParser()
     p.add_argument(
@@ -56,10 +64,17 @@ def main() -> None:
 
     print(f"=== DB: {db_path} ===")
 
+    # a triggerekkel karbantartott napi rollup, ha van; különben az articles tábla
+    counts_from = (
+        "(SELECT source_id, SUM(n_articles) AS n FROM daily_stats GROUP BY source_id)"
+        if has_table(cur, "daily_stats")
+        else "(SELECT source_id, COUNT(*) AS n FROM articles GROUP BY source_id)"
+    )
+
     # 1) összes cikk
-    total_sql = "SELECT COUNT(*) AS n FROM articles"
+    total_sql = f"SELECT COALESCE(SUM(c.n), 0) AS n FROM {counts_from} c"
     if args.domain:
-        total_sql += " WHERE source_id IN (SELECT id FROM sources WHERE domain = ?)"
+        total_sql += " WHERE c.source_id IN (SELECT id FROM sources WHERE domain = ?)"
         total_row = cur.execute(total_sql, (args.domain,)).fetchone()
     else:
         total_row = cur.execute(total_sql).fetchone()
@@ -74,24 +89,23 @@ def main() -> None:
     print("\n--- Domainenkénti cikkdarabszám ---")
     if args.domain:
         rows = cur.execute(
-            """
-            SELECT s.domain, COUNT(*) AS n
-            FROM articles a
-            JOIN sources s ON s.id = a.source_id
+            f"""
+            SELECT s.domain, c.n
+            FROM {counts_from} c
+            JOIN sources s ON s.id = c.source_id
             WHERE s.domain = ?
-            GROUP BY s.domain
-            ORDER BY n DESC;
+            ORDER BY c.n DESC;
             """,
             (args.domain,),
         ).fetchall()
     else:
         rows = cur.execute(
-            """
-            SELECT s.domain, COUNT(*) AS n
-            FROM articles a
-            JOIN sources s ON s.id = a.source_id
-            GROUP BY s.domain
-            ORDER BY n DESC;
+            f"""
+            SELECT s.domain, c.n
+            FROM {counts_from} c
+            JOIN sources s ON s.id = c.source_id
+            WHERE c.n > 0
+            ORDER BY c.n DESC;
             """
         ).fetchall()
 
@@ -0,0 +1,872 @@
+import hashlib
+import importlib.util
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.news_crawler.models import Article
+from src.news_crawler.backfill_domain_batches import set_safe_sqlite_pragmas, verify_window
+from src.news_crawler.backup import OnlineBackup
+from src.news_crawler.body_codec import register as register_body_text, zstd
+from src.news_crawler.export_parquet import iter_record_batches, pa
+from src.news_crawler.federated import FederatedSearch
+from src.news_crawler.filters import Filters
+from src.news_crawler.migrate_legacy import migrate_items
+from src.news_crawler.partitioned import PartitionedRepository
+from src.news_crawler.percolator import Percolator, StandingQuery
+from src.news_crawler.query_budget import QueryBudget, QueryBudgetExceeded
+from src.news_crawler.query_cache import QueryCache
+from src.news_crawler.search import SearchEngine
+from src.news_crawler.suggest import SuggestIndex, merge_suggestions
+from src.news_crawler.repository import Repository
+from src.news_crawler.vector_index import VectorIndex, np
+
+try:
+    from src.news_crawler.AI_tools.narrative_detector import NarrativeDetector
+except ImportError:   # numpy / sentence-transformers / scikit-learn
+    NarrativeDetector = None
+
+# a gyökér scriptek normalizálója (nem a csomag része): útvonalról töltjük be, mint a body_text.py
+HU_NORMALIZER_PATH = Path(__file__).resolve().parents[3] / "hu_normalizer.py"
+if HU_NORMALIZER_PATH.exists():
+    _spec = importlib.util.spec_from_file_location("hu_normalizer", HU_NORMALIZER_PATH)
+    hu_normalizer = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(hu_normalizer)
+else:
+    hu_normalizer = None
+
+
+def make_article(url, title, content, published):
+    return Article(
+        id=hashlib.sha256(url.encode("utf-8")).hexdigest(),
+        title=title,
+        link=url,
+        published=published,
+        source="telex.hu",
+        content=content,
+    )
+
+
+class TestRepositorySearch(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = Repository(":memory:")
+        self.repo.upsert(make_article(
+            "https://telex.hu/belfold/2024/01/02/magyar-peter-tisza",
+            "Magyar Péter új pártja",
+            "A Tisza Párt elnöke bírálta a kormányt.",
+            "2024-01-02",
+        ))
+        self.repo.upsert(make_article(
+            "https://telex.hu/belfold/2024/01/03/orban-viktor-beszed",
+            "Orbán Viktor beszéde",
+            "Évértékelő beszéd.",
+            "2024-01-03",
+        ))
+
+    def tearDown(self):
+        self.repo.close()
+
+    def test_fts_available(self):
+        self.assertTrue(self.repo.has_fts)
+
+    def test_diacritic_folding(self):
+        rows = self.repo.search_by_meta(q="orban")
+        self.assertEqual([r["title"] for r in rows], ["Orbán Viktor beszéde"])
+        self.assertIsNotNone(rows[0]["rank"])
+
+    def test_prefix_match(self):
+        rows = self.repo.search_by_meta(q="Tisz")
+        self.assertEqual(len(rows), 1)
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.repo.search_by_meta(q='"Magyar" -Péter*'), self.repo.search_by_meta(q="Magyar Péter"))
+
+    def test_slug_uses_trigram_index(self):
+        self.assertTrue(self.repo.has_trigram)
+        rows = self.repo.search_by_meta(q="magyar-peter")
+        self.assertEqual([r["title"] for r in rows], ["Magyar Péter új pártja"])
+        rows = self.repo.search_by_meta(q="/2024/01/03/")
+        self.assertEqual([r["title"] for r in rows], ["Orbán Viktor beszéde"])
+
+    def test_hyphenated_term_in_body(self):
+        # a trigram index csak url + title: a kötőjeles / perjeles szó a body-ban is találjon
+        self.repo.upsert(make_article(
+            "https://telex.hu/belfold/2024/01/04/parlament",
+            "Parlamenti vita",
+            "Az Orbán-kormány és a Fidesz-KDNP a T/1234 számú javaslatról.",
+            "2024-01-04",
+        ))
+        for q in ("Orbán-kormány", "fidesz-kdnp", "T/1234"):
+            rows = self.repo.search_by_meta(q=q)
+            self.assertEqual([r["title"] for r in rows], ["Parlamenti vita"], q)
+        self.assertEqual(self.repo.search_by_meta(q="orban-kormany-javaslat"), [])
+
+    def test_update_reindexes(self):
+        self.repo.conn.execute(
+            "UPDATE articles SET title = 'Módosított cím' WHERE url LIKE '%orban-viktor%'"
+        )
+        self.assertEqual(self.repo.search_by_meta(q="beszéde"), [])
+        self.assertEqual(len(self.repo.search_by_meta(q="módosított")), 1)
+
+    def test_body_stored_separately(self):
+        row = self.repo.get_article_row_by_url("https://telex.hu/belfold/2024/01/03/orban-viktor-beszed")
+        self.assertNotIn("content", row.keys())
+        self.assertEqual((row["has_content"], row["content_len"], row["snippet"]), (1, 18, "Évértékelő beszéd."))
+        self.assertIsNone(self.repo.row_to_article(row, load_content=False).content)
+        self.assertEqual(self.repo.row_to_article(row).content, "Évértékelő beszéd.")
+
+    def test_cursor_pagination(self):
+        for i in range(7):
+            published = None if i % 3 == 0 else f"2024-02-{i + 1:02d}"
+            self.repo.upsert(make_article(
+                f"https://telex.hu/belfold/2024/02/cikk-{i}", f"Cikk {i}", "Tisza", published,
+            ))
+        expected = [r["id"] for r in self.repo.search_by_meta(limit=100)]
+
+        seen, cursor = [], None
+        while True:
+            page = self.repo.search_by_meta_page(limit=2, cursor=cursor)
+            seen.extend(r["id"] for r in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 9)
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            self.repo.search_by_meta_page(cursor="nem-cursor")
+
+    def test_federated_merge(self):
+        other = Repository(":memory:")
+        other.upsert(make_article(
+            "https://index.hu/belfold/2024/01/04/tisza-nagygyules",
+            "Tisza nagygyűlés", "Tisza", "2024-01-04",
+        ))
+        fed = FederatedSearch({"telex.hu": self.repo, "index.hu": other})
+
+        first = fed.search_by_meta_page(limit=1)
+        self.assertEqual(first["items"][0]["link"], "https://index.hu/belfold/2024/01/04/tisza-nagygyules")
+        self.assertFalse(first["partial"])
+
+        rest = fed.search_by_meta(limit=100, cursor=first["next_cursor"])
+        self.assertEqual([r["id"] for r in rest], [r["id"] for r in self.repo.search_by_meta(limit=100)])
+        fed.close()
+        other.close()
+
+    def test_federated_stalled_shard(self):
+        other = Repository(":memory:")
+        other.upsert(make_article(
+            "https://index.hu/belfold/2024/01/04/tisza-nagygyules",
+            "Tisza nagygyűlés", "Tisza", "2024-01-04",
+        ))
+        other.upsert(make_article(
+            "https://index.hu/belfold/2024/01/01/ujev", "Újév", "Tűzijáték", "2024-01-01",
+        ))
+        fed = FederatedSearch({"telex.hu": self.repo, "index.hu": other}, timeout=0.2)
+        fed._locks["index.hu"].acquire()   # az előző lekérdezés még fogja a shardot
+        try:
+            page = fed.search_by_meta_page(limit=1)
+        finally:
+            fed._locks["index.hu"].release()
+        self.assertEqual(page["shards"]["index.hu"]["status"], "busy")
+        self.assertTrue(page["partial"])
+        self.assertEqual(len(page["items"]), 1)
+        # a cursor átugraná az index.hu sorait -> nincs folytatás
+        self.assertIsNone(page["next_cursor"])
+
+        # order='bm25' q nélkül: nincs rank, a shardok dátum szerint fésülődnek
+        rows = fed.search_by_meta(limit=10, order="bm25")
+        dates = [r["published_date"] for r in rows]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        fed.close()
+        other.close()
+
+    def test_federated_pages_through_truncated_shard(self):
+        class TruncatingRepository(Repository):
+            # a progress handler helyett: keret alatt csak az első sort adja, csonkaként jelölve
+            def search_by_meta(self, **kwargs):
+                rows = super().search_by_meta(**kwargs)
+                if self._budget_state is not None and len(rows) > 1:
+                    self._budget_state.truncated = True
+                    return rows[:1]
+                return rows
+
+        other = TruncatingRepository(":memory:")
+        for day in ("01", "04", "05"):
+            other.upsert(make_article(f"https://index.hu/belfold/2024/01/{day}/cikk", f"Index {day}",
+                                      "Szöveg", f"2024-01-{day}"))
+        fed = FederatedSearch({"telex.hu": self.repo, "index.hu": other})
+
+        page = fed.search_by_meta_page(limit=10)
+        self.assertTrue(page["truncated"])
+        self.assertEqual(page["shards"]["index.hu"]["status"], "truncated")
+        # az oldal a csonka shard utolsó soránál megáll, a telex sorai a következő oldalra kerülnek
+        self.assertEqual([r["published_date"] for r in page["items"]], ["2024-01-05"])
+
+        seen = [r["published_date"] for r in page["items"]]
+        while page["next_cursor"]:
+            page = fed.search_by_meta_page(limit=10, cursor=page["next_cursor"])
+            seen.extend(r["published_date"] for r in page["items"])
+        self.assertEqual(seen, ["2024-01-05", "2024-01-04", "2024-01-03", "2024-01-02", "2024-01-01"])
+        fed.close()
+        other.close()
+
+    def test_partitioned_pruning(self):
+        with tempfile.TemporaryDirectory() as root:
+            prepo = PartitionedRepository(root)
+            for month in (1, 2, 3):
+                prepo.upsert(make_article(
+                    f"https://telex.hu/belfold/2024/{month:02d}/cikk", f"Cikk {month}", "Tisza", f"2024-{month:02d}-10",
+                ))
+            self.assertEqual([p["key"] for p in prepo.partitions()], ["2024-03", "2024-02", "2024-01"])
+
+            page = prepo.search_by_meta_page(date_from="2024-02-01", date_to="2024-02-28")
+            self.assertEqual(list(page["shards"]), ["2024-02"])
+            self.assertEqual([r["title"] for r in page["items"]], ["Cikk 2"])
+
+            # rowid-hézagok a lezárás (VACUUM) előtt: az FTS-nek utána is a jó cikkre kell mutatnia
+            for i in range(6):
+                prepo.upsert(make_article(
+                    f"https://telex.hu/belfold/2024/01/{i}", f"Januári {i}", f"egyedi{i}szó", "2024-01-11",
+                ))
+            jan = prepo.repo("2024-01")
+            jan.conn.execute("DELETE FROM articles WHERE title IN ('Januári 0', 'Januári 2')")
+            jan.conn.commit()
+
+            prepo.close_before("2024-02-01")
+            self.assertTrue(prepo.repo("2024-01").read_only)
+            self.assertEqual(len(prepo.search_by_meta(q="Tisza")), 3)
+            for i in (1, 3, 4, 5):
+                self.assertEqual([r["title"] for r in prepo.search_by_meta(q=f"egyedi{i}szó")], [f"Januári {i}"])
+            self.assertEqual(prepo.search_by_meta(q="egyedi2szó"), [])
+            prepo.close()
+
+    def test_daily_stats(self):
+        before = self.repo.stats(group_by="total")[0]["n_articles"]
+        self.repo.conn.execute("UPDATE articles SET label = 'ellenzéki'")
+        self.repo.conn.execute("DELETE FROM articles WHERE published_date = '2024-01-02'")
+        self.repo.conn.commit()
+
+        by_day = {r["day"]: r for r in self.repo.stats(domain="telex.hu")}
+        self.assertNotIn("2024-01-02", by_day)
+        self.assertEqual(sum(r["n_articles"] for r in by_day.values()), before - 1)
+        self.assertEqual(by_day["2024-01-03"]["labels"], {"ellenzéki": 1})
+
+        incremental = self.repo.stats(group_by="month")
+        self.repo.rebuild_stats()
+        self.assertEqual(self.repo.stats(group_by="month"), incremental)
+
+    def test_bulk_load(self):
+        with self.repo.bulk_load(keep_indexes=["idx_articles_source_published_id"]):
+            names = {r["name"] for r in self.repo.conn.execute("SELECT name FROM sqlite_master")}
+            self.assertNotIn("article_fts_ai", names)
+            self.assertNotIn("idx_articles_published_id", names)
+            self.assertIn("idx_articles_source_published_id", names)
+            self.repo.upsert(make_article(
+                "https://telex.hu/belfold/2024/01/04/tisza-bulk", "Tömeges betöltés", "Tisza", "2024-01-04",
+            ))
+
+        names = {r["name"] for r in self.repo.conn.execute("SELECT name FROM sqlite_master")}
+        self.assertIn("article_fts_ai", names)
+        self.assertIn("idx_articles_published_id", names)
+        self.assertIsNone(self.repo._meta_get("bulk_load"))
+        self.assertEqual([r["title"] for r in self.repo.search_by_meta(q="betöltés")], ["Tömeges betöltés"])
+
+    def test_migrate_legacy_items(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy = os.path.join(tmp, "old.sqlite")
+            conn = sqlite3.connect(legacy)
+            conn.execute(
+                "CREATE TABLE items (id TEXT PRIMARY KEY, title TEXT, link TEXT, published TEXT, source TEXT, "
+                "content TEXT, matched_tags TEXT, ts INTEGER, label TEXT, emb BLOB, cluster_id INTEGER, "
+                "cluster_summary TEXT, views INTEGER)"
+            )
+            emb = struct.pack("<3f", 0.1, 0.2, 0.3)
+            conn.executemany(
+                "INSERT INTO items VALUES (?, ?, ?, ?, 'hvg.hu', ?, 'tisza', 100, ?, ?, ?, ?, ?)",
+                [
+                    ("a", "Tisza árvíz", "http://HVG.hu/itthon/cikk/?utm_source=rss", "Tue, 02 Jan 2024 10:00:00 +0100",
+                     "", "semleges", emb, 7, "Árvízi összefoglaló", 42),
+                    ("b", "Tisza árvíz", "https://hvg.hu/itthon/cikk", "2024-01-02", "Teljes szöveg.",
+                     None, None, 7, None, None),
+                    ("c", "Másik", "https://hvg.hu/gazdasag/masik", None, None, None, None, None, None, None),
+                ],
+            )
+            conn.commit()
+            conn.close()
+
+            repo = Repository(os.path.join(tmp, "new.sqlite"))
+            try:
+                state = migrate_items(legacy, repo, chunk_size=2)
+                self.assertEqual((state["seen"], state["inserted"], state["merged"]), (3, 2, 1))
+
+                row = repo.get_article_row_by_url("https://hvg.hu/itthon/cikk")
+                self.assertEqual(row["published_date"], "2024-01-02")
+                self.assertEqual(row["label"], "semleges")
+                self.assertEqual(repo.get_article_body(row["id"]), "Teljes szöveg.")
+                self.assertEqual(repo.get_embedding(row["id"]), emb)
+                summary = repo.conn.execute("SELECT summary FROM clusters WHERE cluster_id = 7").fetchone()
+                self.assertEqual(summary["summary"], "Árvízi összefoglaló")
+
+                # újrafuttatás: a checkpoint miatt nincs újabb sor
+                again = migrate_items(legacy, repo, chunk_size=2)
+                self.assertEqual(again["seen"], 3)
+            finally:
+                repo.close()
+
+    @unittest.skipIf(pa is None, "pyarrow nincs telepítve")
+    def test_parquet_batches(self):
+        row = self.repo.get_article_row_by_url("https://telex.hu/belfold/2024/01/02/magyar-peter-tisza")
+        self.repo.set_embedding(row["id"], struct.pack("<2f", 1.0, 2.0))
+        self.repo.conn.execute(
+            "UPDATE article_bodies SET content = '<p>A&nbsp;Tisza <b>Párt</b>\n elnöke</p>' WHERE article_id = ?",
+            (row["id"],),
+        )
+        batches = list(iter_record_batches(self.repo, chunk_size=1, dim=2))
+        self.assertEqual(len(batches), 2)
+        by_id = {r["id"]: r for b in batches for r in b.to_pylist()}
+        self.assertEqual(by_id[row["id"]]["content"], "A Tisza Párt elnöke")
+        self.assertEqual(by_id[row["id"]]["embedding"], [1.0, 2.0])
+        self.assertEqual(by_id[row["id"]]["month"], "2024-01")
+        self.assertEqual(by_id[row["id"]]["entities"], [])
+        other = next(r for r in by_id.values() if r["id"] != row["id"])
+        self.assertIsNone(other["embedding"])
+
+    def _tag_articles(self):
+        ids = {r["title"]: r["id"] for r in self.repo.conn.execute("SELECT id, title FROM articles")}
+        self.repo.set_article_tags(
+            ids["Magyar Péter új pártja"],
+            tags_json='{"label": "ellenzéki"}',
+            matched_tags_json='{"topics": ["választás", "ellenzék"]}',
+            entities=[("Magyar Péter", "PER", 0.9), ("Tisza Párt", "ORG", 0.7)],
+            topics=["választás", "ellenzék"],
+            keywords=["pártalapítás"],
+        )
+        self.repo.set_article_tags(
+            ids["Orbán Viktor beszéde"],
+            tags_json='{"label": "kormánypárti"}',
+            matched_tags_json='{"topics": ["évértékelő"]}',
+            entities=[("Orbán Viktor", "PER", 0.95)],
+            topics=["évértékelő", "választás"],
+        )
+        return ids
+
+    def test_set_article_tags_and_tag_filters(self):
+        ids = self._tag_articles()
+        # az entitás / topic / kulcsszó szűrő a kapcsolótáblákon át, ékezet- és kisbetű-függetlenül
+        self.assertEqual([r["title"] for r in self.repo.search_by_meta(entity="magyar peter")],
+                         ["Magyar Péter új pártja"])
+        self.assertEqual(len(self.repo.search_by_meta(topic="Választás")), 2)
+        self.assertEqual([r["title"] for r in self.repo.search_by_meta(topic="választás", date_from="2024-01-03")],
+                         ["Orbán Viktor beszéde"])
+        self.assertEqual([r["title"] for r in self.repo.search_by_meta(keyword="pártalapítás")],
+                         ["Magyar Péter új pártja"])
+        self.assertEqual(self.repo.search_by_meta(entity="Gyurcsány Ferenc"), [])
+
+        # újracímkézés lecseréli a kapcsolósorokat, a tagger sorrendje megmarad
+        self.repo.set_article_tags(
+            ids["Magyar Péter új pártja"], tags_json=None, matched_tags_json=None,
+            topics=["ellenzék", "Tisza"],
+        )
+        self.assertEqual(self.repo.search_by_meta(entity="magyar peter"), [])
+        self.assertEqual(len(self.repo.search_by_meta(topic="választás")), 1)
+        topics = [r["name"] for r in self.repo.conn.execute(
+            "SELECT t.name FROM article_topics at JOIN topics t ON t.id = at.topic_id "
+            "WHERE at.article_id = ? ORDER BY at.pos", (ids["Magyar Péter új pártja"],))]
+        self.assertEqual(topics, ["ellenzék", "Tisza"])
+
+    def _assert_window_copied(self, path, ids):
+        batch = Repository(path)
+        try:
+            self.assertEqual(batch.window_checksum("telex.hu", "2024-01-01", "2024-02-01"),
+                             self.repo.window_checksum("telex.hu", "2024-01-01", "2024-02-01"))
+            self.assertEqual(batch.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0], 2)
+            self.assertEqual(
+                batch.conn.execute("SELECT content FROM items WHERE title = 'Orbán Viktor beszéde'").fetchone()[0],
+                "Évértékelő beszéd.",
+            )
+            # FTS (cím + body), entitás / topic kapcsolatok, daily_stats rollup
+            self.assertEqual([r["title"] for r in batch.search_by_meta(q="bírálta")], ["Magyar Péter új pártja"])
+            self.assertEqual([r["title"] for r in batch.search_by_meta(entity="tisza part")],
+                             ["Magyar Péter új pártja"])
+            self.assertEqual(len(batch.search_by_meta(topic="választás")), 2)
+            self.assertEqual(batch.stats(group_by="total"), self.repo.stats(date_to="2024-01-31", group_by="total"))
+            topics = [r["name"] for r in batch.conn.execute(
+                "SELECT t.name FROM article_topics at JOIN topics t ON t.id = at.topic_id "
+                "WHERE at.article_id = ? ORDER BY t.kind DESC, at.pos", (ids["Magyar Péter új pártja"],))]
+            self.assertEqual(topics, ["választás", "ellenzék", "pártalapítás"])
+            self.assertEqual(batch.conn.execute("PRAGMA quick_check").fetchone()[0], "ok")
+        finally:
+            batch.close()
+
+    def test_copy_window_to(self):
+        ids = self._tag_articles()
+        self.repo.upsert(make_article("https://telex.hu/kulfold/2024/02/01/x", "Februári hír", "Más ablak.", "2024-02-01"))
+        with tempfile.TemporaryDirectory() as tmp:
+            plain = os.path.join(tmp, "batch.sqlite")
+            snap = os.path.join(tmp, "batch_snap.sqlite")
+            for _ in range(2):   # újrafuttatás: upsert, nem duplikál, a checksum egyezik
+                self.assertEqual(self.repo.copy_window_to(
+                    plain, domain="telex.hu", date_from="2024-01-01", date_to="2024-02-01"), 2)
+                self._assert_window_copied(plain, ids)
+                self.assertEqual(self.repo.copy_window_to(
+                    snap, domain="telex.hu", date_from="2024-01-01", date_to="2024-02-01", snapshot=True), 2)
+                self._assert_window_copied(snap, ids)
+            self.assertFalse(os.path.exists(f"{snap}.tmp"))
+            self.assertFalse(os.path.exists(f"{snap}.partial"))
+
+            # a master változik -> az ablak ellenőrzése eltérést jelez, újramásolás után egyezik
+            master, batch_app = SimpleNamespace(repo=self.repo), SimpleNamespace(repo=Repository(plain))
+            try:
+                report = verify_window(master, batch_app, plain, "telex.hu", "2024-01-01", "2024-02-01")
+                self.assertTrue(report["batch_quick_check"])
+                self.assertTrue(report["reconciled"])
+                self.assertEqual(report["master_rows"], 2)
+
+                self.repo.update_article_content_by_url(
+                    "https://telex.hu/belfold/2024/01/03/orban-viktor-beszed", "Orbán Viktor évértékelője", None)
+                report = verify_window(master, batch_app, plain, "telex.hu", "2024-01-01", "2024-02-01")
+                self.assertFalse(report["reconciled"])
+                self.assertEqual(report["batch_rows"], 2)
+
+                self.repo.copy_window_to(plain, domain="telex.hu", date_from="2024-01-01", date_to="2024-02-01")
+                report = verify_window(master, batch_app, plain, "telex.hu", "2024-01-01", "2024-02-01")
+                self.assertTrue(report["reconciled"])
+            finally:
+                batch_app.repo.close()
+
+    @unittest.skipIf(NarrativeDetector is None, "numpy / sentence-transformers / scikit-learn nincs telepítve")
+    def test_narrative_load_articles(self):
+        self._tag_articles()
+        detector = NarrativeDetector(self.repo, embedder=object())   # embedding nem kell a betöltéshez
+        arts = detector.load_articles("telex.hu", "2024-01-01", "2024-01-31")
+        self.assertEqual([a.title for a in arts], ["Magyar Péter új pártja", "Orbán Viktor beszéde"])
+        self.assertEqual(arts[0].entities, ["Magyar Péter", "Tisza Párt"])   # salience szerint
+        self.assertEqual(arts[0].topics, ["választás", "ellenzék"])          # a tagger sorrendjében
+        self.assertEqual(arts[0].keywords, ["pártalapítás"])
+        self.assertEqual(arts[1].topics, ["évértékelő", "választás"])
+        self.assertEqual(detector.load_articles("index.hu", None, None), [])
+
+    def test_online_backup_under_writes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "master.sqlite")
+            writer = Repository(path)
+            set_safe_sqlite_pragmas(writer.conn)   # WAL, mint a backfill masteren
+            writer.upsert_many(
+                make_article(f"https://telex.hu/a/{i}", f"Cikk {i}", "szöveg " * 200, "2024-01-01") for i in range(50)
+            )
+            stop = threading.Event()
+            written = []
+
+            def write():
+                i = 0
+                while not stop.is_set():
+                    writer.upsert(make_article(f"https://telex.hu/b/{i}", f"Új {i}", "szöveg " * 50, "2024-01-02"))
+                    written.append(i)
+                    i += 1
+
+            backup = OnlineBackup(path, prefix=os.path.join(tmp, "bak", "master_"), keep=2,
+                                  pages_per_step=1, step_sleep=0.001)
+            t = threading.Thread(target=write)
+            t.start()
+            try:
+                results = [backup.run() for _ in range(3)]
+                results.append(OnlineBackup(path, prefix=os.path.join(tmp, "bak", "master_"), keep=2,
+                                            method="vacuum").run())
+            finally:
+                stop.set()
+                t.join()
+            self.assertTrue(written)
+            for result in results:
+                self.assertIsNone(result.error)
+                self.assertFalse(result.skipped)
+                self.assertTrue(result.quick_check_ok)
+
+            # rotáció: csak a `keep` legfrissebb marad, és mind konzisztens pillanatkép
+            kept = sorted(os.listdir(os.path.join(tmp, "bak")))
+            self.assertEqual(len(kept), 2)
+            self.assertEqual(os.path.join(tmp, "bak", kept[-1]), results[-1].path)
+            for name in kept:
+                conn = sqlite3.connect(os.path.join(tmp, "bak", name))
+                self.assertEqual(conn.execute("PRAGMA quick_check").fetchone()[0], "ok")
+                self.assertGreaterEqual(conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0], 50)
+                conn.close()
+
+            # tétlen DB-n a következő futás kimarad
+            self.assertFalse(backup.run().skipped)
+            self.assertTrue(backup.run().skipped)
+            backup.close()
+            writer.close()
+
+    def _add_long_bodies(self, n=120):
+        words = ["kormány", "parlament", "választás", "ellenzék", "törvény", "szavazás", "miniszter", "költségvetés"]
+        self.repo.upsert_many(
+            make_article(
+                f"https://telex.hu/belfold/2024/02/{i:03d}", f"Hír {i}",
+                " ".join(words[(i + j) % len(words)] for j in range(80)) + f" egyedi{i}szó.",
+                f"2024-02-{i % 28 + 1:02d}",
+            )
+            for i in range(n)
+        )
+
+    def test_body_codec_plain_round_trip(self):
+        # zstandard / szótár nélkül sima szöveg; nyers kapcsolaton register() után olvasható az items view
+        self._add_long_bodies(5)
+        row = self.repo.conn.execute(
+            "SELECT b.content, b.content_z FROM article_bodies b JOIN articles a ON a.id = b.article_id "
+            "WHERE a.title = 'Hír 3'"
+        ).fetchone()
+        self.assertIsNotNone(row["content"])
+        self.assertIsNone(row["content_z"])
+        self.assertEqual(self.repo.codec.decode(*self.repo.codec.encode("rövid", "telex.hu")), "rövid")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "news.sqlite")
+            repo = Repository(path)
+            repo.upsert(make_article("https://telex.hu/a", "Cím", "A Tisza Párt elnöke.", "2024-01-01"))
+            repo.close()
+            conn = sqlite3.connect(path)
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("SELECT content FROM items").fetchall()
+            register_body_text(conn)
+            self.assertEqual(conn.execute("SELECT content FROM items").fetchone()[0], "A Tisza Párt elnöke.")
+            conn.execute("UPDATE articles SET title = 'Új cím'")   # az FTS trigger is body_text()-et hív
+            conn.commit()
+            conn.close()
+
+    @unittest.skipIf(zstd is None, "zstandard nincs telepítve")
+    def test_body_dict_train_and_recompress(self):
+        self._add_long_bodies()
+        before = {r["title"]: r["content"] for r in self.repo.conn.execute("SELECT title, content FROM items")}
+
+        dict_id = self.repo.train_body_dict("telex.hu", sample_size=100, dict_size=4096)
+        self.assertEqual(self.repo.codec.active_dict_id("telex.hu"), dict_id)
+        seen, rewritten = self.repo.recompress_bodies("telex.hu", batch_size=50)
+        self.assertEqual(seen, 122)
+        self.assertEqual(rewritten, 120)   # a 2 rövid (<256 karakter) body sima szöveg marad
+        self.assertEqual(self.repo.recompress_bodies("telex.hu"), (122, 0))
+        n_z = self.repo.conn.execute(
+            "SELECT COUNT(*) FROM article_bodies WHERE content_z IS NOT NULL AND dict_id = ?", (dict_id,)
+        ).fetchone()[0]
+        self.assertEqual(n_z, 120)
+
+        # a szöveg változatlan: items view, FTS (a tömörített body szavai) és új írás is tömörítve
+        after = {r["title"]: r["content"] for r in self.repo.conn.execute("SELECT title, content FROM items")}
+        self.assertEqual(after, before)
+        self.assertEqual([r["title"] for r in self.repo.search_by_meta(q="egyedi7szó")], ["Hír 7"])
+        self.repo.upsert(make_article("https://telex.hu/uj", "Új", before["Hír 5"], "2024-03-01"))
+        self.assertIsNotNone(self.repo.conn.execute(
+            "SELECT content_z FROM article_bodies b JOIN articles a ON a.id = b.article_id WHERE a.title = 'Új'"
+        ).fetchone()[0])
+
+        # vissza sima szövegre
+        self.assertEqual(self.repo.recompress_bodies("telex.hu", compress=False)[1], 121)
+        self.assertEqual(
+            self.repo.conn.execute("SELECT COUNT(*) FROM article_bodies WHERE content_z IS NOT NULL").fetchone()[0], 0
+        )
+
+    def test_query_cache_write_generation(self):
+        cache = QueryCache(max_bytes=1 << 20, ttl=60)
+        self.repo.cache = cache
+        first = self.repo.search_by_meta(domain="telex.hu")
+        self.assertEqual(self.repo.search_by_meta(domain="telex.hu", q=""), first)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+        # írás után (az írási generáció nő) nem jöhet a régi eredmény
+        self.repo.upsert(make_article(
+            "https://telex.hu/belfold/2024/01/05/uj-cikk", "Új cikk", "Friss.", "2024-01-05",
+        ))
+        rows = self.repo.search_by_meta(domain="telex.hu")
+        self.assertEqual(rows[0]["title"], "Új cikk")
+        self.assertEqual(cache.stats()["stale"], 1)
+
+        # a visszaadott sor módosítása nem rontja el a cache-t
+        rows[0]["title"] = "x"
+        self.assertEqual(self.repo.search_by_meta(domain="telex.hu")[0]["title"], "Új cikk")
+
+        # közös cache két :memory: repón (azonos írási generációval): a kulcsok nem ütközhetnek
+        repos = [Repository(":memory:", cache=cache) for _ in range(2)]
+        for i, repo in enumerate(repos):
+            repo.upsert(make_article(f"https://telex.hu/db{i}", f"DB {i}", "Szöveg.", "2024-01-01"))
+        self.assertEqual([[r["title"] for r in repo.search_by_meta()] for repo in repos], [["DB 0"], ["DB 1"]])
+        for repo in repos:
+            repo.close()
+
+    def test_filter_pushdown_matches_memory(self):
+        for i, label in enumerate(["ellenzéki", "semleges", "ellenzéki"]):
+            art = make_article(
+                f"https://telex.hu/{'belfold' if i else 'sport'}/2024/02/0{i + 1}/tisza-{i}",
+                f"Tisza {i}", "Tisza hír.", f"2024-02-0{i + 1}",
+            )
+            art.label = label
+            self.repo.upsert(art)
+
+        where = Filters.compose(
+            Filters.by_label(["ellenzéki"]),
+            Filters.by_url_section({"telex.hu": ["belfold"]}),
+        )
+        sql_titles = [r["title"] for r in self.repo.search_by_meta(where=where)]
+        self.assertEqual(sql_titles, ["Tisza 2"])
+        row = self.repo.get_article_row_by_url("https://telex.hu/belfold/2024/02/03/tisza-2")
+        self.assertTrue(where(self.repo.row_to_article(row, load_content=False)))
+
+        # a label szűrés a limit előtt fut: limit=1 mellett is van találat
+        hits = SearchEngine(self.repo).search("Tisza", label="ellenzéki", limit=1)
+        self.assertEqual([h["label"] for h in hits], ["ellenzéki"])
+
+    @unittest.skipIf(np is None, "numpy nincs telepítve")
+    def test_hybrid_search_rrf(self):
+        docs = [
+            ("a", "Tisza Párt kampány", "ellenzéki", (1.0, 0.0)),
+            ("b", "Árvíz a Tiszán", "semleges", (0.0, 1.0)),
+            ("c", "Ellenzéki nagygyűlés", "ellenzéki", (0.9, 0.1)),   # szövegben nincs "Tisza"
+        ]
+        for i, (slug, title, label, vec) in enumerate(docs):
+            art = make_article(f"https://telex.hu/belfold/2024/03/0{i + 1}/{slug}", title, "", f"2024-03-0{i + 1}")
+            art.label = label
+            self.repo.upsert(art)
+            self.repo.set_embedding(art.id, struct.pack("2f", *vec), model="fake")
+
+        class FakeEncoder:
+            def encode(self, text):
+                return np.array([1.0, 0.0], dtype=np.float32)
+
+        engine = SearchEngine(self.repo, vectors=VectorIndex(self.repo, model="fake", use_faiss=False),
+                              encoder=FakeEncoder())
+        hits = engine.hybrid_search("Tisza", limit=10)
+        # mindkét ágon első -> elöl; a csak vektoros találat is bekerül
+        self.assertEqual(hits[0]["title"], "Tisza Párt kampány")
+        self.assertIn("Ellenzéki nagygyűlés", [h["title"] for h in hits])
+        self.assertEqual(hits[0]["bm25_rank"], 1)
+        self.assertEqual(hits[0]["vector_rank"], 1)
+
+        # a szűrő a fúzió előtt, mindkét ágon érvényesül
+        hits = engine.hybrid_search("Tisza", where=Filters.by_label(["semleges"]))
+        self.assertEqual([h["title"] for h in hits], ["Árvíz a Tiszán"])
+
+        # a query-encode szálkészlet példányonkénti, close() leállítja, újrahívásra újraindul
+        self.assertIsNone(SearchEngine(self.repo)._encode_pool)
+        pool = engine._encode_pool
+        engine.close()
+        self.assertIsNone(engine._encode_pool)
+        with self.assertRaises(RuntimeError):
+            pool.submit(len, "")
+        self.assertEqual(engine.hybrid_search("Tisza", limit=10)[0]["title"], "Tisza Párt kampány")
+        engine.close()
+
+    def test_facets_single_pass(self):
+        for i, label in enumerate(["ellenzéki", "ellenzéki", "semleges"]):
+            art = make_article(f"https://telex.hu/kulfold/2024/02/0{i + 1}/tisza-{i}", f"Tisza {i}", "", f"2024-02-0{i + 1}")
+            art.label = label
+            self.repo.upsert(art)
+
+        page = self.repo.search_by_meta_page(q="Tisza", limit=1, facets=["label", "month", "section"])
+        self.assertEqual(len(page["items"]), 1)   # a facetek a teljes találati halmazra vonatkoznak
+        facets = page["facets"]
+        self.assertEqual(facets["label"][0], {"value": "ellenzéki", "count": 2})
+        self.assertEqual(sum(v["count"] for v in facets["month"]), 4)
+        self.assertEqual(facets["section"][0], {"value": "kulfold", "count": 3})
+        self.assertEqual(self.repo.facets(["label"], top_n=1, q="Tisza")["label"],
+                         [{"value": "ellenzéki", "count": 2}])
+        with self.assertRaises(ValueError):
+            self.repo.facets(["nincs_ilyen"])
+
+        # federált: a shardok számai összeadódnak
+        other = Repository(":memory:")
+        art = make_article("https://index.hu/belfold/2024/02/05/tisza", "Tisza", "", "2024-02-05")
+        art.source = "index.hu"
+        other.upsert(art)
+        fed = FederatedSearch({"telex.hu": self.repo, "index.hu": other})
+        domains = fed.search_by_meta_page(q="Tisza", facets=["domain"])["facets"]["domain"]
+        self.assertEqual(domains, [{"value": "telex.hu", "count": 4}, {"value": "index.hu", "count": 1}])
+        fed.close()
+        other.close()
+
+    def test_suggest_prefix_index(self):
+        idx = SuggestIndex(self.repo, title_days=100_000, title_min_df=1, refresh_interval=0)
+        self.assertEqual(idx.suggest("b"), [])   # MIN_PREFIX alatt nincs javaslat
+        self.assertEqual(idx.suggest("belf")[0]["kind"], "section")
+        self.assertIn("Magyar Péter", [r["text"] for r in idx.suggest("magyar p")])
+
+        # címkézés után inkrementálisan megjelenik, szó közepéről is ("part" -> "Tisza Párt")
+        art_id = self.repo.conn.execute("SELECT id FROM articles LIMIT 1").fetchone()["id"]
+        self.repo.set_article_tags(art_id, tags_json="{}", matched_tags_json='["Tisza Párt"]',
+                                   entities=[("Tisza Párt", "ORG", 0.9)])
+        top = idx.suggest("tisza p")[0]
+        self.assertEqual((top["text"], top["kind"], top["count"]), ("Tisza Párt", "entity", 1))
+        self.assertIn("Tisza Párt", [r["text"] for r in idx.suggest("part", kinds=["entity"])])
+
+        # újracímkézés: a régi hozzájárulás levonódik
+        self.repo.set_article_tags(art_id, tags_json="{}", matched_tags_json="[]")
+        self.assertNotIn("entity", [r["kind"] for r in idx.suggest("tisza p")])
+
+        merged = merge_suggestions([idx.suggest("belf"), idx.suggest("belf")])
+        self.assertEqual(merged[0]["count"], 2 * idx.suggest("belf")[0]["count"])
+
+        # törlés + beszúrás (a cikkszám nem változik): a törölt cikk javaslatai is eltűnnek
+        self.repo.conn.execute("DELETE FROM articles WHERE title = 'Magyar Péter új pártja'")
+        self.repo.conn.commit()
+        self.repo.upsert(make_article(
+            "https://telex.hu/kulfold/2024/01/06/brusszel", "Brüsszeli csúcs", "EU.", "2024-01-06",
+        ))
+        self.assertNotIn("Magyar Péter", [r["text"] for r in idx.suggest("magyar p")])
+        self.assertIn("kulfold", [r["text"] for r in idx.suggest("kulf")])
+
+    def test_percolator_hits_at_ingest(self):
+        perc = Percolator(self.repo)   # repo.percolator = perc
+        perc.register(StandingQuery("Magyar Péter", any=["Magyar Péter"], none=["sport"]))
+        perc.register(StandingQuery("T/ javaslat", regex=[r"\bT/\d{3,6}\b"], domains=["telex.hu"]))
+        with self.assertRaises(ValueError):
+            perc.register(StandingQuery("hibás", regex=["("]))
+
+        self.repo.upsert(make_article("https://telex.hu/belfold/2024/02/01/a", "Magyar Pétert kérdezték",
+                                      "A T/1234 számú javaslatról.", "2024-02-01"))
+        self.repo.upsert(make_article("https://telex.hu/sport/2024/02/02/b", "Magyar Péter a meccsen",
+                                      "Sport hírek.", "2024-02-02"))
+        page = perc.hits_since(None)
+        self.assertEqual(sorted(h["query"] for h in page["items"]), ["Magyar Péter", "T/ javaslat"])
+        self.assertEqual(next(h for h in page["items"] if h["query"] == "T/ javaslat")["matched"],
+                         [r"re:\bT/\d{3,6}\b"])
+
+        # frissítés nem duplikál, a cursor után csak az új találat jön
+        self.repo.upsert(make_article("https://telex.hu/belfold/2024/02/01/a", "Magyar Pétert kérdezték",
+                                      "Újra.", "2024-02-01"))
+        self.assertEqual(perc.hits_since(page["next_cursor"])["items"], [])
+        self.repo.upsert(make_article("https://telex.hu/belfold/2024/02/03/c", "Magyar Péter", "", "2024-02-03"))
+        new = perc.hits_since(page["next_cursor"], queries=["Magyar Péter"])
+        self.assertEqual([h["link"] for h in new["items"]], ["https://telex.hu/belfold/2024/02/03/c"])
+
+        # utólag felvett lekérdezés: backfill a tárolt cikkekre
+        perc.register(StandingQuery("Orbán", any=["orbán viktor"]), backfill=True)
+        self.assertEqual(len(perc.hits_since(None, queries=["Orbán"])["items"]), 1)
+
+        # a body utólagos letöltése (get_or_fetch_article) is percolál
+        perc.register(StandingQuery("Tisza Párt", any=["Tisza Párt"]))
+        url = "https://telex.hu/belfold/2024/02/04/d"
+        self.repo.upsert(make_article(url, "Cím nélküli hír", None, "2024-02-04"))
+        self.assertEqual(perc.hits_since(None, queries=["Tisza Párt"])["items"], [])
+        self.repo.update_article_content_by_url(url, None, "A Tisza Párt elnöke.")
+        self.assertEqual([h["link"] for h in perc.hits_since(None, queries=["Tisza Párt"])["items"]], [url])
+
+    def test_time_budget_truncates(self):
+        self.repo.upsert_many(
+            make_article(f"https://telex.hu/belfold/2024/03/{i:03d}", f"Cikk {i}",
+                         "Szöveg " * 20, f"2024-03-{i % 28 + 1:02d}")
+            for i in range(300)
+        )
+        self.repo.cache = QueryCache(max_bytes=1 << 20, ttl=60)
+        self.repo.budget = budget = QueryBudget(slow_ms=10_000, explain=False)
+
+        with self.repo.time_budget(5.0, label="search") as state:
+            state.deadline = 0.0   # már lejárt: az első progress hívás megszakít
+            page = self.repo.search_by_meta_page(domain="telex.hu", limit=500)
+        self.assertTrue(state.aborted)
+        self.assertTrue(page["truncated"])
+        self.assertLess(len(page["items"]), 302)
+
+        # a csonka eredmény nem került a cache-be; keret nélkül a teljes lista jön
+        full = self.repo.search_by_meta_page(domain="telex.hu", limit=500)
+        self.assertEqual(len(full["items"]), 302)
+        self.assertNotIn("truncated", full)
+        self.assertEqual(budget.stats()["aborted"], 1)
+
+        # más szál tartja a kapcsolatot: a keretes lekérdezés el sem indul
+        held, release = threading.Event(), threading.Event()
+
+        def hold():
+            with self.repo.time_budget(5.0, label="hold"):
+                held.set()
+                release.wait(5)
+
+        t = threading.Thread(target=hold)
+        t.start()
+        held.wait(5)
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                with self.repo.time_budget(0.05, label="search"):
+                    pass
+        finally:
+            release.set()
+            t.join()
+        self.assertEqual(budget.stats()["busy"], 1)
+
+
+@unittest.skipIf(hu_normalizer is None, "hu_normalizer.py nincs a repo gyökerében")
+class TestHuNormalizer(unittest.TestCase):
+
+    def setUp(self):
+        # lemma-tábla nélkül (a szabályalapú tövező determinisztikus, a tábla gépenként más)
+        self._saved = (hu_normalizer._table, hu_normalizer._table_loaded)
+        hu_normalizer._table, hu_normalizer._table_loaded = None, True
+        hu_normalizer.normalize_word.cache_clear()
+
+    def tearDown(self):
+        hu_normalizer._table, hu_normalizer._table_loaded = self._saved
+        hu_normalizer.normalize_word.cache_clear()
+
+    def test_strip_suffixes(self):
+        s = hu_normalizer.strip_suffixes
+        self.assertEqual(s("magyarok"), "magyar")
+        self.assertEqual(s("kormányt"), "kormány")
+        # -val/-vel, -vá/-vé hasonulás: a kettőzött (több betűs) mássalhangzó visszaáll
+        self.assertEqual(s("kormánnyal"), "kormány")
+        self.assertEqual(s("házzá"), "ház")
+        # alapalak és toldalékos alak ugyanoda fut
+        self.assertEqual(s("párt"), s("pártot"))
+        self.assertEqual(s("Budapest".lower()), s("budapesten"))
+        self.assertEqual(s("2024"), "2024")
+
+    def test_normalize_word(self):
+        n = hu_normalizer.normalize_word
+        self.assertEqual(n("kormánnyal"), "kormany")
+        self.assertEqual(n("kormányt"), n("kormány"))
+        self.assertEqual(hu_normalizer.normalize_text("A Kormánnyal, a kormányt!"), "a kormany a kormany")
+
+    def test_match_query(self):
+        mq = hu_normalizer.match_query
+        self.assertEqual(mq("kormánnyal"), '"kormany"')
+        self.assertEqual(mq('"Magyar Péternek" Orb*'), '"magyar peter" "orb"*')
+        self.assertEqual(mq("Tisza OR (kormány párt)"), '"tisza" OR ( "kormany" "par" )')
+        self.assertEqual(mq("Tisza (kormány)"), '"tisza" AND ( "kormany" )')
+        self.assertEqual(mq("Tisza NOT kormány"), '"tisza" NOT "kormany"')
+        # lógó operátor, üres / párosítatlan zárójel
+        self.assertEqual(mq("Tisza AND"), '"tisza"')
+        self.assertEqual(mq("( ) Tisza ("), '"tisza"')
+        self.assertEqual(mq("(Tisza"), '( "tisza" )')
+        self.assertIsNone(mq(""))
+
+        # bal oldal nélküli NOT: a kizárt tag / csoport kimarad, a kérdés nem fordul meg
+        self.assertIsNone(mq("NOT kormány"))
+        self.assertEqual(mq("NOT kormány Tisza"), '"tisza"')
+        self.assertEqual(mq("Tisza (NOT kormány)"), '"tisza"')
+        self.assertEqual(mq("NOT (kormány OR párt) Tisza"), '"tisza"')
+        self.assertEqual(mq("Tisza OR NOT kormány"), '"tisza"')
+
+    def test_match_query_on_fts(self):
+        conn = sqlite3.connect(":memory:")
+        hu_normalizer.register(conn)
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        for text in ("A kormánnyal tárgyalt a Tisza Párt.", "A Tisza áradása.", "A kormány ülése."):
+            conn.execute("INSERT INTO t (x) VALUES (hu_norm(?))", (text,))
+
+        def hits(q):
+            match = hu_normalizer.match_query(q)
+            return [] if match is None else [r[0] for r in conn.execute(
+                "SELECT rowid FROM t WHERE t MATCH ? ORDER BY rowid", (match,))]
+
+        self.assertEqual(hits("kormányt"), [1, 3])
+        self.assertEqual(hits("Tisza NOT kormány"), [2])
+        self.assertEqual(hits("NOT kormány"), [])
+        self.assertEqual(hits("NOT kormány Tisza"), [1, 2])
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
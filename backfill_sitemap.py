@@ -19,6 +19,8 @@ import xml.etree.ElementTree as ET
 import httpx
 import trafilatura
 import yaml
+
+from hu_normalizer import register as register_hu_norm
 print(">>> RUNNING:", __file__)
 
 DB_PATH = "news.sqlite"
@@ -166,6 +168,7 @@ def extract_article(url: str) -> str:
 
 def ensure_db(db_path=DB_PATH):
     conn = sqlite3.connect(db_path)
+    register_hu_norm(conn)   # az items_fts triggerei hu_norm()-ot hívnak
     # tábla az rss_filter.py sémájához igazodva
     conn.execute("""
         CREATE TABLE IF NOT EXISTS items(
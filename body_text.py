@@ -0,0 +1,36 @@
+# body_text.py
+"""
+A news_crawler Repository DB-k body_text(content, content_z, dict_id) SQL
+függvénye a gyökér scriptek nyers sqlite3 kapcsolataihoz.
+
+A Repository DB items view-ja és FTS triggerei ezt hívják (zstd-vel
+tömörített body-k), nélküle már egy SELECT content FROM items is
+"no such function: body_text" hibát ad. A connect után:
+
+    conn = sqlite3.connect(args.db)
+    register_body_text(conn)
+
+A régi (items TABLE-ös) DB-ken is ártalmatlan. A kódoló maga a csomag
+body_codec.py-ja (nincs csomagon belüli importja), innen töltjük be.
+"""
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+BODY_CODEC_PATH = Path(__file__).with_name("NewsCrawlerMVP") / "news-crawler-mvp" / "src" / "news_crawler" / "body_codec.py"
+
+_module = None
+
+
+def _body_codec():
+    global _module
+    if _module is None:
+        spec = importlib.util.spec_from_file_location("news_crawler_body_codec", BODY_CODEC_PATH)
+        _module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(_module)
+    return _module
+
+
+def register(conn: sqlite3.Connection) -> None:
+    """body_text() SQL függvény regisztrálása (mint a hu_normalizer.register)."""
+    _body_codec().register(conn)
@@ -2,9 +2,11 @@
 import argparse
 import sqlite3
 from pathlib import Path
-import pandas as pd
 import re, html
 
+from body_text import register as register_body_text
+from streaming_export import XlsxStreamWriter, iter_query, print_progress, write_csv
+
 DB_PATH = "news.sqlite"
 
 TAG_RE = re.compile(r"<[^>]+>")
@@ -21,7 +23,7 @@ def clean_html(text: str) -> str:
     txt = WS_RE.sub(" ", txt).strip()
     return txt
 
-def fetch_df(conn, label=None, cluster=None, limit=None, order="time"):
+def build_query(label=None, cluster=None, limit=None, order="time"):
     base = """
         SELECT 
             id,
@@ -45,11 +47,23 @@ def fetch_df(conn, label=None, cluster=None, limit=None, order="time"):
         base += " WHERE " + " AND ".join(where)
     base += " ORDER BY " + ("label_score DESC" if order == "score" else "ts DESC")
     if limit:
-        base += f" LIMIT {limit}"
+        base += f" LIMIT {int(limit)}"
+    return base, args
 
-    rows = conn.execute(base, args).fetchall()
-    cols = ["id","date","title","link","label","label_score","cluster_id","matched_tags","source","content"]
-    return pd.DataFrame(rows, columns=cols)
+def iter_rows(conn, args):
+    """Soronként tisztított export-sorok (chunkolt cursor, nincs DataFrame a teljes eredményre)."""
+    sql, params = build_query(args.label, args.cluster, args.limit, args.order)
+    for rid, date, title, link, label, score, cid, tags, source, content in iter_query(conn, sql, params):
+        # HTML tisztítás + snippet
+        if args.strip_html:
+            clean = clean_html(content or "")
+        else:
+            # csak a sortöréseket normalizáljuk, hogy ne nyúljon szét Excelben
+            clean = WS_RE.sub(" ", content or "").strip()
+        row = [rid, date, title, link, label, score, cid, tags, source, clean[:args.snippet]]
+        if not args.no_content:
+            row.append(clean)  # megtartjuk a tisztított teljes szöveget is
+        yield row
 
 def main():
     ap = argparse.ArgumentParser(description="Embeddingelt cikkek táblázatos exportja (CSV/XLSX, HTML-mentesítés)")
@@ -65,41 +79,39 @@ def main():
     ap.add_argument("--no-content", action="store_true", help="Ne exportálja a teljes content oszlopot, csak a snippetet")
     args = ap.parse_args()
 
-    conn = sqlite3.connect(args.db)
-    df = fetch_df(conn, args.label, args.cluster, args.limit, args.order)
-    if df.empty:
-        print("⚠️ Nincs találat a megadott szűrőkre."); return
-
-    # HTML tisztítás + snippet
-    if args.strip_html:
-        df["content_clean"] = df["content"].fillna("").map(clean_html)
-    else:
-        # csak a sortöréseket normalizáljuk, hogy ne nyúljon szét Excelben
-        df["content_clean"] = df["content"].fillna("").str.replace(r"\s+", " ", regex=True).str.strip()
-
-    df["snippet"] = df["content_clean"].str.slice(0, args.snippet)
-
     # oszlop-sorrend
     cols = ["id","date","title","link","label","label_score","cluster_id","matched_tags","source","snippet"]
     if not args.no_content:
-        cols += ["content_clean"]  # megtartjuk a tisztított teljes szöveget is
-    df = df[cols]
+        cols += ["content_clean"]
+
+    out = Path(args.export)
+    if out.suffix.lower() not in (".csv", ".xlsx"):
+        print("❌ Ismeretlen kiterjesztés. Használd .csv vagy .xlsx kiterjesztést."); return
 
-    out = Path(args.export); out.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(args.db)
+    register_body_text(conn)   # items view / FTS triggerek: body_text()
+    try:
+        if out.suffix.lower() == ".csv":
+            n = write_csv(out, cols, iter_rows(conn, args), delimiter=args.delimiter, progress=print_progress)
+            msg = f"✅ CSV export kész: {out}  (sep='{args.delimiter}', {n} sor)"
+        else:
+            try:
+                xw = XlsxStreamWriter(str(out), progress=print_progress)
+            except RuntimeError as e:
+                print(f"ℹ️  {e}"); return
+            # konstans memória: soronként íródik, 1M sor felett új munkalapon folytatódik
+            with xw:
+                n = xw.write_sheet("export", cols, iter_rows(conn, args))
+            msg = f"✅ Excel export kész: {out}  ({n} sor)"
+    finally:
+        conn.close()
 
-    if out.suffix.lower() == ".csv":
-        df.to_csv(out, index=False, sep=args.delimiter, encoding="utf-8-sig")
-        print(f"✅ CSV export kész: {out}  (sep='{args.delimiter}')")
-    elif out.suffix.lower() == ".xlsx":
-        try:
-            import openpyxl  # pip install openpyxl
-        except ImportError:
-            print("ℹ️  Az .xlsx exporthoz telepítsd: pip install openpyxl")
-        # ne hagyjunk sortörést az értékekben, így Excel nem fog „felmagasodni”
-        df.to_excel(out, index=False)
-        print(f"✅ Excel export kész: {out}")
-    else:
-        print("❌ Ismeretlen kiterjesztés. Használd .csv vagy .xlsx kiterjesztést.")
+    if n == 0:
+        # csak fejléc lenne benne -> ne maradjon félrevezető, üres export
+        out.unlink(missing_ok=True)
+        print("⚠️ Nincs találat a megadott szűrőkre, nem készült export.")
+        return
+    print(msg)
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,17 @@
 
 # fts_migrate.py
+import argparse
 import sqlite3
+import time
 from pathlib import Path
 
+from hu_normalizer import register
+
 DB_PATH = "news.sqlite"
 
+# A title/content már hu_norm()-mal normalizálva érkezik (lemma / levágott tő,
+# ékezet nélkül), a tokenizernek csak szavakra kell bontania. A régi 'porter'
+# (angol stemmer) magyar ragozott alakokat nem vont össze.
 SCHEMA_FTS = """
 CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
     title, 
@@ -13,61 +20,74 @@ CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
     ts UNINDEXED, 
     item_id UNINDEXED,
     content='',
-    tokenize = 'porter'
+    tokenize = 'unicode61 remove_diacritics 2'
 );
 """
 
+# A triggerek a hu_norm() SQL függvényt hívják: minden kapcsolatnak, ami az
+# items-be ír, hu_normalizer.register(conn)-t kell hívnia.
 TRIGGER_INSERT = """
 CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
   INSERT INTO items_fts(rowid, title, content, link, ts, item_id)
-  VALUES (new.rowid, new.title, new.content, new.link, new.ts, new.id);
+  VALUES (new.rowid, hu_norm(new.title), hu_norm(new.content), new.link, new.ts, new.id);
 END;
 """
 
+# contentless FTS5 táblán nincs UPDATE: 'delete' a régi (ugyanúgy normalizált) értékekkel + új sor
 TRIGGER_UPDATE = """
-CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
-  UPDATE items_fts SET 
-    title = new.title,
-    content = new.content,
-    link = new.link,
-    ts = new.ts,
-    item_id = new.id
-  WHERE rowid = new.rowid;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF title, content, link, ts, id ON items BEGIN
+  INSERT INTO items_fts(items_fts, rowid, title, content, link, ts, item_id)
+  VALUES ('delete', old.rowid, hu_norm(old.title), hu_norm(old.content), old.link, old.ts, old.id);
+  INSERT INTO items_fts(rowid, title, content, link, ts, item_id)
+  VALUES (new.rowid, hu_norm(new.title), hu_norm(new.content), new.link, new.ts, new.id);
 END;
 """
 
 TRIGGER_DELETE = """
 CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
-  DELETE FROM items_fts WHERE rowid = old.rowid;
+  INSERT INTO items_fts(items_fts, rowid, title, content, link, ts, item_id)
+  VALUES ('delete', old.rowid, hu_norm(old.title), hu_norm(old.content), old.link, old.ts, old.id);
 END;
 """
 
 def rebuild(conn):
+    # a lemma-tábla cseréje után is ezt kell futtatni: a contentless 'delete'
+    # csak akkor pontos, ha a régi sort ugyanaz a normalizálás indexelte
+    register(conn)
     cur = conn.cursor()
     cur.execute("DROP TABLE IF EXISTS items_fts")
     conn.commit()
     cur.execute(SCHEMA_FTS)
     conn.commit()
     # bulk load existing
+    t0 = time.perf_counter()
     cur.execute("""
         INSERT INTO items_fts(rowid, title, content, link, ts, item_id)
-        SELECT rowid, title, content, link, ts, id FROM items
+        SELECT rowid, hu_norm(title), hu_norm(content), link, ts, id FROM items
     """)
+    cur.execute("INSERT INTO items_fts(items_fts) VALUES('optimize')")
     conn.commit()
+    print(f"[FTS] Indexelés: {time.perf_counter() - t0:.1f} s")
 
 def ensure_triggers(conn):
     cur = conn.cursor()
+    # a régi (porter) triggerek lecserélése
+    for name in ("items_ai", "items_au", "items_ad"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
     cur.execute(TRIGGER_INSERT)
     cur.execute(TRIGGER_UPDATE)
     cur.execute(TRIGGER_DELETE)
     conn.commit()
 
 def main():
-    p = Path(DB_PATH)
+    ap = argparse.ArgumentParser(description="items_fts újraépítése magyar normalizálással (hu_norm)")
+    ap.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args()
+    p = Path(args.db)
     if not p.exists():
-        print(f"❌ Database not found: {DB_PATH}")
+        print(f"❌ Database not found: {args.db}")
         return
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(args.db)
     try:
         rebuild(conn)
         ensure_triggers(conn)
@@ -0,0 +1,187 @@
+# fuzzy_index.py
+"""
+Fuzzy (név- és kifejezés-variációs) keresés az items tábla felett, rapidfuzz-zal.
+
+A régi history_search.fuzzy_filter soronként hívta a fuzz.partial_ratio-t, és
+minden sorra újra összerakta a "cím + snippet" stringet. Itt:
+
+  - a normalizált (kisbetűs, ékezet nélküli) cím és cím+snippet egyszer készül
+    el, az items_norm segédtáblába (triggerek törlik, ha a cikk változik),
+  - a pontozás kötegelt: rapidfuzz.process.cdist(workers=-1), C++-ban, minden
+    magon, a küszöb alatti párokat korán eldobva,
+  - FuzzyTitleIndex: memóriabeli címindex a "fuzzy-first" módhoz, ami az
+    FTS által nem talált (pl. ragozott / elírt nevű) cikkeket is hozza.
+
+    ensure_norm_table(conn)
+    idx = FuzzyTitleIndex(conn, ts_from, ts_to)
+    idx.search("Lázár János", limit=200, thresh=80)   # [(rowid, score), ...]
+"""
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from rapidfuzz import fuzz, process  # pip install rapidfuzz
+except ImportError:
+    fuzz = process = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SNIPPET_CHARS = 400                  # ugyanannyi, mint a history_search snippet-je
+DEFAULT_CHUNK = 5000
+
+SCHEMA_NORM = """
+CREATE TABLE IF NOT EXISTS items_norm (
+    rowid      INTEGER PRIMARY KEY,   -- = items.rowid
+    norm_title TEXT NOT NULL,
+    norm_text  TEXT NOT NULL          -- cím + tartalom első SNIPPET_CHARS karaktere
+);
+"""
+
+# változott / törölt cikk normalizált alakja elavul -> a következő ensure újraszámolja
+TRIGGERS_NORM = [
+    """
+    CREATE TRIGGER IF NOT EXISTS items_norm_au AFTER UPDATE OF title, content ON items BEGIN
+      DELETE FROM items_norm WHERE rowid = old.rowid;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_norm_ad AFTER DELETE ON items BEGIN
+      DELETE FROM items_norm WHERE rowid = old.rowid;
+    END;
+    """,
+]
+
+
+def _require():
+    if process is None or np is None:
+        raise RuntimeError("A fuzzy kereséshez telepítsd: pip install rapidfuzz numpy")
+
+
+# NFKD után a kombináló ékezetek (U+0300–U+036F) egy regexszel tűnnek el: mindkét
+# lépés C-ben fut, 100k+ soron nagyságrendekkel gyorsabb a karakterenkénti szűrésnél
+_COMBINING_RE = re.compile("[\u0300-\u036f]+")
+
+
+def fold(text: Optional[str]) -> str:
+    """Kisbetű, ékezetek nélkül, szóközök összevonva: 'Lázár  Jánost' -> 'lazar janost'."""
+    if not text:
+        return ""
+    return " ".join(_COMBINING_RE.sub("", unicodedata.normalize("NFKD", text.lower())).split())
+
+
+def norm_text(title: Optional[str], snippet: Optional[str]) -> str:
+    return fold(f"{title or ''} {snippet or ''}")
+
+
+def ensure_norm_table(conn: sqlite3.Connection, chunk_size: int = DEFAULT_CHUNK) -> int:
+    """
+    items_norm létrehozása + a hiányzó sorok kitöltése (inkrementális: csak az új /
+    módosult cikkek). Visszatér: hány sor lett (újra)számolva.
+    """
+    conn.execute(SCHEMA_NORM)
+    for trig in TRIGGERS_NORM:
+        conn.execute(trig)
+    conn.commit()
+
+    cur = conn.execute(f"""
+        SELECT i.rowid, i.title, substr(i.content, 1, {SNIPPET_CHARS})
+        FROM items i
+        WHERE NOT EXISTS (SELECT 1 FROM items_norm n WHERE n.rowid = i.rowid)
+    """)
+    pending = []
+    total = 0
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            break
+        pending.extend((rid, fold(title), norm_text(title, snippet)) for rid, title, snippet in rows)
+    # a SELECT cursor lezárása után írunk (ugyanazon a kapcsolaton)
+    for i in range(0, len(pending), chunk_size):
+        conn.executemany(
+            "INSERT OR REPLACE INTO items_norm(rowid, norm_title, norm_text) VALUES (?, ?, ?)",
+            pending[i:i + chunk_size],
+        )
+        conn.commit()
+        total += len(pending[i:i + chunk_size])
+    if total:
+        print(f"[FUZZY] items_norm: {total} sor normalizálva")
+    return total
+
+
+def fuzzy_scores(query: str, choices: Sequence[str], *, thresh: int = 0, scorer=None) -> "np.ndarray":
+    """
+    A (normalizált) query partial_ratio pontszáma minden choice-ra, egyetlen
+    cdist hívással (workers=-1: minden mag). A küszöb alatti pontszám 0.
+    """
+    _require()
+    if not choices:
+        return np.zeros(0, dtype=np.uint8)
+    m = process.cdist(
+        [fold(query)], choices,
+        scorer=scorer or fuzz.partial_ratio,
+        score_cutoff=thresh,
+        dtype=np.uint8,
+        workers=-1,
+    )
+    return m[0]
+
+
+def top_hits(scores: "np.ndarray", *, thresh: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+    """(pozíció, pontszám) a küszöb felettiekre, pontszám szerint csökkenő, stabil sorrendben."""
+    idx = np.flatnonzero(scores >= thresh)
+    idx = idx[np.argsort(-scores[idx].astype(np.int16), kind="stable")]
+    if limit is not None:
+        idx = idx[:limit]
+    return [(int(i), int(scores[i])) for i in idx]
+
+
+class FuzzyTitleIndex:
+    """Memóriabeli (rowid, normalizált cím) index egy időablakra, a fuzzy-first keresésekhez."""
+
+    def __init__(self, conn: sqlite3.Connection, ts_from: Optional[int] = None, ts_to: Optional[int] = None):
+        _require()
+        where, args = [], []
+        if ts_from is not None:
+            where.append("i.ts >= ?")
+            args.append(ts_from)
+        if ts_to is not None:
+            where.append("i.ts < ?")
+            args.append(ts_to)
+        t0 = time.perf_counter()
+        rows = conn.execute(
+            "SELECT n.rowid, n.norm_title FROM items_norm n JOIN items i ON i.rowid = n.rowid"
+            + (f" WHERE {' AND '.join(where)}" if where else ""),
+            args,
+        ).fetchall()
+        self.rowids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        self.titles: List[str] = [r[1] for r in rows]
+        print(f"[FUZZY] Címindex: {len(self.titles)} cím ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def search(self, query: str, *, limit: int = 200, thresh: int = 80) -> List[Tuple[int, int]]:
+        """Top-limit (items.rowid, pontszám) a címek közül."""
+        t0 = time.perf_counter()
+        hits = top_hits(fuzzy_scores(query, self.titles, thresh=thresh), thresh=thresh, limit=limit)
+        print(f"[FUZZY] {len(self.titles)} cím pontozva: {len(hits)} találat "
+              f"({(time.perf_counter() - t0) * 1000:.0f} ms)")
+        return [(int(self.rowids[i]), score) for i, score in hits]
+
+
+def norm_texts_for(conn: sqlite3.Connection, rowids: Iterable[int]) -> dict:
+    """rowid -> items_norm.norm_text (ami még nincs normalizálva, kimarad)."""
+    rowids = list(rowids)
+    out = {}
+    for i in range(0, len(rowids), 500):
+        chunk = rowids[i:i + 500]
+        out.update(conn.execute(
+            f"SELECT rowid, norm_text FROM items_norm WHERE rowid IN ({', '.join('?' * len(chunk))})", chunk
+        ).fetchall())
+    return out
@@ -3,16 +3,28 @@
 import argparse, sqlite3, csv, sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from rapidfuzz import fuzz
+
+from fuzzy_index import FuzzyTitleIndex, ensure_norm_table, fuzzy_scores, norm_text, norm_texts_for, top_hits
+from body_text import register as register_body_text
+from hu_normalizer import is_hu_index, match_query
 
 DB_PATH = "news.sqlite"
 
+ROW_COLS = """i.title, i.link, i.label, round(i.label_score,3) as label_score, datetime(i.ts,'unixepoch') as date,
+           {rank} as rank, i.cluster_id, substr(i.content,1,400) as snippet, i.rowid"""
+
 def to_ts(dt): return int(dt.timestamp())
 
 def parse_date(s):
     return int(datetime.fromisoformat(s).timestamp())
 
 def fts_query(conn, q, ts_from=None, ts_to=None, limit=200, order="bm25"):
+    """Sorok: (title, link, label, label_score, date, rank, cluster_id, snippet, rowid)."""
+    # hu_norm-os index (fts_migrate.py): a kérdés is ugyanazon a normalizáláson megy át
+    if is_hu_index(conn):
+        q = match_query(q)
+        if q is None:
+            return []
     args = []
     date_filter = ""
     if ts_from is not None:
@@ -23,8 +35,7 @@ def fts_query(conn, q, ts_from=None, ts_to=None, limit=200, order="bm25"):
         args.append(ts_to)
 
     sql = f"""
-    SELECT i.title, i.link, i.label, round(i.label_score,3) as label_score, datetime(i.ts,'unixepoch') as date, 
-           bm25(items_fts) as rank, i.cluster_id, substr(i.content,1,400) as snippet
+    SELECT {ROW_COLS.format(rank="bm25(items_fts)")}
     FROM items i
     JOIN items_fts ON items_fts.rowid = i.rowid
     WHERE items_fts MATCH ?
@@ -34,15 +45,60 @@ def fts_query(conn, q, ts_from=None, ts_to=None, limit=200, order="bm25"):
     """
     return conn.execute(sql, [q, *args, limit]).fetchall()
 
-def fuzzy_filter(rows, q, thresh=70):
-    out = []
-    for r in rows:
-        title, link, label, score, date, rank, cid, snippet = r
-        s = f"{title} {snippet or ''}"
-        if fuzz.partial_ratio(q, s) >= thresh:
-            out.append(r)
+def rows_by_rowid(conn, rowids):
+    """Ugyanolyan sorok rowid alapján (a fuzzy-first, FTS-ből hiányzó találatokhoz); rank = NULL."""
+    out = {}
+    rowids = list(rowids)
+    for i in range(0, len(rowids), 500):
+        chunk = rowids[i:i + 500]
+        for r in conn.execute(
+            f"SELECT {ROW_COLS.format(rank='NULL')} FROM items i WHERE i.rowid IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ):
+            out[r[8]] = r
     return out
 
+def fuzzy_filter(rows, q, thresh=70, norm=None, rerank=True):
+    """
+    Fuzzy utószűrés: [(sor, pontszám)], rerank=True esetén pontszám szerint
+    (egyezésnél az eredeti sorrend), különben az eredeti sorrendben.
+    norm: rowid -> előre normalizált cím+snippet (items_norm); ha nincs, helyben készül.
+    Egyetlen kötegelt cdist hívás, nem soronkénti partial_ratio.
+    """
+    norm = norm or {}
+    texts = [norm.get(r[8]) if len(r) > 8 else None for r in rows]
+    texts = [t if t is not None else norm_text(r[0], r[7]) for t, r in zip(texts, rows)]
+    hits = top_hits(fuzzy_scores(q, texts, thresh=thresh), thresh=thresh)
+    if not rerank:
+        hits.sort()
+    return [(rows[i], score) for i, score in hits]
+
+def fuzzy_first(conn, q, ts_from, ts_to, limit, thresh, candidates):
+    """
+    Fuzzy-first: a címindexből jövő jelöltek + az FTS jelöltjei (cím+snippet alapján pontozva),
+    pontszám szerint összefésülve. Így a ragozott / elírt nevű címek is megjönnek.
+    """
+    try:
+        fts_rows = fts_query(conn, q, ts_from, ts_to, candidates)
+    except sqlite3.OperationalError as e:
+        # pl. FTS szintaxis hiba: a címindex akkor is ad találatot
+        print(f"⚠️ FTS hiba, csak címindex: {e}")
+        fts_rows = []
+    scored = {r[8]: (r, score) for r, score in
+              fuzzy_filter(fts_rows, q, thresh, norm_texts_for(conn, (r[8] for r in fts_rows)))}
+
+    title_hits = FuzzyTitleIndex(conn, ts_from, ts_to).search(q, limit=candidates, thresh=thresh)
+    missing = rows_by_rowid(conn, (rid for rid, _ in title_hits if rid not in scored))
+    for rid, score in title_hits:
+        if rid in scored:
+            r, old = scored[rid]
+            scored[rid] = (r, max(old, score))
+        elif rid in missing:
+            scored[rid] = (missing[rid], score)
+
+    ranked = sorted(scored.values(), key=lambda x: -x[1])   # stabil: FTS sorrend előbb
+    return [r for r, _ in ranked[:limit]]
+
 def export_csv(rows, path):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     import csv
@@ -63,10 +119,16 @@ def main():
     ap.add_argument("--limit", type=int, default=200)
     ap.add_argument("--order", choices=["bm25","time"], default="bm25")
     ap.add_argument("--fuzzy", action="store_true", help="Fuzzy utószűrés (név- és kifejezés-variációkhoz)")
+    ap.add_argument("--fuzzy-first", action="store_true",
+                    help="Fuzzy keresés a címindexben is (az FTS által nem talált variációkhoz)")
+    ap.add_argument("--thresh", type=int, default=70, help="Fuzzy küszöb (0-100, alapértelmezés: 70)")
+    ap.add_argument("--candidates", type=int, default=5000,
+                    help="Fuzzy módban ennyi FTS jelöltből szűr / rangsorol (alapértelmezés: 5000)")
     ap.add_argument("--export", help="CSV export útvonala (pl. export/lazar_10ev.csv)")
     args = ap.parse_args()
 
     conn = sqlite3.connect(args.db)
+    register_body_text(conn)   # items view / FTS triggerek: body_text()
 
     if args.date_from or args.date_to:
         ts_from = parse_date(args.date_from) if args.date_from else None
@@ -81,10 +143,20 @@ def main():
         except ValueError:
             ts_from = to_ts(now - timedelta(days=365*args.years))
 
-    rows = fts_query(conn, args.q, ts_from, ts_to, args.limit, args.order)
+    if args.fuzzy or args.fuzzy_first:
+        ensure_norm_table(conn)   # csak az új / módosult cikkeket normalizálja
+
+    if args.fuzzy_first:
+        rows = fuzzy_first(conn, args.q, ts_from, ts_to, args.limit, args.thresh, max(args.candidates, args.limit))
+    elif args.fuzzy:
+        rows = fts_query(conn, args.q, ts_from, ts_to, max(args.candidates, args.limit), args.order)
+        norm = norm_texts_for(conn, (r[8] for r in rows))
+        # bm25 mellett fuzzy pontszám szerint rangsorol, time mellett marad az időrend
+        rows = [r for r, _ in fuzzy_filter(rows, args.q, args.thresh, norm, rerank=args.order == "bm25")][:args.limit]
+    else:
+        rows = fts_query(conn, args.q, ts_from, ts_to, args.limit, args.order)
 
-    if args.fuzzy:
-        rows = fuzzy_filter(rows, args.q)
+    rows = [r[:8] for r in rows]   # rowid csak belső használatra
 
     if not rows:
         print("⚠️ Nincs találat.")
@@ -0,0 +1,420 @@
+# hu_normalizer.py
+"""
+Magyar szóalak-normalizálás az items_fts indexhez (és a keresőkérdésekhez).
+
+A porter (angol) stemmer magyar szövegen semmit sem von össze: a "kormánynak",
+"kormányt", "kormánnyal" külön term marad. Itt minden szó:
+
+  1) kisbetűsítve kikeresődik a lemma-táblában (forma -> lemma, pl. "lovat" -> "ló"),
+  2) a lemmán / a táblában nem szereplő alakon toldalék-levágás (esetragok,
+     többes szám, -val/-vel hasonulás: "kormánnyal" -> "kormány"); a lemmán
+     is, hogy az alapalak és a táblából jövő alak ugyanoda fusson,
+  3) végül ékezet nélkül kerül az indexbe ("kormany").
+
+Az FTS5 tokenizert Pythonból nem lehet regisztrálni, ezért a normalizálás egy
+SQL függvény (hu_norm), amit a fts_migrate.py triggerei hívnak; a keresőkérdés
+ugyanezen megy át (match_query). Minden kapcsolatnak, ami az items táblába ír,
+register(conn)-t kell hívnia.
+
+A lemma-tábla egy rendezett, memóriába mappelt bináris fájl (bináris keresés,
+nem kell betölteni), huspacy-val vagy egy form<TAB>lemma szótárból építhető:
+
+    python hu_normalizer.py build --tsv hu_forms.tsv --out hu_lemmas.bin
+    python hu_normalizer.py build --huspacy --db news.sqlite --out hu_lemmas.bin
+    python hu_normalizer.py bench --db news.sqlite --sample 20000
+"""
+import argparse
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import time
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+LEMMA_PATH = Path(os.environ.get("HU_LEMMAS_PATH", Path(__file__).with_name("hu_lemmas.bin")))
+MAGIC = b"HULEMMA1"
+_HEADER = struct.Struct("<8sI")      # magic, rekordszám
+_OFFSET = struct.Struct("<I")        # rekord eleje (abszolút fájl-offset)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+# keresőkérdés: "kifejezés"[*], zárójel, szó[*] (minden más írásjel elválasztó)
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"(\*?)|(\()|(\))|(\w+)(\*?)', re.UNICODE)
+_COMBINING_RE = re.compile("[\u0300-\u036f]+")
+FTS_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def fold(text: str) -> str:
+    """Ékezetek nélkül, kisbetűvel: 'Kormány' -> 'kormany'."""
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text.lower()))
+
+
+# ---------------------------------------------------------------------------
+# Memóriába mappelt lemma-tábla
+# ---------------------------------------------------------------------------
+
+class LemmaTable:
+    """
+    Fájlformátum: MAGIC, N, N darab uint32 offset, majd "forma\\tlemma\\n"
+    rekordok a forma UTF-8 bájtjai szerint rendezve. A keresés bináris
+    keresés közvetlenül a mmap-en, a fájl nem töltődik be a memóriába.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._f = open(self.path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Nem lemma-tábla: {self.path}")
+        self._base = _HEADER.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, i: int) -> Tuple[bytes, int]:
+        off = _OFFSET.unpack_from(self._mm, self._base + i * _OFFSET.size)[0]
+        tab = self._mm.find(b"\t", off)
+        return self._mm[off:tab], tab + 1
+
+    def lookup(self, form: str) -> Optional[str]:
+        key = form.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, val_off = self._record(mid)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return self._mm[val_off:self._mm.find(b"\n", val_off)].decode("utf-8")
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+        self._f.close()
+
+
+def build_lemma_table(pairs: Iterable[Tuple[str, str]], out_path: Path) -> int:
+    """(forma, lemma) párokból rendezett bináris tábla; ütközésnél az első pár nyer."""
+    table = {}
+    for form, lemma in pairs:
+        form, lemma = form.strip().lower(), lemma.strip().lower()
+        if form and lemma and form != lemma and "\t" not in form + lemma and "\n" not in form + lemma:
+            table.setdefault(form.encode("utf-8"), lemma.encode("utf-8"))
+    keys = sorted(table)
+    out_path = Path(out_path)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(keys)))
+        off = _HEADER.size + _OFFSET.size * len(keys)
+        for k in keys:
+            f.write(_OFFSET.pack(off))
+            off += len(k) + len(table[k]) + 2
+        if off >= 1 << 32:
+            raise ValueError("A lemma-tábla túl nagy (4 GB offset-limit)")
+        for k in keys:
+            f.write(k + b"\t" + table[k] + b"\n")
+    os.replace(tmp, out_path)
+    return len(keys)
+
+
+# ---------------------------------------------------------------------------
+# Toldalék-levágás (fallback, ha a szó nincs a táblában)
+# ---------------------------------------------------------------------------
+
+MIN_STEM = 3
+MAX_STRIPS = 4
+
+# esetragok + többes szám / birtokos jelek, hosszabbtól a rövidebb felé
+SUFFIXES = tuple(sorted({
+    "ként", "ból", "ből", "ról", "ről", "tól", "től", "hoz", "hez", "höz",
+    "nak", "nek", "ban", "ben", "nál", "nél", "val", "vel", "ért", "jai", "jei",
+    "ba", "be", "ra", "re", "vá", "vé", "on", "en", "ön", "ig",
+    "at", "et", "ot", "öt", "ok", "ek", "ök", "ak", "ai", "ei", "t", "k",
+}, key=lambda suf: (-len(suf), suf)))
+# ezek csak magánhangzó után ilyen alakúak (mássalhangzó után hasonulnak / kötőhangzót kapnak)
+AFTER_VOWEL_ONLY = {"val", "vel", "vá", "vé", "k"}
+
+# -val/-vel, -vá/-vé mássalhangzó után: a v hasonul, a tő utolsó hangja megkettőződik
+_DIGRAPHS = ("ny", "sz", "gy", "ty", "ly", "zs", "cs")
+_VOWELS = set("aáeéiíoóöőuúüű")
+
+
+def _undouble(stem: str) -> Optional[str]:
+    """'kormánny' -> 'kormány', 'házz' -> 'ház'; None, ha a tő vége nem kettőzött."""
+    for dg in _DIGRAPHS:
+        if stem.endswith(dg[0] + dg):
+            return stem[:-1 - len(dg)] + dg
+    if len(stem) >= 2 and stem[-1] == stem[-2] and stem[-1] not in _VOWELS:
+        return stem[:-1]
+    return None
+
+
+def _strip_once(word: str) -> Optional[str]:
+    for suf in ("al", "el", "á", "é"):
+        if word.endswith(suf):
+            base = _undouble(word[:-len(suf)])
+            if base is not None and len(base) >= MIN_STEM:
+                return base
+    for suf in SUFFIXES:
+        if word.endswith(suf) and len(word) - len(suf) >= MIN_STEM:
+            if suf in AFTER_VOWEL_ONLY and word[-len(suf) - 1] not in _VOWELS:
+                continue
+            return word[:-len(suf)]
+    return None
+
+
+def strip_suffixes(word: str) -> str:
+    """
+    Toldalékok ismételt levágása, amíg lehet (a tő legalább MIN_STEM betű).
+
+    Az ismétlés miatt az alapalak és a toldalékos alak ugyanoda fut akkor is, ha
+    az alapalak vége maga is toldaléknak látszik: "párt" és "pártot" -> "pár",
+    "Budapest" és "Budapesten" -> "budapes". Néhány túlvágott ütközés ára a
+    jobb felidézés; a pontos alakokat a lemma-tábla adja.
+    """
+    if word.isdigit():
+        return word
+    for _ in range(MAX_STRIPS):
+        stripped = _strip_once(word)
+        if stripped is None:
+            break
+        word = stripped
+    return word
+
+
+# ---------------------------------------------------------------------------
+# Normalizáló (index + query oldal ugyanez)
+# ---------------------------------------------------------------------------
+
+_table: Optional[LemmaTable] = None
+_table_loaded = False
+
+
+def lemma_table() -> Optional[LemmaTable]:
+    """A LEMMA_PATH tábla (lustán nyitva); None, ha nincs ilyen fájl."""
+    global _table, _table_loaded
+    if not _table_loaded:
+        _table_loaded = True
+        if LEMMA_PATH.exists():
+            _table = LemmaTable(LEMMA_PATH)
+            print(f"[HU] Lemma-tábla: {LEMMA_PATH} ({len(_table)} alak)")
+    return _table
+
+
+@lru_cache(maxsize=200_000)   # a szóeloszlás Zipf-szerű: a találati arány nagyon magas
+def normalize_word(word: str) -> str:
+    """Egy (kisbetűs) szóalak index-kulcsa: lemma vagy levágott tő, ékezet nélkül."""
+    table = lemma_table()
+    lemma = table.lookup(word) if table is not None else None
+    return fold(strip_suffixes(lemma if lemma is not None else word))
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Szöveg -> szóközzel elválasztott index-kulcsok (ezt kapja az items_fts)."""
+    if not text:
+        return ""
+    return " ".join(map(normalize_word, _WORD_RE.findall(text.lower())))
+
+
+def match_query(q: str) -> Optional[str]:
+    """
+    Keresőkifejezés -> FTS5 MATCH ugyanazzal a normalizálással, mint az index.
+
+      - a nagybetűs AND / OR / NOT operátorok és a zárójelek megmaradnak,
+      - "Magyar Péter" egy kifejezés marad, szavanként normalizálva ("magyar peter"),
+      - kormány* / Orb* prefix marad, de a tő nem vágódik le ("kormany"*, "orb"*),
+      - minden más szó idézőjelbe kerül, a többi írásjel elválasztó.
+
+    Az üres zárójel, a lógó operátor és a párosítatlan zárójel kimarad / lezáródik.
+    Az FTS5 NOT-ja kétoperandusú: a bal oldal nélküli NOT (a kérdés vagy a
+    zárójel elején, operátor után) a kizárt taggal / csoporttal együtt kimarad –
+    a kérdés így bővül, de sosem fordul meg ("NOT kormány" -> None).
+    """
+    parts: List[str] = []
+    depth = 0
+    negate = False      # bal oldal nélküli NOT: a következő tag / csoport kimarad
+    skip_depth = 0      # a kihagyott csoporton belüli zárójelmélység
+    for m in _QUERY_TOKEN_RE.finditer(q or ""):
+        phrase, phrase_star, lpar, rpar, word, star = m.groups()
+        if skip_depth:
+            skip_depth += 1 if lpar else -1 if rpar else 0
+            continue
+        if lpar:
+            if negate:
+                negate = False
+                skip_depth = 1
+                continue
+            if parts and parts[-1] not in FTS_OPERATORS and parts[-1] != "(":
+                parts.append("AND")   # az FTS5 csoport előtt nem ismer implicit AND-et
+            parts.append("(")
+            depth += 1
+            continue
+        if rpar:
+            negate = False
+            if not depth:
+                continue
+            while parts[-1] in FTS_OPERATORS:
+                parts.pop()
+            if parts[-1] == "(":
+                parts.pop()   # üres csoport
+            else:
+                parts.append(")")
+            depth -= 1
+            continue
+        if word is not None and not star and word in FTS_OPERATORS:
+            if parts and parts[-1] not in FTS_OPERATORS and parts[-1] != "(":
+                parts.append(word)
+            elif word == "NOT":
+                negate = True
+            continue
+        if phrase is not None and not _WORD_RE.search(phrase):
+            continue
+        if negate:
+            negate = False
+            continue
+        if parts and parts[-1] == ")":
+            parts.append("AND")
+        if phrase is not None:
+            words = _WORD_RE.findall(phrase.lower())
+            keys = [normalize_word(w) for w in words[:-1]]
+            keys.append(fold(words[-1]) if phrase_star else normalize_word(words[-1]))
+            parts.append('"%s"%s' % (" ".join(keys), phrase_star))
+        else:
+            parts.append('"%s"%s' % (fold(word) if star else normalize_word(word.lower()), star))
+    while True:
+        while parts and parts[-1] in FTS_OPERATORS:
+            parts.pop()
+        if depth and parts and parts[-1] == "(":
+            parts.pop()
+            depth -= 1
+            continue
+        break
+    parts.extend(")" * depth)
+    return " ".join(parts) or None
+
+
+def register(conn: sqlite3.Connection) -> None:
+    """hu_norm(text) SQL függvény (az items_fts triggerek ezt hívják)."""
+    conn.create_function("hu_norm", 1, normalize_text, deterministic=True)
+
+
+def is_hu_index(conn: sqlite3.Connection) -> bool:
+    """True, ha az items_fts már a hu_norm-os (fts_migrate.py) indexet használja."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'items' AND sql LIKE '%hu_norm(%'"
+    ).fetchone() is not None
+
+
+# ---------------------------------------------------------------------------
+# Tábla építése: form<TAB>lemma szótárból vagy huspacy-val a DB szókincséből
+# ---------------------------------------------------------------------------
+
+def iter_tsv(path: Path) -> Iterator[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) >= 2:
+                yield cols[0], cols[1]
+
+
+def db_vocabulary(db_path: str, min_count: int = 2) -> List[str]:
+    """Az items szókincse (kisbetűs alakok), legalább min_count előfordulással."""
+    counts: Counter = Counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.execute("SELECT title, content FROM items")
+        while True:
+            rows = cur.fetchmany(2000)
+            if not rows:
+                break
+            for title, content in rows:
+                counts.update(_WORD_RE.findall(f"{title or ''} {content or ''}".lower()))
+    finally:
+        conn.close()
+    return [w for w, n in counts.items() if n >= min_count and not w.isdigit()]
+
+
+def iter_huspacy(words: List[str], model: str) -> Iterator[Tuple[str, str]]:
+    try:
+        import spacy  # pip install huspacy (+ a modell: huspacy.download())
+    except ImportError:
+        raise SystemExit("❌ A huspacy build-hez telepítsd: pip install huspacy")
+    nlp = spacy.load(model, disable=["parser", "ner"])
+    for word, doc in zip(words, nlp.pipe(words, batch_size=4096)):
+        if len(doc) == 1:
+            yield word, doc[0].lemma_
+
+
+def bench(db_path: str, sample: int) -> None:
+    """porter vs hu_norm: indexelési sebesség, term-szám és indexméret egy mintán."""
+    src = sqlite3.connect(db_path)
+    rows = src.execute("SELECT title, content FROM items ORDER BY ts DESC LIMIT ?", (sample,)).fetchall()
+    src.close()
+    n_chars = sum(len(t or "") + len(c or "") for t, c in rows)
+    print(f"[HU] Minta: {len(rows)} cikk, {n_chars / 1e6:.1f} M karakter")
+
+    for name, tokenize, expr in (
+        ("porter", "porter", "?"),
+        ("hu_norm", "unicode61 remove_diacritics 2", "hu_norm(?)"),
+    ):
+        normalize_word.cache_clear()
+        mem = sqlite3.connect(":memory:")
+        register(mem)
+        mem.execute(f"CREATE VIRTUAL TABLE f USING fts5(title, content, content='', tokenize='{tokenize}')")
+        mem.execute("CREATE VIRTUAL TABLE v USING fts5vocab(f, 'row')")
+        t0 = time.perf_counter()
+        mem.executemany(f"INSERT INTO f(title, content) VALUES ({expr}, {expr})", rows)
+        mem.commit()
+        mem.execute("INSERT INTO f(f) VALUES('optimize')")
+        dt = time.perf_counter() - t0
+        terms = mem.execute("SELECT COUNT(*) FROM v").fetchone()[0]
+        pages = mem.execute("PRAGMA page_count").fetchone()[0] * mem.execute("PRAGMA page_size").fetchone()[0]
+        print(f"[HU] {name:8s} {dt:6.2f} s  ({len(rows) / dt:,.0f} cikk/s)  "
+              f"{terms:,} term  index: {pages / 1e6:.1f} MB")
+        mem.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Magyar lemma-tábla építése / FTS normalizálás benchmark")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Lemma-tábla építése (mmap bináris)")
+    b.add_argument("--out", default=str(LEMMA_PATH))
+    b.add_argument("--tsv", action="append", default=[], help="form<TAB>lemma szótár (több is megadható)")
+    b.add_argument("--huspacy", action="store_true", help="A DB szókincsének lemmatizálása huspacy-val")
+    b.add_argument("--model", default="hu_core_news_md", help="huspacy modell (alapértelmezés: hu_core_news_md)")
+    b.add_argument("--db", default="news.sqlite")
+    b.add_argument("--min-count", type=int, default=2, help="Ennél ritkább alakok kimaradnak")
+    t = sub.add_parser("bench", help="porter vs hu_norm indexelés egy mintán")
+    t.add_argument("--db", default="news.sqlite")
+    t.add_argument("--sample", type=int, default=20000)
+    args = ap.parse_args()
+
+    if args.cmd == "bench":
+        bench(args.db, args.sample)
+        return
+
+    def pairs():
+        for p in args.tsv:
+            yield from iter_tsv(Path(p))
+        if args.huspacy:
+            words = db_vocabulary(args.db, args.min_count)
+            print(f"[HU] {len(words)} szóalak lemmatizálása ({args.model})...")
+            yield from iter_huspacy(words, args.model)
+
+    if not args.tsv and not args.huspacy:
+        ap.error("--tsv vagy --huspacy kell")
+    n = build_lemma_table(pairs(), Path(args.out))
+    print(f"✅ Lemma-tábla kész: {args.out} ({n} alak, {Path(args.out).stat().st_size / 1e6:.1f} MB)")
+    print("ℹ️  Az items_fts-t ezután újra kell építeni: python fts_migrate.py")
+
+
+if __name__ == "__main__":
+    main()
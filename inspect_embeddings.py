@@ -3,6 +3,8 @@ import argparse
 import sqlite3
 from textwrap import shorten
 
+from body_text import register as register_body_text
+
 DB_PATH = "news.sqlite"
 
 def list_articles(conn, label=None, cluster=None, limit=15, order="score"):
@@ -25,11 +27,28 @@ def list_articles(conn, label=None, cluster=None, limit=15, order="score"):
     return conn.execute(q, args).fetchall()
 
 def list_clusters(conn):
+    # új sémájú DB: a cluster_stats rollup (triggerek tartják karban), nincs GROUP BY az egész táblán
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='cluster_stats'").fetchone():
+        # az összefoglaló a clusters táblában (migrate_legacy / embedder tölti), ha van
+        has_clusters = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='clusters'"
+        ).fetchone()
+        q = """
+        SELECT s.cluster_id, s.n_articles, s.last_day, {summary}
+        FROM cluster_stats s {join}
+        ORDER BY s.cluster_id;
+        """.format(
+            summary="c.summary" if has_clusters else "NULL",
+            join="LEFT JOIN clusters c ON c.cluster_id = s.cluster_id" if has_clusters else "",
+        )
+        return conn.execute(q).fetchall()
+
+    # régi items tábla: egyetlen menet, klaszterenkénti korrelált al-lekérdezés nélkül
     q = """
     SELECT cluster_id, COUNT(*),
            MAX(datetime(ts,'unixepoch')),
-           (SELECT cluster_summary FROM items i2 WHERE i2.cluster_id=i1.cluster_id AND i2.cluster_summary IS NOT NULL LIMIT 1)
-    FROM items i1
+           MAX(cluster_summary)
+    FROM items
     GROUP BY cluster_id
     ORDER BY cluster_id;
     """
@@ -46,6 +65,7 @@ def main():
     args = ap.parse_args()
 
     conn = sqlite3.connect(args.db)
+    register_body_text(conn)   # items view / FTS triggerek: body_text()
 
     if args.clusters:
         print("\n📊 Klaszter-összefoglalók:\n")
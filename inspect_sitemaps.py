@@ -3,9 +3,12 @@ import argparse
 import sqlite3
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
+import itertools
 import yaml
 
+from body_text import register as register_body_text
+from streaming_export import XlsxStreamWriter, iter_query, print_progress
+
 DB_DEFAULT = "news.sqlite"
 
 def load_allowlist(config_path: str):
@@ -17,7 +20,9 @@ def load_allowlist(config_path: str):
     allow = sorted(set(allow))
     return allow
 
-def fetch_domain_df(conn, domain: str, since_ts: int | None, limit: int | None):
+COLS = ["date","title","link","source","label","label_score","cluster_id","snippet"]
+
+def domain_query(domain: str, since_ts: int | None, limit: int | None):
     where = ["source LIKE '%sitemap%'", "source LIKE ?"]
     params = [f"%{domain}%"]
 
@@ -40,17 +45,7 @@ def fetch_domain_df(conn, domain: str, since_ts: int | None, limit: int | None):
         ORDER BY ts DESC
         {f'LIMIT {int(limit)}' if limit else ''}
     """
-    rows = conn.execute(sql, params).fetchall()
-    cols = ["date","title","link","source","label","label_score","cluster_id","snippet"]
-    return pd.DataFrame(rows, columns=cols)
-
-def sanitize_sheet(name: str) -> str:
-    # Excel munkalapnév max 31 karakter és tiltott jelek nélkül
-    bad = ['\\', '/', '?', '*', '[', ']', ':']
-    for b in bad:
-        name = name.replace(b, ' ')
-    name = name[:31] or "Sheet"
-    return name
+    return sql, params
 
 def main():
     ap = argparse.ArgumentParser(description="Sitemap-ből származó cikkek exportja domainenként Excelbe")
@@ -73,30 +68,36 @@ def main():
 
     Path(args.out).parent.mkdir(parents=True, exist_ok=True)
 
+    try:
+        xw = XlsxStreamWriter(args.out, progress=print_progress)
+    except RuntimeError as e:
+        print(f"ℹ️  {e}")
+        return
+
     conn = sqlite3.connect(args.db)
+    register_body_text(conn)   # items view / FTS triggerek: body_text()
     all_summ_rows = []
 
-    with pd.ExcelWriter(args.out, engine="openpyxl") as xw:
-        for domain in allow:
-            df = fetch_domain_df(conn, domain, since_ts, args.limit)
-            if df.empty:
-                # üres munkalap helyett csak a Summaryban jelezzük
-                all_summ_rows.append({"domain": domain, "rows": 0, "latest_date": None})
-                continue
-
-            # összefoglalóhoz stat
-            latest_date = df["date"].iloc[0] if not df.empty else None
-            all_summ_rows.append({"domain": domain, "rows": int(len(df)), "latest_date": latest_date})
-
-            # írás külön munkalapra
-            sheet = sanitize_sheet(domain)
-            df.to_excel(xw, index=False, sheet_name=sheet)
-
-        # Summary lap
-        summ = pd.DataFrame(all_summ_rows, columns=["domain","rows","latest_date"]).sort_values(by="rows", ascending=False)
-        summ.to_excel(xw, index=False, sheet_name="Summary")
-
-    conn.close()
+    try:
+        with xw:
+            for domain in allow:
+                sql, params = domain_query(domain, since_ts, args.limit)
+                rows = iter_query(conn, sql, params)
+                first = next(rows, None)
+                if first is None:
+                    # üres munkalap helyett csak a Summaryban jelezzük
+                    all_summ_rows.append((domain, 0, None))
+                    continue
+
+                # ts DESC: az első sor a legfrissebb; írás külön munkalapra (streamelve)
+                n = xw.write_sheet(domain, COLS, itertools.chain([first], rows))
+                all_summ_rows.append((domain, n, first[0]))
+
+            # Summary lap
+            all_summ_rows.sort(key=lambda r: r[1], reverse=True)
+            xw.write_sheet("Summary", ["domain","rows","latest_date"], all_summ_rows)
+    finally:
+        conn.close()
     print(f"✅ Kész: {args.out}")
 
 if __name__ == "__main__":
@@ -3,12 +3,15 @@ from pathlib import Path
 import feedparser, httpx, trafilatura, yaml
 from urllib.parse import urlparse
 
+from hu_normalizer import register as register_hu_norm
+
 def load_cfg(p): 
     with open(p, "r", encoding="utf-8") as f: 
         return yaml.safe_load(f)
 
 def init_db(db_path):
     conn = sqlite3.connect(db_path)
+    register_hu_norm(conn)   # az items_fts triggerei hu_norm()-ot hívnak
     conn.execute("""CREATE TABLE IF NOT EXISTS items(
         id TEXT PRIMARY KEY,
         title TEXT,
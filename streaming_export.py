@@ -0,0 +1,179 @@
+# streaming_export.py
+"""
+Konstans memóriás táblázat-export (XLSX / CSV) SQLite lekérdezésekből.
+
+A pandas DataFrame + to_excel (openpyxl) az egész munkafüzetet memóriában
+tartja; itt a sorok chunkolt cursorról (fetchmany) jönnek és rögtön ki is
+íródnak:
+
+  - XLSX: xlsxwriter constant_memory módban (soronként flush-ol a temp fájlba),
+    Excel sorlimitnél a munkalap automatikusan folytatódik ("telex.hu (2)"),
+  - CSV: csv.writer, utf-8-sig (Excel így jól nyitja az ékezeteket).
+
+    with XlsxStreamWriter("export/x.xlsx", progress=print_progress) as xw:
+        xw.write_sheet("telex.hu", COLS, iter_query(conn, sql, params))
+        xw.write_sheet("Summary", ["domain", "rows"], summary_rows)
+"""
+import csv
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+try:
+    import xlsxwriter  # pip install xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXCEL_MAX_ROWS = 1_048_576          # fejléccel együtt
+EXCEL_MAX_CELL = 32_767             # karakter / cella
+DEFAULT_CHUNK = 2000
+PROGRESS_EVERY = 10_000             # sor
+
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+def iter_query(conn, sql: str, params: Sequence[Any] = (), chunk_size: int = DEFAULT_CHUNK) -> Iterator[tuple]:
+    """Lekérdezés sorai chunkonként (fetchmany), a teljes eredmény sosincs memóriában."""
+    cur = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cur.close()
+
+
+def sanitize_sheet(name: str) -> str:
+    # Excel munkalapnév max 31 karakter és tiltott jelek nélkül
+    for b in ['\\', '/', '?', '*', '[', ']', ':']:
+        name = name.replace(b, ' ')
+    return name[:31] or "Sheet"
+
+
+def print_progress(info: Dict[str, Any]) -> None:
+    print(f"  … {info['sheet']}: {info['rows']} sor ({info['total']} összesen, {info['rows_per_sec']:.0f} sor/s)")
+
+
+class _Progress:
+    def __init__(self, progress: Optional[ProgressFn], every: int):
+        self.progress = progress
+        self.every = every
+        self.total = 0
+        self.t0 = time.time()
+
+    def row(self, sheet: str, rows: int) -> None:
+        self.total += 1
+        if rows % self.every == 0:
+            self.report(sheet, rows)
+
+    def report(self, sheet: str, rows: int) -> None:
+        if self.progress:
+            self.progress({
+                "sheet": sheet,
+                "rows": rows,
+                "total": self.total,
+                "rows_per_sec": self.total / max(time.time() - self.t0, 1e-6),
+            })
+
+
+class XlsxStreamWriter:
+    """
+    Munkafüzet, amibe munkalaponként streamelve lehet sorokat írni.
+
+    constant_memory módban egy munkalapot sorrendben, egyszerre kell megírni
+    (write_sheet egy hívás = egy lap, ill. a sorlimit miatt több folytatólap).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        progress: Optional[ProgressFn] = None,
+        progress_every: int = PROGRESS_EVERY,
+        max_rows: int = EXCEL_MAX_ROWS,
+    ):
+        if xlsxwriter is None:
+            raise RuntimeError("Az .xlsx exporthoz telepítsd: pip install xlsxwriter")
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_rows = max_rows
+        self._progress = _Progress(progress, progress_every)
+        # strings_to_urls=False: a link oszlop ne legyen hiperhivatkozás (65k limit + memória)
+        self.wb = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+        self._bold = self.wb.add_format({"bold": True})
+        self._names: set = set()
+
+    def _new_sheet(self, base: str, part: int, columns: Sequence[str]):
+        suffix = f" ({part})" if part > 1 else ""
+        name = sanitize_sheet(base)[: 31 - len(suffix)] + suffix
+        n = 2
+        while name.lower() in self._names:   # két domain ugyanarra rövidül
+            tag = f"~{n}"
+            name = sanitize_sheet(base)[: 31 - len(suffix) - len(tag)] + tag + suffix
+            n += 1
+        self._names.add(name.lower())
+        ws = self.wb.add_worksheet(name)
+        ws.write_row(0, 0, list(columns), self._bold)
+        ws.freeze_panes(1, 0)
+        return ws, name
+
+    def write_sheet(self, name: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """Sorok kiírása; a sorlimit felett új lapon folytatja. Visszatérés: adatsorok száma."""
+        part = 1
+        ws, sheet = self._new_sheet(name, part, columns)
+        r = 0               # aktuális lap utolsó sora (0 = fejléc)
+        written = 0
+        for row in rows:
+            if r + 1 >= self.max_rows:
+                part += 1
+                ws, sheet = self._new_sheet(name, part, columns)
+                r = 0
+            r += 1
+            ws.write_row(r, 0, [_cell(v) for v in row])
+            written += 1
+            self._progress.row(sheet, written)
+        self._progress.report(sheet, written)
+        return written
+
+    def close(self) -> None:
+        self.wb.close()
+
+    def __enter__(self) -> "XlsxStreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _cell(v: Any) -> Any:
+    # Excel cellalimit; hosszabb szöveget az Excel hibásnak jelezne
+    if isinstance(v, str) and len(v) > EXCEL_MAX_CELL:
+        return v[: EXCEL_MAX_CELL - 1] + "…"
+    return v
+
+
+def write_csv(
+    path: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    delimiter: str = ";",
+    progress: Optional[ProgressFn] = None,
+    progress_every: int = PROGRESS_EVERY,
+) -> int:
+    """Soronként streamelt CSV (utf-8-sig). Visszatérés: adatsorok száma."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    prog = _Progress(progress, progress_every)
+    sheet = Path(path).name
+    n = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f, delimiter=delimiter)
+        w.writerow(list(columns))
+        for row in rows:
+            w.writerow(["" if v is None else v for v in row])
+            n += 1
+            prog.row(sheet, n)
+    prog.report(sheet, n)
+    return n